@@ -40,6 +40,14 @@ try:
 except NameError:
     raise ImportError("GatherFramework requires API to be imported before use. Import API in your script first.")
 
+# Optional shared helpers (LegionUtils sits next to this file)
+try:
+    from LegionUtils import JournalWatcher, get_shared_pets, RoutePlanner
+except ImportError:
+    JournalWatcher = None
+    get_shared_pets = None
+    RoutePlanner = None
+
 # ============ CONSTANTS ============
 
 # Timings
@@ -654,6 +662,9 @@ class CombatSystem:
         self.current_enemy = None
         self.last_guard_time = 0
         self.last_kill_time = 0
+        # Flee routes over cached walkability (None without LegionUtils)
+        self.route_planner = RoutePlanner() if RoutePlanner is not None else None
+        self.flee_route = []
 
     def find_closest_hostile(self, max_distance=10):
         """Find nearest hostile mobile.
@@ -740,9 +751,29 @@ class CombatSystem:
         except:
             return False
 
+    def _plan_flee(self, enemy, distance):
+        """Plan Pathfind legs to the reachable tile farthest from enemy.
+
+        Returns:
+            List of (x, y) legs, or [] if no route is known
+        """
+        if self.route_planner is None or not enemy:
+            return []
+        player_x = getattr(API.Player, 'X', 0)
+        player_y = getattr(API.Player, 'Y', 0)
+        enemy_pos = (getattr(enemy, 'X', player_x), getattr(enemy, 'Y', player_y))
+        try:
+            return self.route_planner.flee_route((player_x, player_y), [enemy_pos], distance) or []
+        except Exception:
+            return []
+
     def flee_from_enemy(self, enemy, distance=15, timeout=15.0):
         """Flee from enemy with stuck detection.
 
+        With LegionUtils available the flee target is the reachable tile
+        that ends farthest from the enemy, walked in short legs; otherwise
+        (or when no route is known) it runs the opposite way.
+
         Args:
             enemy: Mobile to flee from
             distance: Distance to flee (default 15)
@@ -756,6 +787,7 @@ class CombatSystem:
         last_pos_y = getattr(API.Player, 'Y', 0)
         last_pos_check = time.time()
         stuck_count = 0
+        self.flee_route = self._plan_flee(enemy, distance)
 
         while time.time() < flee_start + timeout:
             API.ProcessCallbacks()
@@ -772,10 +804,17 @@ class CombatSystem:
                     if API.Pathfinding():
                         API.CancelPathfinding()
 
-                    # Random direction
-                    dx = random.randint(-10, 10)
-                    dy = random.randint(-10, 10)
-                    API.Pathfind(current_x + dx, current_y + dy)
+                    # Block the tile we couldn't enter and re-plan from here
+                    if self.flee_route:
+                        self.route_planner.note_stuck((current_x, current_y), self.flee_route[0])
+                    self.flee_route = self._plan_flee(enemy, distance)
+                    if self.flee_route:
+                        API.Pathfind(self.flee_route[0][0], self.flee_route[0][1])
+                    else:
+                        # Random direction
+                        dx = random.randint(-10, 10)
+                        dy = random.randint(-10, 10)
+                        API.Pathfind(current_x + dx, current_y + dy)
 
                 last_pos_x = current_x
                 last_pos_y = current_y
@@ -794,8 +833,19 @@ class CombatSystem:
                     if hp_after >= hp_before:
                         return True
 
+            # Next leg of the planned route (re-plan once the route is used up)
+            if self.flee_route and max(abs(current_x - self.flee_route[0][0]),
+                                       abs(current_y - self.flee_route[0][1])) <= 1:
+                self.flee_route.pop(0)
+                if not self.flee_route:
+                    self.flee_route = self._plan_flee(enemy, distance)
+                if self.flee_route:
+                    API.Pathfind(self.flee_route[0][0], self.flee_route[0][1])
+
             # Pathfind away from enemy
-            if not API.Pathfinding() and enemy:
+            if not API.Pathfinding() and self.flee_route:
+                API.Pathfind(self.flee_route[0][0], self.flee_route[0][1])
+            elif not API.Pathfinding() and enemy:
                 player_x = getattr(API.Player, 'X', 0)
                 player_y = getattr(API.Player, 'Y', 0)
                 enemy_x = getattr(enemy, 'X', player_x)
@@ -829,21 +879,27 @@ class PetSystem:
         """
         self.use_shared_list = use_shared_list
 
-    def get_pets(self):
-        """Get pets from SharedPets_List.
+    def get_pet_serials(self):
+        """Get pet serials from the shared pet list.
+
+        Uses the LegionUtils state bus when available (no re-parsing until
+        Tamer Suite publishes a change), otherwise parses SharedPets_List.
 
         Returns:
-            List of pet mobiles
+            List of pet serials
         """
         if not self.use_shared_list:
             return []
 
+        if get_shared_pets is not None:
+            return list(get_shared_pets().keys())
+
         try:
             pets_str = API.GetPersistentVar("SharedPets_List", "", API.PersistentVar.Char)
             if not pets_str:
                 return []
 
-            pets = []
+            serials = []
             for entry in pets_str.split('|'):
                 if not entry or ':' not in entry:
                     continue
@@ -851,49 +907,45 @@ class PetSystem:
                 parts = entry.split(':')
                 if len(parts) >= 2:
                     try:
-                        serial = int(parts[1])
-                        mob = API.FindMobile(serial)
-                        if mob and not mob.IsDead:
-                            pets.append(mob)
+                        serials.append(int(parts[1]))
                     except:
                         continue
 
-            return pets
+            return serials
         except:
             return []
 
-    def get_dead_pets(self):
-        """Get list of dead pets.
+    def get_pet_mobiles(self):
+        """Get every shared pet that is in range, alive or dead.
 
         Returns:
-            List of dead pet mobiles
+            List of pet mobiles
         """
-        if not self.use_shared_list:
-            return []
+        mobiles = []
+        for serial in self.get_pet_serials():
+            try:
+                mob = API.FindMobile(serial)
+                if mob:
+                    mobiles.append(mob)
+            except:
+                continue
+        return mobiles
 
-        try:
-            pets_str = API.GetPersistentVar("SharedPets_List", "", API.PersistentVar.Char)
-            if not pets_str:
-                return []
+    def get_pets(self):
+        """Get living pets from SharedPets_List.
 
-            dead_pets = []
-            for entry in pets_str.split('|'):
-                if not entry or ':' not in entry:
-                    continue
+        Returns:
+            List of pet mobiles
+        """
+        return [mob for mob in self.get_pet_mobiles() if not mob.IsDead]
 
-                parts = entry.split(':')
-                if len(parts) >= 2:
-                    try:
-                        serial = int(parts[1])
-                        mob = API.FindMobile(serial)
-                        if mob and mob.IsDead:
-                            dead_pets.append(mob)
-                    except:
-                        continue
+    def get_dead_pets(self):
+        """Get list of dead pets.
 
-            return dead_pets
-        except:
-            return []
+        Returns:
+            List of dead pet mobiles
+        """
+        return [mob for mob in self.get_pet_mobiles() if mob.IsDead]
 
     def preflight_check(self, min_hp_pct=80):
         """Check if pets are alive and healthy.
@@ -904,13 +956,14 @@ class PetSystem:
         Returns:
             "ok", "no_pets", "dead_pets", or "needs_healing"
         """
-        pets = self.get_pets()
+        # One read of the pet list and one lookup per pet for all checks
+        mobiles = self.get_pet_mobiles()
+        pets = [mob for mob in mobiles if not mob.IsDead]
 
-        if not pets or len(pets) == 0:
+        if not pets:
             return "no_pets"
 
-        dead_pets = self.get_dead_pets()
-        if dead_pets and len(dead_pets) > 0:
+        if len(pets) < len(mobiles):
             return "dead_pets"
 
         for pet in pets:
@@ -1037,6 +1090,7 @@ class Harvester:
         self.tool_serial = tool_serial
         self.harvest_delay = harvest_delay
         self.use_aoe = False  # AOE self-targeting mode
+        self.journal = JournalWatcher(API) if JournalWatcher else None
 
     def get_tool(self):
         """Get tool item.
@@ -1062,6 +1116,8 @@ class Harvester:
             return False
 
         API.ClearJournal()
+        if self.journal:
+            self.journal.reset()
 
         if self.use_aoe:
             # AOE self-targeting
@@ -1103,16 +1159,40 @@ class Harvester:
         Returns:
             "success", "depleted", or "unknown"
         """
-        for msg in success_messages:
-            if API.InJournal(msg):
-                return "success"
+        if self.find_journal_message(success_messages):
+            return "success"
 
-        for msg in failure_messages:
-            if API.InJournal(msg):
-                return "depleted"
+        if self.find_journal_message(failure_messages):
+            return "depleted"
 
         return "unknown"
 
+    def find_journal_message(self, messages):
+        """Find the first message seen in the journal since the last harvest.
+
+        With LegionUtils available, new journal lines are read once and
+        matched against every watched message in one pass; otherwise falls
+        back to one API.InJournal call per message.
+
+        Args:
+            messages: List of message strings
+
+        Returns:
+            The first matching message, or None
+        """
+        if self.journal is None:
+            for msg in messages:
+                if API.InJournal(msg, False):
+                    return msg
+            return None
+
+        for msg in messages:
+            if not self.journal.is_watching(msg):
+                self.journal.watch_all(messages)
+                break
+        self.journal.poll()
+        return self.journal.seen_any(messages)
+
 # ============ SESSION STATS ============
 
 class SessionStats:
@@ -0,0 +1,241 @@
+# ============================================================
+# LegionUtils - Common Utilities for TazUO Legion Scripts
+# by Coryigon for UO Unchained
+# Version: 3.2 (Phase 4 - Performance)
+# ============================================================
+#
+# Shared library of common patterns used across scripts.
+# Import this to reduce code duplication and token usage.
+#
+# Usage:
+#   import API
+#   import time
+#   import sys
+#   sys.path.append(r"path\to\refactors")
+#   from LegionUtils import *
+#
+# NOTE: Scripts must import API and time BEFORE importing LegionUtils
+#
+# Layout:
+#   LegionUtils is a package. This file is a facade: every name can still
+#   be imported from LegionUtils directly, but each submodule (combat,
+#   inventory, persistence, gui, hotkeys, gump, journal, perf, ...) is
+#   only loaded the first time one of its names is asked for. A script
+#   that needs get_item_count never compiles the GUI or profiler code.
+#
+# ============================================================
+
+# ============================================================
+# CHANGELOG:
+# v3.2 (2026-10-17) - Modular Loading
+#   - Split into submodules loaded on first use behind this facade
+#   - load_all() / get_loaded_modules() helpers
+#   - HotkeyDispatcher class (one handler per key, dict lookup per press)
+#   - PetDamageTracker class (per-pet HP series, DPS and projected HP for heal triage)
+#   - ActionTimingModel class (learns heal/action completion p95 from journal timestamps)
+#   - percentile() helper (nearest-rank, shared by APIProfiler and ActionTimingModel)
+#   - HealConfig/decide_heal() (pure heal priority engine shared by the healer scripts)
+#   - CommandPipeline class (ORDER mode pet commands paced by the target cursor + adaptive floor)
+#   - MobileScan class (one GetMobiles pass per tick, notoriety/distance bands + spatial hash)
+#   - FrameCache.get_scan()/get_mobile_scan() share the tick's MobileScan across subsystems
+#   - ThreatDistanceField class (lazily filled distance-to-nearest-threat tiles, incremental updates)
+#   - WindowedSum class (ring buffer + running total over a time window)
+#   - WalkabilityGrid/RoutePlanner classes (cached GetTile/statics walkability, A* legs for Pathfind)
+#   - BufferedLogWriter class (batched appends, repeat folding, size rotation)
+#   - AreaIndex class (grid-bucketed area shapes, versioned blob, ordered point-in-area lookups)
+#   - TraceRecorder class / read_trace() (append-only API trace, replayed by tools/LegionReplay.py)
+#   - ConsumptionRate class (sample ring buffer + O(1) exponentially weighted use per hour)
+#
+# v3.1 Phase 4 (2026-10-17) - Performance & Instrumentation
+#   - APIProfiler class (per-function call counts, latency percentiles, calls/tick)
+#   - FrameCache class (per-tick FindMobile/Player memo with hit/miss counters)
+#   - get_mobile_safe() and player helpers read through the active FrameCache
+#   - InventoryIndex class (one-pass graphic map) behind get_item_count/has_item/count_items_by_type
+#   - JournalWatcher class (high-water mark + single-regex multi-pattern match)
+#   - journal_contains()/journal_contains_any() read through the shared JournalWatcher
+#   - SettingsStore class (write-behind, one JSON blob per script) behind save_*/load_* helpers
+#   - StateBus class (versioned shared vars); pets/combat helpers read it before persistent vars
+#   - Scheduler class (timer heap + API.Events wakeups; sleeps until the next due task)
+#
+# v3.0 Phase 3 (2026-01-27) - Polish & Specialized
+#   - Additional formatters: distance, weight, percentage, countdown
+#   - LayoutHelper class (GUI positioning with spacing)
+#   - ConditionChecker class (batch condition checking)
+#   - ResourceTracker class (multi-resource tracking with warnings)
+#   - Journal helpers: journal_contains(), journal_contains_any()
+#   - Safe math helpers: safe_divide(), clamp(), lerp()
+#   - Color helpers: hue_for_percentage(), hue_for_value()
+#
+# v3.0 Phase 2 (2026-01-27) - Advanced Patterns
+#   - HotkeyBinding class (per-binding management)
+#   - HotkeyManager class (eliminates ~200 lines per script)
+#   - StateMachine class (transition callbacks)
+#   - DisplayGroup class (batch label updates, ~50-100 lines saved)
+#   - WarningManager class (extends ErrorManager for warnings)
+#   - StatusDisplay class (transient status messages)
+#   - Common formatters: format_stat_bar(), format_hp_bar()
+#
+# v3.0 Phase 1 (2026-01-27) - Foundation Enhancements
+#   - Enhanced item counting: get_item_count(), has_item(), count_items_by_type()
+#   - WindowPositionTracker class (eliminates ~40 lines per script)
+#   - ToggleSetting class (eliminates ~20 lines per toggle)
+#   - ActionTimer class (simpler than CooldownTracker for one-time actions)
+#   - ExpandableWindow class (eliminates ~80 lines per script)
+#
+# v2.0 (2026-01-25) - Tamer Suite Additions
+#   - CooldownTracker class for reusable cooldown management
+#   - Player state functions (poisoned, dead, paralyzed)
+#   - Enhanced potion management
+#   - Sound alerts
+#   - Pet list save/load helpers
+#
+# v1.0 (2026-01-24) - Initial Release
+#   - Combat state management
+#   - Mobile/item utilities
+#   - Persistence helpers
+#   - ErrorManager class
+#   - Basic GUI utilities
+# ============================================================
+
+import sys
+
+# A fresh import of the facade (script restart, test harness) must not
+# reuse submodules - and their singletons - from the previous load
+for _name in [n for n in sys.modules if n.startswith(__name__ + ".")]:
+    del sys.modules[_name]
+
+# Constants are tiny and used everywhere - always loaded
+from .constants import *
+
+# ============ LAZY SUBMODULES ============
+# submodule -> public names it defines
+_SUBMODULES = {
+    "core": (
+        "ErrorManager", "CooldownTracker", "ResourceRateTracker", "DEBUG_MODE",
+        "set_debug", "debug_msg", "play_sound_alert", "ActionTimer",
+        "StateMachine", "WarningManager", "ConditionChecker", "WindowedSum",
+        "ConsumptionRate",
+    ),
+    "formatting": (
+        "format_gold_compact", "format_time_elapsed", "format_stat_bar",
+        "format_hp_bar", "format_distance", "format_weight",
+        "format_percentage", "format_countdown", "safe_divide", "clamp",
+        "lerp", "percentile", "hue_for_percentage", "hue_for_value",
+    ),
+    "persistence": (
+        "save_bool", "load_bool", "save_int", "load_int", "save_float",
+        "load_float", "save_list", "load_list", "save_window_position",
+        "load_window_position", "parse_shared_pets", "get_shared_pets",
+        "get_shared_pets_version", "save_shared_pets", "SettingsStore",
+        "StateBus", "get_state_bus",
+    ),
+    "combat": (
+        "is_in_combat", "set_combat_state", "get_mobile_safe",
+        "get_hp_percent", "is_poisoned", "get_distance", "get_mob_name",
+        "is_player_poisoned", "is_player_dead", "is_player_paralyzed",
+        "cancel_all_targets", "target_with_pretarget", "request_target",
+        "FrameCache", "find_mobile_cached", "get_player", "PetDamageTracker",
+        "CommandPipeline", "MobileScan", "get_mobile_scan",
+    ),
+    "inventory": (
+        "get_item_safe", "has_bandages", "get_bandage_count",
+        "get_potion_count", "get_item_count", "has_item",
+        "count_items_by_type", "ResourceTracker", "InventoryIndex",
+        "get_inventory_index",
+    ),
+    "journal": (
+        "journal_contains", "journal_contains_any", "clear_journal_check",
+        "JournalWatcher", "get_journal_watcher", "ActionTimingModel",
+    ),
+    "gui": (
+        "create_toggle_button", "update_toggle_button",
+        "WindowPositionTracker", "ToggleSetting", "ExpandableWindow",
+        "DisplayGroup", "StatusDisplay", "LayoutHelper",
+    ),
+    "hotkeys": (
+        "HotkeyBinding", "HotkeyDispatcher", "HotkeyManager",
+    ),
+    "gump": (
+        "GumpCapture",
+    ),
+    "perf": (
+        "APIProfiler", "ScheduledTask", "Scheduler",
+    ),
+    "healing": (
+        "HealConfig", "decide_heal", "NO_RANGE_LIMIT",
+    ),
+    "spatial": (
+        "ThreatDistanceField", "compass_directions", "AreaIndex",
+    ),
+    "routing": (
+        "WalkabilityGrid", "RoutePlanner", "find_path", "flood_steps",
+    ),
+    "logfile": (
+        "BufferedLogWriter",
+    ),
+    "trace": (
+        "TraceRecorder", "TraceObject", "read_trace", "encode_value",
+        "decode_value",
+    ),
+}
+
+_NAME_TO_MODULE = {}
+for _module_name, _names in _SUBMODULES.items():
+    for _name in _names:
+        _NAME_TO_MODULE[_name] = _module_name
+
+__all__ = [
+    "BANDAGE_GRAPHIC", "GOLD_GRAPHIC", "CHECK_GRAPHIC", "HEAL_POTION_GRAPHIC",
+    "CURE_POTION_GRAPHIC", "SHARED_COMBAT_KEY", "SHARED_PETS_KEY",
+    "SHARED_COMBAT_TOPIC", "SHARED_PETS_TOPIC", "ALL_HOTKEYS",
+    "load_all", "get_loaded_modules",
+] + list(_NAME_TO_MODULE)
+
+def _load_module(module_name):
+    __import__(__name__ + "." + module_name)
+    return sys.modules[__name__ + "." + module_name]
+
+def __getattr__(name):
+    """Load the submodule that defines name (Python 3.7+ module hook)"""
+    if name == "_lazy_probe":
+        return True
+    module_name = _NAME_TO_MODULE.get(name)
+    if module_name is None:
+        raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
+    value = getattr(_load_module(module_name), name)
+    # Functions/classes never change - cache them so the hook runs once.
+    # Plain values (DEBUG_MODE) are read from the submodule every time.
+    if callable(value):
+        globals()[name] = value
+    return value
+
+def _has_lazy_hook():
+    try:
+        sys.modules[__name__]._lazy_probe
+        return True
+    except AttributeError:
+        return False
+
+def load_all():
+    """Load every submodule now (e.g. before a fight, to keep hot paths warm)
+
+    Without the module __getattr__ hook every name is copied into the
+    facade, plain values included. With it, plain values (DEBUG_MODE) stay
+    behind the hook so they are read live from their submodule.
+    """
+    copy_values = not _has_lazy_hook()
+    for module_name, names in _SUBMODULES.items():
+        module = _load_module(module_name)
+        for name in names:
+            value = getattr(module, name)
+            if copy_values or callable(value):
+                globals()[name] = value
+
+def get_loaded_modules():
+    """Names of the submodules loaded so far"""
+    prefix = __name__ + "."
+    return sorted(n[len(prefix):] for n in sys.modules if n.startswith(prefix))
+
+# Interpreters without module __getattr__ get everything up front
+if not _has_lazy_hook():
+    load_all()
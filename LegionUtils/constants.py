@@ -0,0 +1,30 @@
+# ============================================================
+# LegionUtils.constants - Item graphics, shared-state keys and hotkey names
+# Part of LegionUtils (see __init__.py for usage and changelog)
+# ============================================================
+
+# ============ CONSTANTS ============
+BANDAGE_GRAPHIC = 0x0E21
+GOLD_GRAPHIC = 0x0EED
+CHECK_GRAPHIC = 0x14F0
+HEAL_POTION_GRAPHIC = 0x0F0C
+CURE_POTION_GRAPHIC = 0x0F07
+
+# Shared persistence keys
+SHARED_COMBAT_KEY = "SharedCombat_Active"
+SHARED_PETS_KEY = "SharedPets_List"
+
+# Shared state bus topics (in-memory, see StateBus)
+SHARED_COMBAT_TOPIC = "combat"
+SHARED_PETS_TOPIC = "pets"
+
+# All possible hotkey bindings
+ALL_HOTKEYS = [
+    "F1", "F2", "F3", "F4", "F5", "F6", "F7", "F8", "F9", "F10", "F11", "F12",
+    "A", "B", "C", "D", "E", "F", "G", "H", "I", "J", "K", "L", "M",
+    "N", "O", "P", "Q", "R", "S", "T", "U", "V", "W", "X", "Y", "Z",
+    "0", "1", "2", "3", "4", "5", "6", "7", "8", "9",
+    "NUMPAD0", "NUMPAD1", "NUMPAD2", "NUMPAD3", "NUMPAD4",
+    "NUMPAD5", "NUMPAD6", "NUMPAD7", "NUMPAD8", "NUMPAD9",
+    "ESC",
+]
@@ -0,0 +1,642 @@
+# ============================================================
+# LegionUtils.core - Error, cooldown, timer and state machine helpers
+# Part of LegionUtils (see __init__.py for usage and changelog)
+# ============================================================
+# API is expected to be in global scope (imported by calling script)
+
+import time
+
+from .formatting import format_gold_compact
+
+# ============ ERROR MESSAGE MANAGEMENT ============
+class ErrorManager:
+    """Manages error messages with cooldowns to prevent spam"""
+    def __init__(self, cooldown=5.0):
+        self.last_error_time = 0
+        self.last_error_msg = ""
+        self.cooldown = cooldown
+
+    def set_error(self, msg):
+        """Show error message if cooldown has passed"""
+        if msg != self.last_error_msg or (time.time() - self.last_error_time) > self.cooldown:
+            self.last_error_msg = msg
+            self.last_error_time = time.time()
+            if msg:
+                API.SysMsg(msg, 32)
+
+    def clear_error(self):
+        """Clear error state"""
+        self.last_error_msg = ""
+
+    def has_error(self):
+        """Check if there's an active error"""
+        return bool(self.last_error_msg)
+
+# ============ COOLDOWN MANAGEMENT ============
+class CooldownTracker:
+    """Tracks cooldowns for actions (potions, vet kit, etc)"""
+    def __init__(self, cooldown_seconds=10.0):
+        self.last_use_time = 0
+        self.cooldown = cooldown_seconds
+
+    def is_ready(self):
+        """Check if action is off cooldown"""
+        return (time.time() - self.last_use_time) >= self.cooldown
+
+    def use(self):
+        """Mark action as used, starting cooldown"""
+        self.last_use_time = time.time()
+
+    def time_remaining(self):
+        """Get seconds remaining on cooldown"""
+        elapsed = time.time() - self.last_use_time
+        remaining = self.cooldown - elapsed
+        return max(0, remaining)
+
+class ResourceRateTracker:
+    """Tracks resource gains over time and calculates rates
+
+    Useful for gathering scripts (gold, ore, logs, fish, etc.)
+    Automatically detects increases and calculates per-minute/hour rates.
+
+    Example:
+        # Setup
+        gold_tracker = ResourceRateTracker("gold", check_interval=2.0, notify_threshold=100)
+
+        # In main loop
+        current_gold = count_all_gold()
+        gold_tracker.update(current_gold)
+
+        # Get rates
+        per_min, per_10min, per_hour = gold_tracker.get_rates()
+
+        # Display
+        API.SysMsg("Total: " + str(gold_tracker.total_gained) + " (" + format_gold_compact(per_min) + "/m)")
+
+        # Reset counter (e.g., user button)
+        gold_tracker.reset()
+    """
+
+    def __init__(self, resource_name="resource", check_interval=2.0, notify_threshold=0):
+        """Initialize resource rate tracker
+
+        Args:
+            resource_name: Name for notifications (e.g., "gold", "ore")
+            check_interval: Seconds between checks (default 2.0)
+            notify_threshold: Minimum gain to show notification (0 = no notifications)
+        """
+        self.resource_name = resource_name
+        self.check_interval = check_interval
+        self.notify_threshold = notify_threshold
+
+        self.session_start = time.time()
+        self.total_gained = 0
+        self.last_known = 0
+        self.last_check = 0
+
+    def update(self, current_amount):
+        """Update tracker with current resource amount
+
+        Call this in main loop with the current resource count.
+        Automatically detects increases and updates totals.
+
+        Args:
+            current_amount: Current total resource amount
+        """
+        # Only check every check_interval seconds
+        if time.time() - self.last_check < self.check_interval:
+            return
+
+        self.last_check = time.time()
+
+        # On first check, just set baseline
+        if self.last_known == 0:
+            self.last_known = current_amount
+            return
+
+        # Check for increase
+        if current_amount > self.last_known:
+            delta = current_amount - self.last_known
+            self.total_gained += delta
+
+            # Show notification if threshold met
+            if self.notify_threshold > 0 and delta >= self.notify_threshold:
+                API.SysMsg("+" + format_gold_compact(delta) + " " + self.resource_name + " gained!", 68)
+
+        # Update baseline (handles both increases and decreases)
+        self.last_known = current_amount
+
+    def get_rates(self):
+        """Calculate resource gain rates
+
+        Returns:
+            tuple: (per_minute, per_10min, per_hour) as floats
+        """
+        elapsed_seconds = time.time() - self.session_start
+        elapsed_minutes = elapsed_seconds / 60.0
+
+        if elapsed_minutes < 0.1:  # Less than 6 seconds
+            return (0.0, 0.0, 0.0)
+
+        per_min = self.total_gained / elapsed_minutes
+        per_10min = per_min * 10
+        per_hour = per_min * 60
+
+        return (per_min, per_10min, per_hour)
+
+    def reset(self):
+        """Reset the tracker (clears total gained, restarts timer)"""
+        self.session_start = time.time()
+        self.total_gained = 0
+        self.last_known = 0
+        self.last_check = 0
+
+    def get_elapsed_time(self):
+        """Get elapsed time since session start
+
+        Returns:
+            float: Seconds elapsed
+        """
+        return time.time() - self.session_start
+
+class WindowedSum:
+    """Running total of the values added in the last `window` seconds
+
+    A fixed-size ring buffer of (time, value) with the sum kept up to
+    date as entries are added and expire, so total() is O(1) amortised
+    no matter how often it is asked - unlike rebuilding a list of recent
+    events and summing it on every check. When more than `capacity`
+    entries fall inside the window the oldest is dropped early.
+
+    Example:
+        damage = WindowedSum(window=3.0)
+        API.Events.OnPlayerHitsChanged(on_hits)   # on_hits calls damage.add(lost)
+        recent = damage.total()                   # damage taken in the last 3s
+    """
+
+    def __init__(self, window=3.0, capacity=64):
+        """Initialize an empty window
+
+        Args:
+            window: Seconds a value counts toward the total
+            capacity: Ring buffer size (most entries kept at once)
+        """
+        self.window = window
+        self.capacity = capacity
+        self._times = [0.0] * capacity
+        self._values = [0] * capacity
+        self._start = 0
+        self._count = 0
+        self._sum = 0
+
+    def _drop_oldest(self):
+        start = self._start
+        self._sum -= self._values[start]
+        self._start = (start + 1) % self.capacity
+        self._count -= 1
+        if self._count == 0:
+            self._sum = 0       # no float drift carried into the next burst
+
+    def expire(self, now=None):
+        """Drop entries older than the window"""
+        if now is None:
+            now = time.time()
+        times = self._times
+        while self._count and now - times[self._start] > self.window:
+            self._drop_oldest()
+
+    def add(self, value, now=None):
+        """Add value at time now (default: time.time())"""
+        if now is None:
+            now = time.time()
+        self.expire(now)
+        if self._count == self.capacity:
+            self._drop_oldest()
+        end = (self._start + self._count) % self.capacity
+        self._times[end] = now
+        self._values[end] = value
+        self._count += 1
+        self._sum += value
+
+    def total(self, now=None):
+        """Sum of the values added within the window"""
+        self.expire(now)
+        return self._sum
+
+    def clear(self):
+        """Forget every entry"""
+        self._start = 0
+        self._count = 0
+        self._sum = 0
+
+    def __len__(self):
+        return self._count
+
+class ConsumptionRate:
+    """Per-hour use of a counted supply (bandages, regs) from count samples
+
+    Keeps the last `capacity` (time, count) samples in a ring buffer and an
+    exponentially weighted rate updated in O(1) as each sample arrives, so
+    asking for the rate never rescans the history. Each interval where the
+    count dropped contributes (used / seconds) weighted by how long it was;
+    older intervals fade with `half_life`. Intervals where the count rose
+    (restocks) only move the baseline.
+
+    rate() also fades the estimate over the time since the last sample, so
+    a supply that stopped being used drifts back to 0 between samples.
+
+    Example:
+        bandages = ConsumptionRate()
+        bandages.add(get_item_count(BANDAGE_GRAPHIC))   # every check; skips repeats
+        per_hour = bandages.rate()
+        hours_left = count / per_hour if per_hour else -1
+    """
+
+    def __init__(self, half_life=1800.0, capacity=100, min_span=60.0):
+        """Initialize an empty history
+
+        Args:
+            half_life: Seconds after which an interval counts half as much
+            capacity: Ring buffer size (samples kept for history/persistence)
+            min_span: Seconds of observed use before rate() reports anything
+        """
+        self.half_life = half_life
+        self.capacity = capacity
+        self.min_span = min_span
+        self._times = [0.0] * capacity
+        self._counts = [0] * capacity
+        self._start = 0
+        self._count = 0
+        self._ewma = 0.0        # weighted items/second
+        self._weight = 0.0      # total weight so far (unbiases the early estimate)
+        self._span = 0.0        # seconds of intervals folded into the estimate
+
+    def _fade(self, elapsed):
+        return 0.5 ** (elapsed / self.half_life) if elapsed > 0 else 1.0
+
+    @property
+    def last_count(self):
+        """Most recent count (None before the first sample)"""
+        if not self._count:
+            return None
+        return self._counts[(self._start + self._count - 1) % self.capacity]
+
+    @property
+    def last_time(self):
+        """Time of the most recent sample (0 before the first)"""
+        if not self._count:
+            return 0
+        return self._times[(self._start + self._count - 1) % self.capacity]
+
+    def add(self, count, now=None):
+        """Record a count at time now; repeats of the last count are skipped
+
+        Returns:
+            bool: True if the sample was stored
+        """
+        if now is None:
+            now = time.time()
+        last = self.last_count
+        if last is not None:
+            if count == last:
+                return False
+            elapsed = now - self.last_time
+            if count < last and elapsed > 0:
+                keep = self._fade(elapsed)
+                self._ewma = self._ewma * keep + (last - count) / elapsed * (1 - keep)
+                self._weight = self._weight * keep + (1 - keep)
+                self._span += elapsed
+        if self._count == self.capacity:
+            self._start = (self._start + 1) % self.capacity
+            self._count -= 1
+        end = (self._start + self._count) % self.capacity
+        self._times[end] = now
+        self._counts[end] = count
+        self._count += 1
+        return True
+
+    def rate(self, now=None):
+        """Estimated use per hour (0 until min_span seconds of use were seen)"""
+        if self._span < self.min_span or self._weight <= 0:
+            return 0
+        if now is None:
+            now = time.time()
+        # The count has not changed since the last sample: that time was idle
+        keep = self._fade(now - self.last_time)
+        weight = self._weight * keep + (1 - keep)
+        return self._ewma * keep / weight * 3600.0
+
+    def samples(self):
+        """[(time, count)] oldest first"""
+        capacity = self.capacity
+        return [(self._times[(self._start + i) % capacity], self._counts[(self._start + i) % capacity])
+                for i in range(self._count)]
+
+    def clear(self):
+        """Forget every sample and the estimate"""
+        self._start = 0
+        self._count = 0
+        self._ewma = 0.0
+        self._weight = 0.0
+        self._span = 0.0
+
+    def __len__(self):
+        return self._count
+
+# ============ DEBUG UTILITIES ============
+DEBUG_MODE = False
+
+def set_debug(enabled):
+    """Enable/disable debug messages"""
+    global DEBUG_MODE
+    DEBUG_MODE = enabled
+
+def debug_msg(text):
+    """Print debug message if debug mode enabled"""
+    if DEBUG_MODE:
+        API.SysMsg("DEBUG: " + text, 88)
+
+# ============ SOUND UTILITIES ============
+def play_sound_alert(sound_id):
+    """Play sound alert if supported by API"""
+    try:
+        if hasattr(API, 'PlaySound'):
+            API.PlaySound(sound_id)
+    except:
+        pass
+
+# ============ ACTION TIMING ============
+class ActionTimer:
+    """Tracks timing for single actions with duration
+
+    Simpler than CooldownTracker - for one-time actions that complete.
+    Eliminates manual start_time + duration tracking.
+
+    Example:
+        bandage_timer = ActionTimer(BANDAGE_DELAY)
+
+        def start_bandage():
+            bandage_timer.start()
+            statusLabel.SetText("Healing...")
+
+        # In main loop
+        if bandage_timer.is_complete():
+            # Ready for next action
+            pass
+        else:
+            # Show remaining time
+            remaining = int(bandage_timer.time_remaining())
+            statusLabel.SetText("Healing (" + str(remaining) + "s)")
+    """
+
+    def __init__(self, duration):
+        """Initialize action timer
+
+        Args:
+            duration: Duration in seconds
+        """
+        self.duration = duration
+        self.start_time = 0
+        self.active = False
+
+    def start(self):
+        """Start action timer"""
+        self.start_time = time.time()
+        self.active = True
+
+    def is_complete(self):
+        """Check if action duration elapsed
+
+        Returns:
+            bool: True if timer not active or duration passed
+        """
+        if not self.active:
+            return True
+
+        if time.time() >= self.start_time + self.duration:
+            self.active = False
+            return True
+
+        return False
+
+    def time_remaining(self):
+        """Get seconds remaining
+
+        Returns:
+            float: Seconds remaining (0 if not active)
+        """
+        if not self.active:
+            return 0
+        remaining = self.duration - (time.time() - self.start_time)
+        return max(0, remaining)
+
+    def cancel(self):
+        """Cancel active timer"""
+        self.active = False
+
+# ============ STATE MACHINE MANAGEMENT ============
+class StateMachine:
+    """Simple state machine with transition callbacks
+
+    Useful for complex workflows with multiple states.
+    Simpler than manual state tracking with if/elif chains.
+
+    Example:
+        heal_state = StateMachine("idle")
+        heal_state.on_enter["healing"] = lambda: statusLabel.SetText("Healing...")
+        heal_state.on_exit["healing"] = lambda: statusLabel.SetText("Running")
+
+        # Transitions
+        heal_state.transition("healing")  # Triggers on_enter callback
+        heal_state.transition("idle")     # Triggers on_exit callback
+
+        # Check state
+        if heal_state.is_state("idle"):
+            # Can start new action
+            pass
+
+        # Time in state
+        if heal_state.time_in_state() > 5.0:
+            # Been healing for 5+ seconds
+            pass
+    """
+
+    def __init__(self, initial_state):
+        """Initialize state machine
+
+        Args:
+            initial_state: Starting state name
+        """
+        self.state = initial_state
+        self.prev_state = None
+        self.state_start_time = time.time()
+        self.on_enter = {}  # state -> callback
+        self.on_exit = {}   # state -> callback
+
+    def transition(self, new_state):
+        """Transition to new state
+
+        Args:
+            new_state: State to transition to
+        """
+        if new_state == self.state:
+            return  # Already in this state
+
+        # Exit callback for current state
+        if self.state in self.on_exit:
+            try:
+                self.on_exit[self.state]()
+            except:
+                pass
+
+        # Transition
+        self.prev_state = self.state
+        self.state = new_state
+        self.state_start_time = time.time()
+
+        # Enter callback for new state
+        if new_state in self.on_enter:
+            try:
+                self.on_enter[new_state]()
+            except:
+                pass
+
+    def is_state(self, state):
+        """Check if in specific state
+
+        Args:
+            state: State to check
+
+        Returns:
+            bool: True if in this state
+        """
+        return self.state == state
+
+    def time_in_state(self):
+        """Get time spent in current state
+
+        Returns:
+            float: Seconds in current state
+        """
+        return time.time() - self.state_start_time
+
+# ============ ENHANCED ERROR/WARNING MANAGEMENT ============
+class WarningManager(ErrorManager):
+    """Extends ErrorManager for warnings (yellow text, less aggressive)
+
+    Use for non-critical warnings that should be less prominent.
+
+    Example:
+        warnings = WarningManager(cooldown=10.0)
+        warnings.set_warning("Low on bandages!")  # Yellow text
+    """
+
+    def set_warning(self, msg):
+        """Show warning message if cooldown passed
+
+        Args:
+            msg: Warning message to display
+        """
+        if msg != self.last_error_msg or (time.time() - self.last_error_time) > self.cooldown:
+            self.last_error_msg = msg
+            self.last_error_time = time.time()
+            if msg:
+                API.SysMsg(msg, 43)  # Yellow for warnings
+
+# ============ BATCH OPERATIONS ============
+class ConditionChecker:
+    """Check multiple conditions at once
+
+    Useful for complex checks with multiple requirements.
+
+    Example:
+        checker = ConditionChecker()
+        checker.add("HP Low", lambda: player.Hits < 50)
+        checker.add("Poisoned", lambda: is_player_poisoned())
+        checker.add("Out of Range", lambda: target.Distance > 10)
+
+        # Check all
+        if checker.check_all():
+            # All conditions true
+            pass
+
+        # Check any
+        if checker.check_any():
+            # At least one condition true
+            pass
+
+        # Get failed conditions
+        failed = checker.get_failed()
+        # Returns: ["HP Low", "Out of Range"]
+    """
+
+    def __init__(self):
+        """Initialize condition checker"""
+        self.conditions = {}  # name -> function
+
+    def add(self, name, condition_func):
+        """Add condition to check
+
+        Args:
+            name: Condition name
+            condition_func: Function that returns True/False
+        """
+        self.conditions[name] = condition_func
+
+    def check_all(self):
+        """Check if all conditions are true
+
+        Returns:
+            bool: True if all conditions pass
+        """
+        for func in self.conditions.values():
+            try:
+                if not func():
+                    return False
+            except:
+                return False
+        return True
+
+    def check_any(self):
+        """Check if any condition is true
+
+        Returns:
+            bool: True if at least one condition passes
+        """
+        for func in self.conditions.values():
+            try:
+                if func():
+                    return True
+            except:
+                pass
+        return False
+
+    def get_failed(self):
+        """Get list of failed condition names
+
+        Returns:
+            list: Names of conditions that failed
+        """
+        failed = []
+        for name, func in self.conditions.items():
+            try:
+                if not func():
+                    failed.append(name)
+            except:
+                failed.append(name)
+        return failed
+
+    def get_passed(self):
+        """Get list of passed condition names
+
+        Returns:
+            list: Names of conditions that passed
+        """
+        passed = []
+        for name, func in self.conditions.items():
+            try:
+                if func():
+                    passed.append(name)
+            except:
+                pass
+        return passed
@@ -0,0 +1,235 @@
+# ============================================================
+# LegionUtils.formatting - Text formatters, safe math and hue helpers
+# Part of LegionUtils (see __init__.py for usage and changelog)
+# ============================================================
+# API is expected to be in global scope (imported by calling script)
+
+# ============ FORMATTING UTILITIES ============
+def format_gold_compact(amount):
+    """Format gold in compact form: 1234 -> 1.2k, 123456 -> 123k"""
+    if amount < 1000:
+        return str(int(amount))
+    elif amount < 10000:
+        val = round(amount / 1000.0, 1)
+        if val == int(val):
+            return str(int(val)) + "k"
+        else:
+            return "{:.1f}".format(val) + "k"
+    elif amount < 1000000:
+        return str(int(amount / 1000)) + "k"
+    else:
+        val = round(amount / 1000000.0, 1)
+        if val == int(val):
+            return str(int(val)) + "m"
+        else:
+            return "{:.1f}".format(val) + "m"
+
+def format_time_elapsed(seconds):
+    """Format elapsed time: 125 -> '2m 5s', 3665 -> '1h 1m'"""
+    if seconds < 60:
+        return str(int(seconds)) + "s"
+    elif seconds < 3600:
+        mins = int(seconds / 60)
+        secs = int(seconds % 60)
+        return str(mins) + "m " + str(secs) + "s"
+    else:
+        hours = int(seconds / 3600)
+        mins = int((seconds % 3600) / 60)
+        return str(hours) + "h " + str(mins) + "m"
+
+# ============ COMMON FORMATTERS ============
+def format_stat_bar(current, maximum, label):
+    """Format stat as current/max (pct%)
+
+    Args:
+        current: Current value
+        maximum: Maximum value
+        label: Label text (e.g., "HP", "Stam")
+
+    Returns:
+        str: Formatted string like "HP: 100/120 (83%)"
+    """
+    pct = (current / maximum * 100) if maximum > 0 else 100
+    return label + ": " + str(current) + "/" + str(maximum) + " (" + str(int(pct)) + "%)"
+
+def format_hp_bar(current, maximum):
+    """Format HP with visual bar
+
+    Args:
+        current: Current HP
+        maximum: Maximum HP
+
+    Returns:
+        str: Formatted string like "HP: 83% ████████████████"
+    """
+    pct = (current / maximum * 100) if maximum > 0 else 100
+    bar_length = int(pct / 5)
+    bar = "█" * bar_length
+    return "HP: " + str(int(pct)) + "% " + bar
+
+# ============ ADDITIONAL FORMATTERS ============
+def format_distance(distance):
+    """Format distance for display
+
+    Args:
+        distance: Distance in tiles
+
+    Returns:
+        str: Formatted distance like "5 tiles" or "Out of range"
+    """
+    if distance <= 0:
+        return "---"
+    elif distance == 1:
+        return "1 tile"
+    elif distance > 20:
+        return "Out of range"
+    else:
+        return str(distance) + " tiles"
+
+def format_weight(weight, max_weight=None):
+    """Format weight for display
+
+    Args:
+        weight: Current weight
+        max_weight: Optional maximum weight
+
+    Returns:
+        str: Formatted weight like "120/150 stones" or "120 stones"
+    """
+    if max_weight:
+        return str(int(weight)) + "/" + str(int(max_weight)) + " stones"
+    else:
+        return str(int(weight)) + " stones"
+
+def format_percentage(value, total):
+    """Format as percentage
+
+    Args:
+        value: Current value
+        total: Total value
+
+    Returns:
+        str: Formatted percentage like "75%"
+    """
+    if total <= 0:
+        return "0%"
+    pct = (value / total * 100)
+    return str(int(pct)) + "%"
+
+def format_countdown(seconds):
+    """Format countdown timer
+
+    Args:
+        seconds: Seconds remaining
+
+    Returns:
+        str: Formatted countdown like "5s" or "1m 30s"
+    """
+    if seconds <= 0:
+        return "Ready"
+    elif seconds < 60:
+        return str(int(seconds)) + "s"
+    else:
+        mins = int(seconds / 60)
+        secs = int(seconds % 60)
+        return str(mins) + "m " + str(secs) + "s"
+
+# ============ SAFE MATH HELPERS ============
+def safe_divide(numerator, denominator, default=0):
+    """Safe division with default for divide-by-zero
+
+    Args:
+        numerator: Value to divide
+        denominator: Divide by this
+        default: Return this if denominator is 0
+
+    Returns:
+        float: Result or default
+    """
+    if denominator == 0:
+        return default
+    return numerator / denominator
+
+def clamp(value, min_value, max_value):
+    """Clamp value between min and max
+
+    Args:
+        value: Value to clamp
+        min_value: Minimum value
+        max_value: Maximum value
+
+    Returns:
+        Value clamped to range
+    """
+    if value < min_value:
+        return min_value
+    elif value > max_value:
+        return max_value
+    else:
+        return value
+
+def lerp(start, end, t):
+    """Linear interpolation between two values
+
+    Args:
+        start: Start value
+        end: End value
+        t: Interpolation factor (0.0 to 1.0)
+
+    Returns:
+        float: Interpolated value
+    """
+    t = clamp(t, 0.0, 1.0)
+    return start + (end - start) * t
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted list
+
+    Args:
+        sorted_samples: Values in ascending order
+        pct: Percentile (0-100)
+
+    Returns:
+        Sample at that rank (0.0 if empty)
+    """
+    if not sorted_samples:
+        return 0.0
+    index = int(round((pct / 100.0) * (len(sorted_samples) - 1)))
+    return sorted_samples[index]
+
+# ============ COLOR HELPERS ============
+def hue_for_percentage(percentage):
+    """Get color hue for percentage (red=low, yellow=mid, green=high)
+
+    Args:
+        percentage: Value from 0-100
+
+    Returns:
+        int: Color hue for API
+    """
+    if percentage >= 75:
+        return 68  # Green
+    elif percentage >= 50:
+        return 43  # Yellow
+    elif percentage >= 25:
+        return 53  # Orange
+    else:
+        return 32  # Red
+
+def hue_for_value(value, low, high):
+    """Get color hue based on value in range
+
+    Args:
+        value: Current value
+        low: Low threshold (red)
+        high: High threshold (green)
+
+    Returns:
+        int: Color hue for API
+    """
+    if value >= high:
+        return 68  # Green
+    elif value >= (low + high) / 2:
+        return 43  # Yellow
+    else:
+        return 32  # Red
@@ -0,0 +1,564 @@
+# ============================================================
+# LegionUtils.gui - Gump controls, window position and layout helpers
+# Part of LegionUtils (see __init__.py for usage and changelog)
+# ============================================================
+# API is expected to be in global scope (imported by calling script)
+
+import time
+
+from .persistence import load_bool, load_window_position, save_bool
+
+# ============ GUI UTILITIES ============
+def create_toggle_button(text, width, height, is_on):
+    """Create a toggle button with standard colors"""
+    btn = API.Gumps.CreateSimpleButton(text, width, height)
+    btn.SetBackgroundHue(68 if is_on else 32)  # Green/Red
+    return btn
+
+def update_toggle_button(btn, is_on):
+    """Update toggle button appearance"""
+    if btn:
+        btn.SetBackgroundHue(68 if is_on else 32)
+
+# ============ WINDOW POSITION TRACKING ============
+class WindowPositionTracker:
+    """Manages window position with periodic updates and persistence
+
+    Eliminates ~40-50 lines per script of manual position tracking code.
+    Handles the common pattern:
+    - Load position on startup
+    - Track position every N seconds
+    - Save on window close
+
+    Example:
+        # Setup
+        pos_tracker = WindowPositionTracker(gump, SETTINGS_KEY, 100, 100)
+        gump.SetRect(pos_tracker.last_x, pos_tracker.last_y, WIDTH, HEIGHT)
+
+        # In main loop
+        pos_tracker.update()
+
+        # On window close
+        pos_tracker.save()
+    """
+
+    def __init__(self, gump, persist_key, default_x=100, default_y=100, update_interval=2.0):
+        """Initialize position tracker
+
+        Args:
+            gump: The gump to track
+            persist_key: Persistence key for saving position
+            default_x, default_y: Default position if not saved
+            update_interval: Seconds between position checks (default 2.0)
+        """
+        self.gump = gump
+        self.key = persist_key
+        self.last_x = default_x
+        self.last_y = default_y
+        self.last_update = 0
+        self.update_interval = update_interval
+
+        # Load saved position
+        saved_x, saved_y = load_window_position(persist_key, default_x, default_y)
+        self.last_x = saved_x
+        self.last_y = saved_y
+
+    def update(self):
+        """Update position if interval elapsed (call in main loop)"""
+        if time.time() - self.last_update > self.update_interval:
+            try:
+                self.last_x = self.gump.GetX()
+                self.last_y = self.gump.GetY()
+                self.last_update = time.time()
+            except:
+                pass
+
+    def get_position(self):
+        """Get current tracked position
+
+        Returns:
+            tuple: (x, y) coordinates
+        """
+        return (self.last_x, self.last_y)
+
+    def save(self):
+        """Save position to persistence (call on window close)
+
+        Uses tracked position instead of reading from gump, since gump
+        may be disposed when this is called from disposal callback.
+        """
+        if self.last_x >= 0 and self.last_y >= 0:
+            API.SavePersistentVar(self.key, str(self.last_x) + "," + str(self.last_y), API.PersistentVar.Char)
+
+# ============ TOGGLE SETTING MANAGEMENT ============
+class ToggleSetting:
+    """Manages a boolean setting with persistence and button updates
+
+    Eliminates ~20-25 lines per toggle of repetitive code.
+    Handles the complete pattern:
+    - Load/save persistence
+    - Update button appearance
+    - System messages
+    - Change callbacks
+
+    Example:
+        # Create toggle
+        auto_heal = ToggleSetting(
+            AUTO_HEAL_KEY, True, "Auto Heal",
+            {"off": auto_heal_off_btn, "on": auto_heal_on_btn},
+            update_display
+        )
+
+        # Wire callbacks
+        API.Gumps.AddControlOnClick(auto_heal_on_btn, lambda: auto_heal.set(True))
+        API.Gumps.AddControlOnClick(auto_heal_off_btn, lambda: auto_heal.set(False))
+
+        # Use in code
+        if auto_heal.value:
+            do_healing()
+    """
+
+    def __init__(self, persist_key, default=True, label="Setting", buttons=None, on_change=None):
+        """Initialize toggle setting
+
+        Args:
+            persist_key: Persistence key for saving
+            default: Default value if not saved
+            label: Display name for system messages
+            buttons: Dict {"off": btn, "on": btn} or {"toggle": btn} or None
+            on_change: Callback function(new_value) called on toggle
+        """
+        self.key = persist_key
+        self.label = label
+        self.value = load_bool(persist_key, default)
+        self.on_change = on_change
+
+        # Normalize buttons dict
+        if buttons is None:
+            self.buttons = {}
+        elif isinstance(buttons, dict):
+            self.buttons = buttons
+        else:
+            # Single button passed
+            self.buttons = {"toggle": buttons}
+
+        # Initial button state
+        self.update_ui()
+
+    def toggle(self):
+        """Toggle the setting value"""
+        self.value = not self.value
+        save_bool(self.key, self.value)
+        self.update_ui()
+
+        # System message
+        API.SysMsg(self.label + ": " + ("ON" if self.value else "OFF"),
+                   68 if self.value else 32)
+
+        # Callback
+        if self.on_change:
+            self.on_change(self.value)
+
+    def set(self, value):
+        """Set to specific value (True/False)"""
+        if self.value != value:
+            self.value = value
+            save_bool(self.key, self.value)
+            self.update_ui()
+
+            # Callback
+            if self.on_change:
+                self.on_change(self.value)
+
+    def update_ui(self):
+        """Update button appearances"""
+        if not self.buttons:
+            return
+
+        # Handle on/off button pair
+        if "off" in self.buttons and "on" in self.buttons:
+            self.buttons["off"].SetBackgroundHue(32 if not self.value else 90)
+            self.buttons["on"].SetBackgroundHue(68 if self.value else 90)
+
+        # Handle single toggle button
+        elif "toggle" in self.buttons:
+            btn = self.buttons["toggle"]
+            btn.SetBackgroundHue(68 if self.value else 32)
+            btn.SetText("[" + ("ON" if self.value else "OFF") + "]")
+
+# ============ EXPANDABLE WINDOW MANAGEMENT ============
+class ExpandableWindow:
+    """Manages window expand/collapse with control visibility
+
+    Eliminates ~80-120 lines per script of repetitive expand/collapse code.
+    Handles the complete pattern:
+    - Load/save expanded state
+    - Toggle button updates
+    - Show/hide controls
+    - Resize window
+
+    Example:
+        expander = ExpandableWindow(
+            gump, expandBtn, EXPANDED_KEY,
+            width=280, expanded_height=600, collapsed_height=24
+        )
+
+        # Register collapsible controls
+        expander.add_controls(
+            hpLabel, stamLabel, manaLabel,
+            healBtn, cureBtn, buffBtn
+        )
+
+        # Wire button
+        API.Gumps.AddControlOnClick(expandBtn, expander.toggle)
+    """
+
+    def __init__(self, gump, expand_btn, persist_key,
+                 width=280, expanded_height=600, collapsed_height=24, background=None):
+        """Initialize expandable window
+
+        Args:
+            gump: The gump window
+            expand_btn: The expand/collapse button
+            persist_key: Persistence key for saving state
+            width: Window width
+            expanded_height: Height when expanded
+            collapsed_height: Height when collapsed
+            background: Optional background ColorBox to resize with window
+        """
+        self.gump = gump
+        self.expand_btn = expand_btn
+        self.key = persist_key
+        self.width = width
+        self.expanded_height = expanded_height
+        self.collapsed_height = collapsed_height
+        self.background = background
+
+        self.controls_to_toggle = []
+        self.is_expanded = load_bool(persist_key, True)
+
+        # Initial state
+        self.update_state(animate=False)
+
+    def add_control(self, control):
+        """Register control for visibility toggle
+
+        Args:
+            control: Control to show/hide on expand/collapse
+        """
+        self.controls_to_toggle.append(control)
+        control.IsVisible = self.is_expanded
+
+    def add_controls(self, *controls):
+        """Register multiple controls
+
+        Args:
+            *controls: Variable number of controls to register
+        """
+        for ctrl in controls:
+            self.add_control(ctrl)
+
+    def toggle(self):
+        """Toggle expanded state"""
+        self.is_expanded = not self.is_expanded
+        save_bool(self.key, self.is_expanded)
+        self.update_state()
+
+    def update_state(self, animate=True):
+        """Update window and controls to current state
+
+        Args:
+            animate: Reserved for future animation support
+        """
+        # Update button
+        self.expand_btn.SetText("[-]" if self.is_expanded else "[+]")
+
+        # Update control visibility
+        for ctrl in self.controls_to_toggle:
+            ctrl.IsVisible = self.is_expanded
+
+        # Resize window and background
+        try:
+            x = self.gump.GetX()
+            y = self.gump.GetY()
+            height = self.expanded_height if self.is_expanded else self.collapsed_height
+            self.gump.SetRect(x, y, self.width, height)
+
+            # Resize background if provided
+            if self.background:
+                self.background.SetRect(0, 0, self.width, height)
+        except:
+            pass
+
+# ============ GUI DISPLAY MANAGEMENT ============
+class DisplayGroup:
+    """Manages batch updates to display labels
+
+    Eliminates ~50-100 lines per script of repetitive label updates.
+    Centralizes label management with formatters.
+
+    Example:
+        display = DisplayGroup()
+
+        # Add labels with formatters
+        display.add("hp", hpLabel,
+                    lambda v: "HP: " + str(v[0]) + "/" + str(v[1]))
+        display.add("stam", stamLabel,
+                    lambda v: "Stam: " + str(v[0]) + "/" + str(v[1]))
+        display.add("poison", poisonLabel)
+
+        # Update all at once
+        player = API.Player
+        display.update_all({
+            "hp": (player.Hits, player.HitsMax),
+            "stam": (player.Stam, player.StamMax),
+            "poison": "POISONED!" if is_player_poisoned() else "Clear"
+        })
+    """
+
+    def __init__(self):
+        """Initialize display group"""
+        self.labels = {}      # name -> control
+        self.formatters = {}  # name -> format function
+
+    def add(self, name, control, formatter=None):
+        """Register label for updates
+
+        Args:
+            name: Identifier for this label
+            control: Label control
+            formatter: Optional function(value) -> str for formatting
+        """
+        self.labels[name] = control
+        if formatter:
+            self.formatters[name] = formatter
+
+    def update(self, name, value):
+        """Update single label
+
+        Args:
+            name: Label identifier
+            value: New value
+        """
+        if name not in self.labels:
+            return
+
+        # Format if formatter exists
+        if name in self.formatters:
+            try:
+                value = self.formatters[name](value)
+            except:
+                pass
+
+        try:
+            self.labels[name].SetText(str(value))
+        except:
+            pass
+
+    def update_all(self, values):
+        """Update multiple labels at once
+
+        Args:
+            values: Dict of {name: value}
+        """
+        for name, value in values.items():
+            self.update(name, value)
+
+    def set_visibility(self, visible):
+        """Show/hide all labels in group
+
+        Args:
+            visible: True to show, False to hide
+        """
+        for label in self.labels.values():
+            try:
+                label.IsVisible = visible
+            except:
+                pass
+
+    def clear(self):
+        """Clear all labels"""
+        for label in self.labels.values():
+            try:
+                label.SetText("")
+            except:
+                pass
+
+class StatusDisplay:
+    """Manages transient status messages with auto-clear
+
+    Useful for temporary status updates that should disappear.
+
+    Example:
+        status = StatusDisplay(statusLabel, duration=3.0)
+
+        # Show transient message
+        status.show("Healed!", duration=2.0)
+
+        # In main loop
+        status.update()  # Auto-clears after duration
+    """
+
+    def __init__(self, status_label, duration=3.0):
+        """Initialize status display
+
+        Args:
+            status_label: Label control for status messages
+            duration: Seconds before auto-clearing message
+        """
+        self.label = status_label
+        self.duration = duration
+        self.message_time = 0
+        self.current_message = ""
+
+    def show(self, msg, duration=None):
+        """Show transient status message
+
+        Args:
+            msg: Message to display
+            duration: Optional custom duration for this message
+        """
+        try:
+            self.label.SetText(msg)
+            self.message_time = time.time()
+            self.current_message = msg
+            if duration:
+                self.duration = duration
+        except:
+            pass
+
+    def update(self):
+        """Call in main loop to auto-clear expired messages"""
+        if self.current_message and time.time() > self.message_time + self.duration:
+            try:
+                self.label.SetText("")
+                self.current_message = ""
+            except:
+                pass
+
+    def clear(self):
+        """Clear status immediately"""
+        try:
+            self.label.SetText("")
+            self.current_message = ""
+        except:
+            pass
+
+# ============ GUI LAYOUT HELPERS ============
+class LayoutHelper:
+    """Helper for positioning GUI controls
+
+    Simplifies positioning controls in columns/rows with consistent spacing.
+
+    Example:
+        layout = LayoutHelper(start_x=10, start_y=30, spacing=5)
+
+        # Add controls in column
+        layout.add_vertical(label1)
+        layout.add_vertical(label2)
+        layout.add_vertical(label3)
+
+        # Start new column
+        layout.new_column(x_offset=100)
+        layout.add_vertical(button1)
+        layout.add_vertical(button2)
+    """
+
+    def __init__(self, start_x=10, start_y=30, spacing=5):
+        """Initialize layout helper
+
+        Args:
+            start_x: Starting X position
+            start_y: Starting Y position
+            spacing: Spacing between controls
+        """
+        self.start_x = start_x
+        self.start_y = start_y
+        self.spacing = spacing
+        self.current_x = start_x
+        self.current_y = start_y
+
+    def add_vertical(self, control, height=None):
+        """Add control vertically (stacked)
+
+        Args:
+            control: Control to position
+            height: Optional custom height (auto-detected if None)
+
+        Returns:
+            tuple: (x, y) position used
+        """
+        try:
+            control.SetPos(self.current_x, self.current_y)
+
+            # Move down for next control
+            if height:
+                self.current_y += height + self.spacing
+            else:
+                # Try to get height from control
+                try:
+                    h = control.GetHeight() if hasattr(control, 'GetHeight') else 20
+                    self.current_y += h + self.spacing
+                except:
+                    self.current_y += 20 + self.spacing
+
+            return (self.current_x, self.current_y - height - self.spacing if height else self.current_y - 20 - self.spacing)
+        except:
+            return (self.current_x, self.current_y)
+
+    def add_horizontal(self, control, width=None):
+        """Add control horizontally (side-by-side)
+
+        Args:
+            control: Control to position
+            width: Optional custom width (auto-detected if None)
+
+        Returns:
+            tuple: (x, y) position used
+        """
+        try:
+            control.SetPos(self.current_x, self.current_y)
+
+            # Move right for next control
+            if width:
+                self.current_x += width + self.spacing
+            else:
+                # Try to get width from control
+                try:
+                    w = control.GetWidth() if hasattr(control, 'GetWidth') else 100
+                    self.current_x += w + self.spacing
+                except:
+                    self.current_x += 100 + self.spacing
+
+            return (self.current_x - width - self.spacing if width else self.current_x - 100 - self.spacing, self.current_y)
+        except:
+            return (self.current_x, self.current_y)
+
+    def new_row(self, y_offset=None):
+        """Start new row (reset X, move Y down)
+
+        Args:
+            y_offset: Optional custom Y offset
+        """
+        self.current_x = self.start_x
+        if y_offset:
+            self.current_y += y_offset
+        else:
+            self.current_y += self.spacing
+
+    def new_column(self, x_offset=None):
+        """Start new column (move X right, reset Y)
+
+        Args:
+            x_offset: Optional custom X offset
+        """
+        if x_offset:
+            self.current_x += x_offset
+        else:
+            self.current_x += 100  # Default column width
+        self.current_y = self.start_y
+
+    def reset(self):
+        """Reset to starting position"""
+        self.current_x = self.start_x
+        self.current_y = self.start_y
@@ -0,0 +1,152 @@
+# ============================================================
+# LegionUtils.gump - GumpCapture (server gump inspection)
+# Part of LegionUtils (see __init__.py for usage and changelog)
+# ============================================================
+# API is expected to be in global scope (imported by calling script)
+
+# ============ GUMP UTILITIES ============
+class GumpCapture:
+    """Utility for detecting and testing gump IDs and buttons
+
+    Used by tome dumpers and other scripts that need to identify
+    gump IDs and button IDs for automation.
+
+    Example:
+        gump_capture = GumpCapture()
+
+        # Detect gump ID
+        gump_id = gump_capture.detect_new_gump(None, timeout=10)
+
+        # Test if button 5 closes the gump
+        if gump_capture.test_button(gump_id, 5):
+            API.SysMsg("Button 5 is the close button", 68)
+    """
+
+    def __init__(self):
+        """Initialize gump capture utility"""
+        pass
+
+    def detect_new_gump(self, tome_serial, timeout=10):
+        """Detect a new gump that appears
+
+        Uses API.GetAllGumps() to detect newly opened gumps.
+        Compares gumps before and after opening to find the new one.
+
+        Args:
+            tome_serial: Serial of item to open (or None to wait for user to open)
+            timeout: Max time to wait for gump (seconds)
+
+        Returns:
+            int: Gump ID if detected, 0 if timeout
+        """
+        # Get list of gumps currently open (before)
+        try:
+            before_gumps = set()
+            all_gumps_before = API.GetAllGumps()
+            if all_gumps_before:
+                for gump in all_gumps_before:
+                    # GetAllGumps returns list of gump objects
+                    # Use ServerSerial (consistent) or fallback to LocalSerial
+                    try:
+                        if hasattr(gump, 'ServerSerial'):
+                            gump_id = gump.ServerSerial
+                        elif hasattr(gump, 'LocalSerial'):
+                            gump_id = gump.LocalSerial
+                        else:
+                            gump_id = gump  # Fallback if it's just an int
+                        if gump_id:
+                            before_gumps.add(gump_id)
+                    except:
+                        before_gumps.add(gump)
+
+            API.SysMsg("Found " + str(len(before_gumps)) + " gumps before. Open tome now...", 68)
+        except Exception as e:
+            API.SysMsg("Error getting gumps before: " + str(e), 32)
+            before_gumps = set()
+
+        # Open tome if serial provided (optional)
+        if tome_serial:
+            tome = API.FindItem(tome_serial)
+            if tome:
+                API.UseObject(tome_serial, False)
+                API.Pause(0.8)
+            else:
+                API.SysMsg("Tome not found (serial provided but not found)", 43)
+                # Continue anyway - user can manually open
+
+        # Wait for new gump to appear
+        API.Pause(2.0)
+
+        # Get list of gumps now (after)
+        try:
+            after_gumps = set()
+            all_gumps_after = API.GetAllGumps()
+            if all_gumps_after:
+                for gump in all_gumps_after:
+                    try:
+                        if hasattr(gump, 'ServerSerial'):
+                            gump_id = gump.ServerSerial
+                        elif hasattr(gump, 'LocalSerial'):
+                            gump_id = gump.LocalSerial
+                        else:
+                            gump_id = gump
+                        if gump_id:
+                            after_gumps.add(gump_id)
+                    except:
+                        after_gumps.add(gump)
+
+            API.SysMsg("Found " + str(len(after_gumps)) + " gumps after", 88)
+        except Exception as e:
+            API.SysMsg("Error getting gumps after: " + str(e), 32)
+            return 0
+
+        # Find new gumps
+        new_gumps = after_gumps - before_gumps
+
+        if len(new_gumps) == 0:
+            API.SysMsg("No new gump detected", 32)
+            API.SysMsg("Did you open the tome?", 43)
+            return 0
+        elif len(new_gumps) == 1:
+            detected_id = list(new_gumps)[0]
+            API.SysMsg("Detected gump ID: " + str(detected_id), 68)
+            return detected_id
+        else:
+            # Multiple new gumps - return the first one
+            detected_id = sorted(list(new_gumps))[0]
+            API.SysMsg("Multiple gumps detected (" + str(len(new_gumps)) + "), using: " + str(detected_id), 43)
+            return detected_id
+
+    def test_button(self, gump_id, button_id):
+        """Test if a button closes a gump
+
+        Opens the gump, clicks the button, and checks if gump closed.
+
+        Args:
+            gump_id: The gump ID to test
+            button_id: The button ID to test
+
+        Returns:
+            bool: True if button closed the gump, False otherwise
+        """
+        if gump_id == 0:
+            return False
+
+        # Check if gump is currently open
+        if not API.HasGump(gump_id):
+            API.SysMsg("Gump not open - open tome first", 43)
+            return False
+
+        # Click the button
+        try:
+            API.ReplyGump(button_id, gump_id)
+            API.Pause(0.5)
+
+            # Check if gump closed
+            if not API.HasGump(gump_id):
+                return True  # Button closed the gump
+            else:
+                return False  # Gump still open
+        except Exception as e:
+            API.SysMsg("Error testing button: " + str(e), 32)
+            return False
@@ -0,0 +1,203 @@
+# ============================================================
+# LegionUtils.healing - Shared heal decision engine (pure, no API calls)
+# Part of LegionUtils (see __init__.py for usage and changelog)
+# ============================================================
+# Nothing here touches API - scripts read mobiles into snapshot rows and
+# act on the decision, so the same priority rules can be replayed and
+# benchmarked against any stand-in world.
+
+# Distance that never limits a range check (e.g. "follow out of range pets")
+NO_RANGE_LIMIT = 1 << 30
+
+# ============ SNAPSHOT ROWS ============
+# Pet row:    (serial, dead, distance, hp_pct, poisoned, projected_pct)
+#   projected_pct is the HP% expected when a heal started now lands
+#   (equal to hp_pct without damage tracking). Dead pets have hp 0.
+# Player row: (serial, dead, hp_pct, missing_hits, poisoned)
+
+def _find_row(rows, serial):
+    """Row for serial in rows, or None"""
+    for row in rows:
+        if row[0] == serial:
+            return row
+    return None
+
+# ============ CONFIG ============
+class HealConfig:
+    """Priority rules and ranges for decide_heal()
+
+    rules is an ordered tuple of (name, threshold); the first rule that
+    finds a target wins. Thresholds are HP% unless noted:
+
+        "self_cure"     player poisoned                        -> cure_self
+        "self"          player below threshold                 -> heal_self
+        "self_missing"  player missing more than threshold hits -> heal_self
+        "priority"      priority pet in heal_range: cure if poisoned, else heal below threshold
+        "tank"          tank in heal_range: cure if poisoned, else heal below threshold
+        "tank_cure"     tank in reach and poisoned             -> cure
+        "tank_heal"     tank in reach below threshold          -> heal (rez if dead and rez)
+        "cure"          first poisoned pet in reach            -> cure
+        "cure_other"    same, skipping the tank
+        "rez"           first dead pet in rez_range (if rez)   -> rez
+        "vetkit"        enough pets hurt in vetkit_range       -> vetkit
+        "lowest"        pet below threshold with the lowest projected HP -> heal
+        "lowest_other"  same, skipping the tank
+
+    Cure rules do nothing when cure is False. Ties keep row order.
+
+    Example:
+        config = HealConfig(
+            (("self_missing", 15), ("tank", 50), ("cure", 0), ("lowest", 90)),
+            heal_range=2, tank=tank_serial)
+        decision = decide_heal(config, rows, player_row)
+        if decision:
+            serial, action, rule = decision
+    """
+
+    __slots__ = ("rules", "heal_range", "reach", "rez_range", "tank", "priority",
+                 "cure", "rez", "vetkit_range", "vetkit_hp", "vetkit_critical_hp",
+                 "vetkit_min_pets", "vetkit_count_poisoned", "vetkit_needs_all_alive")
+
+    def __init__(self, rules, heal_range, reach=None, rez_range=None, tank=0, priority=0,
+                 cure=True, rez=False, vetkit_range=None, vetkit_hp=90, vetkit_critical_hp=50,
+                 vetkit_min_pets=2, vetkit_count_poisoned=False, vetkit_needs_all_alive=False):
+        """Initialize config
+
+        Args:
+            rules: Ordered ((name, threshold), ...) - see class docstring
+            heal_range: Tiles for "priority"/"tank" (bandage or spell range)
+            reach: Tiles for every other pet rule (default heal_range;
+                NO_RANGE_LIMIT when out of range pets are followed)
+            rez_range: Tiles for "rez" (default reach)
+            tank, priority: Pet serials (0 = none)
+            cure: Allow cure rules
+            rez: Allow rezzing dead pets
+            vetkit_range: Tiles a pet must be within to count (default heal_range)
+            vetkit_hp: Pets below this HP% count as hurt
+            vetkit_critical_hp: Two pets below this HP% use the kit even on cooldown
+            vetkit_min_pets: Hurt pets needed to use the kit
+            vetkit_count_poisoned: Poisoned pets count as hurt
+            vetkit_needs_all_alive: Never use the kit while a pet is dead
+        """
+        self.rules = tuple(rules)
+        self.heal_range = heal_range
+        self.reach = heal_range if reach is None else reach
+        self.rez_range = self.reach if rez_range is None else rez_range
+        self.tank = tank
+        self.priority = priority
+        self.cure = cure
+        self.rez = rez
+        self.vetkit_range = heal_range if vetkit_range is None else vetkit_range
+        self.vetkit_hp = vetkit_hp
+        self.vetkit_critical_hp = vetkit_critical_hp
+        self.vetkit_min_pets = vetkit_min_pets
+        self.vetkit_count_poisoned = vetkit_count_poisoned
+        self.vetkit_needs_all_alive = vetkit_needs_all_alive
+
+# ============ DECISION ============
+def decide_heal(config, rows, player=None, extra=(), vetkit=None, blocked=()):
+    """Pick the next heal from a snapshot
+
+    Args:
+        config: HealConfig
+        rows: Pet rows for the pet list, in priority order
+        player: Player row, or None to never heal self
+        extra: Rows for a tank/priority pet that is not in rows
+        vetkit: None = no kit, False = kit on cooldown, True = kit ready
+        blocked: Serials that can't be healed right now (e.g. bandage cooldowns)
+
+    Returns:
+        (serial, action, rule) or None. action is one of "heal_self",
+        "cure_self", "heal", "cure", "rez", "vetkit" (serial 0).
+    """
+    for name, threshold in config.rules:
+        if name == "lowest" or name == "lowest_other":
+            skip = config.tank if name == "lowest_other" else -1
+            best = None
+            best_projected = 0
+            reach = config.reach
+            for serial, dead, dist, hp_pct, poisoned, projected in rows:
+                if (dead or hp_pct >= threshold or dist > reach or serial == skip
+                        or serial in blocked):
+                    continue
+                if best is None or projected < best_projected:
+                    best = serial
+                    best_projected = projected
+            if best is not None:
+                return (best, "heal", name)
+
+        elif name == "cure" or name == "cure_other":
+            if not config.cure:
+                continue
+            skip = config.tank if name == "cure_other" else -1
+            reach = config.reach
+            for row in rows:
+                if (row[4] and not row[1] and row[2] <= reach and row[0] != skip
+                        and row[0] not in blocked):
+                    return (row[0], "cure", name)
+
+        elif name == "self" or name == "self_missing" or name == "self_cure":
+            if player is None or player[1] or player[0] in blocked:
+                continue
+            if name == "self_cure":
+                if config.cure and player[4]:
+                    return (player[0], "cure_self", name)
+            elif (player[2] < threshold) if name == "self" else (player[3] > threshold):
+                return (player[0], "heal_self", name)
+
+        elif name == "priority" or name == "tank":
+            serial = config.priority if name == "priority" else config.tank
+            if serial == 0 or serial in blocked:
+                continue
+            row = _find_row(rows, serial) or _find_row(extra, serial)
+            if row is None or row[1] or row[2] > config.heal_range:
+                continue
+            if row[4] and config.cure:
+                return (serial, "cure", name)
+            if row[3] < threshold:
+                return (serial, "heal", name)
+
+        elif name == "tank_cure" or name == "tank_heal":
+            serial = config.tank
+            if serial == 0 or serial in blocked:
+                continue
+            row = _find_row(rows, serial) or _find_row(extra, serial)
+            if row is None or row[2] > config.reach:
+                continue
+            if name == "tank_cure":
+                if config.cure and row[4] and not row[1]:
+                    return (serial, "cure", name)
+            elif row[1]:
+                if config.rez:
+                    return (serial, "rez", name)
+            elif row[3] < threshold:
+                return (serial, "heal", name)
+
+        elif name == "rez":
+            if not config.rez:
+                continue
+            for row in rows:
+                if row[1] and row[2] <= config.rez_range and row[0] not in blocked:
+                    return (row[0], "rez", name)
+
+        elif name == "vetkit":
+            if vetkit is None:
+                continue
+            hurt = 0
+            critical = 0
+            for serial, dead, dist, hp_pct, poisoned, projected in rows:
+                if dead:
+                    if config.vetkit_needs_all_alive:
+                        hurt = -1
+                        break
+                    continue
+                if dist > config.vetkit_range:
+                    continue
+                if hp_pct < config.vetkit_hp or (poisoned and config.vetkit_count_poisoned):
+                    hurt += 1
+                if hp_pct < config.vetkit_critical_hp:
+                    critical += 1
+            if hurt >= config.vetkit_min_pets and (vetkit or critical >= 2):
+                return (0, "vetkit", name)
+
+    return None
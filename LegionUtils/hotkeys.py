@@ -0,0 +1,364 @@
+# ============================================================
+# LegionUtils.hotkeys - HotkeyBinding and HotkeyManager
+# Part of LegionUtils (see __init__.py for usage and changelog)
+# ============================================================
+# API is expected to be in global scope (imported by calling script)
+
+from .constants import ALL_HOTKEYS
+
+# ============ HOTKEY MANAGEMENT SYSTEM ============
+class HotkeyBinding:
+    """Manages a single hotkey binding with capture and execution
+
+    Handles the complete hotkey pattern:
+    - Load/save binding
+    - Capture mode (listen for key press)
+    - Button updates
+    - Execute callback when key pressed
+
+    Usually created through HotkeyManager.add(), which attaches it to a
+    shared HotkeyDispatcher. A standalone binding can still register its
+    own handlers with make_handler().
+
+    Example:
+        pause_hk = HotkeyBinding(
+            PAUSE_KEY, "Pause", toggle_pause,
+            pause_btn, "PAUSE"
+        )
+
+        # Create handlers for all keys
+        for key in ALL_HOTKEYS:
+            API.OnHotKey(key, pause_hk.make_handler(key))
+
+        # Start capture on button click
+        API.Gumps.AddControlOnClick(pause_btn, pause_hk.start_capture)
+
+        # Custom button text: refresh it whenever the binding changes
+        pause_hk.on_change = refresh_pause_button
+    """
+
+    def __init__(self, persist_key, label, execute_cb, button=None, default_key=""):
+        """Initialize hotkey binding
+
+        Args:
+            persist_key: Persistence key for saving binding
+            label: Display name for system messages
+            execute_cb: Function to call when hotkey pressed
+            button: Button control to update with current key
+            default_key: Default hotkey if not saved
+        """
+        self.key = persist_key
+        self.label = label
+        self.execute = execute_cb
+        self.button = button
+        self.current_hotkey = API.GetPersistentVar(persist_key, default_key, API.PersistentVar.Char)
+        self.capturing = False
+        self.dispatcher = None
+        self.on_change = None  # Called after any binding/capture change
+
+        self.update_button()
+
+    def attach(self, dispatcher):
+        """Route this binding through a HotkeyDispatcher
+
+        Args:
+            dispatcher: HotkeyDispatcher that owns the key handlers
+        """
+        self.dispatcher = dispatcher
+        if self.current_hotkey:
+            dispatcher.bind(self.current_hotkey, self.fire)
+
+    def fire(self):
+        """Run the bound action (dispatcher entry point)"""
+        self.execute()
+
+    def make_handler(self, key_name):
+        """Create handler for specific key
+
+        Args:
+            key_name: The key this handler responds to
+
+        Returns:
+            function: Handler function for this key
+        """
+        def handler():
+            if self.capturing:
+                if key_name == "ESC":
+                    self.cancel_capture()
+                    return
+
+                # Bind to this key
+                self.bind(key_name)
+                return
+
+            # Execute if matches current binding
+            if key_name == self.current_hotkey:
+                self.execute()
+
+        return handler
+
+    def start_capture(self):
+        """Start listening for key press"""
+        if self.dispatcher:
+            self.dispatcher.start_capture(lambda key_name: self.bind(key_name), self.cancel_capture)
+        self.capturing = True
+        self.update_button()
+        API.SysMsg("Press key for " + self.label + " (ESC to cancel)", 68)
+
+    def cancel_capture(self):
+        """Stop listening without changing the binding"""
+        self.capturing = False
+        self.update_button()
+        API.SysMsg("Hotkey capture cancelled", 90)
+
+    def bind(self, key_name):
+        """Bind to new key
+
+        Args:
+            key_name: Key to bind to
+        """
+        old_key = self.current_hotkey
+        if self.dispatcher:
+            self.dispatcher.unbind(old_key, self.fire)
+            self.dispatcher.bind(key_name, self.fire)
+        self.current_hotkey = key_name
+        API.SavePersistentVar(self.key, key_name, API.PersistentVar.Char)
+        self.capturing = False
+        self.update_button()
+
+        msg = self.label + " bound to [" + key_name + "]"
+        if old_key:
+            msg += " (was [" + old_key + "])"
+        API.SysMsg(msg, 68)
+
+    def clear(self):
+        """Clear hotkey binding"""
+        if self.dispatcher:
+            self.dispatcher.unbind(self.current_hotkey, self.fire)
+        self.current_hotkey = ""
+        API.SavePersistentVar(self.key, "", API.PersistentVar.Char)
+        self.update_button()
+        API.SysMsg(self.label + " binding cleared", 90)
+
+    def update_button(self):
+        """Update button appearance"""
+        if self.button:
+            if self.capturing:
+                self.button.SetBackgroundHue(38)  # Purple for listening
+                self.button.SetText("[Listening...]")
+            else:
+                if self.current_hotkey:
+                    self.button.SetBackgroundHue(68)  # Green for bound
+                    self.button.SetText("[" + self.current_hotkey + "]")
+                else:
+                    self.button.SetBackgroundHue(90)  # Gray for unbound
+                    self.button.SetText("[---]")
+
+        if self.on_change:
+            self.on_change()
+
+class HotkeyDispatcher:
+    """One API.OnHotKey handler per physical key, routed through a dict
+
+    Registering a handler per key for every binding means each key press
+    runs one closure per binding, nearly all of which do nothing. The
+    dispatcher registers each key once and looks the press up in a
+    key -> actions table, so registration is O(keys) and a press is O(1).
+    Capture mode ("press a key to bind") is routed here too: while a
+    capture is pending, the next key goes to it instead of the table.
+
+    Example:
+        dispatcher = HotkeyDispatcher()
+        dispatcher.bind("TAB", all_kill)
+        dispatcher.register()
+
+        # Rebind from a config button
+        dispatcher.start_capture(on_key=set_kill_key, on_cancel=restore_button)
+    """
+
+    def __init__(self, keys=None, cancel_key="ESC"):
+        """Initialize dispatcher
+
+        Args:
+            keys: Keys to register handlers for (defaults to ALL_HOTKEYS)
+            cancel_key: Key that cancels a pending capture
+        """
+        self.keys = keys if keys else ALL_HOTKEYS
+        self.cancel_key = cancel_key
+        self.actions = {}           # key -> tuple of callbacks
+        self.registered = []
+        self.failed = []            # (key, error) pairs from register()
+        self._capture = None        # (on_key, on_cancel) while capturing
+        self.presses = 0
+        self.dispatched = 0
+
+    def bind(self, key_name, action):
+        """Run action when key_name is pressed (in addition to existing actions)"""
+        if not key_name:
+            return
+        actions = self.actions.get(key_name, ())
+        if action not in actions:
+            self.actions[key_name] = actions + (action,)
+
+    def unbind(self, key_name, action):
+        """Remove one action from a key"""
+        actions = self.actions.get(key_name)
+        if not actions or action not in actions:
+            return
+        remaining = tuple(a for a in actions if a != action)
+        if remaining:
+            self.actions[key_name] = remaining
+        else:
+            del self.actions[key_name]
+
+    def get_actions(self, key_name):
+        """Actions bound to a key (empty tuple if none)"""
+        return self.actions.get(key_name, ())
+
+    def start_capture(self, on_key, on_cancel=None):
+        """Send the next key press to on_key(key_name) instead of the table
+
+        A capture already pending is cancelled first.
+        """
+        previous = self._capture
+        self._capture = (on_key, on_cancel)
+        if previous is not None and previous[1]:
+            previous[1]()
+
+    def cancel_capture(self):
+        """Drop a pending capture (calls its on_cancel)"""
+        capture = self._capture
+        self._capture = None
+        if capture is not None and capture[1]:
+            capture[1]()
+
+    def is_capturing(self):
+        """True while a capture is pending"""
+        return self._capture is not None
+
+    def register(self):
+        """Register one handler per key with API.OnHotKey
+
+        Safe to call again (already registered keys are skipped).
+
+        Returns:
+            int: Number of keys registered
+        """
+        for key_name in self.keys:
+            if key_name in self.registered:
+                continue
+            try:
+                API.OnHotKey(key_name, self.make_handler(key_name))
+                self.registered.append(key_name)
+            except Exception as e:
+                self.failed.append((key_name, str(e)))
+        return len(self.registered)
+
+    def make_handler(self, key_name):
+        """Create the API.OnHotKey handler for one key"""
+        def handler():
+            self.dispatch(key_name)
+        return handler
+
+    def dispatch(self, key_name):
+        """Handle a key press
+
+        Returns:
+            bool: True if a capture or an action consumed the key
+        """
+        self.presses += 1
+        capture = self._capture
+        if capture is not None:
+            self._capture = None
+            on_key, on_cancel = capture
+            if key_name == self.cancel_key:
+                if on_cancel:
+                    on_cancel()
+            else:
+                on_key(key_name)
+            return True
+
+        actions = self.actions.get(key_name)
+        if not actions:
+            return False
+        self.dispatched += 1
+        for action in actions:
+            action()
+        return True
+
+class HotkeyManager:
+    """Manages multiple hotkey bindings
+
+    Eliminates ~200 lines per script of hotkey management code.
+    Centralizes the complete hotkey system:
+    - Register multiple bindings
+    - One handler per key, shared by all bindings (HotkeyDispatcher)
+    - Bulk registration with API
+
+    Example:
+        hotkeys = HotkeyManager()
+
+        # Add bindings
+        pause_hk = hotkeys.add("pause", PAUSE_KEY, "Pause",
+                               toggle_pause, pause_btn, "PAUSE")
+        kill_hk = hotkeys.add("kill", KILL_KEY, "All Kill",
+                              cmd_all_kill, kill_btn, "TAB")
+
+        # Register all with API
+        hotkeys.register_all()
+
+        # Start capture on button click
+        API.Gumps.AddControlOnClick(pause_btn, pause_hk.start_capture)
+    """
+
+    def __init__(self, all_keys=None):
+        """Initialize hotkey manager
+
+        Args:
+            all_keys: List of all valid keys for capture (defaults to ALL_HOTKEYS)
+        """
+        self.bindings = {}
+        self.all_keys = all_keys if all_keys else ALL_HOTKEYS
+        self.dispatcher = HotkeyDispatcher(self.all_keys)
+
+    def add(self, name, persist_key, label, execute_cb, button=None, default_key=""):
+        """Add hotkey binding
+
+        Args:
+            name: Internal name for this binding
+            persist_key: Persistence key
+            label: Display name
+            execute_cb: Callback function
+            button: Button control
+            default_key: Default key
+
+        Returns:
+            HotkeyBinding: The created binding
+        """
+        binding = HotkeyBinding(persist_key, label, execute_cb, button, default_key)
+        binding.attach(self.dispatcher)
+        self.bindings[name] = binding
+        return binding
+
+    def get(self, name):
+        """Get binding by name
+
+        Args:
+            name: Binding name
+
+        Returns:
+            HotkeyBinding: The binding, or None if not found
+        """
+        return self.bindings.get(name)
+
+    def register_all(self):
+        """Register all hotkey handlers with API
+
+        Call this once after adding all bindings. Registers one handler
+        per key; bindings added or rebound later are picked up through
+        the dispatch table.
+
+        Returns:
+            int: Number of keys registered
+        """
+        return self.dispatcher.register()
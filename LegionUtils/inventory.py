@@ -0,0 +1,369 @@
+# ============================================================
+# LegionUtils.inventory - Item lookups and counting (InventoryIndex)
+# Part of LegionUtils (see __init__.py for usage and changelog)
+# ============================================================
+# API is expected to be in global scope (imported by calling script)
+
+import time
+
+from .constants import BANDAGE_GRAPHIC
+from .combat import get_player
+
+# ============ ITEM UTILITIES ============
+def get_item_safe(serial):
+    """Safely get item by serial, returns None if not found"""
+    if serial == 0:
+        return None
+    return API.FindItem(serial)
+
+def has_bandages():
+    """Check if player has bandages"""
+    return API.FindType(BANDAGE_GRAPHIC)
+
+def get_bandage_count():
+    """Get number of bandages in backpack"""
+    try:
+        if API.FindType(BANDAGE_GRAPHIC):
+            if hasattr(API.Found, 'Amount'):
+                return API.Found.Amount
+            return -1
+        return 0
+    except:
+        return -1
+
+def get_potion_count(graphic):
+    """Get number of potions of specific type in backpack"""
+    try:
+        if API.FindType(graphic):
+            if hasattr(API.Found, 'Amount'):
+                return API.Found.Amount
+            return -1
+        return 0
+    except:
+        return -1
+
+# ============ ENHANCED ITEM COUNTING ============
+def get_item_count(graphic, container_serial=None, recursive=True):
+    """Enhanced item counter - works with ANY item type in any container
+
+    Generalizes get_potion_count(), get_bandage_count(), count_gold(), etc.
+    into one flexible function. This eliminates ~250 lines of duplication.
+
+    Answered from the shared InventoryIndex - one container walk serves
+    every graphic until an item event or the TTL marks it stale.
+
+    Args:
+        graphic: Item graphic ID to count
+        container_serial: Container to search (None = player backpack)
+        recursive: Search nested containers (default True)
+
+    Returns:
+        int: Total count (stacks are summed)
+
+    Examples:
+        heal_potions = get_item_count(HEAL_POTION_GRAPHIC)
+        gold = get_item_count(GOLD_GRAPHIC, container_serial=satchel)
+        bandages = get_item_count(BANDAGE_GRAPHIC)
+    """
+    return get_inventory_index().count(graphic, container_serial, recursive)
+
+def has_item(graphic, min_count=1, container_serial=None):
+    """Quick predicate: do I have enough of this item?
+
+    Args:
+        graphic: Item graphic ID
+        min_count: Minimum count required (default 1)
+        container_serial: Container to search (None = backpack)
+
+    Returns:
+        bool: True if count >= min_count
+
+    Examples:
+        if has_item(HEAL_POTION_GRAPHIC, min_count=5):
+            # Have at least 5 heal potions
+            pass
+    """
+    return get_item_count(graphic, container_serial) >= min_count
+
+def count_items_by_type(*graphics, **kwargs):
+    """Count multiple item types at once
+
+    Args:
+        *graphics: Variable number of graphic IDs to count
+        container_serial: Optional container (keyword arg)
+        recursive: Optional recursive flag (keyword arg)
+
+    Returns:
+        dict: {graphic: count} mapping
+
+    Uses a single container scan for all graphics.
+
+    Example:
+        counts = count_items_by_type(
+            HEAL_POTION_GRAPHIC,
+            CURE_POTION_GRAPHIC,
+            REFRESH_POTION_GRAPHIC
+        )
+        # Returns: {0x0F0C: 15, 0x0F07: 8, 0x0F0B: 3}
+    """
+    return get_inventory_index().counts(*graphics, **kwargs)
+
+# ============ RESOURCE TRACKING ============
+class ResourceTracker:
+    """Track multiple resources with thresholds
+
+    Useful for tracking bandages, potions, reagents, etc. with warnings.
+
+    Example:
+        tracker = ResourceTracker()
+        tracker.add("Bandages", BANDAGE_GRAPHIC, low_threshold=10)
+        tracker.add("Heal Potions", HEAL_POTION_GRAPHIC, low_threshold=5)
+        tracker.add("Gold", GOLD_GRAPHIC, low_threshold=1000)
+
+        # Update counts
+        tracker.update_all()
+
+        # Check status
+        if tracker.is_low("Bandages"):
+            API.SysMsg("Low on bandages!", 43)
+
+        # Get all low resources
+        low_resources = tracker.get_low_resources()
+        # Returns: ["Bandages", "Heal Potions"]
+    """
+
+    def __init__(self):
+        """Initialize resource tracker"""
+        self.resources = {}  # name -> {graphic, count, threshold, warned}
+
+    def add(self, name, graphic, low_threshold=10):
+        """Add resource to track
+
+        Args:
+            name: Resource name
+            graphic: Item graphic ID
+            low_threshold: Threshold for low warning
+        """
+        self.resources[name] = {
+            "graphic": graphic,
+            "count": 0,
+            "threshold": low_threshold,
+            "warned": False
+        }
+
+    def update(self, name):
+        """Update count for specific resource
+
+        Args:
+            name: Resource name
+        """
+        if name not in self.resources:
+            return
+
+        res = self.resources[name]
+        res["count"] = get_item_count(res["graphic"])
+
+    def update_all(self):
+        """Update counts for all tracked resources"""
+        for name in self.resources:
+            self.update(name)
+
+    def get_count(self, name):
+        """Get current count for resource
+
+        Args:
+            name: Resource name
+
+        Returns:
+            int: Current count
+        """
+        if name in self.resources:
+            return self.resources[name]["count"]
+        return 0
+
+    def is_low(self, name):
+        """Check if resource is below threshold
+
+        Args:
+            name: Resource name
+
+        Returns:
+            bool: True if count < threshold
+        """
+        if name not in self.resources:
+            return False
+
+        res = self.resources[name]
+        return res["count"] < res["threshold"]
+
+    def get_low_resources(self):
+        """Get list of resources below threshold
+
+        Returns:
+            list: Names of resources that are low
+        """
+        low = []
+        for name, res in self.resources.items():
+            if res["count"] < res["threshold"]:
+                low.append(name)
+        return low
+
+    def warn_if_low(self, name, cooldown=10.0):
+        """Warn if resource is low (with cooldown)
+
+        Args:
+            name: Resource name
+            cooldown: Seconds between warnings
+
+        Returns:
+            bool: True if warning was shown
+        """
+        if name not in self.resources:
+            return False
+
+        res = self.resources[name]
+
+        if res["count"] < res["threshold"]:
+            if not res["warned"]:
+                API.SysMsg("Low on " + name + "! (" + str(res["count"]) + " remaining)", 43)
+                res["warned"] = True
+                return True
+        else:
+            # Reset warning flag when not low
+            res["warned"] = False
+
+        return False
+
+# ============ INVENTORY INDEX ============
+_inventory_index = None
+
+class InventoryIndex:
+    """One-pass graphic -> [count, serials] map of a container
+
+    get_item_count() used to walk the whole backpack once per graphic, so
+    checking heal/cure/refresh potions meant three full ItemsInContainer
+    scans. The index walks a container once, groups every item by graphic,
+    and answers all counting questions from that map until it goes stale.
+
+    The map is rebuilt when:
+    - OnItemCreated or OnOpenContainer fires (subscribed via API.Events)
+    - it is older than ttl seconds (catches stack amounts used up)
+    - invalidate() is called (e.g. right after moving items)
+
+    Example:
+        index = get_inventory_index()
+        bandages = index.count(BANDAGE_GRAPHIC)
+        counts = index.counts(HEAL_POTION, CURE_POTION, REFRESH_POTION)  # one scan
+        gold_piles = index.serials(GOLD_GRAPHIC)
+    """
+
+    DEFAULT_TTL = 1.0
+
+    def __init__(self, api=None, ttl=DEFAULT_TTL):
+        """Initialize index (nothing is scanned until first lookup)
+
+        Args:
+            api: The API module (defaults to the global API)
+            ttl: Max age of a scan in seconds before it is rebuilt
+        """
+        self.api = api if api is not None else API
+        self.ttl = ttl
+        self._maps = {}  # (container_serial, recursive) -> (built_at, {graphic: [count, serials]})
+        self.scans = 0
+        self.hits = 0
+        self.subscribed = False
+
+    def subscribe(self):
+        """Invalidate on OnItemCreated/OnOpenContainer (ignored if unavailable)"""
+        if self.subscribed:
+            return self
+        try:
+            self.api.Events.OnItemCreated(self._on_inventory_event)
+            self.api.Events.OnOpenContainer(self._on_inventory_event)
+            self.subscribed = True
+        except:
+            pass
+        return self
+
+    def _on_inventory_event(self, *args):
+        self.invalidate()
+
+    def invalidate(self):
+        """Drop all scans - next lookup rebuilds"""
+        self._maps = {}
+
+    def _resolve_container(self, container_serial):
+        if container_serial is not None:
+            return container_serial
+        backpack = get_player().Backpack
+        if not backpack:
+            return 0
+        return backpack.Serial if hasattr(backpack, 'Serial') else 0
+
+    def _scan(self, container_serial, recursive):
+        by_graphic = {}
+        items = self.api.ItemsInContainer(container_serial, recursive)
+        self.scans += 1
+        if items:
+            for item in items:
+                if not hasattr(item, 'Graphic'):
+                    continue
+                entry = by_graphic.get(item.Graphic)
+                if entry is None:
+                    entry = [0, []]
+                    by_graphic[item.Graphic] = entry
+                entry[0] += item.Amount if hasattr(item, 'Amount') else 1
+                entry[1].append(item.Serial)
+        return by_graphic
+
+    def get_map(self, container_serial=None, recursive=True):
+        """Get {graphic: [count, serials]} for a container (None = backpack)"""
+        try:
+            container_serial = self._resolve_container(container_serial)
+            if container_serial == 0:
+                return {}
+            key = (container_serial, recursive)
+            now = time.time()
+            cached = self._maps.get(key)
+            if cached is not None and now - cached[0] < self.ttl:
+                self.hits += 1
+                return cached[1]
+            by_graphic = self._scan(container_serial, recursive)
+            self._maps[key] = (now, by_graphic)
+            return by_graphic
+        except:
+            return {}
+
+    def count(self, graphic, container_serial=None, recursive=True):
+        """Total amount of a graphic (stacks summed)"""
+        entry = self.get_map(container_serial, recursive).get(graphic)
+        return entry[0] if entry else 0
+
+    def serials(self, graphic, container_serial=None, recursive=True):
+        """Serials of every item with this graphic"""
+        entry = self.get_map(container_serial, recursive).get(graphic)
+        return list(entry[1]) if entry else []
+
+    def counts(self, *graphics, **kwargs):
+        """Counts for several graphics from a single scan"""
+        by_graphic = self.get_map(kwargs.get('container_serial', None), kwargs.get('recursive', True))
+        counts = {}
+        for graphic in graphics:
+            entry = by_graphic.get(graphic)
+            counts[graphic] = entry[0] if entry else 0
+        return counts
+
+    def get_stats(self):
+        """Counters for display/debug
+
+        Returns:
+            dict: scans (full container walks), hits (answered from map)
+        """
+        return {"scans": self.scans, "hits": self.hits}
+
+def get_inventory_index():
+    """Shared InventoryIndex used by get_item_count() and friends"""
+    global _inventory_index
+    if _inventory_index is None:
+        _inventory_index = InventoryIndex().subscribe()
+    return _inventory_index
@@ -0,0 +1,504 @@
+# ============================================================
+# LegionUtils.journal - Journal helpers and JournalWatcher
+# Part of LegionUtils (see __init__.py for usage and changelog)
+# ============================================================
+# API is expected to be in global scope (imported by calling script)
+
+import time
+import re
+from collections import deque
+
+from .formatting import percentile
+
+# ============ JOURNAL HELPERS ============
+def journal_contains(pattern, recent_lines=10):
+    """Check if journal contains pattern in recent lines
+
+    Args:
+        pattern: Text pattern to search for (case-insensitive)
+        recent_lines: Number of recent lines to check
+
+    Lines are read incrementally by the shared JournalWatcher, so each
+    journal line is fetched and lowercased once, not on every call.
+
+    Returns:
+        bool: True if pattern found
+    """
+    try:
+        watcher = get_journal_watcher()
+        watcher.poll()
+
+        pattern_lower = pattern.lower()
+        for line in watcher.recent(recent_lines):
+            if pattern_lower in line:
+                return True
+
+        return False
+    except:
+        return False
+
+def journal_contains_any(patterns, recent_lines=10):
+    """Check if journal contains any of multiple patterns
+
+    Args:
+        patterns: List of patterns to search for
+        recent_lines: Number of recent lines to check
+
+    Returns:
+        str: First pattern found, or None if none found
+    """
+    try:
+        watcher = get_journal_watcher()
+        watcher.poll()
+        recent = watcher.recent(recent_lines)
+
+        for pattern in patterns:
+            pattern_lower = pattern.lower()
+            for line in recent:
+                if pattern_lower in line:
+                    return pattern
+
+        return None
+    except:
+        return None
+
+def clear_journal_check():
+    """Mark journal as checked (for detecting new messages)
+
+    Returns current journal length to compare later.
+
+    Returns:
+        int: Journal length
+    """
+    try:
+        journal_text = API.InGameJournal.GetText()
+        return len(journal_text.split('\n'))
+    except:
+        return 0
+
+# ============ JOURNAL WATCHER ============
+_journal_watcher = None
+
+class JournalWatcher:
+    """Incremental journal reader with one-pass multi-pattern matching
+
+    Reads new lines with API.GetJournalEntries and remembers the newest
+    entry it has seen (high-water mark), so every journal line is
+    lowercased and matched exactly once no matter how often you poll.
+    All watched patterns are compiled into a single regex, so adding
+    patterns does not add passes over the journal.
+
+    Matches set a flag (seen/consume) and call the pattern's callback.
+
+    Example:
+        watcher = JournalWatcher(API)
+        watcher.watch("You finish applying the bandages")
+        watcher.watch("You are dead", on_death)   # callback(entry)
+
+        while not API.StopRequested:
+            API.ProcessCallbacks()
+            watcher.poll()
+            if watcher.consume("You finish applying the bandages"):
+                heal_done()
+
+        watcher.reset()   # forget flags and skip everything already in the journal
+    """
+
+    DEFAULT_WINDOW = 60.0  # Seconds of history read on the first poll
+    POLL_SLACK = 1.0       # Extra seconds re-read each poll (covers timestamp jitter)
+    RECENT_LINES = 50      # Lowercased lines kept for journal_contains()
+
+    def __init__(self, api=None, window=DEFAULT_WINDOW):
+        """Initialize watcher
+
+        Args:
+            api: The API module (defaults to the global API)
+            window: Seconds of journal history read on the first poll
+        """
+        self.api = api if api is not None else API
+        self.window = window
+        self._patterns = []      # lowercased, in registration order
+        self._callbacks = {}     # pattern -> [callback]
+        self._implied = {}       # pattern -> patterns contained in it
+        self._group_patterns = {}  # regex group name -> pattern
+        self._matcher = None
+        self._flags = {}         # pattern -> match count since last consume/reset
+        self._recent = []
+        self._last_time = None
+        self._tail_count = 0     # entries already processed at _last_time
+        self._last_poll = 0
+        self.polls = 0
+        self.entries = 0
+        self.matches = 0
+
+    # ---------- patterns ----------
+    def watch(self, pattern, callback=None):
+        """Watch for a (case-insensitive) substring
+
+        Lines already read since the last reset() are checked for the new
+        pattern too (flag only - callbacks fire for new lines).
+
+        Args:
+            pattern: Text to look for
+            callback: Optional callback(entry) run on each match
+        """
+        key = pattern.lower()
+        if key not in self._callbacks:
+            self._patterns.append(key)
+            self._callbacks[key] = []
+            self._compile()
+            # Lines already read since reset() count toward the new pattern's flag
+            count = sum(1 for line in self._recent if key in line)
+            if count:
+                self._flags[key] = count
+        if callback:
+            self._callbacks[key].append(callback)
+        return self
+
+    def watch_all(self, patterns, callback=None):
+        """watch() several patterns at once"""
+        for pattern in patterns:
+            self.watch(pattern, callback)
+        return self
+
+    def unwatch(self, pattern):
+        """Stop watching a pattern"""
+        key = pattern.lower()
+        if key in self._callbacks:
+            self._patterns.remove(key)
+            del self._callbacks[key]
+            self._flags.pop(key, None)
+            self._compile()
+
+    def is_watching(self, pattern):
+        return pattern.lower() in self._callbacks
+
+    def _compile(self):
+        # Longest first so a pattern wins over its own prefix; the lookahead
+        # lets matches overlap, and _implied covers patterns that are
+        # substrings of a longer match starting at the same position.
+        ordered = sorted(self._patterns, key=len, reverse=True)
+        self._group_patterns = {}
+        parts = []
+        for i, pattern in enumerate(ordered):
+            group = "p" + str(i)
+            self._group_patterns[group] = pattern
+            parts.append("(?P<" + group + ">" + re.escape(pattern) + ")")
+        self._matcher = re.compile("(?=" + "|".join(parts) + ")") if parts else None
+        self._implied = {}
+        for pattern in self._patterns:
+            self._implied[pattern] = [p for p in self._patterns if p != pattern and p in pattern]
+
+    def _match_line(self, line):
+        """Set of watched patterns found in a lowercased line"""
+        found = set()
+        for m in self._matcher.finditer(line):
+            pattern = self._group_patterns[m.lastgroup]
+            if pattern not in found:
+                found.add(pattern)
+                found.update(self._implied[pattern])
+        return found
+
+    # ---------- reading ----------
+    def _fetch_new(self):
+        now = time.time()
+        if self._last_time is None:
+            seconds = self.window
+        else:
+            seconds = min(self.window, now - self._last_poll + self.POLL_SLACK)
+        self._last_poll = now
+        self.polls += 1
+        try:
+            entries = self.api.GetJournalEntries(seconds)
+        except:
+            return []
+        if not entries:
+            return []
+
+        fresh = []
+        at_last = 0
+        for entry in entries:
+            stamp = entry.Time
+            if self._last_time is not None:
+                if stamp < self._last_time:
+                    continue
+                if stamp == self._last_time:
+                    at_last += 1
+                    if at_last <= self._tail_count:
+                        continue
+            fresh.append(entry)
+
+        if fresh:
+            newest = fresh[-1].Time
+            if newest == self._last_time:
+                self._tail_count = at_last
+            else:
+                self._tail_count = sum(1 for e in fresh if e.Time == newest)
+            self._last_time = newest
+        return fresh
+
+    def poll(self):
+        """Process new journal entries
+
+        Returns:
+            list: (pattern, entry) for every match, in journal order
+        """
+        hits = []
+        for entry in self._fetch_new():
+            line = (entry.Text or "").lower()
+            self.entries += 1
+            self._recent.append(line)
+            if self._matcher is None:
+                continue
+            for pattern in self._match_line(line):
+                self._flags[pattern] = self._flags.get(pattern, 0) + 1
+                self.matches += 1
+                hits.append((pattern, entry))
+                for callback in self._callbacks[pattern]:
+                    try:
+                        callback(entry)
+                    except Exception as e:
+                        self.api.SysMsg("JournalWatcher callback error: " + str(e), 32)
+        if len(self._recent) > self.RECENT_LINES:
+            del self._recent[:-self.RECENT_LINES]
+        return hits
+
+    def reset(self):
+        """Skip everything currently in the journal and clear all flags
+
+        Call alongside API.ClearJournal() before an action whose result
+        you are waiting for.
+        """
+        matcher = self._matcher
+        self._matcher = None
+        self.poll()
+        self._matcher = matcher
+        self._flags = {}
+        self._recent = []
+
+    # ---------- results ----------
+    def seen(self, pattern):
+        """True if pattern matched since the last consume()/reset()"""
+        return self._flags.get(pattern.lower(), 0) > 0
+
+    def seen_any(self, patterns):
+        """First pattern in patterns that was seen, or None"""
+        for pattern in patterns:
+            if self.seen(pattern):
+                return pattern
+        return None
+
+    def consume(self, pattern):
+        """seen() and clear the flag"""
+        return self._flags.pop(pattern.lower(), 0) > 0
+
+    def recent(self, count=10):
+        """Last count journal lines (lowercased), oldest first"""
+        return self._recent[-count:]
+
+    def get_stats(self):
+        """Counters for display/debug
+
+        Returns:
+            dict: polls, entries (lines processed), matches, patterns
+        """
+        return {
+            "polls": self.polls,
+            "entries": self.entries,
+            "matches": self.matches,
+            "patterns": len(self._patterns),
+        }
+
+def get_journal_watcher():
+    """Shared JournalWatcher used by journal_contains() and friends"""
+    global _journal_watcher
+    if _journal_watcher is None:
+        _journal_watcher = JournalWatcher()
+    return _journal_watcher
+
+# ============ ACTION TIMING ============
+class ActionTimingModel:
+    """Learns how long journal-confirmed actions really take
+
+    Scripts wait a fixed SELF_DELAY/VET_DELAY after each bandage, padded
+    so it covers the slowest case. This model times every action from
+    begin() to its finish message and, once it has enough samples, hands
+    back the observed p95 instead - so the next heal is scheduled when
+    this character's bandages actually finish. Fail messages end the
+    action without recording a sample.
+
+    Until an action has min_samples the configured default is used, and
+    the learned value never exceeds default * max_factor.
+
+    Example:
+        timing = ActionTimingModel({"self": SELF_DELAY, "pet": VET_DELAY},
+                                   JOURNAL_FINISH_MESSAGES, JOURNAL_FAIL_MESSAGES)
+
+        timing.begin("pet")                  # bandage applied
+        ...
+        result = timing.poll()               # each tick: "finish", "fail" or None
+        if result or time.time() - start >= timing.expected("pet"):
+            heal_done()
+
+        timing.get_stats("pet")   # {"samples": 24, "p50": 3.6, "p95": 3.9, "expected": 3.9, ...}
+    """
+
+    def __init__(self, defaults, finish_messages, fail_messages=(), watcher=None,
+                 sample_size=50, min_samples=5, pct=95, max_factor=1.5, floor=0.5):
+        """Initialize model
+
+        Args:
+            defaults: {action: default seconds} - used until samples exist
+            finish_messages: Journal text that completes an action
+            fail_messages: Journal text that aborts an action
+            watcher: JournalWatcher to read through (a new one if None)
+            sample_size: Durations kept per action
+            min_samples: Samples needed before the learned value is used
+            pct: Percentile scheduled (95 = p95)
+            max_factor: Learned value is capped at default * max_factor
+            floor: Never schedule less than this many seconds
+        """
+        self.defaults = dict(defaults)
+        self.finish_messages = [m.lower() for m in finish_messages]
+        self.fail_messages = [m.lower() for m in fail_messages]
+        self.watcher = watcher if watcher is not None else JournalWatcher()
+        self.watcher.watch_all(self.finish_messages + self.fail_messages)
+        self.sample_size = sample_size
+        self.min_samples = min_samples
+        self.pct = pct
+        self.max_factor = max_factor
+        self.floor = floor
+        self.samples = {}     # action -> deque of seconds
+        self.fails = {}       # action -> count
+        self._expected = {}   # action -> cached expected()
+        self.pending = None   # (action, start time)
+        self.last_end = None  # journal time the last action finished/failed
+
+    # ---------- timing ----------
+    def begin(self, action, now=None):
+        """Start timing an action (journal lines before this are ignored)
+
+        A previous action still pending is polled first, so a finish that
+        landed after the caller stopped waiting is still recorded.
+        """
+        if now is None:
+            now = time.time()
+        if self.pending is None or not self.poll(now):
+            self.watcher.poll()
+        self.pending = (action, now)
+
+    def cancel(self):
+        """Stop timing without recording anything"""
+        self.pending = None
+
+    def poll(self, now=None):
+        """Read new journal lines for the pending action
+
+        Lines stamped before the action started belong to an earlier one
+        and are skipped.
+
+        Returns:
+            str: "finish" or "fail" when the pending action ended, else None
+        """
+        if self.pending is None:
+            return None
+        if now is None:
+            now = time.time()
+        action, start = self.pending
+        for pattern, entry in self.watcher.poll():
+            if pattern not in self.finish_messages and pattern not in self.fail_messages:
+                continue
+            end = _entry_seconds(entry, now)
+            if end < start:
+                continue
+            self.pending = None
+            self.last_end = end
+            if pattern in self.finish_messages:
+                self.record(action, end - start)
+                return "finish"
+            self.fails[action] = self.fails.get(action, 0) + 1
+            return "fail"
+        return None
+
+    def record(self, action, seconds):
+        """Add one observed duration"""
+        if seconds <= 0:
+            return
+        samples = self.samples.get(action)
+        if samples is None:
+            samples = self.samples[action] = deque(maxlen=self.sample_size)
+        samples.append(seconds)
+        self._expected.pop(action, None)
+
+    # ---------- results ----------
+    def expected(self, action):
+        """Seconds to wait for action: learned p95, or the default"""
+        value = self._expected.get(action)
+        if value is None:
+            default = self.defaults.get(action, 0.0)
+            samples = self.samples.get(action)
+            if not samples or len(samples) < self.min_samples:
+                value = default
+            else:
+                value = max(self.floor, percentile(sorted(samples), self.pct))
+                if default > 0:
+                    value = min(value, default * self.max_factor)
+            self._expected[action] = value
+        return value
+
+    def set_default(self, action, seconds):
+        """Change an action's default (e.g. user adjusted a timer)"""
+        self.defaults[action] = seconds
+        self._expected.pop(action, None)
+
+    def get_stats(self, action):
+        """Latency stats for display/debug
+
+        Returns:
+            dict: samples, p50, p95, expected, default, fails
+        """
+        ordered = sorted(self.samples.get(action, ()))
+        return {
+            "samples": len(ordered),
+            "p50": percentile(ordered, 50),
+            "p95": percentile(ordered, 95),
+            "expected": self.expected(action),
+            "default": self.defaults.get(action, 0.0),
+            "fails": self.fails.get(action, 0),
+        }
+
+    # ---------- persistence ----------
+    def to_string(self):
+        """Serialize samples: "action=1.23,1.31|action2=..." (for per-character storage)"""
+        parts = []
+        for action, samples in self.samples.items():
+            if samples:
+                parts.append(action + "=" + ",".join("{:.2f}".format(s) for s in samples))
+        return "|".join(parts)
+
+    def from_string(self, text):
+        """Load samples saved by to_string() (bad entries are skipped)"""
+        for part in (text or "").split("|"):
+            action, _, values = part.partition("=")
+            if not action or not values:
+                continue
+            for value in values.split(","):
+                try:
+                    self.record(action, float(value))
+                except ValueError:
+                    pass
+        return self
+
+def _entry_seconds(entry, fallback):
+    """Journal entry time in time.time() seconds, or fallback if it has none
+
+    The client's PyJournalEntry.Time is a datetime; traces replay it as
+    seconds already.
+    """
+    stamp = getattr(entry, "Time", None)
+    if isinstance(stamp, (int, float)):
+        return float(stamp)
+    try:
+        return stamp.timestamp()
+    except Exception:
+        return fallback
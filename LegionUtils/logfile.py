@@ -0,0 +1,168 @@
+# ============================================================
+# LegionUtils.logfile - Buffered, rotating text log files
+# Part of LegionUtils (see __init__.py for usage and changelog)
+# ============================================================
+# API is expected to be in global scope (imported by calling script)
+
+import os
+import time
+
+# ============ BUFFERED LOG WRITER ============
+class BufferedLogWriter:
+    """Append-only text log that batches writes, folds repeats and rotates
+
+    Opening, appending and closing the file on every entry puts disk I/O
+    on the caller's path - during an error storm (a stuck loop logging
+    several times a second) that is many syscalls per second, right where
+    the script is trying to recover. BufferedLogWriter keeps entries in
+    memory and appends them in one write when the oldest pending entry
+    is flush_interval seconds old, max_entries are pending, or the script
+    is stopping (update()/close()).
+
+    Identical (category, message) entries in the same batch are folded
+    into one line with a count and the time of the last repeat. When an
+    append would take the file past max_bytes it is rotated first
+    (path -> path.1 -> ... -> path.<backups>).
+
+    A batch that fails to write is dropped (the error is raised to the
+    caller); logging never grows memory without bound.
+
+    Example:
+        log = BufferedLogWriter(os.path.join(log_dir, "error_log.txt"))
+        log.write("MOVEMENT_STUCK", "No movement for 3.2s")   # memory only
+
+        while not API.StopRequested:
+            log.update()                # flushes when a threshold is hit
+            API.Pause(0.1)
+
+        log.close()                     # final flush
+    """
+
+    DEFAULT_FLUSH_INTERVAL = 5.0
+    DEFAULT_MAX_ENTRIES = 50
+    DEFAULT_MAX_BYTES = 512 * 1024
+    DEFAULT_BACKUPS = 3
+
+    def __init__(self, path, api=None, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES,
+                 backups=DEFAULT_BACKUPS):
+        """Initialize an empty buffer (the file is not touched until a flush)
+
+        Args:
+            path: Log file to append to
+            api: The API module, for StopRequested (defaults to the global API)
+            flush_interval: Max seconds an entry waits in memory
+            max_entries: Pending (folded) entries that force a flush
+            max_bytes: File size that triggers rotation
+            backups: Rotated files to keep (0 = just truncate)
+        """
+        self.api = api if api is not None else API
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.pending = []           # [category, message, first_time, last_time, count]
+        self._index = {}            # (category, message) -> pending entry
+        self._size = None           # bytes in the current file, read on first flush
+        self.entries = 0
+        self.folded = 0
+        self.flushes = 0
+        self.rotations = 0
+        self.bytes_written = 0
+
+    def write(self, category, message, now=None):
+        """Queue an entry; flushes if a threshold is reached
+
+        Returns:
+            bool: True if this call wrote to disk
+        """
+        if now is None:
+            now = time.time()
+        self.entries += 1
+        key = (category, message)
+        entry = self._index.get(key)
+        if entry is not None:
+            entry[3] = now
+            entry[4] += 1
+            self.folded += 1
+        else:
+            entry = [category, message, now, now, 1]
+            self._index[key] = entry
+            self.pending.append(entry)
+        if len(self.pending) >= self.max_entries or now - self.pending[0][2] >= self.flush_interval:
+            return self.flush()
+        return False
+
+    def update(self, now=None):
+        """Flush if the oldest entry is due or the script is stopping (call in main loop)"""
+        if not self.pending:
+            return False
+        if now is None:
+            now = time.time()
+        if now - self.pending[0][2] >= self.flush_interval or getattr(self.api, "StopRequested", False):
+            return self.flush()
+        return False
+
+    def _format(self, entry):
+        category, message, first, last, count = entry
+        line = "[{}] {}: {}".format(time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(first)),
+                                    category, message)
+        if count > 1:
+            line += " (x{}, last {})".format(count, time.strftime("%H:%M:%S", time.localtime(last)))
+        return line + "\n"
+
+    def _rotate(self):
+        """Shift path -> path.1 -> ... and start an empty file"""
+        if self.backups > 0:
+            for i in range(self.backups - 1, 0, -1):
+                older = "{}.{}".format(self.path, i)
+                if os.path.exists(older):
+                    os.replace(older, "{}.{}".format(self.path, i + 1))
+            os.replace(self.path, self.path + ".1")
+        else:
+            os.remove(self.path)
+        self._size = 0
+        self.rotations += 1
+
+    def flush(self):
+        """Append all pending entries in one write
+
+        Returns:
+            bool: True if a write happened
+        """
+        if not self.pending:
+            return False
+        data = "".join(self._format(entry) for entry in self.pending)
+        self.pending = []
+        self._index = {}
+        size = len(data.encode("utf-8"))
+        if self._size is None:
+            self._size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if self._size > 0 and self._size + size > self.max_bytes:
+            self._rotate()
+        with open(self.path, "a") as f:
+            f.write(data)
+        self._size += size
+        self.bytes_written += size
+        self.flushes += 1
+        return True
+
+    def close(self):
+        """Final flush (call on shutdown)"""
+        return self.flush()
+
+    def get_stats(self):
+        """Counters for display/debug
+
+        Returns:
+            dict: entries, folded, pending, flushes, rotations, bytes_written
+        """
+        return {
+            "entries": self.entries,
+            "folded": self.folded,
+            "pending": len(self.pending),
+            "flushes": self.flushes,
+            "rotations": self.rotations,
+            "bytes_written": self.bytes_written,
+        }
@@ -0,0 +1,561 @@
+# ============================================================
+# LegionUtils.perf - APIProfiler and Scheduler
+# Part of LegionUtils (see __init__.py for usage and changelog)
+# ============================================================
+# API is expected to be in global scope (imported by calling script)
+
+import time
+import heapq
+
+from .formatting import format_time_elapsed, percentile
+
+# ============ API PROFILING ============
+class APIProfiler:
+    """Opt-in call profiler for the API module
+
+    Wraps every API.* function (and API.Mobiles.*) in place, so the
+    script, LegionUtils and GatherFramework are all measured without
+    code changes. Each API.Pause() ends one main-loop "tick".
+
+    Records per function: call count, total time, p50/p95/p99 latency.
+    Pause itself is counted but not timed (it is sleep, not client work).
+
+    Example:
+        profiler = APIProfiler(API, name="Tamer_Suite", live_interval=10.0)
+        profiler.install()
+
+        while not API.StopRequested:
+            ...
+            API.Pause(0.1)
+
+        profiler.stop()  # Writes logs/api_profile_Tamer_Suite_<time>.txt
+
+        # Live figure for a label
+        statusLabel.SetText(profiler.get_live_text())
+    """
+
+    TICK_HISTORY = 100          # Ticks averaged for the live calls/tick figure
+    NAMESPACES = ("Mobiles",)   # Sub-objects whose functions are also wrapped
+
+    def __init__(self, api=None, name="script", sample_size=1000, live_interval=0, report_dir=None):
+        """Initialize profiler (nothing is wrapped until install())
+
+        Args:
+            api: The API module to wrap (defaults to the global API)
+            name: Script name used in the report filename
+            sample_size: Latency samples kept per function for percentiles
+            live_interval: Seconds between live SysMsg summaries (0 = off)
+            report_dir: Report folder (default: logs/ in the repo root)
+        """
+        self.api = api if api is not None else API
+        self.name = name
+        self.sample_size = sample_size
+        self.live_interval = live_interval
+        if report_dir is None:
+            import os
+            report_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs")
+        self.report_dir = report_dir
+
+        self.stats = {}           # label -> [count, total_seconds, recent samples]
+        self.ticks = 0
+        self.tick_calls = 0       # Calls since the last Pause
+        self.tick_history = []    # Calls per tick, newest last
+        self.start_time = time.time()
+        self.last_live = time.time()
+        self.installed = False
+        self._originals = []      # (owner, attr, original) for uninstall
+        self._sysmsg = None
+
+    def install(self):
+        """Wrap all API functions. Safe to call twice."""
+        if self.installed:
+            return self
+        api = self.api
+        self._sysmsg = getattr(api, "SysMsg", None)
+        self._wrap_owner(api, "")
+        for ns in self.NAMESPACES:
+            owner = getattr(api, ns, None)
+            if owner is not None:
+                self._wrap_owner(owner, ns + ".")
+        self.start_time = time.time()
+        self.last_live = self.start_time
+        self.installed = True
+        return self
+
+    def uninstall(self):
+        """Restore the original API functions"""
+        for owner, attr, original in reversed(self._originals):
+            try:
+                setattr(owner, attr, original)
+            except:
+                pass
+        self._originals = []
+        self.installed = False
+
+    def stop(self):
+        """Uninstall and write the report. Returns the report path (or None)."""
+        self.uninstall()
+        return self.write_report()
+
+    def _wrap_owner(self, owner, prefix):
+        for attr in dir(owner):
+            if not attr[:1].isupper():
+                continue
+            try:
+                original = getattr(owner, attr)
+            except:
+                continue
+            if not callable(original) or isinstance(original, type):
+                continue
+            if attr == "Pause" and not prefix:
+                wrapper = self._make_pause_wrapper(original)
+            else:
+                wrapper = self._make_wrapper(prefix + attr, original)
+            try:
+                setattr(owner, attr, wrapper)
+                self._originals.append((owner, attr, original))
+            except:
+                pass
+
+    def _make_wrapper(self, label, original):
+        stats = self.stats.setdefault(label, [0, 0.0, []])
+        samples = stats[2]
+        limit = self.sample_size
+        perf = time.perf_counter
+        profiler = self
+
+        def wrapper(*args, **kwargs):
+            start = perf()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                elapsed = perf() - start
+                stats[0] += 1
+                stats[1] += elapsed
+                if len(samples) >= limit:
+                    samples[stats[0] % limit] = elapsed
+                else:
+                    samples.append(elapsed)
+                profiler.tick_calls += 1
+        return wrapper
+
+    def _make_pause_wrapper(self, original):
+        stats = self.stats.setdefault("Pause", [0, 0.0, []])
+        profiler = self
+
+        def wrapper(*args, **kwargs):
+            stats[0] += 1
+            profiler.end_tick()
+            return original(*args, **kwargs)
+        return wrapper
+
+    def end_tick(self):
+        """Close the current tick (called automatically by API.Pause)"""
+        self.ticks += 1
+        self.tick_history.append(self.tick_calls)
+        if len(self.tick_history) > self.TICK_HISTORY:
+            del self.tick_history[0]
+        self.tick_calls = 0
+
+        if self.live_interval > 0 and self._sysmsg is not None:
+            now = time.time()
+            if now - self.last_live >= self.live_interval:
+                self.last_live = now
+                self._sysmsg(self.get_live_text(), 88)
+
+    def calls_per_tick(self):
+        """Average API calls per tick over the recent tick history"""
+        if not self.tick_history:
+            return 0.0
+        return sum(self.tick_history) / float(len(self.tick_history))
+
+    def get_live_text(self):
+        """Short status line, e.g. 'API: 23.4 calls/tick (FindMobile 9.0)'"""
+        text = "API: " + "{:.1f}".format(self.calls_per_tick()) + " calls/tick"
+        ranked = self.get_rows()
+        if ranked and self.ticks:
+            top = ranked[0]
+            text += " (" + top["name"] + " " + "{:.1f}".format(top["per_tick"]) + ")"
+        return text
+
+    def get_rows(self):
+        """Per-function stats sorted by total time (most expensive first)
+
+        Returns:
+            list: dicts with name, calls, per_tick, total_ms, p50_ms, p95_ms, p99_ms
+        """
+        rows = []
+        ticks = max(1, self.ticks)
+        for label, (count, total, samples) in self.stats.items():
+            if count == 0 or label == "Pause":
+                continue
+            ordered = sorted(samples)
+            rows.append({
+                "name": label,
+                "calls": count,
+                "per_tick": count / float(ticks),
+                "total_ms": total * 1000.0,
+                "p50_ms": percentile(ordered, 50) * 1000.0,
+                "p95_ms": percentile(ordered, 95) * 1000.0,
+                "p99_ms": percentile(ordered, 99) * 1000.0,
+            })
+        rows.sort(key=lambda r: (-r["total_ms"], -r["calls"], r["name"]))
+        return rows
+
+    def format_report(self):
+        """Full text report (same content as the file written by stop())"""
+        rows = self.get_rows()
+        total_calls = sum(r["calls"] for r in rows)
+        total_ms = sum(r["total_ms"] for r in rows)
+        ticks = max(1, self.ticks)
+        lines = [
+            "API profile: " + self.name,
+            "Runtime: " + format_time_elapsed(time.time() - self.start_time)
+            + "   Ticks: " + str(self.ticks),
+            "Calls: " + str(total_calls) + " (" + "{:.1f}".format(total_calls / float(ticks))
+            + "/tick)   Client time: " + "{:.1f}".format(total_ms) + "ms ("
+            + "{:.3f}".format(total_ms / ticks) + "ms/tick)",
+            "",
+            "{:<32}{:>10}{:>10}{:>12}{:>10}{:>10}{:>10}".format(
+                "Function", "Calls", "/tick", "Total ms", "p50 ms", "p95 ms", "p99 ms"),
+        ]
+        for r in rows:
+            lines.append("{:<32}{:>10}{:>10.2f}{:>12.2f}{:>10.4f}{:>10.4f}{:>10.4f}".format(
+                r["name"], r["calls"], r["per_tick"], r["total_ms"],
+                r["p50_ms"], r["p95_ms"], r["p99_ms"]))
+        return "\n".join(lines) + "\n"
+
+    def write_report(self):
+        """Write the report to report_dir. Returns the path, or None on failure."""
+        try:
+            import os
+            if not os.path.exists(self.report_dir):
+                os.makedirs(self.report_dir)
+            stamp = time.strftime("%Y%m%d_%H%M%S")
+            path = os.path.join(self.report_dir, "api_profile_" + self.name + "_" + stamp + ".txt")
+            with open(path, "w") as f:
+                f.write(self.format_report())
+            return path
+        except Exception as e:
+            if self._sysmsg is not None:
+                self._sysmsg("Failed to write API profile: " + str(e), 32)
+            return None
+
+
+# ============ SCHEDULER ============
+
+class ScheduledTask:
+    """Handle for a callback registered with Scheduler
+
+    Returned by Scheduler.every()/after(); pass it to wake() or cancel().
+    """
+
+    def __init__(self, callback, interval, due, name, slack=0.0):
+        self.callback = callback
+        self.interval = interval    # None = one-shot
+        self.slack = slack          # may run this much later to share a wakeup
+        self.due = due              # None while running
+        self.name = name
+        self.cancelled = False
+        self.runs = 0
+        self.total_time = 0.0
+        self._wake_due = None       # wake() requested while running
+
+class Scheduler:
+    """Cooperative main loop: timer heap + API.Events wakeups
+
+    Replaces the usual `while not API.StopRequested: ...; API.Pause(0.1)`
+    loop with hand-rolled next_display/next_sync timestamps. Each piece of
+    periodic work becomes a task with its own interval, and the loop
+    sleeps until the next task is due instead of waking on a fixed grid.
+    Tasks given some slack ride along with the next wakeup rather than
+    adding their own.
+
+    Events from API.Events (OnPlayerHitsChanged, OnBuffAdded, OnItemCreated,
+    OnPlayerMoved, ...) and hotkeys are delivered by API.ProcessCallbacks,
+    so max_sleep bounds how late they are seen. An event handler usually
+    just wakes a task, which then runs in the same tick.
+
+    Tasks that raise are reported and keep their schedule.
+
+    Example:
+        scheduler = Scheduler(API)
+        heal = scheduler.every(0.5, heal_tick, "heal")
+        scheduler.every(0.3, update_display, "display", slack=0.1)
+        scheduler.wake_on("OnPlayerHitsChanged", heal)
+
+        # In heal_tick, after starting a 4.5s bandage:
+        scheduler.wake(heal, 4.5)
+
+        scheduler.run()     # until API.StopRequested
+    """
+
+    def __init__(self, api=None, max_sleep=0.1, min_sleep=0.01, on_error=None):
+        """Initialize scheduler
+
+        Args:
+            api: The API module (defaults to the global API)
+            max_sleep: Longest single Pause (bounds hotkey/event latency)
+            min_sleep: Shortest Pause (keeps an overdue task from spinning)
+            on_error: Optional callback(task, exception); task is None for
+                errors outside a task (e.g. a button handler)
+        """
+        self.api = api if api is not None else API
+        self.max_sleep = max_sleep
+        self.min_sleep = min_sleep
+        self.on_error = on_error
+        self._heap = []             # (due, seq, task)
+        self._seq = 0
+        self._handlers = {}         # event name -> [callbacks]
+        self.ticks = 0
+        self.task_runs = 0
+        self.events = 0
+        self.sleep_time = 0.0
+        self.max_late = 0.0
+        self.total_late = 0.0
+
+    # ---------- registering work ----------
+
+    def every(self, interval, callback, name=None, delay=0.0, slack=0.0):
+        """Run callback every interval seconds (first run after delay)
+
+        Args:
+            slack: How late the task may run so it shares a wakeup with
+                other work (use for display/bookkeeping, not for heals)
+
+        Returns:
+            ScheduledTask
+        """
+        task = ScheduledTask(callback, interval, time.time() + delay, name or callback.__name__, slack)
+        self._push(task)
+        return task
+
+    def after(self, delay, callback, name=None):
+        """Run callback once, delay seconds from now
+
+        Returns:
+            ScheduledTask
+        """
+        task = ScheduledTask(callback, None, time.time() + delay, name or callback.__name__)
+        self._push(task)
+        return task
+
+    def cancel(self, task):
+        """Stop a task from running again"""
+        if task:
+            task.cancelled = True
+
+    def wake(self, task, delay=0.0):
+        """Run a task delay seconds from now, if that is sooner than planned"""
+        self.wake_at(task, time.time() + delay)
+
+    def wake_at(self, task, when):
+        """Run a task at time when, if that is sooner than planned
+
+        Never postpones a task. Waking a task from inside its own callback
+        takes effect once it returns.
+        """
+        if task is None or task.cancelled:
+            return
+        if task.due is None:
+            if task._wake_due is None or when < task._wake_due:
+                task._wake_due = when
+        elif when < task.due:
+            task.due = when
+            self._push(task)
+
+    def on(self, event_name, callback):
+        """Call callback(*args) when an API.Events event fires
+
+        Subscribes to API.Events once per event name; later handlers share
+        the subscription.
+
+        Returns:
+            bool: False if this client has no such event
+        """
+        handlers = self._handlers.get(event_name)
+        if handlers is None:
+            try:
+                subscribe = getattr(self.api.Events, event_name)
+                subscribe(self._make_dispatcher(event_name))
+            except:
+                return False
+            handlers = []
+            self._handlers[event_name] = handlers
+        handlers.append(callback)
+        return True
+
+    def wake_on(self, event_name, task):
+        """Wake a task whenever an API.Events event fires"""
+        return self.on(event_name, lambda *args: self.wake(task))
+
+    # ---------- running ----------
+
+    def next_due(self):
+        """Time the next task is due, or None if nothing is scheduled"""
+        heap = self._heap
+        while heap:
+            due, seq, task = heap[0]
+            if task.cancelled or task.due != due:
+                heapq.heappop(heap)     # stale entry (cancelled or rescheduled)
+                continue
+            return due
+        return None
+
+    def run_pending(self):
+        """Run every task that is due
+
+        Returns:
+            int: Number of tasks run
+        """
+        ran = []
+        now = time.time()
+        while True:
+            due = self.next_due()
+            if due is None or due > now:
+                break
+            task = self._heap[0][2]
+            if task in ran:
+                break               # rescheduled itself for now - next tick
+            heapq.heappop(self._heap)
+            self._run_task(task, now - due)
+            ran.append(task)
+        return len(ran)
+
+    def tick(self):
+        """Process callbacks, run due tasks, then sleep until the next one"""
+        self.ticks += 1
+        self.api.ProcessCallbacks()
+        self.run_pending()
+        self._sleep(self.max_sleep)
+
+    def run(self, until=None):
+        """Loop until API.StopRequested (or until() returns True)"""
+        while not self.api.StopRequested and not (until and until()):
+            try:
+                self.tick()
+            except Exception as e:
+                self._report(None, e)
+                self.api.Pause(1)
+
+    def pause(self, seconds):
+        """Wait like API.Pause, running due tasks in the meantime
+
+        For scripts whose main loop is a blocking state machine: replace
+        the API.Pause at the bottom of the loop with this so background
+        tasks (display, position tracking) still run on their own timers.
+        """
+        end = time.time() + seconds
+        self.run_pending()
+        while True:
+            remaining = end - time.time()
+            if remaining <= 0 or self.api.StopRequested:
+                return
+            self._sleep(remaining)
+            if time.time() < end:
+                # Woke early for a task
+                self.api.ProcessCallbacks()
+                self.run_pending()
+
+    def get_stats(self):
+        """Get loop statistics
+
+        Returns:
+            dict: ticks, task_runs, events, sleep_time, avg_sleep,
+                max_late/avg_late (seconds a task ran after its due time),
+                tasks {name: runs}
+        """
+        tasks = {}
+        for due, seq, task in self._heap:
+            if not task.cancelled:
+                tasks[task.name] = task.runs
+        return {
+            "ticks": self.ticks,
+            "task_runs": self.task_runs,
+            "events": self.events,
+            "sleep_time": self.sleep_time,
+            "avg_sleep": self.sleep_time / self.ticks if self.ticks else 0.0,
+            "max_late": self.max_late,
+            "avg_late": self.total_late / self.task_runs if self.task_runs else 0.0,
+            "tasks": tasks,
+        }
+
+    # ---------- internals ----------
+
+    def _push(self, task):
+        self._seq += 1
+        heapq.heappush(self._heap, (task.due, self._seq, task))
+
+    def next_deadline(self):
+        """Latest time the loop can wake without running any task past its slack"""
+        deadline = None
+        for due, seq, task in self._heap:
+            if task.cancelled or task.due != due:
+                continue
+            latest = due + task.slack
+            if deadline is None or latest < deadline:
+                deadline = latest
+        return deadline
+
+    def _sleep(self, longest):
+        """Pause until the next deadline (between min_sleep and longest)"""
+        delay = longest
+        deadline = self.next_deadline()
+        if deadline is not None:
+            delay = min(delay, max(deadline - time.time(), self.min_sleep))
+        self.api.Pause(delay)
+        self.sleep_time += delay
+
+    def _run_task(self, task, late):
+        task.due = None
+        start = time.time()
+        try:
+            task.callback()
+        except Exception as e:
+            self._report(task, e)
+        finished = time.time()
+        task.runs += 1
+        task.total_time += finished - start
+        self.task_runs += 1
+        self.total_late += late
+        if late > self.max_late:
+            self.max_late = late
+
+        wake_due = task._wake_due
+        task._wake_due = None
+        if task.cancelled:
+            return
+        if task.interval is not None:
+            due = finished + task.interval
+            task.due = due if wake_due is None else min(due, wake_due)
+        elif wake_due is not None:
+            task.due = wake_due
+        else:
+            task.cancelled = True   # one-shot finished
+            return
+        self._push(task)
+
+    def _make_dispatcher(self, event_name):
+        def dispatch(*args):
+            self.events += 1
+            for handler in self._handlers.get(event_name, ()):
+                try:
+                    handler(*args)
+                except Exception as e:
+                    self._report(None, e)
+        return dispatch
+
+    def _report(self, task, error):
+        if self.on_error:
+            try:
+                self.on_error(task, error)
+            except:
+                pass
+            return
+        if self.api.StopRequested or "operation canceled" in str(error).lower():
+            return
+        where = task.name if task else "callback"
+        try:
+            self.api.SysMsg("Error in " + where + ": " + str(error), 32)
+        except:
+            pass
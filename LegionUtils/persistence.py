@@ -0,0 +1,411 @@
+# ============================================================
+# LegionUtils.persistence - Persistent/shared vars, SettingsStore, StateBus, pet list
+# Part of LegionUtils (see __init__.py for usage and changelog)
+# ============================================================
+# API is expected to be in global scope (imported by calling script)
+
+import time
+
+from .constants import SHARED_PETS_KEY, SHARED_PETS_TOPIC
+
+# ============ PERSISTENCE UTILITIES ============
+# Character-scope saves/loads go through the active SettingsStore (if one
+# is installed) so they are coalesced into a single write-behind blob.
+def _save_var(key, value, scope):
+    if scope is None:
+        if _active_settings_store is not None:
+            _active_settings_store.set(key, value)
+            return
+        scope = API.PersistentVar.Char
+    API.SavePersistentVar(key, value, scope)
+
+def _load_var(key, default, scope):
+    if scope is None:
+        if _active_settings_store is not None:
+            return _active_settings_store.get(key, default)
+        scope = API.PersistentVar.Char
+    return API.GetPersistentVar(key, default, scope)
+
+def save_bool(key, value, scope=None):
+    """Save boolean to persistent storage"""
+    _save_var(key, str(value), scope)
+
+def load_bool(key, default=True, scope=None):
+    """Load boolean from persistent storage"""
+    return _load_var(key, str(default), scope) == "True"
+
+def save_int(key, value, scope=None):
+    """Save integer to persistent storage"""
+    _save_var(key, str(value), scope)
+
+def load_int(key, default=0, scope=None):
+    """Load integer from persistent storage"""
+    try:
+        return int(_load_var(key, str(default), scope))
+    except:
+        return default
+
+def save_float(key, value, scope=None):
+    """Save float to persistent storage"""
+    _save_var(key, str(value), scope)
+
+def load_float(key, default=0.0, scope=None):
+    """Load float from persistent storage"""
+    try:
+        return float(_load_var(key, str(default), scope))
+    except:
+        return default
+
+def save_list(key, items, separator="|", scope=None):
+    """Save list to persistent storage"""
+    _save_var(key, separator.join(str(x) for x in items), scope)
+
+def load_list(key, separator="|", scope=None):
+    """Load list from persistent storage"""
+    stored = _load_var(key, "", scope)
+    if not stored:
+        return []
+    return [x for x in stored.split(separator) if x]
+
+def save_window_position(key, gump, scope=None):
+    """Save window position from gump"""
+    if gump:
+        try:
+            x = gump.GetX()
+            y = gump.GetY()
+            _save_var(key, str(x) + "," + str(y), scope)
+        except:
+            pass
+
+def load_window_position(key, default_x=100, default_y=100, scope=None):
+    """Load window position
+
+    Returns:
+        tuple: (x, y) coordinates
+    """
+    saved_pos = _load_var(key, str(default_x) + "," + str(default_y), scope)
+    try:
+        pos_parts = saved_pos.split(',')
+        return (int(pos_parts[0]), int(pos_parts[1]))
+    except:
+        return (default_x, default_y)
+
+# ============ PET MANAGEMENT ============
+_shared_pets_cache = (None, None, {})  # (bus version, persistent string, parsed dict)
+
+def parse_shared_pets(stored):
+    """Parse a SharedPets_List string ("name:serial:active|...")
+
+    Returns:
+        dict: {serial: {"name": str, "active": bool}}
+    """
+    pets = {}
+    if not stored:
+        return pets
+    for entry in stored.split("|"):
+        if not entry:
+            continue
+        parts = entry.split(":")
+        if len(parts) >= 3:
+            name = parts[0]
+            serial = int(parts[1]) if parts[1].isdigit() else 0
+            active = parts[2] == "1"
+            if serial > 0:
+                pets[serial] = {"name": name, "active": active}
+    return pets
+
+def get_shared_pets():
+    """Load shared pet list
+
+    Reads the versioned state bus first and only rebuilds the dict when
+    the version changes. Falls back to the SharedPets_List persistent var
+    (re-parsed only when the string changes).
+
+    Returns:
+        dict: {serial: {"name": str, "active": bool}}
+    """
+    global _shared_pets_cache
+    entry = get_state_bus().get_entry(SHARED_PETS_TOPIC)
+    if entry is not None:
+        version, pet_list = entry
+        if _shared_pets_cache[0] != version:
+            pets = {}
+            for name, serial, active in pet_list:
+                pets[serial] = {"name": name, "active": active}
+            _shared_pets_cache = (version, None, pets)
+    else:
+        stored = API.GetPersistentVar(SHARED_PETS_KEY, "", API.PersistentVar.Char)
+        if _shared_pets_cache[0] is not None or _shared_pets_cache[1] != stored:
+            _shared_pets_cache = (None, stored, parse_shared_pets(stored))
+    return dict(_shared_pets_cache[2])
+
+def get_shared_pets_version():
+    """Version of the shared pet list on the state bus (0 = not published)"""
+    return get_state_bus().version(SHARED_PETS_TOPIC)
+
+def save_shared_pets(pet_dict):
+    """Save shared pet list - publishes to the state bus and the persistent var
+
+    Args:
+        pet_dict: {serial: {"name": str, "active": bool}}
+
+    Returns:
+        int: New bus version
+    """
+    pet_list = []
+    pairs = []
+    for serial, info in (pet_dict or {}).items():
+        name = info.get("name", "Pet")
+        active = bool(info.get("active", True))
+        pet_list.append((name, serial, active))
+        pairs.append(name + ":" + str(serial) + ":" + ("1" if active else "0"))
+
+    version = get_state_bus().publish(SHARED_PETS_TOPIC, tuple(pet_list))
+    # Durable copy for the next session / scripts without the bus
+    API.SavePersistentVar(SHARED_PETS_KEY, "|".join(pairs), API.PersistentVar.Char)
+    return version
+
+# ============ SETTINGS STORE ============
+_active_settings_store = None
+_SETTING_MISSING = "__LegionUtils_missing__"
+
+class SettingsStore:
+    """Write-behind settings kept in one JSON persistent var per script
+
+    Every API.SavePersistentVar is a synchronous client call, and scripts
+    often save four or more keys in a row (stats, config toggles) - some
+    of them every few seconds during combat. SettingsStore keeps values in
+    memory, remembers which keys changed (dirty set) and writes them all
+    as a single "<namespace>_Settings" blob at most once per flush_interval,
+    plus on close() or when API.StopRequested is seen in update().
+
+    Keys missing from the blob are read once from their old individual
+    persistent var, so existing saved settings carry over.
+
+    install() routes save_bool/save_int/save_float/save_list and the load_*
+    helpers (character scope) through this store.
+
+    Example:
+        settings = SettingsStore("TamerSuite").install()
+        save_bool("TamerSuite_UseMagery", True)   # memory only
+        settings.set("TamerSuite_Tank", str(tank_serial))
+
+        while not API.StopRequested:
+            API.ProcessCallbacks()
+            settings.update()                       # flushes every 5s if dirty
+            API.Pause(0.1)
+
+        settings.close()                            # final flush
+    """
+
+    DEFAULT_FLUSH_INTERVAL = 5.0
+
+    def __init__(self, namespace, api=None, flush_interval=DEFAULT_FLUSH_INTERVAL, scope=None):
+        """Initialize store and load the namespace blob
+
+        Args:
+            namespace: Script name - the blob is saved as namespace + "_Settings"
+            api: The API module (defaults to the global API)
+            flush_interval: Min seconds between blob writes
+            scope: Persistent var scope (default: character)
+        """
+        self.api = api if api is not None else API
+        self.namespace = namespace
+        self.blob_key = namespace + "_Settings"
+        self.scope = scope if scope is not None else self.api.PersistentVar.Char
+        self.flush_interval = flush_interval
+        self.values = {}
+        self.dirty = set()
+        self.last_flush = time.time()
+        self.sets = 0
+        self.writes = 0
+        self._load()
+
+    def _load(self):
+        import json
+        try:
+            raw = self.api.GetPersistentVar(self.blob_key, "", self.scope)
+            if raw:
+                data = json.loads(raw)
+                if isinstance(data, dict):
+                    self.values = data
+        except:
+            self.values = {}
+
+    def install(self):
+        """Route the save_*/load_* helpers through this store"""
+        global _active_settings_store
+        _active_settings_store = self
+        return self
+
+    def uninstall(self):
+        global _active_settings_store
+        if _active_settings_store is self:
+            _active_settings_store = None
+
+    def get(self, key, default=None):
+        """Get a value (falls back to the legacy per-key persistent var)"""
+        if key in self.values:
+            return self.values[key]
+        try:
+            legacy = self.api.GetPersistentVar(key, _SETTING_MISSING, self.scope)
+        except:
+            legacy = _SETTING_MISSING
+        if legacy != _SETTING_MISSING:
+            # Migrate into the blob on the next flush
+            self.values[key] = legacy
+            self.dirty.add(key)
+            return legacy
+        return default
+
+    def set(self, key, value):
+        """Set a value in memory; written on the next flush"""
+        self.sets += 1
+        if key in self.values and self.values[key] == value:
+            return
+        self.values[key] = value
+        self.dirty.add(key)
+
+    def delete(self, key):
+        """Remove a key from the blob"""
+        if key in self.values:
+            del self.values[key]
+            self.dirty.add(key)
+
+    def is_dirty(self):
+        return len(self.dirty) > 0
+
+    def update(self):
+        """Flush if dirty and the interval passed or the script is stopping (call in main loop)"""
+        if not self.dirty:
+            return False
+        if time.time() - self.last_flush >= self.flush_interval or self.api.StopRequested:
+            return self.flush()
+        return False
+
+    def flush(self):
+        """Write all dirty keys now (one SavePersistentVar)
+
+        Returns:
+            bool: True if a write happened
+        """
+        import json
+        if not self.dirty:
+            return False
+        try:
+            self.api.SavePersistentVar(self.blob_key, json.dumps(self.values, sort_keys=True), self.scope)
+            self.writes += 1
+            self.dirty = set()
+            self.last_flush = time.time()
+            return True
+        except Exception as e:
+            self.api.SysMsg("Settings save failed: " + str(e), 32)
+            return False
+
+    def close(self):
+        """Final flush and stop routing helpers here (call on script exit)"""
+        self.flush()
+        self.uninstall()
+
+    def get_writes_avoided(self):
+        """Individual saves that did not become a persistent var write"""
+        return max(0, self.sets - self.writes)
+
+    def get_stats(self):
+        """Counters for display/debug
+
+        Returns:
+            dict: sets, writes, writes_avoided, dirty
+        """
+        return {
+            "sets": self.sets,
+            "writes": self.writes,
+            "writes_avoided": self.get_writes_avoided(),
+            "dirty": len(self.dirty),
+        }
+
+# ============ STATE BUS ============
+_state_bus = None
+
+class StateBus:
+    """Versioned cross-script state on API.SetSharedVar/GetSharedVar
+
+    Persistent vars are strings that every reader must fetch and re-split
+    on every check. Shared vars live in client memory and can hold
+    structured values, so publishers store (version, value) tuples and
+    readers compare the version with what they last processed to skip
+    rebuilding derived state. Versions only ever increase.
+
+    Persistent vars stay the durable copy: shared vars are gone after a
+    client restart, so helpers like get_shared_pets() fall back to them
+    until something is published.
+
+    Example:
+        bus = get_state_bus()
+        bus.publish("pets", (("Dragon", 0x1234, True),))
+
+        # Reader (any script)
+        if bus.version("pets") != my_version:
+            my_version, pets = bus.get_entry("pets")
+            rebuild(pets)
+    """
+
+    PREFIX = "LegionBus_"
+
+    def __init__(self, api=None):
+        """Initialize bus
+
+        Args:
+            api: The API module (defaults to the global API)
+        """
+        self.api = api if api is not None else API
+        self.publishes = 0
+
+    def get_entry(self, topic):
+        """Get (version, value) for a topic, or None if never published"""
+        try:
+            entry = self.api.GetSharedVar(self.PREFIX + topic)
+        except:
+            return None
+        if not entry or len(entry) != 2:
+            return None
+        return entry
+
+    def version(self, topic):
+        """Current version of a topic (0 = never published)"""
+        entry = self.get_entry(topic)
+        return entry[0] if entry is not None else 0
+
+    def read(self, topic, default=None):
+        """Current value of a topic"""
+        entry = self.get_entry(topic)
+        return entry[1] if entry is not None else default
+
+    def changed(self, topic, since_version):
+        """True if the topic was published after since_version"""
+        return self.version(topic) != since_version
+
+    def publish(self, topic, value):
+        """Publish a new value (use tuples/immutable values)
+
+        Returns:
+            int: The new version
+        """
+        version = self.version(topic) + 1
+        self.api.SetSharedVar(self.PREFIX + topic, (version, value))
+        self.publishes += 1
+        return version
+
+    def clear(self, topic):
+        """Remove a topic (readers fall back to their persistent copy)"""
+        try:
+            self.api.RemoveSharedVar(self.PREFIX + topic)
+        except:
+            pass
+
+def get_state_bus():
+    """Shared StateBus used by the pet/combat helpers"""
+    global _state_bus
+    if _state_bus is None:
+        _state_bus = StateBus()
+    return _state_bus
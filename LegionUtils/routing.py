@@ -0,0 +1,467 @@
+# ============================================================
+# LegionUtils.routing - Cached walkability grid and A* route planning
+# Part of LegionUtils (see __init__.py for usage and changelog)
+# ============================================================
+# API is expected to be in global scope (imported by calling script)
+
+import heapq
+
+from .spatial import compass_directions
+
+# Orthogonal steps first: ties in the searches prefer straight moves
+_STEPS = ((0, -1), (1, 0), (0, 1), (-1, 0), (1, -1), (1, 1), (-1, 1), (-1, -1))
+
+def _is_impassable(obj):
+    """PyStatic reports IsImpassible; land tiles (PyGameObject) Impassible"""
+    return bool(getattr(obj, "IsImpassible", False) or getattr(obj, "Impassible", False))
+
+# ============ WALKABILITY GRID ============
+class WalkabilityGrid:
+    """Walkable/blocked per tile, read from the client once and cached
+
+    A tile is blocked when its land tile is impassable (GetTile) or any
+    static on it is (GetStaticsInArea). Statics are read one chunk x chunk
+    block per call the first time a tile in the block is asked about;
+    land tiles are read one at a time, also only on first use. The map
+    doesn't change under a farming area, so nothing expires - but tiles
+    the player got stuck on (doors, furniture the statics don't show) can
+    be marked blocked and stay that way.
+
+    Example:
+        grid = WalkabilityGrid()
+        if grid.is_walkable(x, y):
+            ...
+    """
+
+    def __init__(self, api=None, chunk=16):
+        """Initialize an empty cache
+
+        Args:
+            api: The API module (defaults to the global API)
+            chunk: Width in tiles of one GetStaticsInArea block
+        """
+        self.api = api if api is not None else API
+        self.chunk = chunk
+        self._walkable = {}         # (x, y) -> bool
+        self._statics = {}          # (chunk_x, chunk_y) -> set of blocked tiles
+        self.learned = set()        # tiles marked blocked after getting stuck
+        self.tile_reads = 0
+        self.static_reads = 0
+
+    def _blocked_statics(self, x, y):
+        """Impassable static tiles of the chunk holding (x, y)"""
+        chunk = self.chunk
+        key = (x // chunk, y // chunk)
+        blocked = self._statics.get(key)
+        if blocked is None:
+            x1 = key[0] * chunk
+            y1 = key[1] * chunk
+            blocked = set()
+            self.static_reads += 1
+            try:
+                statics = self.api.GetStaticsInArea(x1, y1, x1 + chunk - 1, y1 + chunk - 1) or []
+            except Exception:
+                statics = []
+            for static in statics:
+                if _is_impassable(static):
+                    blocked.add((int(static.X), int(static.Y)))
+            self._statics[key] = blocked
+        return blocked
+
+    def _read_land(self, x, y):
+        """True if the land tile at (x, y) can be walked on"""
+        self.tile_reads += 1
+        try:
+            tile = self.api.GetTile(x, y)
+        except Exception:
+            return True             # unknown - let the client decide
+        return tile is not None and not _is_impassable(tile)
+
+    def is_walkable(self, x, y):
+        """True if (x, y) is believed walkable"""
+        pos = (x, y)
+        walkable = self._walkable.get(pos)
+        if walkable is None:
+            walkable = pos not in self._blocked_statics(x, y) and self._read_land(x, y)
+            self._walkable[pos] = walkable
+        return walkable
+
+    def can_step(self, x, y, dx, dy):
+        """True if one step (dx, dy) from (x, y) is possible
+
+        Diagonal steps need both orthogonal neighbours open (no corner
+        cutting), which is what the client's own pathfinder expects.
+        """
+        if not self.is_walkable(x + dx, y + dy):
+            return False
+        if dx and dy:
+            return self.is_walkable(x + dx, y) and self.is_walkable(x, y + dy)
+        return True
+
+    def mark_blocked(self, x, y):
+        """Remember (x, y) as blocked (e.g. the player got stuck stepping on it)"""
+        self.learned.add((x, y))
+        self._walkable[(x, y)] = False
+
+    def clear(self):
+        """Drop everything read from the client (learned tiles are kept)"""
+        self._walkable = dict.fromkeys(self.learned, False)
+        self._statics = {}
+
+    def __len__(self):
+        return len(self._walkable)
+
+# ============ SEARCH ============
+def find_path(grid, start, goal, max_nodes=4000):
+    """A* over a WalkabilityGrid (8-way, every step costs 1)
+
+    Args:
+        grid: WalkabilityGrid (anything with can_step/is_walkable)
+        start: (x, y) to search from (need not be walkable itself)
+        goal: (x, y) to reach
+        max_nodes: Expansion budget; None is returned past it
+
+    Returns:
+        list: Tiles from the first step to goal ([] if start == goal),
+              or None if goal is unreachable within the budget
+    """
+    start = (int(start[0]), int(start[1]))
+    goal = (int(goal[0]), int(goal[1]))
+    if start == goal:
+        return []
+    if not grid.is_walkable(goal[0], goal[1]):
+        return None
+    gx, gy = goal
+    came_from = {start: None}
+    cost = {start: 0}
+    counter = 0
+    heap = [(max(abs(gx - start[0]), abs(gy - start[1])), 0, counter, start)]
+    expanded = 0
+    while heap:
+        _, g, _, node = heapq.heappop(heap)
+        if node == goal:
+            path = []
+            while node != start:
+                path.append(node)
+                node = came_from[node]
+            path.reverse()
+            return path
+        if g > cost[node]:
+            continue                # stale heap entry
+        expanded += 1
+        if expanded > max_nodes:
+            return None
+        x, y = node
+        for dx, dy in _STEPS:
+            nxt = (x + dx, y + dy)
+            step_cost = g + 1
+            if step_cost >= cost.get(nxt, step_cost + 1):
+                continue
+            if not grid.can_step(x, y, dx, dy):
+                continue
+            cost[nxt] = step_cost
+            came_from[nxt] = node
+            counter += 1
+            h = max(abs(gx - nxt[0]), abs(gy - nxt[1]))
+            heapq.heappush(heap, (step_cost + h, step_cost, counter, nxt))
+    return None
+
+def flood_steps(grid, start, max_steps):
+    """Steps from start to every tile reachable within max_steps (BFS)
+
+    Moves are symmetric, so a flood from a goal doubles as a
+    distance-to-goal map for every tile around it.
+
+    Returns:
+        dict: (x, y) -> steps, start included at 0
+    """
+    start = (int(start[0]), int(start[1]))
+    steps = {start: 0}
+    frontier = [start]
+    for depth in range(1, max_steps + 1):
+        next_frontier = []
+        for x, y in frontier:
+            for dx, dy in _STEPS:
+                nxt = (x + dx, y + dy)
+                if nxt in steps or not grid.can_step(x, y, dx, dy):
+                    continue
+                steps[nxt] = depth
+                next_frontier.append(nxt)
+        if not next_frontier:
+            break
+        frontier = next_frontier
+    return steps
+
+# ============ ROUTE PLANNER ============
+class RoutePlanner:
+    """Reachable destinations and short Pathfind legs over a cached grid
+
+    API.Pathfind fails on long distances and walks into dead ends when
+    handed a point behind a wall; scripts then notice "stuck" seconds
+    later and retry a random offset. The planner answers the question up
+    front on the cached walkability grid:
+
+    - route(start, goal) runs A* and cuts the path into legs no longer
+      than max_leg tiles, each a straight walk, so every point handed to
+      Pathfind is one the client can reach.
+    - patrol_points()/patrol_loop() keep the patrol spots of an area
+      that are reachable from its center / the previous waypoint
+      (cached per area).
+    - escape_route() follows a distance-to-safe-spot map built once per
+      safe spot, so re-planning after a stumble costs only the path.
+    - flee_route() picks the reachable tile that ends farthest from the
+      threats instead of a blind offset.
+    - note_stuck() marks the tile the player couldn't step onto and drops
+      cached routes through it.
+
+    Example:
+        planner = RoutePlanner()
+        legs = planner.route((px, py), (dest_x, dest_y))
+        if legs:
+            API.Pathfind(*legs[0])
+    """
+
+    def __init__(self, grid=None, api=None, max_leg=10, max_nodes=4000):
+        """Initialize a planner
+
+        Args:
+            grid: WalkabilityGrid to share (a new one is made if None)
+            api: The API module for a new grid (defaults to the global API)
+            max_leg: Longest single Pathfind leg in tiles
+            max_nodes: A* expansion budget per route
+        """
+        self.grid = grid if grid is not None else WalkabilityGrid(api)
+        self.max_leg = max_leg
+        self.max_nodes = max_nodes
+        self._patrol_points = {}    # area key -> [(x, y), ...]
+        self._escape_maps = {}      # (area key, goal) -> {(x, y): steps}
+        self.routes = 0
+        self.unreachable = 0
+        self.cache_hits = 0
+        self.stuck_marks = 0
+
+    # ---------- legs ----------
+    def _direct(self, a, b):
+        """True if walking straight from a to b (diagonal first) stays walkable"""
+        grid = self.grid
+        x, y = a
+        bx, by = b
+        while (x, y) != (bx, by):
+            dx = (bx > x) - (bx < x)
+            dy = (by > y) - (by < y)
+            if not grid.can_step(x, y, dx, dy):
+                return False
+            x += dx
+            y += dy
+        return True
+
+    def legs(self, start, path):
+        """Cut a tile path into Pathfind legs (straight walks of <= max_leg tiles)"""
+        legs = []
+        anchor = (int(start[0]), int(start[1]))
+        i = 0
+        while i < len(path):
+            # Furthest tile in reach of a straight walk from the anchor
+            end = i
+            j = i + 1
+            while j < len(path) and j - i < self.max_leg and self._direct(anchor, path[j]):
+                end = j
+                j += 1
+            anchor = path[end]
+            legs.append(anchor)
+            i = end + 1
+        return legs
+
+    def route(self, start, goal):
+        """Pathfind legs from start to goal
+
+        Returns:
+            list: [(x, y), ...] ending at goal ([] if already there),
+                  or None if goal can't be reached
+        """
+        self.routes += 1
+        path = find_path(self.grid, start, goal, self.max_nodes)
+        if path is None:
+            self.unreachable += 1
+            return None
+        return self.legs(start, path)
+
+    def is_reachable(self, start, goal):
+        """True if goal can be walked to from start"""
+        return find_path(self.grid, start, goal, self.max_nodes) is not None
+
+    # ---------- per-area precompute ----------
+    def patrol_points(self, key, center_x, center_y, radius, points=None):
+        """Patrol spots of an area reachable from its center (cached per key)
+
+        Args:
+            key: Cache key (area name)
+            center_x, center_y: Area center (or first waypoint)
+            radius: Area radius in tiles
+            points: Candidate spots; default is the center plus two
+                    rings of compass points at half and 85% of radius
+
+        Returns:
+            list: Reachable (x, y) spots in candidate order
+        """
+        cached = self._patrol_points.get(key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+        center = (int(center_x), int(center_y))
+        if points is None:
+            points = [center]
+            for ring, count in ((0.5, 8), (0.85, 16)):
+                length = max(1, int(radius * ring))
+                points += [(center[0] + dx, center[1] + dy)
+                           for dx, dy in compass_directions(count, length)]
+        # Two tiles of slack: a point just outside the radius may only be
+        # reachable around an obstacle that pokes out of the area
+        reach = flood_steps(self.grid, center, int(radius) * 2 + 2)
+        reachable = []
+        for point in points:
+            point = (int(point[0]), int(point[1]))
+            if point in reach and point not in reachable:
+                reachable.append(point)
+        self._patrol_points[key] = reachable
+        return reachable
+
+    def patrol_loop(self, key, waypoints):
+        """Waypoints that can be walked in order, back to the first (cached per key)
+
+        Each waypoint is kept if A* reaches it from the last kept one, so
+        the loop costs one path per leg rather than a flood of the route.
+
+        Returns:
+            list: Reachable (x, y) waypoints in order
+        """
+        cached = self._patrol_points.get(key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+        loop = []
+        for point in waypoints:
+            point = (int(point[0]), int(point[1]))
+            if not loop:
+                if self.grid.is_walkable(point[0], point[1]):
+                    loop.append(point)
+            elif find_path(self.grid, loop[-1], point, self.max_nodes) is not None:
+                loop.append(point)
+        self._patrol_points[key] = loop
+        return loop
+
+    def escape_map(self, key, goal, max_steps=60):
+        """Steps-to-goal for every tile within max_steps of goal (cached)"""
+        goal = (int(goal[0]), int(goal[1]))
+        cache_key = (key, goal)
+        steps = self._escape_maps.get(cache_key)
+        if steps is None:
+            steps = flood_steps(self.grid, goal, max_steps)
+            self._escape_maps[cache_key] = steps
+        else:
+            self.cache_hits += 1
+        return steps
+
+    def escape_route(self, key, start, goal, max_steps=60):
+        """Pathfind legs from start to a safe spot, following its escape map
+
+        Returns:
+            list: Legs ending at goal, or None if start isn't on the map
+        """
+        self.routes += 1
+        steps = self.escape_map(key, goal, max_steps)
+        node = (int(start[0]), int(start[1]))
+        remaining = steps.get(node)
+        if remaining is None:
+            self.unreachable += 1
+            return None
+        grid = self.grid
+        path = []
+        while remaining > 0:
+            x, y = node
+            for dx, dy in _STEPS:
+                nxt = (x + dx, y + dy)
+                if steps.get(nxt) == remaining - 1 and grid.can_step(x, y, dx, dy):
+                    break
+            else:
+                self.unreachable += 1
+                return None         # map went stale (tile marked blocked)
+            node = nxt
+            remaining -= 1
+            path.append(node)
+        return self.legs(start, path)
+
+    # ---------- fleeing ----------
+    def flee_route(self, start, threats, distance=15):
+        """Legs to the reachable tile that ends farthest from the threats
+
+        Only tiles within distance steps are considered; among equally
+        distant tiles the one with fewer steps wins.
+
+        Args:
+            start: (x, y) to flee from
+            threats: [(x, y), ...] to get away from
+            distance: Max steps to plan
+
+        Returns:
+            list: Legs, or None if no reachable tile improves on start
+        """
+        self.routes += 1
+        threats = [(int(tx), int(ty)) for tx, ty in threats]
+        if not threats:
+            return None
+        steps = flood_steps(self.grid, start, distance)
+
+        def clearance(pos):
+            return min((pos[0] - tx) ** 2 + (pos[1] - ty) ** 2 for tx, ty in threats)
+
+        start = (int(start[0]), int(start[1]))
+        best = start
+        best_key = (clearance(start), 0)
+        for pos, count in steps.items():
+            key = (clearance(pos), -count)
+            if key > best_key:
+                best, best_key = pos, key
+        if best == start:
+            self.unreachable += 1
+            return None
+        path = find_path(self.grid, start, best, self.max_nodes)
+        return self.legs(start, path) if path else None
+
+    # ---------- learning ----------
+    def note_stuck(self, position, target):
+        """The player made no progress from position toward target
+
+        Marks the tile it was about to step onto as blocked and drops the
+        cached patrol points and escape maps, which may lead through it.
+
+        Returns:
+            (x, y) marked, or None if there was no next step to blame
+        """
+        position = (int(position[0]), int(position[1]))
+        path = find_path(self.grid, position, target, self.max_nodes)
+        if not path:
+            return None
+        blocked = path[0]
+        self.grid.mark_blocked(blocked[0], blocked[1])
+        self.stuck_marks += 1
+        self._patrol_points = {}
+        self._escape_maps = {}
+        return blocked
+
+    def get_stats(self):
+        """Counters for display/debug
+
+        Returns:
+            dict: tiles, tile_reads, static_reads, routes, unreachable,
+                  cache_hits, stuck_marks
+        """
+        return {
+            "tiles": len(self.grid),
+            "tile_reads": self.grid.tile_reads,
+            "static_reads": self.grid.static_reads,
+            "routes": self.routes,
+            "unreachable": self.unreachable,
+            "cache_hits": self.cache_hits,
+            "stuck_marks": self.stuck_marks,
+        }
@@ -0,0 +1,393 @@
+# ============================================================
+# LegionUtils.spatial - Grid-backed spatial queries (threat distance field, area index)
+# Part of LegionUtils (see __init__.py for usage and changelog)
+# ============================================================
+# Pure data structures - no API calls. Scripts feed in positions they
+# already read and query tiles; nothing here knows about mobiles or areas.
+
+import math
+
+# ============ THREAT DISTANCE FIELD ============
+class ThreatDistanceField:
+    """Distance from tiles around a center to the nearest threat
+
+    Avoid-zone checks ("is this tile within 6 of any NPC?") and flee
+    planning ("which way puts the most room between me and them?") ask
+    about the same tiles again and again between scans. Looping over
+    every threat with a sqrt per question makes each one O(threats). The
+    field remembers, per asked-about tile in a (2 * radius + 1)^2 window,
+    the squared distance to the nearest threat and that threat's tile, so
+    a repeated question is one dict lookup.
+
+    Tiles are filled in on first query, never ahead of time, so update()
+    only touches tiles that were actually asked about: threats that stayed
+    put cost nothing, new ones relax the remembered tiles, and tiles whose
+    nearest threat left are forgotten until asked again. The window
+    re-centers (memory dropped) when the center drifts more than
+    `recenter` tiles. Tiles outside it are answered by a direct loop, so
+    results never depend on the window.
+
+    Ties keep the threat that was added first.
+
+    Example:
+        field = ThreatDistanceField(radius=24)
+        field.update(npc_positions, player.X, player.Y)
+        if field.is_clear(x, y, 6):
+            ...
+        nearest = field.nearest(x, y)   # (npc_x, npc_y, distance) or None
+    """
+
+    def __init__(self, radius=24, recenter=8):
+        """Initialize an empty field
+
+        Args:
+            radius: Window half-width in tiles around the center
+            recenter: Center drift (tiles) that triggers a rebuild
+        """
+        self.radius = radius
+        self.recenter = recenter
+        self.center = None
+        self.threats = {}           # (x, y) -> count, in the order first seen
+        self._tiles = {}            # (x, y) -> (dist_sq, threat_x, threat_y), asked-about tiles
+        self.rebuilds = 0
+        self.added = 0
+        self.removed = 0
+        self.lookups = 0
+        self.computed = 0
+        self.fallbacks = 0
+
+    # ---------- updates ----------
+    def update(self, positions, center_x, center_y):
+        """Make the field match positions [(x, y), ...]
+
+        Returns:
+            int: Threat tiles added plus removed (0 = nothing changed)
+        """
+        counts = {}
+        for pos in positions:
+            pos = (int(pos[0]), int(pos[1]))
+            counts[pos] = counts.get(pos, 0) + 1
+        center = (int(center_x), int(center_y))
+
+        if (self.center is None or abs(center[0] - self.center[0]) > self.recenter
+                or abs(center[1] - self.center[1]) > self.recenter):
+            self.center = center
+            self.threats = counts
+            self._tiles = {}
+            self.rebuilds += 1
+            return len(counts)
+
+        gone = [pos for pos in self.threats if pos not in counts]
+        new = [pos for pos in counts if pos not in self.threats]
+        self.threats = self._merge_order(counts, gone)
+        if gone or new:
+            self._refresh(set(gone), new)
+        self.removed += len(gone)
+        self.added += len(new)
+        return len(gone) + len(new)
+
+    def clear(self):
+        """Drop every threat"""
+        if self.threats:
+            self.threats = {}
+            self._tiles = {}
+
+    def _merge_order(self, counts, gone):
+        """counts keyed in first-seen order: survivors first, then new tiles"""
+        gone = set(gone)
+        merged = {}
+        for pos in self.threats:
+            if pos not in gone:
+                merged[pos] = counts[pos]
+        for pos, count in counts.items():
+            if pos not in merged:
+                merged[pos] = count
+        return merged
+
+    def _refresh(self, gone, new):
+        """Bring the remembered tiles up to date - the only per-update tile work"""
+        tiles = self._tiles
+        for tile, entry in list(tiles.items()):
+            d, tx, ty = entry
+            if (tx, ty) in gone:
+                del tiles[tile]     # re-derived if it is asked about again
+                continue
+            x, y = tile
+            for nx, ny in new:
+                dx = x - nx
+                dy = y - ny
+                nd = dx * dx + dy * dy
+                if nd < d:
+                    d, tx, ty = nd, nx, ny
+            if d != entry[0]:
+                tiles[tile] = (d, tx, ty)
+
+    # ---------- queries ----------
+    def _closest(self, x, y):
+        """(dist_sq, tx, ty) by looping over the threats"""
+        best = best_x = best_y = None
+        for tx, ty in self.threats:
+            dx = x - tx
+            dy = y - ty
+            d = dx * dx + dy * dy
+            if best is None or d < best:
+                best, best_x, best_y = d, tx, ty
+        return (best, best_x, best_y)
+
+    def _lookup(self, x, y):
+        """(dist_sq, tx, ty) for (x, y) - remembered inside the window"""
+        self.lookups += 1
+        entry = self._tiles.get((x, y))
+        if entry is not None:
+            return entry                        # remembered (only window tiles are)
+        center = self.center
+        if type(x) is not int or type(y) is not int:
+            if x != int(x) or y != int(y):
+                self.fallbacks += 1
+                return self._closest(x, y)      # between tiles
+            x, y = int(x), int(y)
+        radius = self.radius
+        if center is None or abs(x - center[0]) > radius or abs(y - center[1]) > radius:
+            self.fallbacks += 1
+            return self._closest(x, y)
+        entry = self._closest(x, y)
+        self._tiles[(x, y)] = entry
+        self.computed += 1
+        return entry
+
+    def nearest(self, x, y):
+        """(threat_x, threat_y, distance) of the closest threat, or None"""
+        if not self.threats:
+            return None
+        d, tx, ty = self._lookup(x, y)
+        return (tx, ty, math.sqrt(d))
+
+    def distance_sq(self, x, y):
+        """Squared distance to the closest threat (None without threats)"""
+        if not self.threats:
+            return None
+        return self._lookup(x, y)[0]
+
+    def is_clear(self, x, y, avoid_radius):
+        """True if no threat is within avoid_radius tiles of (x, y)"""
+        d = self.distance_sq(x, y)
+        return d is None or d > avoid_radius * avoid_radius
+
+    def get_stats(self):
+        """Counters for display/debug
+
+        Returns:
+            dict: threats, tiles, rebuilds, added, removed, lookups, computed, fallbacks
+        """
+        return {
+            "threats": len(self.threats),
+            "tiles": len(self._tiles),
+            "rebuilds": self.rebuilds,
+            "added": self.added,
+            "removed": self.removed,
+            "lookups": self.lookups,
+            "computed": self.computed,
+            "fallbacks": self.fallbacks,
+        }
+
+def compass_directions(count=8, length=10):
+    """count (dx, dy) vectors of about length tiles, clockwise from north
+
+    count=8 gives N, NE, E, ... as (0, -10), (7, -7), (10, 0), ...
+    """
+    directions = []
+    for i in range(count):
+        angle = 2 * math.pi * i / count
+        directions.append((int(round(math.sin(angle) * length)),
+                           int(round(-math.cos(angle) * length))))
+    return directions
+
+# ============ AREA INDEX ============
+class AreaIndex:
+    """Grid buckets over area shapes for constant-time point-in-area lookups
+
+    Scripts that record farming areas used to answer "which area am I
+    in?" by loading every area and testing each one. AreaIndex keeps only
+    the geometry - circles (center + radius) and point sets (waypoints,
+    each with a radius) - and files every shape under the cell_size grid
+    cells its bounding box covers. A lookup reads one cell and tests the
+    few shapes filed there, however many areas exist.
+
+    find() returns the earliest-added key that contains the point, the
+    same answer a loop over the areas in order gave. margin widens every
+    shape at lookup time (PetFarmer's "proximity"); margins up to pad
+    stay in the grid, larger ones fall back to testing every shape.
+
+    to_dict()/from_dict() round-trip the index through one versioned
+    blob, so a script can persist it instead of re-reading every area.
+
+    Example:
+        index = AreaIndex()
+        index.add_circle("Crypt", 5200, 1200, 15)
+        index.add_points("Halls", [(5300, 1100), (5320, 1110)], 15)
+        name = index.find(player.X, player.Y)     # "Crypt", "Halls" or None
+    """
+
+    VERSION = 1
+
+    def __init__(self, cell_size=32, pad=0):
+        """Initialize an empty index
+
+        Args:
+            cell_size: Grid cell width in tiles
+            pad: Largest lookup margin kept on the grid fast path
+        """
+        self.cell_size = cell_size
+        self.pad = pad
+        self._shapes = {}           # key -> ("circle", cx, cy, r) or ("points", [(x, y), ...], r)
+        self._order = {}            # key -> first-added sequence number
+        self._cells = {}            # (cell_x, cell_y) -> [(order, key, x, y, r), ...]
+        self._key_cells = {}        # key -> cells holding its pieces
+        self._next_order = 0
+        self.lookups = 0
+        self.tests = 0
+        self.fallbacks = 0
+
+    # ---------- building ----------
+    def add_circle(self, key, center_x, center_y, radius):
+        """Add (or replace) a circle area"""
+        self._set(key, ("circle", center_x, center_y, radius), [(center_x, center_y, radius)])
+
+    def add_points(self, key, points, radius=0):
+        """Add (or replace) an area made of points (e.g. waypoints), each with a radius
+
+        An empty point list registers the key with no shape (never found).
+        """
+        points = [(p[0], p[1]) for p in points]
+        self._set(key, ("points", points, radius), [(x, y, radius) for x, y in points])
+
+    def _set(self, key, shape, pieces):
+        if key in self._shapes:
+            self._unfile(key)
+        else:
+            self._order[key] = self._next_order
+            self._next_order += 1
+        self._shapes[key] = shape
+        order = self._order[key]
+        size = self.cell_size
+        cells = set()
+        for x, y, r in pieces:
+            reach = r + self.pad
+            for cell_x in range(int((x - reach) // size), int((x + reach) // size) + 1):
+                for cell_y in range(int((y - reach) // size), int((y + reach) // size) + 1):
+                    self._cells.setdefault((cell_x, cell_y), []).append((order, key, x, y, r))
+                    cells.add((cell_x, cell_y))
+        self._key_cells[key] = cells
+
+    def _unfile(self, key):
+        for cell in self._key_cells.pop(key, ()):
+            bucket = [piece for piece in self._cells[cell] if piece[1] != key]
+            if bucket:
+                self._cells[cell] = bucket
+            else:
+                del self._cells[cell]
+
+    def remove(self, key):
+        """Drop an area (no-op if unknown)"""
+        if key in self._shapes:
+            self._unfile(key)
+            del self._shapes[key]
+            del self._order[key]
+
+    # ---------- lookups ----------
+    def _matches(self, pieces, x, y, margin):
+        found = {}
+        tests = 0
+        for order, key, px, py, r in pieces:
+            if key in found:
+                continue
+            tests += 1
+            if math.sqrt((x - px) ** 2 + (y - py) ** 2) <= r + margin:
+                found[key] = order
+        self.tests += tests
+        return found
+
+    def _pieces(self, x, y, margin):
+        if margin > self.pad:
+            # Wider than the grid was built for - test everything
+            self.fallbacks += 1
+            pieces = []
+            for key, shape in self._shapes.items():
+                order = self._order[key]
+                if shape[0] == "circle":
+                    pieces.append((order, key, shape[1], shape[2], shape[3]))
+                else:
+                    pieces.extend((order, key, px, py, shape[2]) for px, py in shape[1])
+            return pieces
+        size = self.cell_size
+        return self._cells.get((int(x // size), int(y // size)), ())
+
+    def find(self, x, y, margin=0):
+        """Key of the earliest-added area containing (x, y), or None"""
+        self.lookups += 1
+        found = self._matches(self._pieces(x, y, margin), x, y, margin)
+        if not found:
+            return None
+        return min(found, key=found.get)
+
+    def find_all(self, x, y, margin=0):
+        """Keys of every area containing (x, y), earliest-added first"""
+        self.lookups += 1
+        found = self._matches(self._pieces(x, y, margin), x, y, margin)
+        return sorted(found, key=found.get)
+
+    def keys(self):
+        """All keys, earliest-added first"""
+        return sorted(self._shapes, key=self._order.get)
+
+    def __contains__(self, key):
+        return key in self._shapes
+
+    def __len__(self):
+        return len(self._shapes)
+
+    # ---------- persistence ----------
+    def to_dict(self):
+        """Versioned, JSON-ready form ({"version": N, "areas": [...]}, in order)"""
+        areas = []
+        for key in self.keys():
+            shape = self._shapes[key]
+            if shape[0] == "circle":
+                areas.append([key, "circle", shape[1], shape[2], shape[3]])
+            else:
+                areas.append([key, "points", [list(p) for p in shape[1]], shape[2]])
+        return {"version": self.VERSION, "areas": areas}
+
+    @classmethod
+    def from_dict(cls, data, cell_size=32, pad=0):
+        """Rebuild an index from to_dict() output
+
+        Returns:
+            AreaIndex, or None if data is from another version or malformed
+        """
+        try:
+            if data.get("version") != cls.VERSION:
+                return None
+            index = cls(cell_size, pad)
+            for entry in data["areas"]:
+                if entry[1] == "circle":
+                    index.add_circle(entry[0], entry[2], entry[3], entry[4])
+                else:
+                    index.add_points(entry[0], entry[2], entry[3])
+            return index
+        except Exception:
+            return None
+
+    def get_stats(self):
+        """Counters for display/debug
+
+        Returns:
+            dict: areas, cells, lookups, tests, fallbacks
+        """
+        return {
+            "areas": len(self._shapes),
+            "cells": len(self._cells),
+            "lookups": self.lookups,
+            "tests": self.tests,
+            "fallbacks": self.fallbacks,
+        }
@@ -0,0 +1,436 @@
+# ============================================================
+# LegionUtils.trace - Record API reads and actions for offline replay
+# Part of LegionUtils (see __init__.py for usage and changelog)
+# ============================================================
+# API is expected to be in global scope (imported by calling script)
+
+import datetime
+import json
+import os
+import random
+import time
+
+
+def encode_value(value, depth=0):
+    """JSON-ready copy of an API argument or result
+
+    Primitives pass through, sequences become lists and objects become a
+    dict of their TraceRecorder.SNAPSHOT_FIELDS (nested objects one level
+    deep). Datetimes become time.time() seconds and traced callbacks become
+    "@cb:<id>"; anything else is stored as str().
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [encode_value(v, depth) for v in value]
+    if isinstance(value, datetime.datetime):
+        return value.timestamp()        # journal entry times replay as seconds
+    if callable(value):
+        return TraceRecorder.CALLBACK_PREFIX + str(getattr(value, "_trace_id", "?"))
+    if depth < 2:
+        fields = {}
+        for name in TraceRecorder.SNAPSHOT_FIELDS:
+            try:
+                field = getattr(value, name)
+            except Exception:
+                continue
+            if field is None or callable(field):
+                continue
+            fields[name] = encode_value(field, depth + 1)
+        if fields:
+            return fields
+        if hasattr(value, "__iter__") and not isinstance(value, dict):
+            try:
+                return [encode_value(v, depth) for v in value]
+            except Exception:
+                pass
+    return str(value)
+
+
+class TraceObject:
+    """Attribute bag standing in for a recorded object (mobile, item, ...)"""
+
+    def __init__(self, fields):
+        self.__dict__.update(fields)
+
+    def __repr__(self):
+        return "<TraceObject " + str(self.__dict__.get("Name", self.__dict__.get("Serial", ""))) + ">"
+
+
+def decode_value(data):
+    """Inverse of encode_value: dicts come back as TraceObjects"""
+    if isinstance(data, list):
+        return [decode_value(v) for v in data]
+    if isinstance(data, dict):
+        return TraceObject(dict((k, decode_value(v)) for k, v in data.items()))
+    return data
+
+
+def read_trace(path):
+    """Load a trace written by TraceRecorder
+
+    A last line cut short (client killed mid-write) is ignored.
+
+    Returns:
+        tuple: (header dict, ticks) - each tick is [time, ambient or None, entries]
+
+    Raises:
+        ValueError: Not a trace, or written by another TraceRecorder.VERSION
+    """
+    if path.endswith(".gz"):
+        import gzip
+        with gzip.open(path, "rt") as f:
+            lines = f.read().splitlines()
+    else:
+        with open(path) as f:
+            lines = f.read().splitlines()
+    lines = [line for line in lines if line.strip()]
+    if not lines:
+        raise ValueError("Empty trace: " + path)
+    header = json.loads(lines[0])
+    if not isinstance(header, dict) or header.get("trace") != TraceRecorder.VERSION:
+        raise ValueError("Not a version " + str(TraceRecorder.VERSION) + " trace: " + path)
+    ticks = []
+    for i, line in enumerate(lines[1:]):
+        try:
+            ticks.append(json.loads(line))
+        except ValueError:
+            if i == len(lines) - 2:
+                break
+            raise
+    return header, ticks
+
+
+# ============ TRACE RECORDER ============
+class _TracedNamespace:
+    """Stands in for API.Mobiles/API.Gumps/... while a recorder is installed"""
+
+    def __init__(self, recorder, owner, prefix):
+        self._recorder = recorder
+        self._owner = owner
+        self._prefix = prefix
+
+    def __getattr__(self, name):
+        value = getattr(self._owner, name)
+        if name[:1].isupper() and callable(value) and not isinstance(value, type):
+            value = self._recorder._make_wrapper(self._prefix + name, value)
+            setattr(self, name, value)      # next lookup skips __getattr__
+        return value
+
+
+class TraceRecorder:
+    """Opt-in recorder of every API read and action, for offline replay
+
+    Wraps every API.* function (and the Mobiles, Gumps, Events and
+    InGameJournal namespaces) in place, like APIProfiler, and writes what
+    each call returned to a compact append-only trace. Each API.Pause()
+    closes one tick: one JSON line holding the tick's start time, the
+    Player/Backpack/StopRequested snapshot (only what changed) and its calls in
+    order. Callbacks handed to the API (hotkeys, API.Events, gump
+    buttons) are numbered and logged when they fire, so a replay can
+    fire them at the same point. Random is seeded from the header so a
+    replay makes the same random choices.
+
+    _support/tools/LegionReplay.py feeds a trace back through a stand-in
+    API and reruns the script offline - a two hour session in seconds -
+    to time decisions, compare actions across versions and profile.
+
+    Install before FrameCache/APIProfiler so cached lookups are replayed
+    the same way they were recorded. Script gump controls are passed
+    through but not recorded (text boxes read back as empty in replay).
+
+    Example:
+        api_trace = TraceRecorder(API, name="Tamer_PetFarmer").install()
+
+        while not API.StopRequested:
+            ...
+            API.Pause(0.1)
+
+        api_trace.stop()  # logs/trace_Tamer_PetFarmer_<time>.jsonl.gz
+    """
+
+    VERSION = 1
+    NAMESPACES = ("Mobiles", "Gumps", "Events", "InGameJournal")
+    AMBIENT = ("Player", "Backpack", "StopRequested")   # Snapshotted once per tick
+    CONSTANTS = ("PersistentVar", "Notoriety", "ScanType")
+    FLUSH_TICKS = 50                            # Ticks buffered per append
+
+    # Attributes copied when a result is an object (player, mobile, item,
+    # journal entry, gump). Nothing else about the object is in the trace.
+    SNAPSHOT_FIELDS = (
+        "Serial", "Name", "Graphic", "Hue", "X", "Y", "Z", "Distance",
+        "Hits", "HitsMax", "Mana", "ManaMax", "Stam", "StamMax", "Notoriety",
+        "IsDead", "IsPoisoned", "Poisoned", "IsVisible", "IsDestroyed",
+        "Amount", "Container", "Weight", "MaxWeight", "Opened",
+        "Impassible", "IsImpassible", "Text", "Time", "ServerSerial",
+        "LocalSerial", "Backpack",
+    )
+
+    # Calls that only print or build script gumps - their callbacks are
+    # traced, their results (UI handles) are not
+    QUIET_CALLS = ("SysMsg", "HeadMsg")
+    QUIET_NAMESPACES = ("Gumps",)
+
+    CALLBACK_PREFIX = "@cb:"        # A callback argument, by registration number
+    RAISE_PREFIX = "@raise:"        # The call raised; the message follows
+
+    def __init__(self, api=None, name="script", path=None, report_dir=None,
+                 flush_ticks=FLUSH_TICKS, compress=True, seed=None):
+        """Initialize recorder (nothing is wrapped until install())
+
+        Args:
+            api: The API module to wrap (defaults to the global API)
+            name: Script name used in the trace filename
+            path: Trace file (default: report_dir/trace_<name>_<time>.jsonl[.gz])
+            report_dir: Trace folder (default: logs/ in the repo root)
+            flush_ticks: Ticks kept in memory between appends
+            compress: gzip the trace (ignored when gzip is unavailable)
+            seed: Random seed stored in the header (default: from the clock)
+        """
+        self.api = api if api is not None else API
+        self.name = name
+        if report_dir is None:
+            report_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs")
+        self.report_dir = report_dir
+        self.path = path
+        self.flush_ticks = flush_ticks
+        self.compress = compress
+        self.seed = seed
+
+        self.installed = False
+        self.ticks = 0
+        self.calls = 0
+        self.callbacks = 0
+        self.flushes = 0
+        self._originals = []      # (owner, attr, original) for uninstall
+        self._lines = []          # Encoded lines not yet appended
+        self._entries = []        # Current tick's calls/callbacks
+        self._tick_time = 0.0
+        self._tick_ambient = None
+        self._ambient = {}        # name -> last encoded snapshot
+        self._next_callback = 0
+        self._sysmsg = None
+
+    def install(self):
+        """Wrap all API functions and start the first tick. Safe to call twice."""
+        if self.installed:
+            return self
+        api = self.api
+        self._sysmsg = getattr(api, "SysMsg", None)
+        if self.seed is None:
+            self.seed = int(time.time() * 1000) & 0x7FFFFFFF
+        random.seed(self.seed)
+        if self.path is None:
+            self.path = self._default_path()
+        self._lines.append(json.dumps({
+            "trace": self.VERSION,
+            "script": self.name,
+            "start": time.time(),
+            "seed": self.seed,
+            "constants": self._constants(),
+        }, separators=(",", ":")))
+
+        for attr in dir(api):
+            if not attr[:1].isupper() or attr in self.NAMESPACES:
+                continue
+            try:
+                original = getattr(api, attr)
+            except:
+                continue
+            if not callable(original) or isinstance(original, type):
+                continue
+            if attr == "Pause":
+                wrapper = self._make_pause_wrapper(original)
+            else:
+                wrapper = self._make_wrapper(attr, original)
+            self._replace(api, attr, original, wrapper)
+        for ns in self.NAMESPACES:
+            owner = getattr(api, ns, None)
+            if owner is not None:
+                self._replace(api, ns, owner, _TracedNamespace(self, owner, ns + "."))
+
+        self.installed = True
+        self._start_tick()
+        return self
+
+    def uninstall(self):
+        """Restore the original API functions"""
+        for owner, attr, original in reversed(self._originals):
+            try:
+                setattr(owner, attr, original)
+            except:
+                pass
+        self._originals = []
+        self.installed = False
+
+    def stop(self):
+        """Uninstall, close the current tick and append the rest. Returns the path."""
+        if self.installed:
+            self.uninstall()
+            self._close_tick()
+        self.flush()
+        return self.path
+
+    def end_tick(self):
+        """Close the current tick (called automatically by API.Pause)"""
+        self._close_tick()
+        if len(self._lines) >= self.flush_ticks:
+            self.flush()
+        self._start_tick()
+
+    def flush(self):
+        """Append buffered lines to the trace file
+
+        Returns:
+            bool: True if anything was written
+        """
+        if not self._lines:
+            return False
+        text = "\n".join(self._lines) + "\n"
+        self._lines = []
+        try:
+            folder = os.path.dirname(self.path)
+            if folder and not os.path.exists(folder):
+                os.makedirs(folder)
+            if self.path.endswith(".gz"):
+                import gzip
+                with gzip.open(self.path, "at") as f:
+                    f.write(text)
+            else:
+                with open(self.path, "a") as f:
+                    f.write(text)
+        except Exception as e:
+            if self._sysmsg is not None:
+                self._sysmsg("Failed to write API trace: " + str(e), 32)
+            return False
+        self.flushes += 1
+        return True
+
+    def get_stats(self):
+        """Counters for display/debug
+
+        Returns:
+            dict: ticks, calls, callbacks, flushes, pending (lines in memory)
+        """
+        return {
+            "ticks": self.ticks,
+            "calls": self.calls,
+            "callbacks": self.callbacks,
+            "flushes": self.flushes,
+            "pending": len(self._lines),
+        }
+
+    @classmethod
+    def is_quiet(cls, label):
+        """True for calls whose results are not recorded (messages, script gumps)"""
+        return label in cls.QUIET_CALLS or label.split(".")[0] in cls.QUIET_NAMESPACES
+
+    # ---------- internals ----------
+
+    def _default_path(self):
+        suffix = ".jsonl"
+        if self.compress:
+            try:
+                import gzip
+                suffix += ".gz"
+            except ImportError:
+                pass
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        return os.path.join(self.report_dir, "trace_" + self.name + "_" + stamp + suffix)
+
+    def _constants(self):
+        constants = {}
+        for name in self.CONSTANTS:
+            owner = getattr(self.api, name, None)
+            if owner is None:
+                continue
+            members = {}
+            for member in dir(owner):
+                if not member[:1].isupper():
+                    continue
+                try:
+                    value = getattr(owner, member)
+                except:
+                    continue
+                if not callable(value):
+                    members[member] = encode_value(value)
+            constants[name] = members
+        return constants
+
+    def _replace(self, owner, attr, original, replacement):
+        try:
+            setattr(owner, attr, replacement)
+            self._originals.append((owner, attr, original))
+        except:
+            pass
+
+    def _start_tick(self):
+        self._tick_time = time.time()
+        changed = {}
+        for name in self.AMBIENT:
+            try:
+                value = encode_value(getattr(self.api, name))
+            except Exception:
+                continue
+            if self._ambient.get(name) != value:
+                self._ambient[name] = value
+                changed[name] = value
+        self._tick_ambient = changed or None
+        self._entries = []
+
+    def _close_tick(self):
+        self._lines.append(json.dumps([self._tick_time, self._tick_ambient, self._entries],
+                                      separators=(",", ":")))
+        self.ticks += 1
+
+    def _trace_callback(self, callback):
+        self._next_callback += 1
+        callback_id = self._next_callback
+        recorder = self
+
+        def traced(*args, **kwargs):
+            recorder.callbacks += 1
+            recorder._entries.append(["!", callback_id, [encode_value(a) for a in args]])
+            return callback(*args, **kwargs)
+        traced._trace_id = callback_id
+        return traced
+
+    def _make_wrapper(self, label, original):
+        recorder = self
+        quiet = self.is_quiet(label)
+
+        def wrapper(*args, **kwargs):
+            if any(callable(a) for a in args):
+                args = tuple(recorder._trace_callback(a) if callable(a) else a for a in args)
+            if kwargs and any(callable(v) for v in kwargs.values()):
+                kwargs = dict((k, recorder._trace_callback(v) if callable(v) else v)
+                              for k, v in kwargs.items())
+            try:
+                result = original(*args, **kwargs)
+            except Exception as e:
+                if not quiet:
+                    recorder._log(label, args, kwargs, recorder.RAISE_PREFIX + str(e))
+                raise
+            if not quiet:
+                recorder._log(label, args, kwargs, result)
+            return result
+        return wrapper
+
+    def _make_pause_wrapper(self, original):
+        recorder = self
+
+        def wrapper(*args, **kwargs):
+            try:
+                return original(*args, **kwargs)
+            finally:
+                recorder.end_tick()
+        return wrapper
+
+    def _log(self, label, args, kwargs, result):
+        self.calls += 1
+        entry = [label, [encode_value(a) for a in args]]
+        if result is not None or kwargs:
+            entry.append(encode_value(result))
+        if kwargs:
+            entry.append(dict((k, encode_value(v)) for k, v in kwargs.items()))
+        self._entries.append(entry)
@@ -29,7 +29,7 @@ try:
 except ImportError:
     import urllib2 as urllib_request  # Fallback for older Python
 
-__version__ = "1.9.0"
+__version__ = "1.9.1"
 
 # ============ USER SETTINGS ============
 GITHUB_BASE_URL = "https://raw.githubusercontent.com/crameep/LegionScripts/main/"
@@ -43,6 +43,9 @@ MAX_BACKUPS_PER_SCRIPT = 5  # Keep only this many backups per script (auto-clean
 # Directories to exclude from recursion (Test excluded conditionally via show_test_scripts toggle)
 EXCLUDED_DIRS_BASE = ["__pycache__", ".git", ".github", "_support", ".claude"]
 
+# Library packages - their __init__.py is part of the library, not a stub
+LIBRARY_PACKAGES = ["LegionUtils"]
+
 # Scripts to manage - dynamically loaded from GitHub
 MANAGED_SCRIPTS = []  # List of (category, relative_path) tuples
 
@@ -477,8 +480,8 @@ def fetch_github_script_list():
                 item_type = item.get('type', '')
 
                 if item_type == 'file' and item_name.endswith('.py'):
-                    # Skip __init__.py files
-                    if item_name != '__init__.py':
+                    # Skip __init__.py files (except in library packages)
+                    if item_name != '__init__.py' or path_prefix.rstrip('/') in LIBRARY_PACKAGES:
                         relative_path = path_prefix + item_name if path_prefix else item_name
                         category = path_prefix.rstrip('/') if path_prefix else ""
                         script_list.append((category, relative_path))
@@ -517,7 +520,8 @@ def discover_local_scripts():
                 for item_name in os.listdir(dir_path):
                     item_path = os.path.join(dir_path, item_name)
 
-                    if os.path.isfile(item_path) and item_name.endswith('.py') and item_name != '__init__.py':
+                    is_stub = item_name == '__init__.py' and path_prefix.rstrip('/') not in LIBRARY_PACKAGES
+                    if os.path.isfile(item_path) and item_name.endswith('.py') and not is_stub:
                         relative_path = path_prefix + item_name if path_prefix else item_name
                         category = path_prefix.rstrip('/') if path_prefix else ""
                         script_list.append((category, relative_path))
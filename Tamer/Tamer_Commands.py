@@ -19,6 +19,20 @@
 # ============================================================
 import API
 import time
+import sys
+import os
+
+# Add parent directory to path for library imports
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(script_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+# Optional shared library (commands fall back to fixed delays without it)
+try:
+    from LegionUtils import CommandPipeline
+except ImportError:
+    CommandPipeline = None
 
 __version__ = "3.2"
 
@@ -26,7 +40,7 @@ __version__ = "3.2"
 MAX_DISTANCE = 10             # Max distance to search for hostiles
 SHOW_RADIUS_INDICATOR = True  # Show range circle around player
 TARGET_TIMEOUT = 3.0          # Seconds to wait for target cursor
-COMMAND_DELAY = 0.8           # Delay between pet commands in ORDER mode (increased)
+COMMAND_DELAY = 0.8           # Delay between pet commands in ORDER mode (without LegionUtils)
 MAX_ATTACK_PETS = 5           # Maximum pets in attack order list
 
 # Hotkeys (set to "" to disable)
@@ -71,6 +85,10 @@ last_position_check = 0
 # Expand/collapse state
 is_expanded = True
 
+# ORDER mode pacing: the next pet's command goes out as soon as the last
+# target cursor is answered; learns server lag from cursor latency
+command_pipeline = CommandPipeline(timeout=2.0) if CommandPipeline else None
+
 # ============ UTILITY FUNCTIONS ============
 def safe_get_name(mobile):
     """Safely get mobile name"""
@@ -383,27 +401,27 @@ def ordered_kill():
                 return
         
         # Send each active pet to attack
+        started = time.time()
         for i, pet in enumerate(active_pets):
             pet_name = pet["name"]
             
-            # Delay BEFORE command (except first one)
-            if i > 0:
-                API.Pause(COMMAND_DELAY)
-            
-            # Say the command
-            API.Msg(pet_name + " kill")
+            # Say the command (paced by the pipeline, or a fixed delay)
+            say_pet_command(pet_name + " kill", i)
             API.SysMsg("  " + str(i + 1) + ". " + pet_name + " -> attack", 88)
             
             # Wait for target cursor to appear
-            if API.WaitForTarget(timeout=2.0):
+            if wait_for_command_cursor():
                 API.Target(target_serial)
+                if command_pipeline:
+                    command_pipeline.wait_cursor_consumed()
+                else:
+                    # Small pause after targeting to let it register
+                    API.Pause(0.2)
             else:
                 API.SysMsg("  " + pet_name + " - no target cursor", 43)
-            
-            # Small pause after targeting to let it register
-            API.Pause(0.2)
         
-        API.SysMsg("Ordered attack complete (" + str(len(active_pets)) + " pets)", 68)
+        API.SysMsg("Ordered attack complete (" + str(len(active_pets)) + " pets, " +
+                   format_command_timing(time.time() - started) + ")", 68)
         
     except Exception as e:
         API.DisplayRange(0)
@@ -440,16 +458,32 @@ def ordered_command(command, display_name):
         return
     
     for i, pet in enumerate(active_pets):
-        pet_name = pet["name"]
-        
-        # Delay before command (except first)
-        if i > 0:
-            API.Pause(COMMAND_DELAY)
-        
-        API.Msg(pet_name + " " + command)
+        say_pet_command(pet["name"] + " " + command, i)
     
     API.SysMsg("Ordered " + display_name + " (" + str(len(active_pets)) + " pets)", 88)
 
+def say_pet_command(message, index):
+    """Say one ORDER mode command - pipelined, or COMMAND_DELAY apart without LegionUtils"""
+    if command_pipeline:
+        command_pipeline.say(message)
+        return
+    if index > 0:
+        API.Pause(COMMAND_DELAY)
+    API.Msg(message)
+
+def wait_for_command_cursor():
+    """Wait for the target cursor of the command just said"""
+    if command_pipeline:
+        return command_pipeline.wait_for_cursor()
+    return API.WaitForTarget(timeout=2.0)
+
+def format_command_timing(elapsed):
+    """'1.2s, lag 180ms' - elapsed time plus the learned cursor latency"""
+    text = str(round(elapsed, 1)) + "s"
+    if command_pipeline and command_pipeline.samples:
+        text += ", lag " + str(int(command_pipeline.get_stats()["p50"] * 1000)) + "ms"
+    return text
+
 def stable_pets():
     API.Msg("stable")
     API.SysMsg("Requesting stable...", 88)
@@ -26,8 +26,27 @@
 # ============================================================
 import API
 import time
+import sys
+import os
 from collections import namedtuple
 
+# Add parent directory to path for library imports
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(script_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+# Optional shared library (the healer still runs standalone without it)
+try:
+    from LegionUtils import JournalWatcher, PetDamageTracker, ActionTimingModel
+except ImportError:
+    JournalWatcher = None
+    PetDamageTracker = None
+    ActionTimingModel = None
+
+# Heal priority rules (required - shared with the other healer scripts)
+from LegionUtils import HealConfig, decide_heal, NO_RANGE_LIMIT
+
 __version__ = "7.2"
 
 # ============ USER SETTINGS ============
@@ -120,6 +139,7 @@ VETKIT_KEY = "PetHealer_VetKitID"
 JOURNAL_KEY = "PetHealer_UseJournal"
 SKIPOOR_KEY = "PetHealer_SkipOOR"
 EXPANDED_KEY = "PetHealer_Expanded"
+HEAL_TIMING_KEY = "PetHealer_HealTiming"
 
 # Runtime state
 USE_MAGERY = False
@@ -249,6 +269,31 @@ def get_hp_percent(mob):
     except:
         return 100
 
+def track_pet_damage():
+    """Sample every pet's HP into the damage tracker (once per loop)"""
+    if damage_tracker:
+        for pet in PETS:
+            damage_tracker.observe(API.FindMobile(pet))
+
+def get_projected_hp_percent(mob, seconds):
+    """HP% the mob will have after `seconds` at its recent damage rate"""
+    if not damage_tracker:
+        return get_hp_percent(mob)
+    return int(damage_tracker.projected_percent(mob, seconds))
+
+def snapshot_pet(serial, lead=0):
+    """Read a pet into a heal row:
+    (serial, dead, distance, hp_pct, poisoned, projected_pct)
+    Returns None if the mobile isn't visible.
+    """
+    mob = API.FindMobile(serial)
+    if not mob:
+        return None
+    if mob.IsDead:
+        return (serial, True, get_distance(mob), 0, False, 0)
+    return (serial, False, get_distance(mob), get_hp_percent(mob), is_poisoned(mob),
+            get_projected_hp_percent(mob, lead))
+
 def get_distance(mob):
     """Safely get distance to mobile"""
     if not mob:
@@ -402,6 +447,9 @@ def load_settings():
         except:
             PETS = []
 
+    if heal_timing:
+        heal_timing.from_string(API.GetPersistentVar(HEAL_TIMING_KEY, "", API.PersistentVar.Char))
+
 def load_expanded_state():
     """Load expanded state from persistence"""
     global is_expanded
@@ -441,31 +489,89 @@ def save_window_position():
     except:
         pass
 
+# ============ DAMAGE TRACKING ============
+# Per-pet HP history so the lowest-HP pick can look ahead to when the
+# heal lands (a pet taking burst damage outranks one that is holding steady)
+damage_tracker = PetDamageTracker() if PetDamageTracker else None
+
 # ============ JOURNAL TRACKING ============
+# All bandage/rez messages are matched in one pass over new journal lines
+journal_watcher = None
+if JournalWatcher:
+    journal_watcher = JournalWatcher(API).watch_all(
+        JOURNAL_FINISH_MESSAGES + JOURNAL_FAIL_MESSAGES + JOURNAL_REZ_SUCCESS + JOURNAL_REZ_FAIL)
+
+# Learned bandage durations (p95 of observed begin -> finish message),
+# used in place of SELF_DELAY/VET_DELAY once enough samples exist
+heal_timing = None
+if ActionTimingModel and journal_watcher:
+    heal_timing = ActionTimingModel({"self": SELF_DELAY, "pet": VET_DELAY},
+                                    JOURNAL_FINISH_MESSAGES, JOURNAL_FAIL_MESSAGES,
+                                    watcher=journal_watcher)
+
+def get_heal_delay(kind):
+    """Bandage time for "self" or "pet": learned p95 if known, else the fixed timer"""
+    if heal_timing:
+        return heal_timing.expected(kind)
+    return SELF_DELAY if kind == "self" else VET_DELAY
+
+def format_heal_timing():
+    """Timing line for the window, e.g. Self:3.9s | Vet:3.7s | Rez:10.0s"""
+    return ("Self:" + str(round(get_heal_delay("self"), 1)) + "s | Vet:" +
+            str(round(get_heal_delay("pet"), 1)) + "s | Rez:" + str(REZ_DELAY) + "s")
+
 def check_journal_for_message(msg):
     """
-    Check if journal contains a message using API.InJournal.
+    Check if journal contains a message since the last clear.
+    Uses the JournalWatcher when available (new lines read once),
+    otherwise API.InJournal.
     Returns True if found, False if not found.
     """
     try:
+        if journal_watcher and journal_watcher.is_watching(msg):
+            journal_watcher.poll()
+            return journal_watcher.seen(msg)
         return API.InJournal(msg, False)  # Don't clear matches
     except Exception as e:
         if DEBUG:
             API.SysMsg("DEBUG: Journal check error: " + str(e), 32)
         return False
 
+def find_journal_message(messages):
+    """
+    Return the first of messages found in the journal since the last clear,
+    or None. Reads new journal lines once for the whole list.
+    """
+    if journal_watcher:
+        try:
+            journal_watcher.poll()
+            return journal_watcher.seen_any(messages)
+        except Exception as e:
+            if DEBUG:
+                API.SysMsg("DEBUG: Journal check error: " + str(e), 32)
+            return None
+    for msg in messages:
+        if check_journal_for_message(msg):
+            return msg
+    return None
+
 def clear_journal_safe():
     """Safely clear journal"""
     try:
         API.ClearJournal()
+        if journal_watcher:
+            journal_watcher.reset()
     except:
         pass
 
-def wait_for_bandage(target_name, max_wait):
+def wait_for_bandage(target_name, max_wait, action=None):
     """
     Wait for bandage to finish using journal tracking or fixed timer.
+    Bandages with an action ("self"/"pet") use the learned timing instead.
     Returns True if successful, False if interrupted.
     """
+    if action and heal_timing:
+        return wait_for_timed_bandage(target_name, action)
     if not USE_JOURNAL_TRACKING:
         if DEBUG:
             API.SysMsg("DEBUG: Using fixed timer (" + str(max_wait) + "s)", 88)
@@ -482,22 +588,22 @@ def wait_for_bandage(target_name, max_wait):
     
     while time.time() - start_time < max_wait:
         # Check for success messages
-        for msg in JOURNAL_FINISH_MESSAGES:
-            if check_journal_for_message(msg):
-                clear_journal_safe()
-                elapsed = round(time.time() - start_time, 1)
-                if DEBUG:
-                    API.SysMsg("DEBUG: Bandage finished (" + str(elapsed) + "s)", 68)
-                return True
+        if find_journal_message(JOURNAL_FINISH_MESSAGES):
+            clear_journal_safe()
+            elapsed = round(time.time() - start_time, 1)
+            if DEBUG:
+                API.SysMsg("DEBUG: Bandage finished (" + str(elapsed) + "s)", 68)
+            return True
         
         # Check for failure messages
-        for msg in JOURNAL_FAIL_MESSAGES:
-            if check_journal_for_message(msg):
-                clear_journal_safe()
-                if DEBUG:
-                    API.SysMsg("DEBUG: Bandage failed - " + msg, 32)
-                return False
+        msg = find_journal_message(JOURNAL_FAIL_MESSAGES)
+        if msg:
+            clear_journal_safe()
+            if DEBUG:
+                API.SysMsg("DEBUG: Bandage failed - " + msg, 32)
+            return False
         
+        track_pet_damage()
         API.Pause(JOURNAL_CHECK_INTERVAL)
     
     # Timeout - fall back to assuming it worked
@@ -506,19 +612,42 @@ def wait_for_bandage(target_name, max_wait):
     clear_journal_safe()
     return True
 
+def wait_for_timed_bandage(target_name, action):
+    """
+    Wait up to the learned duration for a bandage started with heal_timing.begin().
+    Journal tracking ends the wait on the finish/fail message; with it off the
+    journal is still read so the timer keeps learning.
+    Returns True if successful, False if interrupted.
+    """
+    start_time = heal_timing.pending[1] if heal_timing.pending else time.time()
+    deadline = start_time + heal_timing.expected(action)
+    if DEBUG:
+        API.SysMsg("DEBUG: Learned timer (" + str(round(deadline - start_time, 1)) + "s)", 88)
+    
+    result = None
+    while time.time() < deadline:
+        if result is None:
+            result = heal_timing.poll()
+            if result == "finish":
+                API.SavePersistentVar(HEAL_TIMING_KEY, heal_timing.to_string(), API.PersistentVar.Char)
+                timingLabel.SetText(format_heal_timing())
+            if result and USE_JOURNAL_TRACKING:
+                break
+        track_pet_damage()
+        API.Pause(max(0.05, min(JOURNAL_CHECK_INTERVAL, deadline - time.time())))
+    
+    if DEBUG:
+        elapsed = round(time.time() - start_time, 1)
+        API.SysMsg("DEBUG: " + target_name + " bandage " + (result or "timeout") + " (" + str(elapsed) + "s)", 68)
+    return result != "fail"
+
 def check_rez_success():
     """Check journal for resurrection success messages"""
-    for msg in JOURNAL_REZ_SUCCESS:
-        if check_journal_for_message(msg):
-            return True
-    return False
+    return find_journal_message(JOURNAL_REZ_SUCCESS) is not None
 
 def check_rez_fail():
     """Check journal for resurrection failure messages"""
-    for msg in JOURNAL_REZ_FAIL:
-        if check_journal_for_message(msg):
-            return msg  # Return the specific failure message
-    return None
+    return find_journal_message(JOURNAL_REZ_FAIL)  # The specific failure message
 
 # ============ FOLLOWING ============
 def follow_to_target(target_serial, max_distance=1):
@@ -589,8 +718,10 @@ def heal_self_with_bandage():
         if DEBUG:
             API.SysMsg("DEBUG: BandageSelf failed - no bandages?", 32)
         return False
+    if heal_timing:
+        heal_timing.begin("self")
     
-    wait_for_bandage("Self", SELF_DELAY)
+    wait_for_bandage("Self", SELF_DELAY, "self")
     
     # Cleanup
     clear_stray_cursor()
@@ -650,6 +781,8 @@ def heal_pet_with_bandage(target_serial):
     
     # Use the bandage
     API.UseObject(API.Found, False)
+    if heal_timing:
+        heal_timing.begin("pet")
     API.Pause(ACTION_REGISTER_DELAY)
     
     # IMPORTANT: Cancel the pre-target after use
@@ -658,7 +791,7 @@ def heal_pet_with_bandage(target_serial):
     # Clear any stray cursor that might have appeared
     clear_stray_cursor()
     
-    wait_for_bandage(get_mob_name(mob), VET_DELAY)
+    wait_for_bandage(get_mob_name(mob), VET_DELAY, "pet")
     
     # Final cleanup
     clear_stray_cursor()
@@ -1211,130 +1344,88 @@ def get_priority_heal_target():
     if not USE_MAGERY and not has_bandages_available():
         return HealAction(None, False, None, 'none')
     
-    # 0. CHECK IF VET KIT SHOULD BE USED (before individual heals)
-    # Triggers when: VET_KIT_THRESHOLD or more pets are hurt
-    if VET_KIT_ID > 0 and can_use_vetkit():
-        hurt_count = count_pets_needing_heal()
-        if hurt_count >= VET_KIT_THRESHOLD:
-            status = "Using Vet Kit (" + str(hurt_count) + " pets hurt)"
-            return HealAction(None, False, status, 'vetkit')
-    
-    # 1. CHECK SELF (poison or damage) - but NOT if dead!
-    if HEAL_SELF and not is_player_dead():
-        player = API.Player
-        if CURE_POISON and is_player_poisoned():
-            return HealAction(player.Serial, True, "Curing SELF (poisoned)", 'heal')
-        if player.HitsDiff > SELF_HEAL_THRESHOLD:
-            return HealAction(player.Serial, True, "Healing: SELF", 'heal')
-    
-    # 2. CHECK FOR ANY POISONED PETS (urgent!) - with range check
-    if CURE_POISON:
-        # Check tank first
-        if TANK_PET:
-            mob = API.FindMobile(TANK_PET)
-            if mob and not mob.IsDead and is_poisoned(mob):
-                can_heal, reason = can_heal_target(TANK_PET, USE_MAGERY)
-                if can_heal:
-                    status = "Curing TANK: " + get_mob_name(mob) + " (poisoned)"
-                    return HealAction(TANK_PET, False, status, 'heal')
-                elif DEBUG:
-                    API.SysMsg("DEBUG: Tank poisoned but out of range", 53)
-        
-        # Check other pets
-        for pet in PETS:
-            if pet == TANK_PET:
-                continue
-            mob = API.FindMobile(pet)
-            if mob and not mob.IsDead and is_poisoned(mob):
-                can_heal, reason = can_heal_target(pet, USE_MAGERY)
-                if can_heal:
-                    status = "Curing: " + get_mob_name(mob) + " (poisoned)"
-                    return HealAction(pet, False, status, 'heal')
-    
-    # 3. CHECK TANK PET (priority if under TANK_HP_PERCENT) - with range check
-    tank_needs_topoff = False
-    tank_in_range = False
-    if TANK_PET:
-        mob = API.FindMobile(TANK_PET)
-        if mob:
-            can_heal, reason = can_heal_target(TANK_PET, USE_MAGERY)
-            tank_in_range = can_heal
-            
-            if mob.IsDead and USE_REZ:
-                if can_heal:
-                    status = "Rezzing TANK: " + get_mob_name(mob)
-                    return HealAction(TANK_PET, False, status, 'rez')
-                elif DEBUG:
-                    API.SysMsg("DEBUG: Tank dead but out of range (" + str(get_distance(mob)) + " tiles)", 53)
-            elif not mob.IsDead:
-                hp_pct = get_hp_percent(mob)
-                if hp_pct < TANK_HP_PERCENT:
-                    if can_heal:
-                        status = "Healing TANK: " + get_mob_name(mob) + " (" + str(hp_pct) + "%)"
-                        return HealAction(TANK_PET, False, status, 'heal')
-                    elif DEBUG:
-                        API.SysMsg("DEBUG: Tank hurt but out of range (" + str(get_distance(mob)) + " tiles)", 53)
-                elif mob.HitsDiff > 0:
-                    tank_needs_topoff = True
-    
-    # 4. CHECK OTHER PETS - find lowest HP percentage IN RANGE
-    worst_pet = None
-    worst_pct = 100
-    worst_name = ""
-    
-    # Also track best out-of-range target for debug info
-    oor_pet_name = None
-    oor_pet_pct = 100
-    
+    heal_range = SPELL_RANGE if USE_MAGERY else BANDAGE_RANGE
+    heal_lead = CAST_DELAY if USE_MAGERY else get_heal_delay("pet")
+
+    # Read every pet once - the engine works from these rows. Pets
+    # beyond the heal range still count when we follow them.
+    rows = []
     for pet in PETS:
-        if pet == TANK_PET:
-            continue
-        
-        mob = API.FindMobile(pet)
-        if not mob:
-            continue
-        
-        can_heal, reason = can_heal_target(pet, USE_MAGERY)
-        
-        if mob.IsDead and USE_REZ:
-            if can_heal:
-                status = "Rezzing: " + get_mob_name(mob)
-                return HealAction(pet, False, status, 'rez')
-            # Track out of range dead pet
-            continue
-        
-        if not mob.IsDead:
-            hp_pct = get_hp_percent(mob)
-            
-            if can_heal:
-                # In range - track for healing
-                if hp_pct < worst_pct:
-                    worst_pet = pet
-                    worst_pct = hp_pct
-                    worst_name = get_mob_name(mob)
-            else:
-                # Out of range - track for debug
-                if hp_pct < oor_pet_pct:
-                    oor_pet_name = get_mob_name(mob)
-                    oor_pet_pct = hp_pct
-    
-    if worst_pet and worst_pct < PET_HP_PERCENT:
-        status = "Healing: " + worst_name + " (" + str(worst_pct) + "%)"
-        return HealAction(worst_pet, False, status, 'heal')
-    
-    # Debug: mention if we skipped an out-of-range pet
-    if DEBUG and oor_pet_name and oor_pet_pct < PET_HP_PERCENT:
-        API.SysMsg("DEBUG: " + oor_pet_name + " (" + str(oor_pet_pct) + "%) out of range, skipped", 53)
-    
-    # 5. TOP OFF TANK (if in range)
-    if tank_needs_topoff and tank_in_range:
-        mob = API.FindMobile(TANK_PET)
-        if mob:
-            hp_pct = get_hp_percent(mob)
-            status = "Topping off TANK: " + get_mob_name(mob) + " (" + str(hp_pct) + "%)"
-            return HealAction(TANK_PET, False, status, 'heal')
-    
-    return HealAction(None, False, None, 'none')
+        row = snapshot_pet(pet, heal_lead)
+        if row:
+            rows.append(row)
+    extra = ()
+    if TANK_PET and TANK_PET not in PETS:
+        row = snapshot_pet(TANK_PET, heal_lead)
+        extra = (row,) if row else ()
+
+    player_row = None
+    if HEAL_SELF:
+        player = API.Player
+        player_row = (player.Serial, is_player_dead(), get_hp_percent(player),
+                      player.HitsDiff, is_player_poisoned())
+
+    vetkit = True if VET_KIT_ID > 0 and can_use_vetkit() else None
+    decision = decide_heal(get_heal_config(heal_range), rows, player_row, extra, vetkit)
+    if not decision:
+        if DEBUG:
+            report_out_of_range(rows, heal_range)
+        return HealAction(None, False, None, 'none')
+
+    target, action_type, rule = decision
+    if action_type == "vetkit":
+        status = "Using Vet Kit (" + str(count_pets_needing_heal()) + " pets hurt)"
+        return HealAction(None, False, status, 'vetkit')
+    if action_type == "cure_self":
+        return HealAction(target, True, "Curing SELF (poisoned)", 'heal')
+    if action_type == "heal_self":
+        return HealAction(target, True, "Healing: SELF", 'heal')
+
+    mob = API.FindMobile(target)
+    name = get_mob_name(mob)
+    if action_type == "rez":
+        prefix = "Rezzing TANK: " if target == TANK_PET else "Rezzing: "
+        return HealAction(target, False, prefix + name, 'rez')
+    if action_type == "cure":
+        prefix = "Curing TANK: " if target == TANK_PET else "Curing: "
+        return HealAction(target, False, prefix + name + " (poisoned)", 'heal')
+    if rule == "lowest_other":
+        prefix = "Healing: "
+    elif get_hp_percent(mob) < TANK_HP_PERCENT:
+        prefix = "Healing TANK: "
+    else:
+        prefix = "Topping off TANK: "
+    return HealAction(target, False, prefix + name + " (" + str(get_hp_percent(mob)) + "%)", 'heal')
+
+def get_heal_config(heal_range):
+    """HealConfig for the current settings.
+
+    Order: vet kit (VET_KIT_THRESHOLD+ pets hurt), self (poison, then
+    damage), poisoned tank, other poisoned pets, tank below
+    TANK_HP_PERCENT (or rez), dead pets, the other pet with the lowest
+    projected HP, then topping off the tank.
+    """
+    if SKIP_OUT_OF_RANGE or not FOLLOW_PET:
+        reach = heal_range
+    else:
+        reach = max(heal_range, MAX_FOLLOW_RANGE)
+    return HealConfig(
+        (("vetkit", 0), ("self_cure", 0), ("self_missing", SELF_HEAL_THRESHOLD),
+         ("tank_cure", 0), ("cure_other", 0), ("tank_heal", TANK_HP_PERCENT), ("rez", 0),
+         ("lowest_other", PET_HP_PERCENT), ("tank_heal", 100)),
+        heal_range, reach=reach, tank=TANK_PET, cure=CURE_POISON, rez=USE_REZ,
+        vetkit_range=heal_range if SKIP_OUT_OF_RANGE else NO_RANGE_LIMIT,
+        vetkit_hp=VET_KIT_HP_PERCENT, vetkit_critical_hp=0,
+        vetkit_min_pets=VET_KIT_THRESHOLD, vetkit_count_poisoned=True)
+
+def report_out_of_range(rows, heal_range):
+    """Debug: mention the lowest hurt pet skipped for being out of range"""
+    skipped = [row for row in rows if not row[1] and row[2] > heal_range and row[0] != TANK_PET]
+    if skipped:
+        row = min(skipped, key=lambda r: r[3])
+        if row[3] < PET_HP_PERCENT:
+            name = get_mob_name(API.FindMobile(row[0]))
+            API.SysMsg("DEBUG: " + name + " (" + str(row[3]) + "%) out of range, skipped", 53)
 
 # ============ EXPAND/COLLAPSE ============
 def toggle_expand():
@@ -1593,7 +1684,7 @@ priorityLabel.SetPos(0, 25)
 priorityLabel.IsVisible = is_expanded
 gump.Add(priorityLabel)
 
-timingLabel = API.Gumps.CreateGumpTTFLabel("Self:" + str(SELF_DELAY) + "s | Vet:" + str(VET_DELAY) + "s | Rez:" + str(REZ_DELAY) + "s", 15, "#AAFFAA", aligned="center", maxWidth=300)
+timingLabel = API.Gumps.CreateGumpTTFLabel(format_heal_timing(), 15, "#AAFFAA", aligned="center", maxWidth=300)
 timingLabel.SetPos(0, 40)
 timingLabel.IsVisible = is_expanded
 gump.Add(timingLabel)
@@ -1792,6 +1883,7 @@ next_display_update = time.time() + DISPLAY_UPDATE_INTERVAL
 while not API.StopRequested:
     try:
         API.ProcessCallbacks()
+        track_pet_damage()
 
         # Save window position periodically
         if time.time() > next_save:
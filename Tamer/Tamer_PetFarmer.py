@@ -30,9 +30,24 @@ import os
 
 # Add parent directory (CoryCustom root) to path for library imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from LegionUtils import WindowPositionTracker, ResourceRateTracker
+from LegionUtils import WindowPositionTracker, ResourceRateTracker, FrameCache, SettingsStore
+from LegionUtils import set_combat_state, HealConfig, decide_heal
+from LegionUtils import RoutePlanner, AreaIndex, TraceRecorder
+from LegionUtils import ConsumptionRate, get_inventory_index
 from GatherFramework import TravelSystem
 
+# Record every API read/action for offline replay (_support/tools/LegionReplay.py).
+# Installed before the frame cache so cached lookups replay the same way.
+TRACE_API = False
+api_trace = TraceRecorder(API, name="Tamer_PetFarmer").install() if TRACE_API else None
+
+# Per-tick mobile cache - cleared automatically on ProcessCallbacks/Pause
+frame_cache = FrameCache(API).install()
+find_mobile = frame_cache.find_mobile
+
+# Write-behind storage for stats saved during combat (kills, gold, deaths)
+settings_store = SettingsStore("TamerPetFarmer")
+
 __version__ = "1.0"
 
 # ============ CONSTANTS ============
@@ -514,7 +529,7 @@ class PetManager:
         valid_pets = []
         for pet in self.pets:
             serial = pet['serial']
-            mob = API.Mobiles.FindMobile(serial)
+            mob = find_mobile(serial)
             if mob is not None and not getattr(mob, 'IsDead', True):
                 valid_pets.append(pet)
             elif pet.get('is_tank', False):
@@ -539,7 +554,7 @@ class PetManager:
             return True  # No pets to check
 
         for pet in self.pets:
-            mob = API.Mobiles.FindMobile(pet['serial'])
+            mob = find_mobile(pet['serial'])
             if mob is None or getattr(mob, 'IsDead', True):
                 return False
 
@@ -671,11 +686,69 @@ class FarmingArea:
 class AreaManager:
     """
     Manages farming area persistence and retrieval.
+
+    Area names and geometry live in one versioned index blob
+    (key_prefix + "AreaIndex") read once at startup; full areas are
+    parsed from their own vars on first use and cached. get_current_area
+    looks the player up in the index's grid buckets.
     """
 
+    MAX_PROXIMITY = 20  # Largest get_current_area proximity served from the grid
+
     def __init__(self, key_prefix):
         self.key_prefix = key_prefix
         self.areas_key = key_prefix + "Areas_"
+        self.index_key = key_prefix + "AreaIndex"
+        self.areas = {}  # Cache of parsed areas: {name: FarmingArea}
+        self.index = AreaIndex(pad=self.MAX_PROXIMITY)
+        self._load_index()
+
+    def _load_index(self):
+        """Load the area index blob (built from the old name list once if missing)"""
+        import json
+        try:
+            index_json = API.GetPersistentVar(self.index_key, "", API.PersistentVar.Char)
+            if index_json:
+                index = AreaIndex.from_dict(json.loads(index_json), pad=self.MAX_PROXIMITY)
+                if index is not None:
+                    self.index = index
+                    return
+
+            # Older saves: "AreaNames" plus one var per area - parse them all once
+            names_str = API.GetPersistentVar(self.key_prefix + "AreaNames", "", API.PersistentVar.Char)
+            names = [name for name in names_str.split("|") if name] if names_str else []
+            for name in names:
+                area = self._read_area(name)
+                if area:
+                    self._index_area(area)
+            if names:
+                self._save_index()
+        except Exception as e:
+            API.SysMsg(f"Area index load error: {str(e)}", 32)
+
+    def _index_area(self, area):
+        """Add or replace an area's geometry in the index"""
+        if area.area_type == "circle":
+            self.index.add_circle(area.name, area.center_x, area.center_y, area.radius)
+        elif area.area_type == "waypoints":
+            self.index.add_points(area.name, area.waypoints)
+        else:
+            self.index.add_points(area.name, [])
+
+    def _save_index(self):
+        """Save the area index blob"""
+        import json
+        API.SavePersistentVar(self.index_key, json.dumps(self.index.to_dict()), API.PersistentVar.Char)
+
+    def _read_area(self, name):
+        """Parse an area from its persistent var into the cache"""
+        import json
+        area_json = API.GetPersistentVar(self.areas_key + name, "", API.PersistentVar.Char)
+        if not area_json:
+            return None
+        area = FarmingArea.from_dict(json.loads(area_json))
+        self.areas[name] = area
+        return area
 
     def add_area(self, area):
         """
@@ -689,13 +762,11 @@ class AreaManager:
             area_key = self.areas_key + area.name
             area_json = json.dumps(area.to_dict())
             API.SavePersistentVar(area_key, area_json, API.PersistentVar.Char)
+            self.areas[area.name] = area
 
-            # Update area names list
-            area_names_key = self.key_prefix + "AreaNames"
-            names = self.list_areas()
-            if area.name not in names:
-                names.append(area.name)
-                API.SavePersistentVar(area_names_key, "|".join(names), API.PersistentVar.Char)
+            # Update area index
+            self._index_area(area)
+            self._save_index()
 
             return True
         except Exception as e:
@@ -713,15 +784,9 @@ class AreaManager:
             FarmingArea object or None if not found
         """
         try:
-            import json
-            area_key = self.areas_key + name
-            area_json = API.GetPersistentVar(area_key, "", API.PersistentVar.Char)
-
-            if not area_json:
-                return None
-
-            area_dict = json.loads(area_json)
-            return FarmingArea.from_dict(area_dict)
+            if name in self.areas:
+                return self.areas[name]
+            return self._read_area(name)
         except Exception as e:
             API.SysMsg(f"Area load error: {str(e)}", 32)
             return None
@@ -733,17 +798,7 @@ class AreaManager:
         Returns:
             List of area name strings
         """
-        # Note: This is a simplified implementation
-        # A full implementation would need to scan all persistence keys
-        # For now, we'll track area names in a separate key
-        try:
-            area_names_key = self.key_prefix + "AreaNames"
-            names_str = API.GetPersistentVar(area_names_key, "", API.PersistentVar.Char)
-            if names_str:
-                return [name for name in names_str.split("|") if name]
-            return []
-        except:
-            return []
+        return self.index.keys()
 
     def delete_area(self, name):
         """
@@ -755,13 +810,12 @@ class AreaManager:
         try:
             area_key = self.areas_key + name
             API.SavePersistentVar(area_key, "", API.PersistentVar.Char)
+            self.areas.pop(name, None)
 
-            # Remove from area names list
-            area_names_key = self.key_prefix + "AreaNames"
-            names = self.list_areas()
-            if name in names:
-                names.remove(name)
-                API.SavePersistentVar(area_names_key, "|".join(names), API.PersistentVar.Char)
+            # Remove from area index
+            if name in self.index:
+                self.index.remove(name)
+                self._save_index()
 
             return True
         except Exception as e:
@@ -781,22 +835,11 @@ class AreaManager:
         try:
             px, py = get_player_pos()
 
-            for area_name in self.list_areas():
-                area = self.get_area(area_name)
-                if not area:
-                    continue
-
-                if area.area_type == "circle":
-                    dist = distance(px, py, area.center_x, area.center_y)
-                    if dist <= area.radius + proximity:
-                        return area
-                elif area.area_type == "waypoints":
-                    # Check proximity to any waypoint
-                    for wx, wy in area.waypoints:
-                        if distance(px, py, wx, wy) <= proximity:
-                            return area
-
-            return None
+            # Circles match within radius + proximity, waypoints within proximity
+            area_name = self.index.find(px, py, proximity)
+            if area_name is None:
+                return None
+            return self.get_area(area_name)
         except:
             return None
 
@@ -993,11 +1036,13 @@ class NPCThreatMap:
 class HealingSystem:
     """
     Manages healing configuration and provides interface for config GUI.
-    Holds healing thresholds, vet kit settings, and healing options.
+    Holds healing thresholds, vet kit settings, and healing options, and
+    picks/runs heals through the shared LegionUtils heal engine.
     """
 
-    def __init__(self):
+    def __init__(self, pet_manager=None):
         """Initialize healing system with default values"""
+        self.pet_manager = pet_manager
         self.player_heal_threshold = 85
         self.tank_heal_threshold = 70
         self.pet_heal_threshold = 50
@@ -1009,6 +1054,177 @@ class HealingSystem:
         self.use_magery_healing = False
         self.auto_cure_poison = True
 
+        # Heal in progress
+        self.STATE = "idle"  # idle, healing
+        self.heal_start_time = 0
+        self.current_heal_type = ""
+        self.last_vetkit_use = 0
+        self.out_of_bandages_warned = False
+
+    def get_heal_config(self):
+        """
+        HealConfig for the current settings.
+
+        Order: self (poison, then below player threshold), vet kit, poisoned
+        tank, tank below tank threshold, other poisoned pets, then the other
+        pet with the lowest HP below the pet threshold.
+        """
+        tank = self.pet_manager.get_tank_pet() if self.pet_manager else None
+        return HealConfig(
+            (("self_cure", 0), ("self", self.player_heal_threshold), ("vetkit", 0),
+             ("tank_cure", 0), ("tank_heal", self.tank_heal_threshold), ("cure_other", 0),
+             ("lowest_other", self.pet_heal_threshold)),
+            SPELL_RANGE if self.use_magery_healing else BANDAGE_RANGE,
+            tank=tank['serial'] if tank else 0, cure=self.auto_cure_poison,
+            vetkit_range=BANDAGE_RANGE, vetkit_hp=self.vetkit_hp_threshold,
+            vetkit_critical_hp=self.vetkit_critical_hp, vetkit_min_pets=self.vetkit_min_pets,
+            vetkit_needs_all_alive=True)
+
+    def _snapshot_pets(self):
+        """Read every visible pet once into heal rows for decide_heal()"""
+        rows = []
+        for pet_info in (self.pet_manager.pets if self.pet_manager else []):
+            mob = find_mobile(pet_info.get('serial', 0))
+            if not mob:
+                continue
+            distance = getattr(mob, 'Distance', 99)
+            if getattr(mob, 'IsDead', False):
+                rows.append((mob.Serial, True, distance, 0, False, 0))
+                continue
+            hp_pct = int(mob.Hits * 100 / mob.HitsMax) if mob.HitsMax > 0 else 100
+            poisoned = bool(getattr(mob, 'IsPoisoned', False))
+            rows.append((mob.Serial, False, distance, hp_pct, poisoned, hp_pct))
+        return rows
+
+    def _get_vetkit_state(self):
+        """None when no vet kit is set or in the pack, else whether its cooldown is up"""
+        if not self.vetkit_graphic or not API.FindType(self.vetkit_graphic):
+            return None
+        return time.time() - self.last_vetkit_use >= self.vetkit_cooldown
+
+    def get_next_heal_action(self):
+        """
+        Pick the next heal.
+
+        Returns:
+            tuple: (target_serial, heal_type, is_self) or None. heal_type is
+            "bandage_self", "spell_self", "bandage_pet", "spell_pet", "cure"
+            or "vetkit" (target 0).
+        """
+        try:
+            player = API.Player
+            hp_pct = int(player.Hits * 100 / player.HitsMax) if player.HitsMax > 0 else 100
+            player_row = (player.Serial, getattr(player, 'IsDead', False), hp_pct,
+                          player.HitsMax - player.Hits, bool(getattr(player, 'IsPoisoned', False)))
+            decision = decide_heal(self.get_heal_config(), self._snapshot_pets(), player_row,
+                                   vetkit=self._get_vetkit_state())
+        except Exception as e:
+            API.SysMsg(f"Heal check error: {str(e)}", 32)
+            return None
+
+        if decision is None:
+            return None
+        target_serial, action, rule = decision
+        method = "spell" if self.use_magery_healing else "bandage"
+        if action == "cure_self":
+            return (target_serial, "bandage_self", True)  # Bandages cure poison
+        if action == "heal_self":
+            return (target_serial, method + "_self", True)
+        if action == "vetkit":
+            return (0, "vetkit", False)
+        if action == "cure":
+            return (target_serial, "cure", False)
+        return (target_serial, method + "_pet", False)
+
+    def execute_heal(self, target_serial, heal_type, is_self):
+        """
+        Start a heal picked by get_next_heal_action().
+
+        Args:
+            target_serial: Target serial (0 for vet kit)
+            heal_type: Heal type from get_next_heal_action()
+            is_self: True when healing the player
+
+        Returns:
+            bool: True if the heal was started
+        """
+        try:
+            if heal_type == "vetkit":
+                kit = API.FindType(self.vetkit_graphic) if self.vetkit_graphic else None
+                if not kit:
+                    return False
+                API.UseObject(kit.Serial, False)
+                self.last_vetkit_use = time.time()
+                if supply_tracker:
+                    supply_tracker.track_usage('vet_kits')
+            elif heal_type.startswith("spell"):
+                API.CancelTarget()
+                API.CancelPreTarget()
+                API.PreTarget(target_serial, "beneficial")
+                API.CastSpell("Greater Heal")
+            elif is_self:
+                if not API.BandageSelf():
+                    return self._warn_no_bandages()
+                if supply_tracker:
+                    supply_tracker.track_usage('bandages')
+            else:
+                # Pet bandage or cure (bandages cure poison)
+                bandages = API.FindType(BANDAGE)
+                if not bandages:
+                    return self._warn_no_bandages()
+                API.CancelTarget()
+                API.CancelPreTarget()
+                API.PreTarget(target_serial, "beneficial")
+                API.Pause(0.1)
+                API.UseObject(bandages.Serial, False)
+                API.Pause(0.1)
+                API.CancelPreTarget()
+                if supply_tracker:
+                    supply_tracker.track_usage('bandages')
+
+            self.out_of_bandages_warned = False
+            self.STATE = "healing"
+            self.heal_start_time = time.time()
+            self.current_heal_type = heal_type
+            return True
+
+        except Exception as e:
+            API.SysMsg(f"Heal error: {str(e)}", 32)
+            self.STATE = "idle"
+            return False
+
+    def _warn_no_bandages(self):
+        """Warn once about running out of bandages; returns False"""
+        if not self.out_of_bandages_warned:
+            API.SysMsg("Out of bandages!", 32)
+            self.out_of_bandages_warned = True
+        return False
+
+    def check_heal_complete(self):
+        """
+        Check if the current heal has finished.
+
+        Returns:
+            bool: True if no heal is in progress
+        """
+        if self.STATE != "healing":
+            return True
+
+        if self.current_heal_type == "vetkit":
+            delay = VET_KIT_DELAY
+        elif self.current_heal_type.startswith("spell"):
+            delay = CAST_DELAY
+        elif self.current_heal_type.endswith("_self"):
+            delay = BANDAGE_DELAY
+        else:
+            delay = VET_DELAY
+
+        if time.time() > self.heal_start_time + delay:
+            self.STATE = "idle"
+            self.current_heal_type = ""
+            return True
+        return False
+
     def configure_thresholds(self, player_threshold=None, tank_threshold=None, pet_threshold=None):
         """
         Configure healing thresholds.
@@ -1126,6 +1342,11 @@ class FleeSystem:
         self.last_position = (0, 0)
         self.stuck_check_time = 0
 
+        # Escape routes: walkability cached per area, one steps-to-spot map per safe spot
+        self.route_planner = RoutePlanner()
+        self.route = []  # Remaining Pathfind legs to the safe spot
+        self.route_key = ""
+
         # Statistics
         self.flee_count = 0
         self.flee_success = 0
@@ -1136,6 +1357,7 @@ class FleeSystem:
         self.MAX_FLEE_TIME = 20.0
         self.STUCK_TIMEOUT = 3.0
         self.SAFE_SPOT_ARRIVAL_DISTANCE = 2
+        self.ESCAPE_MAP_STEPS = 60  # How far from a safe spot its escape map reaches
 
     def initiate_flee(self, reason="danger_critical", danger_score=0):
         """
@@ -1192,6 +1414,21 @@ class FleeSystem:
                         API.SysMsg("Primary blocked, using backup safe spot", 43)
                         break
 
+            # Plan the escape route; prefer a safe spot that can actually be walked to
+            self.route_key = current_area.name
+            self.route = self._plan_escape(primary_spot, (px, py))
+            if self.route is None:
+                for spot in current_area.safe_spots:
+                    if spot is primary_spot or not self.npc_threat_map.is_position_safe(spot.x, spot.y):
+                        continue
+                    self.route = self._plan_escape(spot, (px, py))
+                    if self.route is not None:
+                        primary_spot = spot
+                        API.SysMsg("No route to safe spot, using reachable backup", 43)
+                        break
+            if self.route is None:
+                self.route = []  # No known route - let the client pathfind directly
+
             # Set flee state
             self.is_fleeing = True
             self.flee_start_time = time.time()
@@ -1254,13 +1491,21 @@ class FleeSystem:
                 last_x, last_y = self.last_position
 
                 if cur_x == last_x and cur_y == last_y:
-                    # Stuck! Try random direction
+                    # Stuck! Block the tile we couldn't enter and re-plan from here
                     API.SysMsg("Stuck! Trying alternate path...", 43)
                     if API.Pathfinding():
                         API.CancelPathfinding()
 
-                    import random
-                    API.Pathfind(cur_x + random.randint(-5, 5), cur_y + random.randint(-5, 5))
+                    next_leg = self.route[0] if self.route else (safe_spot.x, safe_spot.y)
+                    self.route_planner.note_stuck((cur_x, cur_y), next_leg)
+                    route = self._plan_escape(safe_spot, (cur_x, cur_y))
+                    if route:
+                        self.route = route
+                        API.Pathfind(route[0][0], route[0][1])
+                    else:
+                        import random
+                        self.route = []
+                        API.Pathfind(cur_x + random.randint(-5, 5), cur_y + random.randint(-5, 5))
                     API.Pause(0.5)
 
                 self.last_position = get_player_pos()
@@ -1269,8 +1514,15 @@ class FleeSystem:
             # Update NPC threat map
             self.npc_threat_map.scan_npcs()
 
-            # Start/resume pathfinding to safe spot
-            if not API.Pathfinding():
+            # Start/resume pathfinding along the route (legs end at the safe spot)
+            if self.route:
+                leg_x, leg_y = self.route[0]
+                if len(self.route) > 1 and max(abs(px - leg_x), abs(py - leg_y)) <= 1:
+                    self.route.pop(0)
+                    API.Pathfind(self.route[0][0], self.route[0][1])
+                elif not API.Pathfinding():
+                    API.Pathfind(leg_x, leg_y)
+            elif not API.Pathfinding():
                 API.Pathfind(safe_spot.x, safe_spot.y)
 
             return True
@@ -1281,6 +1533,36 @@ class FleeSystem:
             self.flee_failures += 1
             return False
 
+    def _plan_escape(self, safe_spot, position):
+        """
+        Plan Pathfind legs from position to a safe spot.
+
+        The steps-to-spot map is built on the first flee to each spot and
+        reused, so re-planning after a stumble only walks the path.
+
+        Args:
+            safe_spot: SafeSpot to reach
+            position: (x, y) to start from
+
+        Returns:
+            list: [(x, y), ...] legs ending at the spot, or None if unreachable
+        """
+        try:
+            return self.route_planner.escape_route(self.route_key, position,
+                                                   (safe_spot.x, safe_spot.y), self.ESCAPE_MAP_STEPS)
+        except Exception:
+            return None
+
+    def prepare_escape_routes(self, area):
+        """
+        Build escape maps for every safe spot of an area ahead of the first flee.
+
+        Args:
+            area: FarmingArea whose safe spots to map
+        """
+        for spot in area.safe_spots:
+            self.route_planner.escape_map(area.name, (spot.x, spot.y), self.ESCAPE_MAP_STEPS)
+
     def execute_escape_method(self, safe_spot):
         """
         Execute the escape method defined by the safe spot.
@@ -1542,7 +1824,7 @@ class DangerAssessment:
         try:
             pet_dangers = []
             for pet in pets_data:
-                mob = API.Mobiles.FindMobile(pet.get('serial', 0))
+                mob = find_mobile(pet.get('serial', 0))
                 if mob and not mob.IsDead:
                     current_hp = getattr(mob, 'Hits', 0)
                     max_hp = getattr(mob, 'HitsMax', 1)
@@ -1681,7 +1963,7 @@ class DangerAssessment:
             distances = []
 
             for pet in pets_data:
-                mob = API.Mobiles.FindMobile(pet.get('serial', 0))
+                mob = find_mobile(pet.get('serial', 0))
                 if mob and not mob.IsDead:
                     dist = getattr(mob, 'Distance', 99)
                     distances.append(dist)
@@ -1934,7 +2216,7 @@ class RecoverySystem:
                 needs_healing = False
                 for pet_info in self.pet_manager.pets:
                     pet_serial = pet_info.get('serial', 0)
-                    pet = API.Mobiles.FindMobile(pet_serial)
+                    pet = find_mobile(pet_serial)
 
                     if pet and not getattr(pet, 'IsDead', True):
                         pet_hp = getattr(pet, 'Hits', 0)
@@ -2168,7 +2450,7 @@ class RecoverySystem:
         try:
             for pet_info in self.pet_manager.pets:
                 pet_serial = pet_info.get('serial', 0)
-                pet = API.Mobiles.FindMobile(pet_serial)
+                pet = find_mobile(pet_serial)
 
                 if pet and getattr(pet, 'IsDead', False):
                     return True
@@ -2184,7 +2466,7 @@ class RecoverySystem:
             for pet_info in self.pet_manager.pets:
                 pet_serial = pet_info.get('serial', 0)
                 pet_name = pet_info.get('name', 'Unknown')
-                pet = API.Mobiles.FindMobile(pet_serial)
+                pet = find_mobile(pet_serial)
 
                 if pet and getattr(pet, 'IsDead', False):
                     self.resurrect_pet(pet_name)
@@ -2266,7 +2548,7 @@ class RecoverySystem:
             tank_pet = self.pet_manager.get_tank_pet()
             if tank_pet:
                 tank_serial = tank_pet.get('serial', 0)
-                tank_mob = API.Mobiles.FindMobile(tank_serial)
+                tank_mob = find_mobile(tank_serial)
                 if tank_mob and not getattr(tank_mob, 'IsDead', False):
                     tank_hp = getattr(tank_mob, 'Hits', 0)
                     tank_max_hp = getattr(tank_mob, 'HitsMax', 1)
@@ -2288,8 +2570,18 @@ class SupplyTracker:
     Tracks supply consumption rates, predicts depletion, optimizes banking timing.
     Monitors bandages and vet kits, calculates usage rates, and helps determine
     optimal times to bank (combining gold dump + restocking).
+
+    Each supply keeps its count samples in a ConsumptionRate (ring buffer +
+    running use-per-hour estimate) and counts come from the shared
+    InventoryIndex, so the banking checks can be asked every tick. New
+    samples are appended to the saved history string; it is only rewritten
+    from the ring buffer when it grows past twice the buffer size.
     """
 
+    HISTORY_SIZE = 100          # Samples kept per supply
+    HISTORY_MAX_AGE = 86400     # Saved samples older than this are dropped on load
+    RATE_HALF_LIFE = 1800.0     # Seconds until a consumption interval counts half
+
     def __init__(self, key_prefix):
         """
         Args:
@@ -2298,82 +2590,87 @@ class SupplyTracker:
         self.key_prefix = key_prefix
         self.check_interval = 30.0  # Check supplies every 30 seconds
         self.last_check_time = 0
+        self.inventory = get_inventory_index()
 
         # Tracked supplies
         self.supplies = {
-            'bandages': {'graphic': 0x0E21, 'usage_history': [], 'last_count': 0},
-            'vet_kits': {'graphic': 0x0E50, 'usage_history': [], 'last_count': 0}
+            'bandages': {'graphic': 0x0E21},
+            'vet_kits': {'graphic': 0x0E50}
         }
+        for data in self.supplies.values():
+            data['usage'] = ConsumptionRate(self.RATE_HALF_LIFE, self.HISTORY_SIZE)
+            data['saved'] = ""          # History string as last written
+            data['saved_entries'] = 0
+            data['pending'] = []        # Entries not written yet
 
         # Load historical data
         self._load_history()
 
+    def _history_key(self, supply_name):
+        return self.key_prefix + f"Supply_{supply_name}_History"
+
     def _load_history(self):
         """Load historical usage data from persistence"""
         try:
-            for supply_name in self.supplies:
-                history_str = API.GetPersistentVar(
-                    self.key_prefix + f"Supply_{supply_name}_History",
-                    "",
-                    API.PersistentVar.Char
-                )
-                if history_str:
-                    # Format: "timestamp:count|timestamp:count|..."
-                    entries = [x for x in history_str.split("|") if x]
-                    history = []
-                    for entry in entries[-100:]:  # Keep last 100 entries
-                        parts = entry.split(":")
-                        if len(parts) == 2:
-                            try:
-                                timestamp = float(parts[0])
-                                count = int(parts[1])
-                                # Only keep entries from last 24 hours
-                                if time.time() - timestamp < 86400:
-                                    history.append({'timestamp': timestamp, 'count': count})
-                            except (ValueError, IndexError):
-                                pass
-                    self.supplies[supply_name]['usage_history'] = history
+            cutoff = time.time() - self.HISTORY_MAX_AGE
+            for supply_name, data in self.supplies.items():
+                history_str = API.GetPersistentVar(self._history_key(supply_name), "", API.PersistentVar.Char)
+                if not history_str:
+                    continue
+                # Format: "timestamp:count|timestamp:count|..."
+                entries = [x for x in history_str.split("|") if x]
+                for entry in entries[-self.HISTORY_SIZE:]:
+                    parts = entry.split(":")
+                    if len(parts) == 2:
+                        try:
+                            timestamp = float(parts[0])
+                            count = int(parts[1])
+                            if timestamp > cutoff:
+                                data['usage'].add(count, timestamp)
+                        except (ValueError, IndexError):
+                            pass
+                data['saved'] = history_str
+                data['saved_entries'] = len(entries)
 
         except Exception as e:
             API.SysMsg(f"Load supply history error: {str(e)}", 32)
 
     def _save_history(self):
-        """Save historical usage data to persistence"""
+        """Append new samples to each changed supply's history"""
         try:
             for supply_name, data in self.supplies.items():
-                # Format: "timestamp:count|timestamp:count|..."
-                history = data['usage_history']
-                history_str = "|".join([f"{h['timestamp']}:{h['count']}" for h in history[-100:]])
-                API.SavePersistentVar(
-                    self.key_prefix + f"Supply_{supply_name}_History",
-                    history_str,
-                    API.PersistentVar.Char
-                )
+                pending = data['pending']
+                if not pending:
+                    continue
+                if data['saved_entries'] + len(pending) > self.HISTORY_SIZE * 2:
+                    # Compact: keep what the ring buffer holds
+                    entries = [f"{t:.0f}:{c}" for t, c in data['usage'].samples()]
+                    history_str = "|".join(entries)
+                    data['saved_entries'] = len(entries)
+                else:
+                    history_str = data['saved'] + ("|" if data['saved'] else "") + "|".join(pending)
+                    data['saved_entries'] += len(pending)
+                API.SavePersistentVar(self._history_key(supply_name), history_str, API.PersistentVar.Char)
+                data['saved'] = history_str
+                data['pending'] = []
         except Exception as e:
             API.SysMsg(f"Save supply history error: {str(e)}", 32)
 
     def _count_supply(self, graphic):
-        """Count items of given graphic in player's backpack"""
-        try:
-            backpack = API.Player.Backpack
-            if not backpack:
-                return 0
+        """Count items of given graphic in player's backpack (cached inventory)"""
+        return self.inventory.count(graphic)
 
-            count = 0
-            items = API.FindType(graphic, backpack.Serial)
-            if items:
-                for item in items:
-                    if item and hasattr(item, 'Amount'):
-                        count += item.Amount
-            return count
-        except Exception as e:
-            API.SysMsg(f"Count supply error: {str(e)}", 32)
-            return 0
+    def _sample(self, supply_name, now):
+        """Record the current count if it changed; written on the next save"""
+        data = self.supplies[supply_name]
+        count = self._count_supply(data['graphic'])
+        if data['usage'].add(count, now):
+            data['pending'].append(f"{now:.0f}:{count}")
 
     def track_usage(self, supply_name):
         """
         Manually track usage of a supply (call when using bandage/vet kit).
-        This increments the usage counter and stores timestamp.
+        Records the current count; it is saved with the next update_counts().
 
         Args:
             supply_name: Name of supply ('bandages' or 'vet_kits')
@@ -2382,25 +2679,7 @@ class SupplyTracker:
             return
 
         try:
-            current_count = self._count_supply(self.supplies[supply_name]['graphic'])
-            timestamp = time.time()
-
-            # Add to history
-            self.supplies[supply_name]['usage_history'].append({
-                'timestamp': timestamp,
-                'count': current_count
-            })
-
-            # Keep only last 24 hours
-            cutoff = timestamp - 86400
-            self.supplies[supply_name]['usage_history'] = [
-                h for h in self.supplies[supply_name]['usage_history']
-                if h['timestamp'] > cutoff
-            ]
-
-            # Save to persistence
-            self._save_history()
-
+            self._sample(supply_name, time.time())
         except Exception as e:
             API.SysMsg(f"Track usage error: {str(e)}", 32)
 
@@ -2416,76 +2695,32 @@ class SupplyTracker:
 
             self.last_check_time = current_time
 
-            for supply_name, data in self.supplies.items():
-                current_count = self._count_supply(data['graphic'])
-
-                # Only add to history if count changed
-                if current_count != data['last_count']:
-                    data['usage_history'].append({
-                        'timestamp': current_time,
-                        'count': current_count
-                    })
-
-                    # Keep only last 24 hours
-                    cutoff = current_time - 86400
-                    data['usage_history'] = [
-                        h for h in data['usage_history']
-                        if h['timestamp'] > cutoff
-                    ]
-
-                    data['last_count'] = current_count
+            for supply_name in self.supplies:
+                self._sample(supply_name, current_time)
 
-            # Save to persistence
+            # Save to persistence (only supplies with new samples)
             self._save_history()
 
         except Exception as e:
             API.SysMsg(f"Update counts error: {str(e)}", 32)
 
-    def _calculate_usage_rate(self, supply_name, hours=1.0):
+    def flush(self):
+        """Write samples recorded since the last check (call on stop)"""
+        self._save_history()
+
+    def _calculate_usage_rate(self, supply_name):
         """
-        Calculate usage rate per hour from historical data.
+        Usage rate per hour, weighted toward the last half hour.
 
         Args:
             supply_name: Name of supply
-            hours: Time window to calculate rate over (default 1 hour)
 
         Returns:
             Usage rate (items per hour), or 0 if insufficient data
         """
         if supply_name not in self.supplies:
             return 0
-
-        try:
-            history = self.supplies[supply_name]['usage_history']
-            if len(history) < 2:
-                return 0  # Not enough data
-
-            current_time = time.time()
-            cutoff = current_time - (hours * 3600)
-
-            # Get entries within time window
-            recent = [h for h in history if h['timestamp'] > cutoff]
-            if len(recent) < 2:
-                return 0
-
-            # Calculate rate from first to last entry in window
-            time_span = recent[-1]['timestamp'] - recent[0]['timestamp']
-            if time_span < 60:  # Need at least 1 minute of data
-                return 0
-
-            count_change = recent[0]['count'] - recent[-1]['count']  # Consumed = decrease
-            if count_change <= 0:
-                return 0  # Count increased or no change
-
-            # Convert to per-hour rate
-            hours_span = time_span / 3600.0
-            rate = count_change / hours_span
-
-            return max(0, rate)
-
-        except Exception as e:
-            API.SysMsg(f"Calculate usage rate error: {str(e)}", 32)
-            return 0
+        return self.supplies[supply_name]['usage'].rate()
 
     def predict_depletion_time(self, supply_name):
         """
@@ -2505,7 +2740,7 @@ class SupplyTracker:
             if current_count == 0:
                 return 0  # Already out
 
-            usage_rate = self._calculate_usage_rate(supply_name, hours=1.0)
+            usage_rate = self._calculate_usage_rate(supply_name)
             if usage_rate == 0:
                 return -1  # No usage data or not consuming
 
@@ -2548,7 +2783,7 @@ class SupplyTracker:
         try:
             for supply_name in self.supplies:
                 count = self._count_supply(self.supplies[supply_name]['graphic'])
-                rate = self._calculate_usage_rate(supply_name, hours=1.0)
+                rate = self._calculate_usage_rate(supply_name)
                 hours_remaining = self.predict_depletion_time(supply_name)
 
                 # Determine status
@@ -3444,48 +3679,27 @@ class StatisticsTracker:
         # Load persistent stats
         self._load_stats()
 
+    STAT_KEYS = (
+        ("gold_collected", "StatsGoldCollected"),
+        ("total_kills", "StatsTotalKills"),
+        ("player_deaths", "StatsPlayerDeaths"),
+        ("pet_deaths", "StatsPetDeaths"),
+    )
+
     def _load_stats(self):
         """Load persistent statistics from saved data"""
         try:
             # Load cumulative stats if they exist
-            self.gold_collected = int(API.GetPersistentVar(
-                self.key_prefix + "StatsGoldCollected", "0", API.PersistentVar.Char
-            ))
-            self.total_kills = int(API.GetPersistentVar(
-                self.key_prefix + "StatsTotalKills", "0", API.PersistentVar.Char
-            ))
-            self.player_deaths = int(API.GetPersistentVar(
-                self.key_prefix + "StatsPlayerDeaths", "0", API.PersistentVar.Char
-            ))
-            self.pet_deaths = int(API.GetPersistentVar(
-                self.key_prefix + "StatsPetDeaths", "0", API.PersistentVar.Char
-            ))
+            for attr, key in self.STAT_KEYS:
+                setattr(self, attr, int(settings_store.get(self.key_prefix + key, "0")))
         except:
             pass
 
     def _save_stats(self):
-        """Save persistent statistics"""
+        """Save persistent statistics (buffered - flushed by the main loop)"""
         try:
-            API.SavePersistentVar(
-                self.key_prefix + "StatsGoldCollected",
-                str(self.gold_collected),
-                API.PersistentVar.Char
-            )
-            API.SavePersistentVar(
-                self.key_prefix + "StatsTotalKills",
-                str(self.total_kills),
-                API.PersistentVar.Char
-            )
-            API.SavePersistentVar(
-                self.key_prefix + "StatsPlayerDeaths",
-                str(self.player_deaths),
-                API.PersistentVar.Char
-            )
-            API.SavePersistentVar(
-                self.key_prefix + "StatsPetDeaths",
-                str(self.pet_deaths),
-                API.PersistentVar.Char
-            )
+            for attr, key in self.STAT_KEYS:
+                settings_store.set(self.key_prefix + key, str(getattr(self, attr)))
         except:
             pass
 
@@ -5939,6 +6153,18 @@ def cleanup():
         except Exception as e:
             API.SysMsg(f"Settings save error: {str(e)}", 32)
 
+        # Don't leave other scripts thinking we're still fighting
+        set_combat_state(False)
+
+        # Write buffered stats
+        settings_store.close()
+        if supply_tracker:
+            supply_tracker.flush()
+
+        # Append the last ticks of the API trace
+        if api_trace:
+            api_trace.stop()
+
         # Final message
         API.SysMsg("Pet Farmer stopped. Session saved.", 90)
 
@@ -5999,7 +6225,7 @@ def initialize():
         npc_threat_map = NPCThreatMap()
 
         # Initialize healing system
-        healing_system = HealingSystem()
+        healing_system = HealingSystem(pet_manager)
         healing_system.sync_from_globals()
 
         # Initialize combat and patrol systems
@@ -6008,6 +6234,9 @@ def initialize():
 
         # Initialize flee and recovery systems
         flee_system = FleeSystem(area_manager, npc_threat_map, KEY_PREFIX)
+        startup_area = area_manager.get_current_area()
+        if startup_area:
+            flee_system.prepare_escape_routes(startup_area)  # Map safe spots before the first flee
         recovery_system = RecoverySystem(pet_manager, area_manager, KEY_PREFIX)
 
         # Initialize looting system
@@ -6097,6 +6326,9 @@ try:
         if supply_tracker:
             supply_tracker.update_counts()
 
+        # Flush buffered stats/settings (every few seconds)
+        settings_store.update()
+
         # Update statistics tracking (every 2s)
         if stats_tracker and current_time - last_stats_update >= 2.0:
             # Update state time tracking
@@ -6137,6 +6369,9 @@ try:
             API.SysMsg("Script stopped", 43)
             break
 
+        # Shared combat flag for other scripts (state bus - writes only on change)
+        set_combat_state(STATE == "engaging")
+
         API.Pause(0.1)  # Short pause only
 
 except Exception as e:
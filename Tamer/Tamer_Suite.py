@@ -49,6 +49,9 @@
 # ============================================================
 import API
 import time
+import sys
+import os
+from collections import deque
 
 __version__ = "3.0"
 
@@ -65,6 +68,10 @@ REZ_DELAY = 10.0              # Pet resurrection time
 CAST_DELAY = 2.5              # Greater Heal spell time
 VET_KIT_DELAY = 5.0           # Vet kit execution/cast time (adjustable in config)
 
+# === HEAL PIPELINING ===
+PIPELINE_HEALS = True         # Pick the next heal target before the current heal ends
+PIPELINE_LEAD = 0.4           # Seconds before the expected finish to pick it
+
 # === RANGES ===
 BANDAGE_RANGE = 2
 SPELL_RANGE = 10
@@ -95,7 +102,6 @@ SOUND_NO_BANDAGES = 0x1F4
 
 # === SHARED PERSISTENCE ===
 SHARED_PETS_KEY = "SharedPets_List"
-SHARED_COMBAT_KEY = "SharedCombat_Active"  # Shared combat flag for all scripts
 PET_SYNC_INTERVAL = 2.0
 MAX_PETS = 5
 
@@ -115,8 +121,49 @@ POTION_COOLDOWN = 10.0        # Universal potion cooldown
 # === TRAPPED POUCH ===
 TRAPPED_POUCH_MIN_HP = 30     # Min HP to safely use trapped pouch
 AUTO_TARGET_RANGE = 3         # Range for auto-targeting next enemy
+
+# === PROFILING ===
+PROFILE_API = False           # Record API call costs (report saved to logs/ on stop)
 # =======================================
 
+# Add parent directory to path for library imports
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(script_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+# Shared library (required - heal priority rules, state bus, scheduler)
+from LegionUtils import APIProfiler, FrameCache, SettingsStore
+from LegionUtils import get_shared_pets, save_shared_pets, get_shared_pets_version
+from LegionUtils import set_combat_state, is_in_combat as shared_is_in_combat
+from LegionUtils import Scheduler, PetDamageTracker, ActionTimingModel
+from LegionUtils import HealConfig, decide_heal, NO_RANGE_LIMIT
+
+api_profiler = None
+if PROFILE_API:
+    api_profiler = APIProfiler(API, name="Tamer_Suite", live_interval=10.0).install()
+
+# Per-tick mobile cache: repeat lookups of the same pet within one loop
+# iteration are answered from memory (cleared on ProcessCallbacks/Pause)
+frame_cache = FrameCache(API).install()
+find_mobile = frame_cache.find_mobile
+
+# Per-pet HP history: heal triage ranks pets by the HP they will have when
+# the bandage lands, so a pet taking burst damage is caught early
+damage_tracker = PetDamageTracker()
+
+# Write-behind settings: config changes are coalesced into one persistent
+# var write every few seconds instead of one write per click
+settings_store = SettingsStore("TamerSuite")
+
+def save_setting(key, value):
+    """Save a character setting (buffered)"""
+    settings_store.set(key, value)
+
+def load_setting(key, default):
+    """Load a character setting"""
+    return settings_store.get(key, default)
+
 # Persistent storage keys
 SETTINGS_KEY = "TamerSuite_XY"
 CONFIG_XY_KEY = "TamerSuite_ConfigXY"
@@ -138,6 +185,7 @@ EXPANDED_KEY = "TamerSuite_Expanded"
 SELF_DELAY_KEY = "TamerSuite_SelfDelay"
 VET_DELAY_KEY = "TamerSuite_VetDelay"
 VET_KIT_DELAY_KEY = "TamerSuite_VetKitDelay"
+HEAL_TIMING_KEY = "TamerSuite_HealTiming"
 
 # Hotkey binding persistence (command hotkeys)
 PAUSE_HOTKEY_KEY = "TamerSuite_HK_Pause"
@@ -160,6 +208,9 @@ heal_start_time = 0
 heal_target = 0
 heal_duration = 0
 heal_action_type = ""  # 'heal', 'rez', 'vetkit'
+staged_heal = None     # Next action picked near the end of this heal (False = nothing needed)
+heal_idle_since = 0    # When the last heal ended with more healing waiting (0 = none)
+heal_gaps = deque(maxlen=50)  # Seconds from one heal ending to the next one starting
 
 # ============ RUNTIME STATE ============
 # Healer
@@ -211,6 +262,7 @@ PETS = []
 PET_NAMES = {}
 PET_ACTIVE = {}  # Track which pets are active in ORDER mode
 last_known_pets_str = ""
+last_pets_version = 0  # State bus version of the pet list we last synced
 
 # Alert tracking
 last_critical_alert = 0
@@ -220,12 +272,10 @@ ALERT_COOLDOWN = 5.0
 # Position tracking (main window)
 last_known_x = 100
 last_known_y = 100
-last_position_check = 0
 
 # Position tracking (config window)
 config_last_known_x = 150
 config_last_known_y = 150
-config_last_position_check = 0
 
 # Friend rez (non-blocking state machine)
 rez_friend_target = 0
@@ -249,6 +299,7 @@ hotkeys = {
 
 # Pet hotkey system (NEW in v2.2)
 pet_hotkeys = ["", "", "", "", ""]  # Empty string = unbound
+key_actions = {}  # key -> action, rebuilt from hotkeys/pet_hotkeys on change
 priority_heal_pet = 0  # Serial of pet flagged for priority heal
 last_selected_pet_index = -1  # Which pet row shows [>] arrow
 
@@ -267,6 +318,28 @@ JOURNAL_REZ_FAIL = [
     "Target cannot be seen"
 ]
 
+# Journal messages that end a bandage (used to learn real heal timings)
+JOURNAL_FINISH_MESSAGES = [
+    "You finish applying the bandages",
+    "You heal what little damage",
+    "You apply the bandages, but they barely help",
+    "You have cured the target of all poisons"
+]
+
+JOURNAL_FAIL_MESSAGES = [
+    "You are too far away",
+    "You did not stay close enough",
+    "You were disturbed",
+    "That is too far away",
+    "Target cannot be seen"
+]
+
+# Learned bandage timings: each bandage is timed to its finish message and
+# the next heal is scheduled at this character's observed p95 instead of
+# the padded SELF_DELAY/VET_DELAY (which stay as defaults and upper bounds)
+heal_timing = ActionTimingModel({"self": SELF_DELAY, "pet": VET_DELAY},
+                                JOURNAL_FINISH_MESSAGES, JOURNAL_FAIL_MESSAGES)
+
 # ============ ALL POSSIBLE KEYS ============
 ALL_KEYS = [
     "F1", "F2", "F3", "F4", "F5", "F6", "F7", "F8", "F9", "F10", "F11", "F12",
@@ -427,7 +500,7 @@ def check_critical_alerts():
             pass
 
     for pet in PETS:
-        mob = API.FindMobile(pet)
+        mob = find_mobile(pet)
         if mob and mob.IsDead:
             last_alert = last_pet_death_alerts.get(pet, 0)
             if now - last_alert > ALERT_COOLDOWN:
@@ -577,7 +650,7 @@ def target_trapped_pouch():
             item = API.FindItem(target)
             if item:
                 trapped_pouch_serial = target
-                API.SavePersistentVar(TRAPPED_POUCH_SERIAL_KEY, str(trapped_pouch_serial), API.PersistentVar.Char)
+                save_setting(TRAPPED_POUCH_SERIAL_KEY, str(trapped_pouch_serial))
                 API.SysMsg("Trapped pouch set! Serial: " + hex(trapped_pouch_serial), 68)
                 update_config_pouch_display()
                 update_config_gump_state()
@@ -607,7 +680,7 @@ def handle_auto_target():
     # Clear any stray cursors before auto-targeting
     clear_stray_cursor()
 
-    target = API.FindMobile(current_attack_target)
+    target = find_mobile(current_attack_target)
 
     target_distance = target.Distance if target and hasattr(target, 'Distance') else 999
     if not target or target.IsDead or target_distance > AUTO_TARGET_RANGE:
@@ -639,10 +712,21 @@ def handle_auto_target():
             update_combat_flag()
 
 # ============ SHARED PET STORAGE (READ/WRITE) ============
+# The pet list and combat flag go through the in-memory LegionUtils
+# state bus (other scripts skip re-parsing until the version changes);
+# the persistent vars are still written as the durable copy.
+def publish_pets():
+    """Publish PETS to the state bus + persistent var"""
+    global last_pets_version
+    pet_dict = {}
+    for serial in PETS:
+        pet_dict[serial] = {"name": PET_NAMES.get(serial, "Pet"), "active": PET_ACTIVE.get(serial, True)}
+    last_pets_version = save_shared_pets(pet_dict)
+
 def save_pets_to_storage():
     global last_known_pets_str
     if len(PETS) == 0:
-        API.SavePersistentVar(SHARED_PETS_KEY, "", API.PersistentVar.Char)
+        publish_pets()
         last_known_pets_str = ""
         return
 
@@ -655,20 +739,45 @@ def save_pets_to_storage():
 
     new_str = "|".join(pairs)
     if new_str != last_known_pets_str:
-        API.SavePersistentVar(SHARED_PETS_KEY, new_str, API.PersistentVar.Char)
+        publish_pets()
         last_known_pets_str = new_str
 
 def update_combat_flag():
     """Update shared combat flag based on current attack target"""
     in_combat = current_attack_target != 0
-    API.SavePersistentVar(SHARED_COMBAT_KEY, str(in_combat), API.PersistentVar.Char)
+    set_combat_state(in_combat)  # Only writes when the flag changes
 
 def is_in_combat():
     """Check if any script reports being in combat"""
-    return API.GetPersistentVar(SHARED_COMBAT_KEY, "False", API.PersistentVar.Char) == "True"
+    return shared_is_in_combat()
+
+def sync_pets_from_bus():
+    """Sync PETS from the state bus. Returns False if nothing was published yet."""
+    global PETS, PET_NAMES, PET_ACTIVE, last_known_pets_str, last_pets_version
+    version = get_shared_pets_version()
+    if not version:
+        return False
+    if version == last_pets_version:
+        return True
+
+    last_pets_version = version
+    pets = get_shared_pets()
+    PETS = list(pets.keys())
+    PET_NAMES = {}
+    PET_ACTIVE = {}
+    pairs = []
+    for serial in PETS:
+        PET_NAMES[serial] = pets[serial]["name"]
+        PET_ACTIVE[serial] = pets[serial]["active"]
+        pairs.append(PET_NAMES[serial] + ":" + str(serial) + ":" + ("1" if PET_ACTIVE[serial] else "0"))
+    last_known_pets_str = "|".join(pairs)
+    return True
 
 def sync_pets_from_storage():
     global PETS, PET_NAMES, PET_ACTIVE, last_known_pets_str
+    if sync_pets_from_bus():
+        return
+
     stored = API.GetPersistentVar(SHARED_PETS_KEY, "", API.PersistentVar.Char)
 
     if stored == last_known_pets_str:
@@ -712,136 +821,216 @@ def sync_pets_from_storage():
             except Exception as e:
                 API.SysMsg("ERROR: Failed to load pet: " + name + " - " + str(e), 32)
 
+    # First load this session - seed the state bus for the other scripts
+    publish_pets()
+
 # ============ HEALING ACTIONS ============
-def get_next_heal_action():
-    if HEAL_SELF:
+def get_next_heal_action(skip=0):
+    """Pick the next heal: (target, action_type, duration, is_self) or None.
+
+    skip leaves out the target of the heal in progress when staging
+    the next one - its HP is about to change.
+    """
+    player_row = None
+    if HEAL_SELF and skip != API.Player.Serial:
         if is_player_poisoned():
             if drink_potion(POTION_CURE, "Cure"):
                 return None
         player = API.Player
-        if player.Hits < (player.HitsMax - SELF_HEAL_THRESHOLD):
-            if USE_POTIONS and potion_ready():
-                if drink_potion(POTION_HEAL, "Heal"):
-                    return None
-            return (API.Player.Serial, "heal_self", SELF_DELAY, True)
-
-    if trapped_pouch_enabled and is_player_paralyzed():
-        if use_trapped_pouch():
-            return None
+        player_row = (player.Serial, False, get_hp_percent(player),
+                      player.HitsMax - player.Hits, False)
 
     # Determine effective heal range based on magery or bandages
     heal_range = SPELL_RANGE if USE_MAGERY else BANDAGE_RANGE
+    heal_delay = CAST_DELAY if USE_MAGERY else get_heal_delay("pet")
 
-    # Priority heal pet (NEW in v2.2)
-    if priority_heal_pet != 0:
-        mob = API.FindMobile(priority_heal_pet)
-        if mob and not mob.IsDead and get_distance(mob) <= heal_range:
-            if is_poisoned(mob):
-                return (priority_heal_pet, "cure", CAST_DELAY if USE_MAGERY else VET_DELAY, False)
-            hp_pct = get_hp_percent(mob)
-            if hp_pct < PET_HP_PERCENT:
-                return (priority_heal_pet, "heal", CAST_DELAY if USE_MAGERY else VET_DELAY, False)
-
-    if TANK_PET != 0:
-        mob = API.FindMobile(TANK_PET)
-        if mob and not mob.IsDead and get_distance(mob) <= heal_range:
-            if is_poisoned(mob):
-                return (TANK_PET, "cure", CAST_DELAY if USE_MAGERY else VET_DELAY, False)
-            hp_pct = get_hp_percent(mob)
-            if hp_pct < TANK_HP_PERCENT:
-                return (TANK_PET, "heal", CAST_DELAY if USE_MAGERY else VET_DELAY, False)
-
-    # Check for poisoned pets first (always cure poison - critical)
+    # Read every pet once - the engine works from these rows. Thresholds
+    # use current HP; the lowest-HP pick ranks by the HP each pet is
+    # projected to have when this heal lands.
+    rows = []
     for pet in PETS:
-        mob = API.FindMobile(pet)
-        if not mob or mob.IsDead:
-            continue
-        dist = get_distance(mob)
-        if SKIP_OUT_OF_RANGE and dist > heal_range:
+        if pet == skip:
             continue
+        row = snapshot_pet(pet, heal_delay)
+        if row:
+            rows.append(row)
+    extra = []
+    for serial in (priority_heal_pet, TANK_PET):
+        if serial and serial not in PETS:
+            row = snapshot_pet(serial, heal_delay)
+            if row:
+                extra.append(row)
+
+    decision = decide_heal(get_heal_config(heal_range), rows, player_row, extra,
+                           get_vetkit_state(), (skip,) if skip else ())
+    if decision and decision[1] == "heal_self":
+        if USE_POTIONS and potion_ready():
+            if drink_potion(POTION_HEAL, "Heal"):
+                return None
+        return (decision[0], "heal_self", get_heal_delay("self"), True)
 
-        if is_poisoned(mob):
-            return (pet, "cure", CAST_DELAY if USE_MAGERY else VET_DELAY, False)
-
-    # Resurrect dead pets BEFORE healing injured ones
-    if USE_REZ:
-        for pet in PETS:
-            mob = API.FindMobile(pet)
-            if mob and mob.IsDead:
-                dist = get_distance(mob)
-                if dist <= SPELL_RANGE:
-                    return (pet, "rez", REZ_DELAY, False)
-
-    # Check if vet kit should be used (BEFORE individual healing)
-    # BUT skip if there are dead pets that need rezzing first
-    if VET_KIT_GRAPHIC != 0:
-        # Check for dead pets first - don't waste vet kit if pets need rezzing
-        has_dead_pets = False
-        if USE_REZ:
-            for pet in PETS:
-                mob = API.FindMobile(pet)
-                if mob and mob.IsDead:
-                    dist = get_distance(mob)
-                    if dist <= SPELL_RANGE:
-                        has_dead_pets = True
-                        break
-
-        # Only try vet kit if no dead pets and vet kit exists in inventory
-        if not has_dead_pets and API.FindType(VET_KIT_GRAPHIC):
-            hurt_count = 0
-            critical_count = 0
-            for pet in PETS:
-                mob = API.FindMobile(pet)
-                if not mob or mob.IsDead:
-                    continue
-                # Only count pets in range for vet kit to heal
-                dist = get_distance(mob)
-                if dist > BANDAGE_RANGE:
-                    continue
-                hp_pct = get_hp_percent(mob)
-                if hp_pct < VET_KIT_HP_PERCENT:
-                    hurt_count += 1
-                # Count critical HP pets (for emergency bypass)
-                if hp_pct < VET_KIT_CRITICAL_HP:
-                    critical_count += 1
-
-            # Use vet kit if threshold met (2+ pets hurt)
-            should_use = hurt_count >= VET_KIT_THRESHOLD
-            cooldown_ok = time.time() - last_vetkit_use > VET_KIT_COOLDOWN
-            # Emergency: 2+ pets critical, bypass cooldown
-            emergency = critical_count >= 2
-
-            if should_use and (cooldown_ok or emergency):
-                return (0, "vetkit", VET_KIT_DELAY, False)
-        else:
-            # Vet kit not found - warn once and fall through to bandaging
-            global out_of_vetkit_warned
-            if not out_of_vetkit_warned:
-                API.SysMsg("Vet kit not in pack - using bandages", 43)
-                out_of_vetkit_warned = True
-
-    # Find lowest HP pet for individual healing
-    lowest_hp = None
-    lowest_pct = 100
-    for pet in PETS:
-        mob = API.FindMobile(pet)
-        if not mob or mob.IsDead:
-            continue
-        dist = get_distance(mob)
-        if SKIP_OUT_OF_RANGE and dist > heal_range:
-            continue
+    if trapped_pouch_enabled and is_player_paralyzed():
+        if use_trapped_pouch():
+            return None
 
-        hp_pct = get_hp_percent(mob)
-        if hp_pct < PET_HP_PERCENT and hp_pct < lowest_pct:
-            lowest_hp = pet
-            lowest_pct = hp_pct
+    if not decision:
+        return None
+    target, action_type = decision[0], decision[1]
+    if action_type == "rez":
+        return (target, "rez", REZ_DELAY, False)
+    if action_type == "vetkit":
+        return (0, "vetkit", VET_KIT_DELAY, False)
+    return (target, action_type, heal_delay, False)
+
+def get_heal_config(heal_range):
+    """HealConfig for the current settings.
+
+    Order: self, priority pet (NEW in v2.2), tank, poisoned pets (always
+    cure - critical), dead pets (rez BEFORE healing injured ones), vet
+    kit, then the lowest HP pet. Dead pets in rez range are taken before
+    the vet kit, so the kit is never used while a pet waits for a rez.
+    """
+    return HealConfig(
+        (("self_missing", SELF_HEAL_THRESHOLD), ("priority", PET_HP_PERCENT),
+         ("tank", TANK_HP_PERCENT), ("cure", 0), ("rez", 0), ("vetkit", 0),
+         ("lowest", PET_HP_PERCENT)),
+        heal_range,
+        reach=heal_range if SKIP_OUT_OF_RANGE else NO_RANGE_LIMIT,
+        rez_range=SPELL_RANGE, tank=TANK_PET, priority=priority_heal_pet, rez=USE_REZ,
+        vetkit_range=BANDAGE_RANGE, vetkit_hp=VET_KIT_HP_PERCENT,
+        vetkit_critical_hp=VET_KIT_CRITICAL_HP, vetkit_min_pets=VET_KIT_THRESHOLD)
+
+def get_vetkit_state():
+    """None without a vet kit, else whether its cooldown is up"""
+    global out_of_vetkit_warned
+    if VET_KIT_GRAPHIC == 0:
+        return None
+    if not API.FindType(VET_KIT_GRAPHIC):
+        # Vet kit not found - warn once and fall through to bandaging
+        if not out_of_vetkit_warned:
+            API.SysMsg("Vet kit not in pack - using bandages", 43)
+            out_of_vetkit_warned = True
+        return None
+    return time.time() - last_vetkit_use > VET_KIT_COOLDOWN
+
+def get_heal_delay(kind):
+    """Bandage time for "self" or "pet": learned p95 if known, else the configured timer"""
+    return heal_timing.expected(kind)
+
+def start_bandage_timing(kind):
+    """Time a bandage applied just now; returns its start"""
+    now = time.time()
+    heal_timing.begin(kind, now)
+    return now
 
-    if lowest_hp:
-        return (lowest_hp, "heal", CAST_DELAY if USE_MAGERY else VET_DELAY, False)
+def stage_next_heal():
+    """Near the end of a heal, pick the next one so it fires the moment this one ends"""
+    global staged_heal
+    if staged_heal is not None or time.time() < heal_start_time + heal_duration - PIPELINE_LEAD:
+        return
+    staged_heal = get_next_heal_action(skip=heal_target) or False
+    if staged_heal:
+        cancel_all_targets()  # clear cursors now rather than when it fires
+
+def take_staged_heal():
+    """The staged action if it still holds now that the last heal landed, else None.
+
+    Only heals and cures are kept, and only while the target is still in
+    range and hurt/poisoned. The pet just healed is re-read too - if it
+    is still lower than the staged pet, a full triage runs instead.
+    """
+    global staged_heal
+    action, staged_heal = staged_heal, None
+    if not action:
+        return None
+    target, action_type = action[0], action[1]
+    if action_type == "heal_self":
+        player = API.Player
+        return action if player.Hits < (player.HitsMax - SELF_HEAL_THRESHOLD) else None
+    if action_type not in ("heal", "cure"):
+        return None
 
-    return None
+    heal_range = SPELL_RANGE if USE_MAGERY else BANDAGE_RANGE
+    row = snapshot_pet(target)
+    if not row or row[1] or row[2] > heal_range:
+        return None
+    if action_type == "cure":
+        return action if row[4] else None
+    if row[3] >= PET_HP_PERCENT:
+        return None
+    if heal_target in PETS and heal_target != target:
+        last = snapshot_pet(heal_target)
+        if last and not last[1] and last[2] <= heal_range and last[3] < row[3]:
+            return None
+    return action
+
+def run_next_heal():
+    """Start the next heal (staged one first) and record the idle gap before it"""
+    global heal_idle_since
+    action = take_staged_heal()
+    staged = action is not None
+    if not staged:
+        action = get_next_heal_action()
+    if action:
+        target, action_type, duration, is_self = action
+        start_heal_action(target, action_type, duration, is_self, staged)
+        if HEAL_STATE != "idle" and heal_idle_since:
+            heal_gaps.append(max(0.0, heal_start_time - heal_idle_since))
+    heal_idle_since = 0
+
+def end_heal_action(ended_at):
+    """Heal/rez/vet kit is over - go idle and remember when for the gap metric"""
+    global HEAL_STATE, heal_idle_since
+    HEAL_STATE = "idle"
+    heal_idle_since = ended_at
+    statusLabel.SetText("Running" if not PAUSED else "PAUSED")
+
+def get_heal_gap_stats():
+    """(average, max, count) idle seconds between back-to-back heals"""
+    if not heal_gaps:
+        return (0.0, 0.0, 0)
+    return (sum(heal_gaps) / len(heal_gaps), max(heal_gaps), len(heal_gaps))
+
+def pretarget_heal(target, staged=False, settle=0.2):
+    """PreTarget a heal/cure target before using the bandage or casting.
+
+    Staged heals cleared cursors when they were picked, so they skip
+    cancel_all_targets() and only settle for PRETARGET_DELAY.
+    """
+    global script_cursor_time
+    if staged:
+        script_cursor_time = time.time()
+        settle = min(settle, PRETARGET_DELAY)
+    else:
+        cancel_all_targets()
+    API.PreTarget(target, "beneficial")
+    API.Pause(settle)
 
-def start_heal_action(target, action_type, duration, is_self):
+def snapshot_pet(serial, lead=0):
+    """Read a pet into a triage row:
+    (serial, dead, distance, hp_pct, poisoned, projected_pct)
+
+    projected_pct is the HP% expected `lead` seconds from now at the pet's
+    recent damage rate. Returns None if the mobile isn't visible.
+    """
+    mob = find_mobile(serial)
+    if not mob:
+        return None
+    if mob.IsDead:
+        return (serial, True, get_distance(mob), 0, False, 0)
+    return (serial, False, get_distance(mob), get_hp_percent(mob), is_poisoned(mob),
+            get_projected_hp_percent(mob, lead))
+
+def track_pet_damage():
+    """Sample every pet's HP into the damage tracker (once per heal tick)"""
+    for pet in PETS:
+        damage_tracker.observe(find_mobile(pet))
+
+def get_projected_hp_percent(mob, seconds):
+    """HP% the mob will have after `seconds` at its recent damage rate"""
+    return int(damage_tracker.projected_percent(mob, seconds))
+
+def start_heal_action(target, action_type, duration, is_self, staged=False):
     global HEAL_STATE, heal_start_time, heal_target, heal_duration, heal_action_type
     global out_of_bandages_warned, out_of_bandages_cooldown
 
@@ -870,17 +1059,16 @@ def start_heal_action(target, action_type, duration, is_self):
         if not check_bandages():
             return
         try:
-            cancel_all_targets()
             try:
-                API.PreTarget(target, "beneficial")
-                API.Pause(0.1)
+                pretarget_heal(target, staged, 0.1)
                 if API.FindType(BANDAGE):
                     API.HeadMsg("Healing!", target, 68)
                     API.UseObject(API.Found, False)
+                    bandage_time = start_bandage_timing("self")
                     API.Pause(0.1)
 
                     HEAL_STATE = "healing"
-                    heal_start_time = time.time()
+                    heal_start_time = bandage_time
                     heal_target = target
                     heal_duration = duration
                     heal_action_type = action_type
@@ -898,7 +1086,7 @@ def start_heal_action(target, action_type, duration, is_self):
             API.CancelPreTarget()  # Only cancel PreTarget, don't touch active cursors
         return
 
-    mob = API.FindMobile(target)
+    mob = find_mobile(target)
     if not mob:
         return
 
@@ -934,9 +1122,7 @@ def start_heal_action(target, action_type, duration, is_self):
     if action_type == "cure":
         if USE_MAGERY:
             try:
-                cancel_all_targets()
-                API.PreTarget(target, "beneficial")
-                API.Pause(0.2)
+                pretarget_heal(target, staged)
 
                 API.Cast("Cure")
                 API.Pause(0.3)  # Wait for pretarget consumption
@@ -957,17 +1143,16 @@ def start_heal_action(target, action_type, duration, is_self):
             if not check_bandages():
                 return
             try:
-                cancel_all_targets()
-                API.PreTarget(target, "beneficial")
-                API.Pause(0.2)
+                pretarget_heal(target, staged)
 
                 if API.FindType(BANDAGE):
                     API.UseObject(API.Found, False)
+                    bandage_time = start_bandage_timing("pet")
                     API.Pause(0.3)  # Wait for pretarget consumption
                     API.HeadMsg("Curing!", target, 68)
 
                     HEAL_STATE = "healing"
-                    heal_start_time = time.time()
+                    heal_start_time = bandage_time
                     heal_target = target
                     heal_duration = duration
                     heal_action_type = action_type
@@ -987,9 +1172,7 @@ def start_heal_action(target, action_type, duration, is_self):
     if action_type == "heal":
         if USE_MAGERY:
             try:
-                cancel_all_targets()
-                API.PreTarget(target, "beneficial")
-                API.Pause(0.2)
+                pretarget_heal(target, staged)
 
                 API.Cast("Greater Heal")
                 API.Pause(0.3)  # Wait for pretarget consumption
@@ -1010,17 +1193,16 @@ def start_heal_action(target, action_type, duration, is_self):
             if not check_bandages():
                 return
             try:
-                cancel_all_targets()
-                API.PreTarget(target, "beneficial")
-                API.Pause(0.2)
+                pretarget_heal(target, staged)
 
                 if API.FindType(BANDAGE):
                     API.UseObject(API.Found, False)
+                    bandage_time = start_bandage_timing("pet")
                     API.Pause(0.3)  # Wait for pretarget consumption
                     API.HeadMsg("Healing!", target, 68)
 
                     HEAL_STATE = "healing"
-                    heal_start_time = time.time()
+                    heal_start_time = bandage_time
                     heal_target = target
                     heal_duration = duration
                     heal_action_type = action_type
@@ -1037,24 +1219,32 @@ def start_heal_action(target, action_type, duration, is_self):
                 API.CancelPreTarget()  # Only cancel PreTarget, don't touch active cursors
 
 def check_heal_complete():
-    global HEAL_STATE
-
     if HEAL_STATE == "idle":
         return
 
     # Special check for resurrection - exit early if pet is alive
     if HEAL_STATE == "rezzing" and heal_target != 0:
-        mob = API.FindMobile(heal_target)
+        mob = find_mobile(heal_target)
         if mob and not mob.IsDead:
             # Pet is alive! Exit rezzing state immediately
-            HEAL_STATE = "idle"
-            statusLabel.SetText("Running" if not PAUSED else "PAUSED")
+            end_heal_action(time.time())
             return
 
-    elapsed = time.time() - heal_start_time
-    if elapsed >= heal_duration:
-        HEAL_STATE = "idle"
-        statusLabel.SetText("Running" if not PAUSED else "PAUSED")
+    # Bandage finished (or failed) in the journal - free right away. Only
+    # the bandage this heal started counts: after a timed-out bandage the
+    # next heal may be a spell or vet kit, and a late "finish applying"
+    # line must not end it (begin() records that line on the next bandage)
+    if heal_timing.pending and heal_timing.pending[1] == heal_start_time:
+        result = heal_timing.poll()
+        if result:
+            if result == "finish":
+                save_setting(HEAL_TIMING_KEY, heal_timing.to_string())
+            update_heal_timing_display()
+            end_heal_action(heal_timing.last_end or time.time())
+            return
+
+    if time.time() - heal_start_time >= heal_duration:
+        end_heal_action(heal_start_time + heal_duration)
 
 # ============ FRIEND REZ LOGIC ============
 def attempt_friend_rez():
@@ -1069,7 +1259,7 @@ def attempt_friend_rez():
             statusLabel.SetText("Running")
             return
 
-        mob = API.FindMobile(rez_friend_target)
+        mob = find_mobile(rez_friend_target)
         if not mob:
             API.SysMsg("Friend not found. Rez cancelled.", 43)
             rez_friend_active = False
@@ -1125,7 +1315,7 @@ def attempt_friend_rez():
         elapsed = time.time() - rez_friend_start_time
         if elapsed >= REZ_FRIEND_DELAY:
             # Rez attempt complete, check result
-            mob = API.FindMobile(rez_friend_target)
+            mob = find_mobile(rez_friend_target)
             if mob and not mob.IsDead:
                 API.SysMsg("Friend is alive! Rez complete.", 68)
                 rez_friend_active = False
@@ -1252,7 +1442,7 @@ def execute_order_mode(base_cmd, attack_target):
     try:
         for i, serial in enumerate(active_pets):
             name = PET_NAMES.get(serial, "Pet")
-            mob = API.FindMobile(serial)
+            mob = find_mobile(serial)
             if not mob:
                 continue
             dist = get_distance(mob)
@@ -1293,7 +1483,7 @@ def add_pet():
     try:
         target = API.RequestTarget(timeout=10)
         if target:
-            mob = API.FindMobile(target)
+            mob = find_mobile(target)
             if mob:
                 name = get_mob_name(mob, "Pet")
                 if target not in PETS:
@@ -1373,7 +1563,7 @@ def make_pet_click_callback(idx):
         if idx >= len(PETS):
             return
         serial = PETS[idx]
-        mob = API.FindMobile(serial)
+        mob = find_mobile(serial)
         if not mob:
             API.SysMsg("Pet not found!", 32)
             return
@@ -1408,7 +1598,7 @@ def toggle_pet_active(idx):
 def toggle_expand():
     global is_expanded
     is_expanded = not is_expanded
-    API.SavePersistentVar(EXPANDED_KEY, str(is_expanded), API.PersistentVar.Char)
+    save_setting(EXPANDED_KEY, str(is_expanded))
 
     if is_expanded:
         expand_window()
@@ -1499,7 +1689,9 @@ def adjust_self_delay(increment):
         SELF_DELAY = max(0.5, SELF_DELAY - 0.1)
 
     # Save immediately
-    API.SavePersistentVar(SELF_DELAY_KEY, str(SELF_DELAY), API.PersistentVar.Char)
+    save_setting(SELF_DELAY_KEY, str(SELF_DELAY))
+    heal_timing.set_default("self", SELF_DELAY)
+    update_heal_timing_display()
 
     # Update display
     if "self_delay_val" in config_controls:
@@ -1514,7 +1706,9 @@ def adjust_vet_delay(increment):
         VET_DELAY = max(0.5, VET_DELAY - 0.1)
 
     # Save immediately
-    API.SavePersistentVar(VET_DELAY_KEY, str(VET_DELAY), API.PersistentVar.Char)
+    save_setting(VET_DELAY_KEY, str(VET_DELAY))
+    heal_timing.set_default("pet", VET_DELAY)
+    update_heal_timing_display()
 
     # Update display
     if "vet_delay_val" in config_controls:
@@ -1529,7 +1723,7 @@ def adjust_vet_kit_delay(increment):
         VET_KIT_DELAY = max(0.5, VET_KIT_DELAY - 0.1)
 
     # Save immediately
-    API.SavePersistentVar(VET_KIT_DELAY_KEY, str(VET_KIT_DELAY), API.PersistentVar.Char)
+    save_setting(VET_KIT_DELAY_KEY, str(VET_KIT_DELAY))
 
     # Update display
     if "vet_kit_delay_val" in config_controls:
@@ -1548,7 +1742,7 @@ def build_config_gump():
     config_controls = {}
 
     # Load saved position or use default (offset from main window)
-    saved_pos = API.GetPersistentVar(CONFIG_XY_KEY, "150,150", API.PersistentVar.Char)
+    saved_pos = load_setting(CONFIG_XY_KEY, "150,150")
     pos_parts = saved_pos.split(',')
     cfg_x, cfg_y = int(pos_parts[0]), int(pos_parts[1])
 
@@ -1867,6 +2061,28 @@ def build_config_gump():
     API.Gumps.AddControlOnClick(config_controls["auto_target_on"], lambda: toggle_auto_target(True))
     config_gump.Add(config_controls["auto_target_on"])
 
+    # Learned heal timing (below COMMANDS)
+    timing_y = y_start + 118
+    timing_box = API.Gumps.CreateGumpColorBox(0.9, "#0f0f1a")
+    timing_box.SetRect(col2_x, timing_y, 160, 66)
+    config_gump.Add(timing_box)
+
+    timing_hdr = API.Gumps.CreateGumpTTFLabel("HEAL TIMING (p95)", 15, "#66ccff")
+    timing_hdr.SetPos(col2_x + 20, timing_y + 3)
+    config_gump.Add(timing_hdr)
+
+    config_controls["timing_self"] = API.Gumps.CreateGumpTTFLabel(format_heal_timing("self"), 15, "#dddddd")
+    config_controls["timing_self"].SetPos(col2_x + 4, timing_y + 19)
+    config_gump.Add(config_controls["timing_self"])
+
+    config_controls["timing_pet"] = API.Gumps.CreateGumpTTFLabel(format_heal_timing("pet"), 15, "#dddddd")
+    config_controls["timing_pet"].SetPos(col2_x + 4, timing_y + 34)
+    config_gump.Add(config_controls["timing_pet"])
+
+    config_controls["timing_gap"] = API.Gumps.CreateGumpTTFLabel(format_heal_gap(), 15, "#aaaaaa")
+    config_controls["timing_gap"].SetPos(col2_x + 4, timing_y + 49)
+    config_gump.Add(config_controls["timing_gap"])
+
     # --- COLUMN 3: EQUIPMENT (X: 344, W: 168) ---
     col3_x = 344
     col3_y = y_start
@@ -2217,7 +2433,7 @@ def close_config_gump():
     if config_gump is not None:
         # Always use tracked position - gump is being disposed so GetX/GetY returns 0
         if config_last_known_x >= 0 and config_last_known_y >= 0:
-            API.SavePersistentVar(CONFIG_XY_KEY, str(config_last_known_x) + "," + str(config_last_known_y), API.PersistentVar.Char)
+            save_setting(CONFIG_XY_KEY, str(config_last_known_x) + "," + str(config_last_known_y))
 
         config_gump.Dispose()
         config_gump = None
@@ -2229,7 +2445,7 @@ def on_config_closed():
 
     # Always use tracked position - gump is being disposed so GetX/GetY returns 0
     if config_last_known_x >= 0 and config_last_known_y >= 0:
-        API.SavePersistentVar(CONFIG_XY_KEY, str(config_last_known_x) + "," + str(config_last_known_y), API.PersistentVar.Char)
+        save_setting(CONFIG_XY_KEY, str(config_last_known_x) + "," + str(config_last_known_y))
         API.SysMsg("Config position saved: " + str(config_last_known_x) + "," + str(config_last_known_y), 68)
 
     # Clear references
@@ -2308,14 +2524,14 @@ def toggle_magery_config(use_mage):
     """Toggle magery mode from config window"""
     global USE_MAGERY
     USE_MAGERY = use_mage
-    API.SavePersistentVar(MAGERY_KEY, str(USE_MAGERY), API.PersistentVar.Char)
+    save_setting(MAGERY_KEY, str(USE_MAGERY))
     update_config_gump_state()
 
 def get_tank_name():
     """Get tank pet name for display"""
     if TANK_PET == 0:
         return "None"
-    mob = API.FindMobile(TANK_PET)
+    mob = find_mobile(TANK_PET)
     if mob:
         return get_mob_name(mob)
     return "Unknown"
@@ -2324,62 +2540,62 @@ def get_tank_name():
 def toggle_magery():
     global USE_MAGERY
     USE_MAGERY = not USE_MAGERY
-    API.SavePersistentVar(MAGERY_KEY, str(USE_MAGERY), API.PersistentVar.Char)
+    save_setting(MAGERY_KEY, str(USE_MAGERY))
     update_config_gump_state()
 
 def toggle_self(state):
     global HEAL_SELF
     HEAL_SELF = state
-    API.SavePersistentVar(HEALSELF_KEY, str(HEAL_SELF), API.PersistentVar.Char)
+    save_setting(HEALSELF_KEY, str(HEAL_SELF))
     update_config_healer_display()
     update_config_gump_state()
 
 def toggle_rez(state):
     global USE_REZ
     USE_REZ = state
-    API.SavePersistentVar(REZ_KEY, str(USE_REZ), API.PersistentVar.Char)
+    save_setting(REZ_KEY, str(USE_REZ))
     update_config_healer_display()
     update_config_gump_state()
 
 def toggle_skip(state):
     global SKIP_OUT_OF_RANGE
     SKIP_OUT_OF_RANGE = state
-    API.SavePersistentVar(SKIPOOR_KEY, str(SKIP_OUT_OF_RANGE), API.PersistentVar.Char)
+    save_setting(SKIPOOR_KEY, str(SKIP_OUT_OF_RANGE))
     update_config_healer_display()
     update_config_gump_state()
 
 def toggle_reds(state):
     global TARGET_REDS
     TARGET_REDS = state
-    API.SavePersistentVar(REDS_KEY, str(TARGET_REDS), API.PersistentVar.Char)
+    save_setting(REDS_KEY, str(TARGET_REDS))
     update_config_cmd_display()
     update_config_gump_state()
 
 def toggle_grays(state):
     global TARGET_GRAYS
     TARGET_GRAYS = state
-    API.SavePersistentVar(GRAYS_KEY, str(TARGET_GRAYS), API.PersistentVar.Char)
+    save_setting(GRAYS_KEY, str(TARGET_GRAYS))
     update_config_cmd_display()
     update_config_gump_state()
 
 def toggle_potions(state):
     global USE_POTIONS
     USE_POTIONS = state
-    API.SavePersistentVar(POTION_KEY, str(USE_POTIONS), API.PersistentVar.Char)
+    save_setting(POTION_KEY, str(USE_POTIONS))
     update_config_cmd_display()
     update_config_gump_state()
 
 def toggle_auto_target(state):
     global auto_target
     auto_target = state
-    API.SavePersistentVar(AUTO_TARGET_KEY, str(auto_target), API.PersistentVar.Char)
+    save_setting(AUTO_TARGET_KEY, str(auto_target))
     update_config_cmd_display()
     update_config_gump_state()
 
 def toggle_use_trapped_pouch(state):
     global trapped_pouch_enabled
     trapped_pouch_enabled = state
-    API.SavePersistentVar(USE_TRAPPED_POUCH_KEY, str(trapped_pouch_enabled), API.PersistentVar.Char)
+    save_setting(USE_TRAPPED_POUCH_KEY, str(trapped_pouch_enabled))
     update_config_cmd_display()
     update_config_gump_state()
 
@@ -2392,7 +2608,7 @@ def toggle_pause():
 def toggle_mode():
     global ATTACK_MODE
     ATTACK_MODE = "ORDER" if ATTACK_MODE == "ALL" else "ALL"
-    API.SavePersistentVar(MODE_KEY, ATTACK_MODE, API.PersistentVar.Char)
+    save_setting(MODE_KEY, ATTACK_MODE)
     modeBtn.SetText("[" + ATTACK_MODE + "]")
     modeBtn.SetBackgroundHue(66 if ATTACK_MODE == "ORDER" else 68)
     update_config_gump_state()
@@ -2405,10 +2621,10 @@ def set_tank():
     try:
         target = API.RequestTarget(timeout=10)
         if target:
-            mob = API.FindMobile(target)
+            mob = find_mobile(target)
             if mob:
                 TANK_PET = target
-                API.SavePersistentVar(TANK_KEY, str(TANK_PET), API.PersistentVar.Char)
+                save_setting(TANK_KEY, str(TANK_PET))
                 name = get_mob_name(mob)
                 API.SysMsg("Tank set: " + name, 68)
                 update_tank_display()
@@ -2426,7 +2642,7 @@ def set_tank():
 def clear_tank():
     global TANK_PET
     TANK_PET = 0
-    API.SavePersistentVar(TANK_KEY, "0", API.PersistentVar.Char)
+    save_setting(TANK_KEY, "0")
     API.SysMsg("Tank cleared", 90)
     update_tank_display()
     update_config_tank_display()
@@ -2443,7 +2659,7 @@ def set_vetkit():
             item = API.FindItem(target)
             if item:
                 VET_KIT_GRAPHIC = item.Graphic if hasattr(item, 'Graphic') else 0
-                API.SavePersistentVar(VETKIT_KEY, str(VET_KIT_GRAPHIC), API.PersistentVar.Char)
+                save_setting(VETKIT_KEY, str(VET_KIT_GRAPHIC))
                 API.SysMsg("Vet kit set! Graphic: " + hex(VET_KIT_GRAPHIC), 68)
                 update_vetkit_display()
                 update_config_vetkit_display()
@@ -2460,7 +2676,7 @@ def set_vetkit():
 def clear_vetkit():
     global VET_KIT_GRAPHIC
     VET_KIT_GRAPHIC = 0
-    API.SavePersistentVar(VETKIT_KEY, "0", API.PersistentVar.Char)
+    save_setting(VETKIT_KEY, "0")
     API.SysMsg("Vet kit cleared", 90)
     update_vetkit_display()
     update_config_vetkit_display()
@@ -2472,7 +2688,7 @@ def on_set_trapped_pouch():
 def clear_trapped_pouch():
     global trapped_pouch_serial
     trapped_pouch_serial = 0
-    API.SavePersistentVar(TRAPPED_POUCH_SERIAL_KEY, "0", API.PersistentVar.Char)
+    save_setting(TRAPPED_POUCH_SERIAL_KEY, "0")
     API.SysMsg("Trapped pouch cleared", 90)
     update_config_pouch_display()
     update_config_gump_state()
@@ -2496,7 +2712,7 @@ def toggle_rez_friend():
     try:
         target = API.RequestTarget(timeout=10)
         if target:
-            mob = API.FindMobile(target)
+            mob = find_mobile(target)
             if mob:
                 rez_friend_target = target
                 rez_friend_name = get_mob_name(mob, "Friend")
@@ -2574,29 +2790,34 @@ def make_key_handler(key_name):
                 return
 
         # Not capturing - execute action if this key is bound
-        # Check command hotkeys
-        for cmd, bound_key in hotkeys.items():
-            if bound_key == key_name:
-                if cmd == "pause":
-                    toggle_pause()
-                elif cmd == "kill":
-                    all_kill_hotkey()
-                elif cmd == "guard":
-                    all_guard()
-                elif cmd == "follow":
-                    all_follow()
-                elif cmd == "stay":
-                    all_stay()
-                return
-
-        # Check pet hotkeys (NEW v2.2)
-        for i in range(5):
-            if pet_hotkeys[i] == key_name:
-                execute_pet_hotkey(i)
-                return
+        action = key_actions.get(key_name)
+        if action:
+            action()
 
     return handler
 
+def rebuild_key_actions():
+    """Rebuild the key -> action table (call after any binding changes)
+
+    Command hotkeys win over pet hotkeys bound to the same key.
+    """
+    global key_actions
+    commands = {
+        "pause": toggle_pause,
+        "kill": all_kill_hotkey,
+        "guard": all_guard,
+        "follow": all_follow,
+        "stay": all_stay,
+    }
+    table = {}
+    for cmd, bound_key in hotkeys.items():
+        if bound_key and cmd in commands:
+            table.setdefault(bound_key, commands[cmd])
+    for i, bound_key in enumerate(pet_hotkeys[:5]):
+        if bound_key:
+            table.setdefault(bound_key, lambda i=i: execute_pet_hotkey(i))
+    key_actions = table
+
 def start_capture_pause():
     global capturing_for
     capturing_for = "pause"
@@ -2672,7 +2893,7 @@ def execute_pet_hotkey(pet_index):
         return
 
     serial = PETS[pet_index]
-    mob = API.FindMobile(serial)
+    mob = find_mobile(serial)
 
     if not mob:
         API.SysMsg("Pet not found!", 32)
@@ -2693,30 +2914,32 @@ def execute_pet_hotkey(pet_index):
     API.SysMsg("Following " + name + " (priority heal enabled)", 68)
 
 def save_hotkey(cmd, key):
+    rebuild_key_actions()
     if cmd == "pause":
-        API.SavePersistentVar(PAUSE_HOTKEY_KEY, key, API.PersistentVar.Char)
+        save_setting(PAUSE_HOTKEY_KEY, key)
     elif cmd == "kill":
-        API.SavePersistentVar(KILL_HOTKEY_KEY, key, API.PersistentVar.Char)
+        save_setting(KILL_HOTKEY_KEY, key)
     elif cmd == "guard":
-        API.SavePersistentVar(GUARD_HOTKEY_KEY, key, API.PersistentVar.Char)
+        save_setting(GUARD_HOTKEY_KEY, key)
     elif cmd == "follow":
-        API.SavePersistentVar(FOLLOW_HOTKEY_KEY, key, API.PersistentVar.Char)
+        save_setting(FOLLOW_HOTKEY_KEY, key)
     elif cmd == "stay":
-        API.SavePersistentVar(STAY_HOTKEY_KEY, key, API.PersistentVar.Char)
+        save_setting(STAY_HOTKEY_KEY, key)
 
 def load_hotkeys():
-    hotkeys["pause"] = API.GetPersistentVar(PAUSE_HOTKEY_KEY, "PAUSE", API.PersistentVar.Char)
-    hotkeys["kill"] = API.GetPersistentVar(KILL_HOTKEY_KEY, "TAB", API.PersistentVar.Char)
-    hotkeys["guard"] = API.GetPersistentVar(GUARD_HOTKEY_KEY, "1", API.PersistentVar.Char)
-    hotkeys["follow"] = API.GetPersistentVar(FOLLOW_HOTKEY_KEY, "2", API.PersistentVar.Char)
-    hotkeys["stay"] = API.GetPersistentVar(STAY_HOTKEY_KEY, "", API.PersistentVar.Char)
+    hotkeys["pause"] = load_setting(PAUSE_HOTKEY_KEY, "PAUSE")
+    hotkeys["kill"] = load_setting(KILL_HOTKEY_KEY, "TAB")
+    hotkeys["guard"] = load_setting(GUARD_HOTKEY_KEY, "1")
+    hotkeys["follow"] = load_setting(FOLLOW_HOTKEY_KEY, "2")
+    hotkeys["stay"] = load_setting(STAY_HOTKEY_KEY, "")
 
 def save_pet_hotkeys():
     """Save pet hotkey bindings to persistence (NEW v2.2)"""
+    rebuild_key_actions()
     keys = [PET1_HOTKEY_KEY, PET2_HOTKEY_KEY, PET3_HOTKEY_KEY, PET4_HOTKEY_KEY, PET5_HOTKEY_KEY]
     for i in range(5):
         value = pet_hotkeys[i] if i < len(pet_hotkeys) else ""
-        API.SavePersistentVar(keys[i], value, API.PersistentVar.Char)
+        save_setting(keys[i], value)
 
 def load_pet_hotkeys():
     """Load pet hotkey bindings from persistence (NEW v2.2)"""
@@ -2726,7 +2949,7 @@ def load_pet_hotkeys():
     pet_hotkeys = []
 
     for key in keys:
-        value = API.GetPersistentVar(key, "", API.PersistentVar.Char)
+        value = load_setting(key, "")
         pet_hotkeys.append(value)
 
 def update_config_buttons():
@@ -2743,7 +2966,7 @@ def update_pet_display():
         if i < len(PETS):
             serial = PETS[i]
             name = PET_NAMES.get(serial, "Pet")
-            mob = API.FindMobile(serial)
+            mob = find_mobile(serial)
 
             if mob:
                 hp_str = str(mob.Hits) + "/" + str(mob.HitsMax)
@@ -2858,6 +3081,36 @@ def update_config_potion_display():
     """Legacy function - inline config panel removed in v2.2"""
     pass
 
+def format_heal_timing(kind):
+    """Config line for learned bandage timing, e.g. Pet: 3.9s (24, 2 fail)"""
+    label = "Self: " if kind == "self" else "Pet: "
+    stats = heal_timing.get_stats(kind)
+    if stats["samples"] < heal_timing.min_samples:
+        text = label + "{:.1f}s learning ({})".format(stats["expected"], stats["samples"])
+    else:
+        text = label + "{:.1f}s ({}".format(stats["expected"], stats["samples"])
+        text += ", {} fail)".format(stats["fails"]) if stats["fails"] else ")"
+    return text
+
+def format_heal_gap():
+    """Config line for the idle gap between back-to-back heals, e.g. Gap: 0.21s (max 0.40)"""
+    average, longest, count = get_heal_gap_stats()
+    if not count:
+        return "Gap: --"
+    return "Gap: {:.2f}s (max {:.2f})".format(average, longest)
+
+def update_heal_timing_display():
+    """Refresh learned heal timing and idle gap labels in the config window"""
+    if config_gump is None:
+        return
+    for kind in ("self", "pet"):
+        control = config_controls.get("timing_" + kind)
+        if control:
+            control.SetText(format_heal_timing(kind))
+    control = config_controls.get("timing_gap")
+    if control:
+        control.SetText(format_heal_gap())
+
 def update_rez_friend_display():
     # No main UI display in v2.1 (removed)
     pass
@@ -2877,12 +3130,12 @@ def load_settings():
     global USE_POTIONS, trapped_pouch_serial, trapped_pouch_enabled, auto_target
     global is_expanded, SELF_DELAY, VET_DELAY, VET_KIT_DELAY
 
-    USE_MAGERY = API.GetPersistentVar(MAGERY_KEY, "False", API.PersistentVar.Char) == "True"
-    USE_REZ = API.GetPersistentVar(REZ_KEY, "False", API.PersistentVar.Char) == "True"
-    HEAL_SELF = API.GetPersistentVar(HEALSELF_KEY, "True", API.PersistentVar.Char) == "True"
-    SKIP_OUT_OF_RANGE = API.GetPersistentVar(SKIPOOR_KEY, "True", API.PersistentVar.Char) == "True"
+    USE_MAGERY = load_setting(MAGERY_KEY, "False") == "True"
+    USE_REZ = load_setting(REZ_KEY, "False") == "True"
+    HEAL_SELF = load_setting(HEALSELF_KEY, "True") == "True"
+    SKIP_OUT_OF_RANGE = load_setting(SKIPOOR_KEY, "True") == "True"
 
-    tank_str = API.GetPersistentVar(TANK_KEY, "0", API.PersistentVar.Char)
+    tank_str = load_setting(TANK_KEY, "0")
     try:
         TANK_PET = int(tank_str)
         if TANK_PET < 0:
@@ -2891,9 +3144,9 @@ def load_settings():
         API.SysMsg("ERROR: Corrupted tank pet setting: " + tank_str, 43)
         API.SysMsg("  Resetting to default (0)", 43)
         TANK_PET = 0
-        API.SavePersistentVar(TANK_KEY, "0", API.PersistentVar.Char)
+        save_setting(TANK_KEY, "0")
 
-    vetkit_str = API.GetPersistentVar(VETKIT_KEY, "0", API.PersistentVar.Char)
+    vetkit_str = load_setting(VETKIT_KEY, "0")
     try:
         VET_KIT_GRAPHIC = int(vetkit_str)
         if VET_KIT_GRAPHIC < 0:
@@ -2902,15 +3155,15 @@ def load_settings():
         API.SysMsg("ERROR: Corrupted vet kit setting: " + vetkit_str, 43)
         API.SysMsg("  Resetting to default (0)", 43)
         VET_KIT_GRAPHIC = 0
-        API.SavePersistentVar(VETKIT_KEY, "0", API.PersistentVar.Char)
+        save_setting(VETKIT_KEY, "0")
 
-    TARGET_REDS = API.GetPersistentVar(REDS_KEY, "False", API.PersistentVar.Char) == "True"
-    TARGET_GRAYS = API.GetPersistentVar(GRAYS_KEY, "False", API.PersistentVar.Char) == "True"
-    ATTACK_MODE = API.GetPersistentVar(MODE_KEY, "ALL", API.PersistentVar.Char)
+    TARGET_REDS = load_setting(REDS_KEY, "False") == "True"
+    TARGET_GRAYS = load_setting(GRAYS_KEY, "False") == "True"
+    ATTACK_MODE = load_setting(MODE_KEY, "ALL")
 
-    USE_POTIONS = API.GetPersistentVar(POTION_KEY, "True", API.PersistentVar.Char) == "True"
+    USE_POTIONS = load_setting(POTION_KEY, "True") == "True"
 
-    pouch_str = API.GetPersistentVar(TRAPPED_POUCH_SERIAL_KEY, "0", API.PersistentVar.Char)
+    pouch_str = load_setting(TRAPPED_POUCH_SERIAL_KEY, "0")
     try:
         trapped_pouch_serial = int(pouch_str)
         if trapped_pouch_serial < 0:
@@ -2919,15 +3172,15 @@ def load_settings():
         API.SysMsg("ERROR: Corrupted trapped pouch setting: " + pouch_str, 43)
         API.SysMsg("  Resetting to default (0)", 43)
         trapped_pouch_serial = 0
-        API.SavePersistentVar(TRAPPED_POUCH_SERIAL_KEY, "0", API.PersistentVar.Char)
+        save_setting(TRAPPED_POUCH_SERIAL_KEY, "0")
 
-    trapped_pouch_enabled = API.GetPersistentVar(USE_TRAPPED_POUCH_KEY, "True", API.PersistentVar.Char) == "True"
-    auto_target = API.GetPersistentVar(AUTO_TARGET_KEY, "False", API.PersistentVar.Char) == "True"
+    trapped_pouch_enabled = load_setting(USE_TRAPPED_POUCH_KEY, "True") == "True"
+    auto_target = load_setting(AUTO_TARGET_KEY, "False") == "True"
 
-    is_expanded = API.GetPersistentVar(EXPANDED_KEY, "True", API.PersistentVar.Char) == "True"
+    is_expanded = load_setting(EXPANDED_KEY, "True") == "True"
 
     # Load bandage timers
-    self_delay_str = API.GetPersistentVar(SELF_DELAY_KEY, "4.5", API.PersistentVar.Char)
+    self_delay_str = load_setting(SELF_DELAY_KEY, "4.5")
     try:
         SELF_DELAY = float(self_delay_str)
         if not (0.5 <= SELF_DELAY <= 10.0):
@@ -2936,9 +3189,9 @@ def load_settings():
         API.SysMsg("ERROR: Invalid self bandage delay: " + self_delay_str, 43)
         API.SysMsg("  Using default 4.5s", 43)
         SELF_DELAY = 4.5
-        API.SavePersistentVar(SELF_DELAY_KEY, "4.5", API.PersistentVar.Char)
+        save_setting(SELF_DELAY_KEY, "4.5")
 
-    vet_delay_str = API.GetPersistentVar(VET_DELAY_KEY, "4.5", API.PersistentVar.Char)
+    vet_delay_str = load_setting(VET_DELAY_KEY, "4.5")
     try:
         VET_DELAY = float(vet_delay_str)
         if not (0.5 <= VET_DELAY <= 10.0):
@@ -2947,9 +3200,9 @@ def load_settings():
         API.SysMsg("ERROR: Invalid vet delay: " + vet_delay_str, 43)
         API.SysMsg("  Using default 4.5s", 43)
         VET_DELAY = 4.5
-        API.SavePersistentVar(VET_DELAY_KEY, "4.5", API.PersistentVar.Char)
+        save_setting(VET_DELAY_KEY, "4.5")
 
-    vet_kit_delay_str = API.GetPersistentVar(VET_KIT_DELAY_KEY, "5.0", API.PersistentVar.Char)
+    vet_kit_delay_str = load_setting(VET_KIT_DELAY_KEY, "5.0")
     try:
         VET_KIT_DELAY = float(vet_kit_delay_str)
         if not (0.5 <= VET_KIT_DELAY <= 10.0):
@@ -2958,13 +3211,19 @@ def load_settings():
         API.SysMsg("ERROR: Invalid vet kit delay: " + vet_kit_delay_str, 43)
         API.SysMsg("  Using default 5.0s", 43)
         VET_KIT_DELAY = 5.0
-        API.SavePersistentVar(VET_KIT_DELAY_KEY, "5.0", API.PersistentVar.Char)
+        save_setting(VET_KIT_DELAY_KEY, "5.0")
+
+    # Learned bandage timings (per character; the timers above are the defaults)
+    heal_timing.set_default("self", SELF_DELAY)
+    heal_timing.set_default("pet", VET_DELAY)
+    heal_timing.from_string(load_setting(HEAL_TIMING_KEY, ""))
 
     load_hotkeys()
     load_pet_hotkeys()  # NEW v2.2
+    rebuild_key_actions()
     sync_pets_from_storage()
 
-    active_str = API.GetPersistentVar(PETACTIVE_KEY, "", API.PersistentVar.Char)
+    active_str = load_setting(PETACTIVE_KEY, "")
     if active_str:
         pairs = [x for x in active_str.split("|") if x]
         for pair in pairs:
@@ -2983,7 +3242,7 @@ def onClosed():
 
     # Always use tracked position - gump is being disposed so GetX/GetY returns 0
     if last_known_x >= 0 and last_known_y >= 0:
-        API.SavePersistentVar(SETTINGS_KEY, str(last_known_x) + "," + str(last_known_y), API.PersistentVar.Char)
+        save_setting(SETTINGS_KEY, str(last_known_x) + "," + str(last_known_y))
         API.SysMsg("Saved position: " + str(last_known_x) + "," + str(last_known_y), 68)
 
     active_pairs = []
@@ -2993,7 +3252,7 @@ def onClosed():
         active_pairs.append(str(serial) + ":" + active_str)
 
     if active_pairs:
-        API.SavePersistentVar(PETACTIVE_KEY, "|".join(active_pairs), API.PersistentVar.Char)
+        save_setting(PETACTIVE_KEY, "|".join(active_pairs))
 
     # Close config window if open
     if config_gump is not None:
@@ -3011,7 +3270,7 @@ load_settings()
 gump = API.Gumps.CreateGump()
 API.Gumps.AddControlOnDisposed(gump, onClosed)
 
-savedPos = API.GetPersistentVar(SETTINGS_KEY, "100,100", API.PersistentVar.Char)
+savedPos = load_setting(SETTINGS_KEY, "100,100")
 posXY = savedPos.split(',')
 lastX = int(posXY[0])
 lastY = int(posXY[1])
@@ -3268,115 +3527,136 @@ API.SysMsg("Tamer Suite v3.0 loaded! Separate config window ready", 68)
 API.SysMsg("Kill:" + (hotkeys["kill"] or "-") + " Guard:" + (hotkeys["guard"] or "-") + " Follow:" + (hotkeys["follow"] or "-") + " Pause:" + (hotkeys["pause"] or "-"), 53)
 
 # ============ MAIN LOOP (NON-BLOCKING) ============
+HEAL_INTERVAL = 0.1
 DISPLAY_INTERVAL = 0.3
 SYNC_INTERVAL = 2.0
+POSITION_INTERVAL = 2.0
+SETTINGS_INTERVAL = 1.0
 
-next_display = time.time() + DISPLAY_INTERVAL
-next_sync = time.time() + SYNC_INTERVAL
+def heal_tick():
+    """Cursor detection, heal/rez state machine and auto-target"""
+    global manual_cursor_detected, last_manual_cursor_msg
+    global out_of_bandages_warned, out_of_bandages_cooldown
 
-while not API.StopRequested:
-    try:
-        # Process GUI clicks and HOTKEYS - always instant!
-        API.ProcessCallbacks()
-
-        # Detect manual targeting cursor (player using abilities/skills)
-        # Increased threshold to 1.5s to reduce false positives
-        if API.HasTarget() and time.time() - script_cursor_time > 1.5:
-            # Player has a manual cursor - pause all healing actions
-            if not manual_cursor_detected:
-                manual_cursor_detected = True
-                # Only show message if not shown recently (prevent spam)
-                if time.time() - last_manual_cursor_msg > 3.0:
-                    API.SysMsg("Manual targeting detected - healing paused", 43)
-                    last_manual_cursor_msg = time.time()
-        elif not API.HasTarget() and manual_cursor_detected:
-            # Manual cursor cleared - resume healing
-            manual_cursor_detected = False
+    # Detect manual targeting cursor (player using abilities/skills)
+    # Increased threshold to 1.5s to reduce false positives
+    if API.HasTarget() and time.time() - script_cursor_time > 1.5:
+        # Player has a manual cursor - pause all healing actions
+        if not manual_cursor_detected:
+            manual_cursor_detected = True
+            # Only show message if not shown recently (prevent spam)
             if time.time() - last_manual_cursor_msg > 3.0:
-                API.SysMsg("Manual targeting complete - healing resumed", 68)
+                API.SysMsg("Manual targeting detected - healing paused", 43)
                 last_manual_cursor_msg = time.time()
+    elif not API.HasTarget() and manual_cursor_detected:
+        # Manual cursor cleared - resume healing
+        manual_cursor_detected = False
+        if time.time() - last_manual_cursor_msg > 3.0:
+            API.SysMsg("Manual targeting complete - healing resumed", 68)
+            last_manual_cursor_msg = time.time()
+
+    # Pet HP history for projected-HP triage
+    track_pet_damage()
+
+    # Check if current heal is done
+    check_heal_complete()
+
+    # Check alerts (even when paused)
+    check_critical_alerts()
+
+    # FRIEND REZ LOGIC (highest priority - pauses all other healing)
+    if not PAUSED and not manual_cursor_detected and rez_friend_active:
+        statusLabel.SetText("Rezzing: " + rez_friend_name + " (#" + str(rez_friend_attempts) + ")")
+        attempt_friend_rez()
+        return
 
-        # Check if current heal is done
-        check_heal_complete()
-
-        # Periodically capture position (main window)
-        if not API.StopRequested:
-            current_time = time.time()
-            if current_time - last_position_check > 2.0:
-                last_position_check = current_time
-                try:
-                    last_known_x = gump.GetX()
-                    last_known_y = gump.GetY()
-                except:
-                    pass
+    # HEALER LOGIC (non-blocking)
+    if not PAUSED and not manual_cursor_detected and HEAL_STATE == "idle":
+        # Skip healing if we're in bandage cooldown (out of bandages recently)
+        if out_of_bandages_cooldown > 0:
+            # Check if bandages are back in stock
+            if API.FindType(BANDAGE):
+                # Bandages found - reset cooldown
+                out_of_bandages_warned = False
+                out_of_bandages_cooldown = 0
+                # Continue to healing logic
+                run_next_heal()
+            elif time.time() - out_of_bandages_cooldown > 5.0:
+                # Still no bandages after 5s - extend cooldown to prevent spam
+                out_of_bandages_cooldown = time.time()
+        else:
+            run_next_heal()
+    elif PIPELINE_HEALS and not PAUSED and not manual_cursor_detected and HEAL_STATE == "healing":
+        # Pick the next target while this heal finishes
+        stage_next_heal()
 
-        # Periodically capture position (config window)
-        if config_gump is not None and not API.StopRequested:
-            current_time = time.time()
-            if current_time - config_last_position_check > 2.0:
-                config_last_position_check = current_time
-                try:
-                    config_last_known_x = config_gump.GetX()
-                    config_last_known_y = config_gump.GetY()
-                except:
-                    pass
+    # AUTO-TARGET LOGIC (continuous combat)
+    if not PAUSED and not manual_cursor_detected and auto_target:
+        handle_auto_target()
 
-        # Sync pets
-        if time.time() > next_sync:
-            sync_pets_from_storage()
-            next_sync = time.time() + SYNC_INTERVAL
-
-        # Update displays
-        if time.time() > next_display:
-            update_pet_display()
-            update_pet_hotkey_main_display()  # NEW v2.2
-            update_pet_arrow_display()  # NEW v2.2
-            update_bandage_display()
-            if show_config:
-                update_config_potion_display()
-                update_pet_hotkey_config_display()  # NEW v2.2
-            next_display = time.time() + DISPLAY_INTERVAL
-
-        # Check alerts (even when paused)
-        check_critical_alerts()
-
-        # FRIEND REZ LOGIC (highest priority - pauses all other healing)
-        if not PAUSED and not manual_cursor_detected and rez_friend_active:
-            statusLabel.SetText("Rezzing: " + rez_friend_name + " (#" + str(rez_friend_attempts) + ")")
-            attempt_friend_rez()
-            continue
+    # Come back the moment the current bandage/vet kit finishes (and
+    # just before, to stage the next heal)
+    if HEAL_STATE != "idle":
+        if PIPELINE_HEALS and staged_heal is None and HEAL_STATE == "healing":
+            scheduler.wake_at(heal_task, heal_start_time + heal_duration - PIPELINE_LEAD)
+        scheduler.wake_at(heal_task, heal_start_time + heal_duration)
+
+def display_tick():
+    update_pet_display()
+    update_pet_hotkey_main_display()  # NEW v2.2
+    update_pet_arrow_display()  # NEW v2.2
+    update_bandage_display()
+    if show_config:
+        update_config_potion_display()
+        update_pet_hotkey_config_display()  # NEW v2.2
+        update_heal_timing_display()
+
+def position_tick():
+    """Capture window positions (main + config)"""
+    global last_known_x, last_known_y, config_last_known_x, config_last_known_y
+    if API.StopRequested:
+        return
+    try:
+        last_known_x = gump.GetX()
+        last_known_y = gump.GetY()
+    except:
+        pass
+    if config_gump is not None:
+        try:
+            config_last_known_x = config_gump.GetX()
+            config_last_known_y = config_gump.GetY()
+        except:
+            pass
 
-        # HEALER LOGIC (non-blocking)
-        if not PAUSED and not manual_cursor_detected and HEAL_STATE == "idle":
-            # Skip healing if we're in bandage cooldown (out of bandages recently)
-            if out_of_bandages_cooldown > 0:
-                # Check if bandages are back in stock
-                if API.FindType(BANDAGE):
-                    # Bandages found - reset cooldown
-                    out_of_bandages_warned = False
-                    out_of_bandages_cooldown = 0
-                    # Continue to healing logic
-                    action = get_next_heal_action()
-                    if action:
-                        target, action_type, duration, is_self = action
-                        start_heal_action(target, action_type, duration, is_self)
-                elif time.time() - out_of_bandages_cooldown > 5.0:
-                    # Still no bandages after 5s - extend cooldown to prevent spam
-                    out_of_bandages_cooldown = time.time()
-            else:
-                action = get_next_heal_action()
-                if action:
-                    target, action_type, duration, is_self = action
-                    start_heal_action(target, action_type, duration, is_self)
+def settings_tick():
+    # Flush changed settings (every few seconds, or right away on stop)
+    settings_store.update()
 
-        # AUTO-TARGET LOGIC (continuous combat)
-        if not PAUSED and not manual_cursor_detected and auto_target:
-            handle_auto_target()
+def report_loop_error(task, e):
+    if "operation canceled" not in str(e).lower() and not API.StopRequested:
+        API.SysMsg("Error: " + str(e), 32)
 
-        # Short pause - loop runs ~10x/second (balance of responsiveness vs CPU)
-        API.Pause(0.1)
+MAIN_TASKS = [
+    (heal_tick, HEAL_INTERVAL),
+    (display_tick, DISPLAY_INTERVAL),
+    (sync_pets_from_storage, SYNC_INTERVAL),
+    (position_tick, POSITION_INTERVAL),
+    (settings_tick, SETTINGS_INTERVAL),
+]
 
-    except Exception as e:
-        if "operation canceled" not in str(e).lower() and not API.StopRequested:
-            API.SysMsg("Error: " + str(e), 32)
-        API.Pause(1)
+# Each task runs on its own timer and the loop sleeps until the next
+# one is due; heals also wake on HP/buff/backpack changes
+scheduler = Scheduler(API, on_error=report_loop_error)
+heal_task = scheduler.every(HEAL_INTERVAL, heal_tick)
+for task_func, interval in MAIN_TASKS[1:]:
+    scheduler.every(interval, task_func, delay=interval, slack=HEAL_INTERVAL)
+for event_name in ("OnPlayerHitsChanged", "OnBuffAdded", "OnBuffRemoved", "OnItemCreated"):
+    scheduler.wake_on(event_name, heal_task)
+scheduler.run()
+
+settings_store.close()
+
+if api_profiler:
+    report_path = api_profiler.stop()
+    if report_path:
+        API.SysMsg("API profile saved: " + report_path, 68)
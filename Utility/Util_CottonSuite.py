@@ -3,6 +3,20 @@
 # Converted from RazorEnhanced by Frogmancer Schteve
 import API
 import time
+import sys
+import os
+
+# Add parent directory to path for library imports
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(script_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+# Optional: read the shared pet list from the LegionUtils state bus
+try:
+    from LegionUtils import get_shared_pets
+except ImportError:
+    get_shared_pets = None
 
 # ============ CONSTANTS ============
 # Graphics
@@ -794,35 +808,42 @@ def use_bandage_on_self():
     except:
         return False
 
-def get_player_pets():
-    """Get list of player's pets (followers) from shared pet storage.
+def get_shared_pet_serials():
+    """Get pet serials registered by Tamer Suite.
 
-    Reads from SharedPets_List persistence (same as Tamer Suite).
-    Format: name:serial:active|name:serial:active|...
+    Uses the LegionUtils state bus when available (only rebuilt when Tamer
+    Suite publishes a change), otherwise parses the SharedPets_List
+    persistence string. Format: name:serial:active|name:serial:active|...
     """
-    pets = []
-    try:
-        # Read shared pet list from persistence (same key as Tamer Suite)
-        shared_pets_str = API.GetPersistentVar("SharedPets_List", "", API.PersistentVar.Char)
+    if get_shared_pets is not None:
+        return list(get_shared_pets().keys())
 
-        if not shared_pets_str:
-            return []
+    shared_pets_str = API.GetPersistentVar("SharedPets_List", "", API.PersistentVar.Char)
+    if not shared_pets_str:
+        return []
 
-        # Parse pet list: name:serial:active|name:serial:active|...
-        pet_entries = shared_pets_str.split('|')
+    serials = []
+    for entry in shared_pets_str.split('|'):
+        if not entry:
+            continue
 
-        for entry in pet_entries:
-            if not entry:
-                continue
+        parts = entry.split(':')
+        if len(parts) < 2:
+            continue
 
-            parts = entry.split(':')
-            if len(parts) < 2:
-                continue
+        pet_serial = int(parts[1]) if parts[1].isdigit() else 0
+        if pet_serial != 0:
+            serials.append(pet_serial)
+    return serials
 
-            pet_serial = int(parts[1]) if parts[1].isdigit() else 0
-            if pet_serial == 0:
-                continue
+def get_player_pets():
+    """Get list of player's pets (followers) from shared pet storage.
 
+    Reads the same shared pet list as Tamer Suite.
+    """
+    pets = []
+    try:
+        for pet_serial in get_shared_pet_serials():
             # Get the mobile (correct API is API.FindMobile, not API.Mobiles.FindMobile)
             mob = API.FindMobile(pet_serial)
             if mob and not mob.IsDead:
@@ -939,31 +960,11 @@ def check_critical_hp():
 def get_dead_pets():
     """Get list of dead pets that need resurrection from shared pet storage.
 
-    Reads from SharedPets_List persistence (same as Tamer Suite).
+    Reads the same shared pet list as Tamer Suite.
     """
     dead_pets = []
     try:
-        # Read shared pet list from persistence
-        shared_pets_str = API.GetPersistentVar("SharedPets_List", "", API.PersistentVar.Char)
-
-        if not shared_pets_str:
-            return []
-
-        # Parse pet list: name:serial:active|name:serial:active|...
-        pet_entries = shared_pets_str.split('|')
-
-        for entry in pet_entries:
-            if not entry:
-                continue
-
-            parts = entry.split(':')
-            if len(parts) < 2:
-                continue
-
-            pet_serial = int(parts[1]) if parts[1].isdigit() else 0
-            if pet_serial == 0:
-                continue
-
+        for pet_serial in get_shared_pet_serials():
             # Get the mobile (correct API is API.FindMobile, not API.Mobiles.FindMobile)
             mob = API.FindMobile(pet_serial)
             if mob and mob.IsDead:
@@ -1084,16 +1085,7 @@ def debug_shared_pets():
 def count_expected_pets():
     """Count how many pets are registered in SharedPets_List."""
     try:
-        shared_pets_str = API.GetPersistentVar("SharedPets_List", "", API.PersistentVar.Char)
-        if not shared_pets_str:
-            return 0
-
-        pet_entries = shared_pets_str.split('|')
-        count = 0
-        for entry in pet_entries:
-            if entry and ':' in entry:
-                count += 1
-        return count
+        return len(get_shared_pet_serials())
     except:
         return 0
 
@@ -25,8 +25,16 @@
 import API
 import time
 import os
+import sys
 import hashlib
 
+# Add parent directory (CoryCustom root) to path for library imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    from LegionUtils import Scheduler
+except ImportError:
+    Scheduler = None
+
 __version__ = "3.4"
 
 # ============ CONSTANTS ============
@@ -736,48 +744,60 @@ except Exception as e:
 # Initial display update
 update_message_display()
 
-next_poll = time.time()
-next_display_update = time.time()
-last_position_check = time.time()
-
-while not API.StopRequested:
-    try:
-        API.ProcessCallbacks()
-
-        # State validation - recover from corruption
-        if state not in ["polling", "paused"]:
-            API.SysMsg("Invalid state detected, resetting to polling", 32)
-            state = "polling"
-
-        # Poll queue if in polling state
-        if state == "polling" and time.time() >= next_poll:
-            parse_queue()
-            next_poll = time.time() + POLL_INTERVAL
-
-        # Update display periodically
-        if time.time() >= next_display_update:
-            update_message_display()
-            next_display_update = time.time() + 0.3
-
-        # Position tracking with validation
-        if time.time() - last_position_check > 2.0:
-            try:
-                x = gump.GetX()
-                y = gump.GetY()
-                # Validate reasonable bounds (on screen)
-                if 0 <= x <= 3000 and 0 <= y <= 2000:
-                    last_known_x = x
-                    last_known_y = y
-            except Exception as e:
-                # Silent fail but validate we have reasonable defaults
-                if last_known_x < 0 or last_known_y < 0:
-                    last_known_x = 100
-                    last_known_y = 100
-            last_position_check = time.time()
+def poll_tick():
+    global state
+    # State validation - recover from corruption
+    if state not in ["polling", "paused"]:
+        API.SysMsg("Invalid state detected, resetting to polling", 32)
+        state = "polling"
 
-        API.Pause(0.1)
+    # Poll queue if in polling state
+    if state == "polling":
+        parse_queue()
 
+def position_tick():
+    """Position tracking with validation"""
+    global last_known_x, last_known_y
+    try:
+        x = gump.GetX()
+        y = gump.GetY()
+        # Validate reasonable bounds (on screen)
+        if 0 <= x <= 3000 and 0 <= y <= 2000:
+            last_known_x = x
+            last_known_y = y
     except Exception as e:
-        if "operation canceled" not in str(e).lower() and not API.StopRequested:
-            API.SysMsg("Console error: " + str(e)[:50], 32)
-        API.Pause(1)
+        # Silent fail but validate we have reasonable defaults
+        if last_known_x < 0 or last_known_y < 0:
+            last_known_x = 100
+            last_known_y = 100
+
+def report_loop_error(task, e):
+    if "operation canceled" not in str(e).lower() and not API.StopRequested:
+        API.SysMsg("Console error: " + str(e)[:50], 32)
+
+MAIN_TASKS = [
+    (poll_tick, POLL_INTERVAL),
+    (update_message_display, 0.3),
+    (position_tick, 2.0),
+]
+
+if Scheduler:
+    # Sleeps between polls instead of waking every 100ms; button clicks
+    # are still picked up within one poll interval
+    scheduler = Scheduler(API, max_sleep=POLL_INTERVAL, on_error=report_loop_error)
+    for task_func, interval in MAIN_TASKS:
+        scheduler.every(interval, task_func, delay=interval, slack=0.1)
+    scheduler.run()
+else:
+    next_run = [time.time() + interval for task_func, interval in MAIN_TASKS]
+    while not API.StopRequested:
+        try:
+            API.ProcessCallbacks()
+            for i, (task_func, interval) in enumerate(MAIN_TASKS):
+                if time.time() >= next_run[i]:
+                    task_func()
+                    next_run[i] = time.time() + interval
+            API.Pause(0.1)
+        except Exception as e:
+            report_loop_error(None, e)
+            API.Pause(1)
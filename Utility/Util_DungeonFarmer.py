@@ -21,6 +21,7 @@ import API
 import time
 import sys
 import os
+from collections import deque
 
 # Add parent directory to path for library imports
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -28,17 +29,53 @@ parent_dir = os.path.dirname(script_dir)
 if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
-# Import from LegionUtils
-try:
-    from LegionUtils import WindowPositionTracker, DisplayGroup, HotkeyManager
-except ImportError as e:
-    API.SysMsg("Failed to import LegionUtils: " + str(e), 32)
-    WindowPositionTracker = None
-    DisplayGroup = None
-    HotkeyManager = None
+# Import from LegionUtils (required)
+from LegionUtils import WindowPositionTracker, DisplayGroup, HotkeyManager, FrameCache, SettingsStore
+from LegionUtils import set_combat_state, PetDamageTracker, TraceRecorder
+
+# Heal priority rules (shared with the other healer scripts)
+from LegionUtils import HealConfig, decide_heal
+
+# Per-tick world scan (pets, NPC avoidance, combat and looting
+# all query one GetMobiles pass per tick instead of walking it themselves)
+from LegionUtils import get_mobile_scan
+
+# Distance-to-nearest-NPC grid (O(1) avoid-zone and flee queries)
+from LegionUtils import ThreatDistanceField, compass_directions, AreaIndex
+
+# Rolling damage total for DangerAssessment (fed by API.Events)
+from LegionUtils import WindowedSum
+
+# Walkability cache + A* legs for patrol destinations
+from LegionUtils import RoutePlanner
+
+# Batched, rotating error log for ErrorRecoverySystem
+from LegionUtils import BufferedLogWriter
+
+# Record every API read/action for offline replay (_support/tools/LegionReplay.py).
+# Installed before the frame cache so cached lookups replay the same way.
+TRACE_API = False
+api_trace = TraceRecorder(API, name="DungeonFarmer").install() if TRACE_API else None
+
+# Per-tick mobile cache (pets/tank/enemy are looked up by several systems per tick)
+frame_cache = FrameCache(API).install()
+find_mobile = frame_cache.find_mobile
 
 # ========== CONSTANTS ==========
 KEY_PREFIX = "DungeonFarmer_"
+
+# Config settings kept in one persistent var blob
+settings_store = SettingsStore("DungeonFarmer")
+
+def save_setting(key, value):
+    """Save a character setting (written right away - saves come from button clicks)"""
+    settings_store.set(key, value)
+    settings_store.flush()
+
+def load_setting(key, default):
+    """Load a character setting"""
+    return settings_store.get(key, default)
+
 BANDAGE_GRAPHIC = 0x0E21
 BANDAGE_COOLDOWN = 10.0  # Seconds between bandages per target
 HEAL_RANGE = 2  # Tiles
@@ -68,17 +105,15 @@ class PetManager:
     def scan_pets(self):
         """Scan for owned pets (Notoriety == 1) and update pet list"""
         try:
-            all_mobiles = API.Mobiles.GetMobiles()
             pet_data = []
 
-            for mob in all_mobiles:
-                if mob and not mob.IsDead and mob.Notoriety == 1:  # Owned pet
-                    pet_data.append({
-                        "serial": mob.Serial,
-                        "name": mob.Name,
-                        "max_hp": mob.HitsMax,
-                        "is_tank": mob.Serial == self.tank_pet_serial
-                    })
+            for mob in get_mobile_scan().in_range([1]):  # Owned pets
+                pet_data.append({
+                    "serial": mob.Serial,
+                    "name": mob.Name,
+                    "max_hp": mob.HitsMax,
+                    "is_tank": mob.Serial == self.tank_pet_serial
+                })
 
             # Sort by max HP (highest first)
             pet_data.sort(key=lambda p: p["max_hp"], reverse=True)
@@ -126,7 +161,7 @@ class PetManager:
         """Remove dead/invalid pets from list"""
         valid_pets = []
         for pet in self.pets:
-            mob = API.Mobiles.FindMobile(pet["serial"])
+            mob = find_mobile(pet["serial"])
             if mob and not mob.IsDead:
                 valid_pets.append(pet)
         self.pets = valid_pets
@@ -140,7 +175,7 @@ class PetManager:
     def all_pets_alive(self):
         """Check if all tracked pets are alive"""
         for pet in self.pets:
-            mob = API.Mobiles.FindMobile(pet["serial"])
+            mob = find_mobile(pet["serial"])
             if not mob or mob.IsDead:
                 return False
         return True
@@ -171,6 +206,9 @@ class HealingSystem:
         # Bandage cooldown tracking: {serial: last_bandage_time}
         self.bandage_cooldowns = {}
 
+        # Per-pet HP history - pets are ranked by projected HP when the bandage lands
+        self.damage_tracker = PetDamageTracker()
+
         # Vet kit settings (will be extended in vet kit task)
         self.vet_kit_graphic = 0
         self.vet_kit_hp_threshold = 90
@@ -212,6 +250,31 @@ class HealingSystem:
             return 100
         return (mob.Hits / mob.HitsMax) * 100
 
+    def _get_projected_hp_percent(self, mob):
+        """HP percentage expected when a bandage started now would land"""
+        if mob is None or mob.IsDead:
+            return self._get_hp_percent(mob)
+        return self.damage_tracker.projected_percent(mob, BANDAGE_DELAY)
+
+    def track_damage(self):
+        """Sample every pet's HP for damage-rate estimates (call every tick)"""
+        for pet_info in self.pet_manager.pets:
+            self.damage_tracker.observe(find_mobile(pet_info["serial"]))
+
+    def _snapshot_pets(self):
+        """Read every visible pet once into heal rows for decide_heal()"""
+        rows = []
+        for pet_info in self.pet_manager.pets:
+            mob = find_mobile(pet_info["serial"])
+            if mob is None:
+                continue
+            if mob.IsDead:
+                rows.append((mob.Serial, True, mob.Distance, 0, False, 0))
+            else:
+                rows.append((mob.Serial, False, mob.Distance, self._get_hp_percent(mob),
+                             self._is_poisoned(mob), self._get_projected_hp_percent(mob)))
+        return rows
+
     def _is_in_range(self, mob):
         """Check if mobile is within heal range"""
         if mob is None or mob.IsDead:
@@ -224,44 +287,49 @@ class HealingSystem:
             return False
         return getattr(mob, 'IsPoisoned', False) or getattr(mob, 'Poisoned', False)
 
-    def check_vetkit_conditions(self):
-        """Check if vet kit should be used (called from get_next_heal_action)"""
+    def _get_vetkit_state(self, rows):
+        """None when the vet kit can't be used, else whether its cooldown is up"""
         # Not configured or not available
         if self.vet_kit_graphic == 0:
-            return False
+            return None
 
         vet_kit = API.FindType(self.vet_kit_graphic)
         if not vet_kit:
             if not self.out_of_vetkit_warned:
                 API.SysMsg("Out of vet kits!", 32)
                 self.out_of_vetkit_warned = True
-            return False
+            return None
         else:
             self.out_of_vetkit_warned = False
 
-        # Don't use vet kit if pets need rezzing
-        if not self.pet_manager.all_pets_alive:
-            return False
-
-        # Count pets hurt and critically hurt
-        hurt_count = 0
-        critical_count = 0
+        # Don't use vet kit if pets need rezzing (dead rows are checked by the engine)
+        if len(rows) < len(self.pet_manager.pets):
+            return None
 
-        for pet_info in self.pet_manager.pets:
-            mob = API.Mobiles.FindMobile(pet_info["serial"])
-            if mob and not mob.IsDead and self._is_in_range(mob):
-                hp_pct = self._get_hp_percent(mob)
-                if hp_pct < self.vet_kit_hp_threshold:
-                    hurt_count += 1
-                if hp_pct < self.vet_kit_critical_hp:
-                    critical_count += 1
+        return (time.time() - self.last_vetkit_use) >= self.vet_kit_cooldown
 
-        # Check cooldown (bypass if critical situation)
-        cooldown_expired = (time.time() - self.last_vetkit_use) >= self.vet_kit_cooldown
-        emergency_bypass = critical_count >= 2
+    def get_heal_config(self):
+        """HealConfig for the current thresholds.
 
-        # Use vet kit if enough pets hurt and (cooldown ok OR emergency)
-        return hurt_count >= self.vet_kit_min_pets_hurt and (cooldown_expired or emergency_bypass)
+        Order: player critical, tank critical, player normal, vet kit AOE
+        (2+ pets hurt, cooldown bypassed when 2+ are critical), tank normal,
+        other pets poisoned, other pets injured (lowest projected HP first),
+        then top-off heals for the tank and the other pets.
+        """
+        tank_pet_info = self.pet_manager.get_tank_pet()
+        return HealConfig(
+            (("self", self.player_critical_threshold),
+             ("tank_heal", self.tank_critical_threshold),
+             ("self", self.player_bandage_threshold),
+             ("vetkit", 0),
+             ("tank_heal", self.tank_heal_threshold),
+             ("cure_other", 0),
+             ("lowest_other", self.pet_heal_threshold),
+             ("tank_heal", self.pet_topoff_threshold),
+             ("lowest_other", self.pet_topoff_threshold)),
+            HEAL_RANGE, tank=tank_pet_info["serial"] if tank_pet_info else 0,
+            vetkit_hp=self.vet_kit_hp_threshold, vetkit_critical_hp=self.vet_kit_critical_hp,
+            vetkit_min_pets=self.vet_kit_min_pets_hurt, vetkit_needs_all_alive=True)
 
     def use_vetkit(self):
         """Execute vet kit usage"""
@@ -280,86 +348,31 @@ class HealingSystem:
         action_type: "bandage_self", "bandage_pet", "vetkit", "cure"
         Returns None if nothing needs healing
         """
-        player_hp_pct = self._get_hp_percent(API.Player)
-
-        # PRIORITY 1: Player critical (< 50%)
-        if player_hp_pct < self.player_critical_threshold:
-            if self.can_bandage(API.Player.Serial):
-                return (API.Player.Serial, "bandage_self", True)
+        self.track_damage()
+        player = API.Player
+        player_row = (player.Serial, player.IsDead, self._get_hp_percent(player),
+                      player.HitsMax - player.Hits, False)
+        rows = self._snapshot_pets()
+
+        # Targets still on bandage cooldown are skipped by every rule
+        now = time.time()
+        blocked = set(serial for serial, last in self.bandage_cooldowns.items()
+                      if now - last < BANDAGE_COOLDOWN)
+
+        decision = decide_heal(self.get_heal_config(), rows, player_row,
+                               vetkit=self._get_vetkit_state(rows), blocked=blocked)
+        if decision is None:
+            return None
 
-        # Get tank pet
-        tank_pet_info = self.pet_manager.get_tank_pet()
-        tank_mob = None
-        tank_hp_pct = 100
-
-        if tank_pet_info:
-            tank_mob = API.Mobiles.FindMobile(tank_pet_info["serial"])
-            if tank_mob and not tank_mob.IsDead and self._is_in_range(tank_mob):
-                tank_hp_pct = self._get_hp_percent(tank_mob)
-
-        # PRIORITY 2: Tank pet critical (< 40%)
-        if tank_mob and tank_hp_pct < self.tank_critical_threshold:
-            if self.can_bandage(tank_mob.Serial):
-                return (tank_mob.Serial, "bandage_pet", False)
-
-        # PRIORITY 3: Player normal (< 85%)
-        if player_hp_pct < self.player_bandage_threshold:
-            if self.can_bandage(API.Player.Serial):
-                return (API.Player.Serial, "bandage_self", True)
-
-        # PRIORITY 4: Vet kit AOE (2+ pets hurt)
-        if self.check_vetkit_conditions():
+        target_serial, action, rule = decision
+        if action == "heal_self":
+            return (target_serial, "bandage_self", True)
+        if action == "vetkit":
             return (0, "vetkit", False)
-
-        # PRIORITY 5: Tank pet normal (< 70%)
-        if tank_mob and tank_hp_pct < self.tank_heal_threshold:
-            if self.can_bandage(tank_mob.Serial):
-                return (tank_mob.Serial, "bandage_pet", False)
-
-        # PRIORITY 6: Other pets poisoned
-        for pet_info in self.pet_manager.pets:
-            if pet_info["is_tank"]:
-                continue  # Already handled tank
-
-            mob = API.Mobiles.FindMobile(pet_info["serial"])
-            if mob and not mob.IsDead and self._is_in_range(mob):
-                if self._is_poisoned(mob):
-                    # For now, bandage poisoned pets (cure spell will be added later)
-                    if self.can_bandage(mob.Serial):
-                        return (mob.Serial, "cure", False)
-
-        # PRIORITY 7: Other pets injured (< 50%)
-        for pet_info in self.pet_manager.pets:
-            if pet_info["is_tank"]:
-                continue
-
-            mob = API.Mobiles.FindMobile(pet_info["serial"])
-            if mob and not mob.IsDead and self._is_in_range(mob):
-                hp_pct = self._get_hp_percent(mob)
-                if hp_pct < self.pet_heal_threshold:
-                    if self.can_bandage(mob.Serial):
-                        return (mob.Serial, "bandage_pet", False)
-
-        # PRIORITY 8: Top-off heals (< 90%)
-        # Check tank first for top-off
-        if tank_mob and tank_hp_pct < self.pet_topoff_threshold:
-            if self.can_bandage(tank_mob.Serial):
-                return (tank_mob.Serial, "bandage_pet", False)
-
-        # Then check other pets
-        for pet_info in self.pet_manager.pets:
-            if pet_info["is_tank"]:
-                continue
-
-            mob = API.Mobiles.FindMobile(pet_info["serial"])
-            if mob and not mob.IsDead and self._is_in_range(mob):
-                hp_pct = self._get_hp_percent(mob)
-                if hp_pct < self.pet_topoff_threshold:
-                    if self.can_bandage(mob.Serial):
-                        return (mob.Serial, "bandage_pet", False)
-
-        # Nothing needs healing
-        return None
+        if action == "cure":
+            # For now, bandage poisoned pets (cure spell will be added later)
+            return (target_serial, "cure", False)
+        return (target_serial, "bandage_pet", False)
 
     def execute_heal(self, target_serial, action_type, is_self):
         """
@@ -407,7 +420,7 @@ class HealingSystem:
                     self.out_of_bandages_warned = False
 
                 # Check if target is in range
-                target_mob = API.Mobiles.FindMobile(target_serial)
+                target_mob = find_mobile(target_serial)
                 if not target_mob or target_mob.IsDead or not self._is_in_range(target_mob):
                     return False
 
@@ -456,7 +469,7 @@ class HealingSystem:
                     self.out_of_bandages_warned = False
 
                 # Check if target is in range
-                target_mob = API.Mobiles.FindMobile(target_serial)
+                target_mob = find_mobile(target_serial)
                 if not target_mob or target_mob.IsDead or not self._is_in_range(target_mob):
                     return False
 
@@ -728,26 +741,60 @@ class FarmingArea:
 
 # ========== AREA MANAGER CLASS ==========
 class AreaManager:
-    """Manages farming areas with persistence"""
+    """Manages farming areas with persistence
+
+    One versioned index blob (KEY_PREFIX + "AreaIndex") holds every
+    area's name and geometry; it is the only thing read at startup.
+    Full area details stay in their own "Area_<name>" vars and are only
+    parsed the first time an area is asked for. Point-in-area lookups go
+    through the index's grid buckets instead of testing every area.
+    """
+
+    WAYPOINT_RADIUS = 15  # Tiles around any waypoint that count as "in area" (see FarmingArea.is_in_area)
 
     def __init__(self):
-        self.areas = {}  # Cache: {name: FarmingArea}
-        self._load_area_list()
+        self.areas = {}  # Cache of parsed areas: {name: FarmingArea}
+        self.index = AreaIndex()
+        self._load_index()
+
+    def _load_index(self):
+        """Load the area index blob (built from the old per-area vars once if missing)"""
+        import json
+
+        index_str = API.GetPersistentVar(KEY_PREFIX + "AreaIndex", "", API.PersistentVar.Char)
+        if index_str:
+            try:
+                index = AreaIndex.from_dict(json.loads(index_str))
+                if index is not None:
+                    self.index = index
+                    return
+            except Exception:
+                pass
 
-    def _load_area_list(self):
-        """Load list of area names from persistence"""
+        # Older saves: a name list plus one var per area - parse them all once
         area_list_str = API.GetPersistentVar(KEY_PREFIX + "AreaList", "", API.PersistentVar.Char)
         if area_list_str:
             area_names = [name.strip() for name in area_list_str.split("|") if name.strip()]
             for name in area_names:
-                # Load each area into cache
-                self._load_area_from_persistence(name)
+                area = self._load_area_from_persistence(name)
+                if area is not None:
+                    self._index_area(area)
+            self._save_index()
+
+    def _index_area(self, area):
+        """Add or replace an area's geometry in the index"""
+        if area.area_type == "circle":
+            self.index.add_circle(area.name, area.center_x, area.center_y, area.radius)
+        elif area.area_type == "waypoints":
+            self.index.add_points(area.name, area.waypoints, self.WAYPOINT_RADIUS)
+        else:
+            self.index.add_points(area.name, [])
+
+    def _save_index(self):
+        """Save the area index blob to persistence"""
+        import json
 
-    def _save_area_list(self):
-        """Save list of area names to persistence"""
-        area_names = list(self.areas.keys())
-        area_list_str = "|".join(area_names)
-        API.SavePersistentVar(KEY_PREFIX + "AreaList", area_list_str, API.PersistentVar.Char)
+        API.SavePersistentVar(KEY_PREFIX + "AreaIndex", json.dumps(self.index.to_dict()), API.PersistentVar.Char)
 
     def _load_area_from_persistence(self, name):
         """Load a specific area from persistence into cache"""
@@ -791,8 +838,9 @@ class AreaManager:
             key = KEY_PREFIX + "Area_" + area.name
             API.SavePersistentVar(key, json_str, API.PersistentVar.Char)
 
-            # Update area list
-            self._save_area_list()
+            # Update area index
+            self._index_area(area)
+            self._save_index()
 
             return True
 
@@ -824,7 +872,7 @@ class AreaManager:
         Returns:
             List of area name strings
         """
-        return list(self.areas.keys())
+        return self.index.keys()
 
     def delete_area(self, name):
         """
@@ -836,19 +884,20 @@ class AreaManager:
         Returns:
             True if deleted, False if not found
         """
-        if name not in self.areas:
+        if name not in self.index:
             return False
 
         try:
             # Remove from cache
-            del self.areas[name]
+            self.areas.pop(name, None)
 
             # Remove from persistence
             key = KEY_PREFIX + "Area_" + name
             API.SavePersistentVar(key, "", API.PersistentVar.Char)
 
-            # Update area list
-            self._save_area_list()
+            # Update area index
+            self.index.remove(name)
+            self._save_index()
 
             return True
 
@@ -866,22 +915,41 @@ class AreaManager:
         player_x = getattr(API.Player, 'X', 0)
         player_y = getattr(API.Player, 'Y', 0)
 
-        for area in self.areas.values():
-            if area.is_in_area(player_x, player_y):
-                return area
+        name = self.index.find(player_x, player_y)
+        if name is None:
+            return None
+        return self.get_area(name)
 
-        return None
+    def get_nearest_safe_spot(self, x=None, y=None):
+        """
+        Get the nearest safe spot of the area containing a position.
+
+        Args:
+            x, y: Position (defaults to the player's)
+
+        Returns:
+            SafeSpot object or None if not in an area or it has no safe spots
+        """
+        if x is None or y is None:
+            x = getattr(API.Player, 'X', 0)
+            y = getattr(API.Player, 'Y', 0)
+
+        name = self.index.find(x, y)
+        area = self.get_area(name) if name is not None else None
+        if area is None:
+            return None
+        return area.get_nearest_safe_spot(x, y)
 
     def get_area_count(self):
         """Get total number of configured areas"""
-        return len(self.areas)
+        return len(self.index)
 
 
 # ========== NPC THREAT MAP CLASS ==========
 class NPCThreatMap:
     """Handles NPC detection and threat zone mapping for avoidance"""
 
-    def __init__(self, avoid_radius=6, scan_radius=12, refresh_interval=2.0):
+    def __init__(self, avoid_radius=6, scan_radius=12, refresh_interval=2.0, flee_directions=16):
         """
         Initialize NPC threat map.
 
@@ -889,12 +957,19 @@ class NPCThreatMap:
             avoid_radius: Radius around NPCs to mark as avoid zone (tiles)
             scan_radius: Radius to scan for NPCs (tiles)
             refresh_interval: Minimum time between scans to reduce overhead (seconds)
+            flee_directions: Directions sampled by calculate_safe_direction
         """
         self.avoid_radius = avoid_radius
         self.scan_radius = scan_radius
         self.refresh_interval = refresh_interval
         self.last_scan_time = 0
         self.npc_positions = []  # List of (x, y) NPC positions
+        self.flee_directions = compass_directions(flee_directions, 10)
+
+        # Distance to the nearest NPC for the tiles asked about around the
+        # player. NPCs are within scan_radius; flee/patrol destinations reach ~12 further.
+        self.threat_field = ThreatDistanceField(radius=scan_radius + 12)
+        self._field_positions = None  # npc_positions list the field was built from
 
     def scan_npcs(self, force_scan=False):
         """
@@ -916,28 +991,15 @@ class NPCThreatMap:
             # Clear previous threat map
             self.npc_positions = []
 
-            # Get all mobiles within scan radius
-            all_mobiles = API.Mobiles.GetMobiles()
-
+            # Get all mobiles within scan radius (the scan skips the player and the dead)
             player_x = getattr(API.Player, 'X', 0)
             player_y = getattr(API.Player, 'Y', 0)
 
-            for mob in all_mobiles:
-                if mob is None or mob.IsDead:
-                    continue
-
+            for mob in get_mobile_scan().in_range(None, self.scan_radius):
                 # Filter out pets (Notoriety == 1)
                 if mob.Notoriety == 1:
                     continue
 
-                # Filter out player
-                if mob.Serial == API.Player.Serial:
-                    continue
-
-                # Check if within scan radius
-                if mob.Distance > self.scan_radius:
-                    continue
-
                 # Store NPC position
                 mob_x = getattr(mob, 'X', player_x)
                 mob_y = getattr(mob, 'Y', player_y)
@@ -952,6 +1014,15 @@ class NPCThreatMap:
             API.SysMsg("NPCThreatMap.scan_npcs error: " + str(e), 32)
             return []
 
+    def _get_threat_field(self):
+        """Threat field in sync with npc_positions (updated when the list is replaced)"""
+        if self._field_positions is not self.npc_positions:
+            # Incremental: only NPCs that appeared, left or moved touch the grid
+            self.threat_field.update(self.npc_positions,
+                                     getattr(API.Player, 'X', 0), getattr(API.Player, 'Y', 0))
+            self._field_positions = self.npc_positions
+        return self.threat_field
+
     def is_position_safe(self, x, y):
         """
         Check if position is safe from NPCs (not in any avoid zone).
@@ -963,17 +1034,7 @@ class NPCThreatMap:
             True if safe, False if in avoid zone
         """
         try:
-            import math
-
-            for npc_x, npc_y in self.npc_positions:
-                # Calculate distance to NPC
-                distance = math.sqrt((x - npc_x) ** 2 + (y - npc_y) ** 2)
-
-                # Check if within avoid radius
-                if distance <= self.avoid_radius:
-                    return False
-
-            return True
+            return self._get_threat_field().is_clear(x, y, self.avoid_radius)
 
         except Exception as e:
             API.SysMsg("NPCThreatMap.is_position_safe error: " + str(e), 32)
@@ -990,22 +1051,7 @@ class NPCThreatMap:
             (npc_x, npc_y, distance) or None if no NPCs
         """
         try:
-            import math
-
-            if not self.npc_positions:
-                return None
-
-            nearest_npc = None
-            min_distance = float('inf')
-
-            for npc_x, npc_y in self.npc_positions:
-                distance = math.sqrt((x - npc_x) ** 2 + (y - npc_y) ** 2)
-
-                if distance < min_distance:
-                    min_distance = distance
-                    nearest_npc = (npc_x, npc_y, distance)
-
-            return nearest_npc
+            return self._get_threat_field().nearest(x, y)
 
         except Exception as e:
             API.SysMsg("NPCThreatMap.get_nearest_threat error: " + str(e), 32)
@@ -1014,7 +1060,8 @@ class NPCThreatMap:
     def calculate_safe_direction(self, from_x, from_y):
         """
         Calculate safest direction to move from given position.
-        Samples 8 cardinal/diagonal directions and returns the safest one.
+        Samples flee_directions compass directions (10 tiles out, clockwise
+        from north) and returns the safest one.
 
         Args:
             from_x, from_y: Starting position
@@ -1023,43 +1070,26 @@ class NPCThreatMap:
             (dx, dy) direction vector for safest path, or None if all blocked
         """
         try:
-            import math
-
-            # Define 8 directions (N, NE, E, SE, S, SW, W, NW)
-            directions = [
-                (0, -10),   # North
-                (7, -7),    # NE
-                (10, 0),    # East
-                (7, 7),     # SE
-                (0, 10),    # South
-                (-7, 7),    # SW
-                (-10, 0),   # West
-                (-7, -7)    # NW
-            ]
+            field = self._get_threat_field()
+            avoid_sq = self.avoid_radius * self.avoid_radius
 
             best_direction = None
-            max_distance_to_threat = 0
-
-            for dx, dy in directions:
-                # Calculate destination
-                dest_x = from_x + dx
-                dest_y = from_y + dy
-
-                # Check if destination is safe
-                if not self.is_position_safe(dest_x, dest_y):
-                    continue
+            max_distance_sq = 0
 
-                # Find distance to nearest threat from this destination
-                nearest = self.get_nearest_threat(dest_x, dest_y)
-                if nearest is None:
+            for dx, dy in self.flee_directions:
+                # Squared distance to the nearest threat from the destination
+                threat_distance_sq = field.distance_sq(from_x + dx, from_y + dy)
+                if threat_distance_sq is None:
                     # No threats at all, this direction is perfect
                     return (dx, dy)
 
-                threat_distance = nearest[2]
+                # Check if destination is safe
+                if threat_distance_sq <= avoid_sq:
+                    continue
 
                 # Track direction that gets us furthest from threats
-                if threat_distance > max_distance_to_threat:
-                    max_distance_to_threat = threat_distance
+                if threat_distance_sq > max_distance_sq:
+                    max_distance_sq = threat_distance_sq
                     best_direction = (dx, dy)
 
             return best_direction
@@ -1107,13 +1137,22 @@ class DangerAssessment:
         }
 
         # Danger history tracking (last 10 readings)
-        self.danger_history = []
         self.max_history_size = 10
+        self.danger_history = deque(maxlen=self.max_history_size)
 
-        # Damage rate tracking
+        # Damage rate tracking: player HP drops in the last 3 seconds, with a
+        # running total. Fed by OnPlayerHitsChanged so no hit between two
+        # danger checks is missed (polled in calculate_danger without events).
         self.last_player_hp = 0
         self.last_hp_check_time = 0
-        self.recent_damage = []  # List of (damage, time) tuples
+        self.recent_damage = WindowedSum(window=3.0)
+        self.hits_events = self._subscribe_hits_events()
+
+        # Last score and the inputs it was computed from - an unchanged
+        # reading is answered without recomputing
+        self._last_inputs = None
+        self._last_danger = 0
+        self.recalculations = 0
 
     def configure_weights(self, player_hp=None, tank_pet_hp=None, enemy_count=None, nearby_npcs=None, damage_rate=None):
         """Update danger calculation weights"""
@@ -1137,35 +1176,57 @@ class DangerAssessment:
         if high is not None:
             self.thresholds["high"] = high
 
-    def _get_player_danger(self):
-        """Calculate danger from player HP"""
+    def _subscribe_hits_events(self):
+        """Track player HP drops through API.Events (False if unavailable)"""
         try:
-            player_hp_pct = (API.Player.Hits / API.Player.HitsMax) if API.Player.HitsMax > 0 else 1.0
-            danger = self.weights["player_hp"] * (1.0 - player_hp_pct)
-            return danger
+            self.last_player_hp = API.Player.Hits
+            API.Events.OnPlayerHitsChanged(self._on_player_hits_changed)
+            return True
         except:
-            return 0
+            return False
 
-    def _get_tank_pet_danger(self):
-        """Calculate danger from tank pet HP"""
-        try:
-            tank_pet = self.pet_manager.get_tank_pet()
-            if tank_pet is None:
-                return 0
+    def _on_player_hits_changed(self, hits):
+        """OnPlayerHitsChanged callback - record the drop in the damage window"""
+        self._record_player_hp(hits, time.time())
+
+    def _record_player_hp(self, current_hp, current_time):
+        """Add any HP drop since the last reading to the damage window"""
+        if self.last_player_hp > 0 and current_hp < self.last_player_hp:
+            self.recent_damage.add(self.last_player_hp - current_hp, current_time)
+        self.last_player_hp = current_hp
+        self.last_hp_check_time = current_time
+
+    def _read_tank_state(self):
+        """(hits, hits_max, is_dead, distance) of the tank pet, or None"""
+        tank_pet = self.pet_manager.get_tank_pet()
+        if tank_pet is None:
+            return None
 
-            tank_mob = API.Mobiles.FindMobile(tank_pet["serial"])
-            if tank_mob is None:
-                return 0
+        tank_mob = find_mobile(tank_pet["serial"])
+        if tank_mob is None:
+            return None
 
-            if tank_mob.IsDead:
-                return self.weights["tank_pet_hp"] + 50  # Extra danger if tank dead
+        if tank_mob.IsDead:
+            return (0, tank_mob.HitsMax, True, tank_mob.Distance)
+        return (tank_mob.Hits, tank_mob.HitsMax, False, tank_mob.Distance)
 
-            tank_hp_pct = (tank_mob.Hits / tank_mob.HitsMax) if tank_mob.HitsMax > 0 else 1.0
-            danger = self.weights["tank_pet_hp"] * (1.0 - tank_hp_pct)
-            return danger
-        except:
+    def _get_player_danger(self, hits, hits_max):
+        """Calculate danger from player HP"""
+        player_hp_pct = (hits / hits_max) if hits_max > 0 else 1.0
+        return self.weights["player_hp"] * (1.0 - player_hp_pct)
+
+    def _get_tank_pet_danger(self, tank_state):
+        """Calculate danger from tank pet HP"""
+        if tank_state is None:
             return 0
 
+        hits, hits_max, is_dead, _ = tank_state
+        if is_dead:
+            return self.weights["tank_pet_hp"] + 50  # Extra danger if tank dead
+
+        tank_hp_pct = (hits / hits_max) if hits_max > 0 else 1.0
+        return self.weights["tank_pet_hp"] * (1.0 - tank_hp_pct)
+
     def _get_enemy_danger(self, enemy_count):
         """Calculate danger from nearby enemy count"""
         return enemy_count * self.weights["enemy_count"]
@@ -1174,54 +1235,25 @@ class DangerAssessment:
         """Calculate danger from nearby NPC count"""
         return npc_count * self.weights["nearby_npcs"]
 
-    def _get_damage_danger(self):
-        """Calculate danger from recent damage rate"""
-        try:
-            current_time = time.time()
-
-            # Track player HP changes
-            current_hp = API.Player.Hits
-            if self.last_player_hp > 0 and current_hp < self.last_player_hp:
-                damage = self.last_player_hp - current_hp
-                self.recent_damage.append((damage, current_time))
-
-            self.last_player_hp = current_hp
-            self.last_hp_check_time = current_time
-
-            # Remove damage events older than 3 seconds
-            self.recent_damage = [(dmg, t) for dmg, t in self.recent_damage if current_time - t <= 3.0]
-
-            # Calculate damage rate (total damage in last 3 seconds)
-            total_damage = sum(dmg for dmg, _ in self.recent_damage)
-
-            # Normalize damage rate (assume 100 HP = full danger weight)
-            max_hp = API.Player.HitsMax if API.Player.HitsMax > 0 else 100
-            damage_ratio = min(1.0, total_damage / max_hp)
-
-            return self.weights["damage_rate"] * damage_ratio
+    def _get_damage_danger(self, total_damage, hits_max):
+        """Calculate danger from recent damage rate (total damage in last 3 seconds)"""
+        # Normalize damage rate (assume 100 HP = full danger weight)
+        max_hp = hits_max if hits_max > 0 else 100
+        damage_ratio = min(1.0, total_damage / max_hp)
 
-        except:
-            return 0
+        return self.weights["damage_rate"] * damage_ratio
 
-    def _get_positioning_danger(self):
+    def _get_positioning_danger(self, tank_state):
         """Calculate danger from pet positioning (too far from player)"""
-        try:
-            tank_pet = self.pet_manager.get_tank_pet()
-            if tank_pet is None:
-                return 0
-
-            tank_mob = API.Mobiles.FindMobile(tank_pet["serial"])
-            if tank_mob is None or tank_mob.IsDead:
-                return 0
+        if tank_state is None or tank_state[2]:
+            return 0
 
-            # Add danger if tank pet is more than 5 tiles away
-            distance = tank_mob.Distance
-            if distance > 5:
-                return min(15, (distance - 5) * 3)  # Up to 15 extra danger
+        # Add danger if tank pet is more than 5 tiles away
+        distance = tank_state[3]
+        if distance > 5:
+            return min(15, (distance - 5) * 3)  # Up to 15 extra danger
 
-            return 0
-        except:
-            return 0
+        return 0
 
     def calculate_danger(self, enemy_count=0, npc_count=0):
         """
@@ -1235,31 +1267,45 @@ class DangerAssessment:
             Danger score (0-100)
         """
         try:
-            # Calculate individual danger factors
-            player_danger = self._get_player_danger()
-            tank_danger = self._get_tank_pet_danger()
-            enemy_danger = self._get_enemy_danger(enemy_count)
-            npc_danger = self._get_npc_danger(npc_count)
-            damage_danger = self._get_damage_danger()
-            positioning_danger = self._get_positioning_danger()
-
-            # Sum all factors
-            total_danger = (
-                player_danger +
-                tank_danger +
-                enemy_danger +
-                npc_danger +
-                damage_danger +
-                positioning_danger
-            )
-
-            # Clamp to 0-100
-            total_danger = max(0, min(100, total_danger))
-
-            # Track in history
+            # Read each input once
+            current_time = time.time()
+            try:
+                player = API.Player
+                hits, hits_max = player.Hits, player.HitsMax
+                if not self.hits_events:
+                    self._record_player_hp(hits, current_time)
+            except:
+                hits, hits_max = 0, 0    # no player danger, default damage scale
+            try:
+                tank_state = self._read_tank_state()
+            except:
+                tank_state = None
+            total_damage = self.recent_damage.total(current_time)
+
+            inputs = (hits, hits_max, tank_state, enemy_count, npc_count, total_damage,
+                      tuple(self.weights.values()))
+            if inputs == self._last_inputs:
+                total_danger = self._last_danger
+            else:
+                self.recalculations += 1
+
+                # Sum all factors
+                total_danger = (
+                    self._get_player_danger(hits, hits_max) +
+                    self._get_tank_pet_danger(tank_state) +
+                    self._get_enemy_danger(enemy_count) +
+                    self._get_npc_danger(npc_count) +
+                    self._get_damage_danger(total_damage, hits_max) +
+                    self._get_positioning_danger(tank_state)
+                )
+
+                # Clamp to 0-100
+                total_danger = max(0, min(100, total_danger))
+                self._last_inputs = inputs
+                self._last_danger = total_danger
+
+            # Track in history (deque drops the oldest reading)
             self.danger_history.append(total_danger)
-            if len(self.danger_history) > self.max_history_size:
-                self.danger_history.pop(0)
 
             return total_danger
 
@@ -1302,8 +1348,9 @@ class DangerAssessment:
             return "stable"
 
         # Compare last 3 readings to previous 3
-        recent_avg = sum(self.danger_history[-3:]) / 3
-        previous_avg = sum(self.danger_history[-6:-3]) / 3 if len(self.danger_history) >= 6 else recent_avg
+        history = self.danger_history
+        recent_avg = (history[-1] + history[-2] + history[-3]) / 3
+        previous_avg = (history[-4] + history[-5] + history[-6]) / 3 if len(history) >= 6 else recent_avg
 
         diff = recent_avg - previous_avg
 
@@ -1320,7 +1367,7 @@ class DangerAssessment:
 
     def reset_damage_tracking(self):
         """Reset damage rate tracking"""
-        self.recent_damage = []
+        self.recent_damage.clear()
         self.last_player_hp = API.Player.Hits
         self.last_hp_check_time = time.time()
 
@@ -1408,43 +1455,18 @@ class CombatManager:
             if scan_range is None:
                 scan_range = self.enemy_scan_range
 
-            all_mobiles = API.Mobiles.GetMobiles()
-            enemies = []
-
-            for mob in all_mobiles:
-                if mob is None or mob.IsDead:
-                    continue
-
-                # Skip player
-                if mob.Serial == API.Player.Serial:
-                    continue
-
-                # Skip pets (Notoriety 1)
-                if mob.Notoriety == 1:
-                    continue
-
-                # Check if this enemy type is enabled
-                if mob.Notoriety == 5 and not self.attack_reds:
-                    continue
-                if mob.Notoriety == 6 and not self.attack_grays:
-                    continue
-
-                # Filter by notoriety (5=red, 6=gray)
-                if mob.Notoriety not in [5, 6]:
-                    continue
-
-                # Check range
-                if mob.Distance > scan_range:
-                    continue
+            # Enabled enemy types (5=red, 6=gray)
+            notorieties = []
+            if self.attack_reds:
+                notorieties.append(5)
+            if self.attack_grays:
+                notorieties.append(6)
+            if not notorieties:
+                return []
 
-                # Add to enemy list with distance for sorting
-                enemies.append((mob.Serial, mob.Distance))
-
-            # Sort by distance (closest first)
-            enemies.sort(key=lambda x: x[1])
-
-            # Return just serials
-            return [serial for serial, _ in enemies]
+            # The tick's shared scan already skips the player and the dead
+            # and keeps each notoriety sorted by distance (closest first)
+            return [mob.Serial for mob in get_mobile_scan().in_range(notorieties, scan_range)]
 
         except Exception as e:
             API.SysMsg("CombatManager.scan_for_enemies error: " + str(e), 32)
@@ -1462,7 +1484,7 @@ class CombatManager:
         """
         try:
             # Get enemy mobile
-            enemy = API.Mobiles.FindMobile(enemy_serial)
+            enemy = find_mobile(enemy_serial)
             if enemy is None or enemy.IsDead:
                 return False
 
@@ -1477,32 +1499,17 @@ class CombatManager:
                 return False
 
             # Check 3: Scan for NPCs near target enemy (pull risk assessment)
-            import math
             enemy_x = getattr(enemy, 'X', 0)
             enemy_y = getattr(enemy, 'Y', 0)
 
             npcs_near_target = 0
-            all_mobiles = API.Mobiles.GetMobiles()
-
-            for mob in all_mobiles:
-                if mob is None or mob.IsDead:
-                    continue
-
-                # Skip player and pets
-                if mob.Serial == API.Player.Serial or mob.Notoriety == 1:
-                    continue
+            neighbours = get_mobile_scan().neighbours(enemy_x, enemy_y, self.npc_proximity_radius)
 
-                # Skip the target enemy itself
-                if mob.Serial == enemy_serial:
+            for mob in neighbours:
+                # Skip pets and the target enemy itself
+                if mob.Notoriety == 1 or mob.Serial == enemy_serial:
                     continue
-
-                # Calculate distance to target enemy
-                mob_x = getattr(mob, 'X', enemy_x)
-                mob_y = getattr(mob, 'Y', enemy_y)
-                distance = math.sqrt((mob_x - enemy_x) ** 2 + (mob_y - enemy_y) ** 2)
-
-                if distance <= self.npc_proximity_radius:
-                    npcs_near_target += 1
+                npcs_near_target += 1
 
             if npcs_near_target > self.max_npcs_near_target:
                 return False
@@ -1510,7 +1517,7 @@ class CombatManager:
             # Check 4: Tank pet HP
             tank_pet = self.pet_manager.get_tank_pet()
             if tank_pet is not None:
-                tank_mob = API.Mobiles.FindMobile(tank_pet["serial"])
+                tank_mob = find_mobile(tank_pet["serial"])
                 if tank_mob is not None and not tank_mob.IsDead:
                     tank_hp_pct = (tank_mob.Hits / tank_mob.HitsMax * 100) if tank_mob.HitsMax > 0 else 100
                     if tank_hp_pct < self.min_tank_hp_to_engage:
@@ -1535,7 +1542,7 @@ class CombatManager:
         """
         try:
             # Verify enemy is valid
-            enemy = API.Mobiles.FindMobile(enemy_serial)
+            enemy = find_mobile(enemy_serial)
             if enemy is None or enemy.IsDead:
                 return False
 
@@ -1556,6 +1563,7 @@ class CombatManager:
             # Update engagement state
             self.engaged_enemy_serial = enemy_serial
             self.combat_start_time = time.time()
+            set_combat_state(True)  # Lets other scripts (e.g. gold satchel) hold off
 
             API.HeadMsg("Engaging!", API.Player.Serial, 68)
 
@@ -1575,7 +1583,7 @@ class CombatManager:
         if self.engaged_enemy_serial == 0:
             return None
 
-        enemy = API.Mobiles.FindMobile(self.engaged_enemy_serial)
+        enemy = find_mobile(self.engaged_enemy_serial)
         if enemy and not enemy.IsDead:
             return enemy
 
@@ -1585,6 +1593,7 @@ class CombatManager:
         """Clear engagement state"""
         self.engaged_enemy_serial = 0
         self.combat_start_time = 0
+        set_combat_state(False)
 
     def get_combat_duration(self):
         """Get duration of current combat in seconds"""
@@ -1604,6 +1613,10 @@ class CombatManager:
             - "corpse_serial": Corpse serial if enemy died (0 otherwise)
         """
         try:
+            # Keep pet damage rates current even while a bandage is running
+            if self.healing_system:
+                self.healing_system.track_damage()
+
             result = {
                 "status": "continuing",
                 "enemy_serial": self.engaged_enemy_serial,
@@ -1616,7 +1629,7 @@ class CombatManager:
                 return result
 
             # Check 1: Enemy status (dead or lost)
-            enemy = API.Mobiles.FindMobile(self.engaged_enemy_serial)
+            enemy = find_mobile(self.engaged_enemy_serial)
 
             if enemy is None or enemy.IsDead:
                 # Enemy defeated
@@ -1657,7 +1670,7 @@ class CombatManager:
 
                 if heal_action:
                     target_serial, action_type, is_self = heal_action
-                    target_mob = API.Mobiles.FindMobile(target_serial) if not is_self else API.Player
+                    target_mob = find_mobile(target_serial) if not is_self else API.Player
 
                     if target_mob:
                         hp_pct = (target_mob.Hits / target_mob.HitsMax * 100) if target_mob.HitsMax > 0 else 100
@@ -1678,7 +1691,7 @@ class CombatManager:
             # Check 4: Tank pet positioning
             tank_pet = self.pet_manager.get_tank_pet()
             if tank_pet:
-                tank_mob = API.Mobiles.FindMobile(tank_pet["serial"])
+                tank_mob = find_mobile(tank_pet["serial"])
                 if tank_mob and not tank_mob.IsDead:
                     if tank_mob.Distance > 10:
                         # Tank too far - call back
@@ -1774,14 +1787,17 @@ class CombatManager:
 class PatrolSystem:
     """Handles patrol movement for circle and waypoint-based areas"""
 
-    def __init__(self, npc_threat_map=None):
+    def __init__(self, npc_threat_map=None, route_planner=None):
         """
         Initialize the patrol system.
 
         Args:
             npc_threat_map: Optional NPCThreatMap instance for avoidance
+            route_planner: Optional RoutePlanner to share (one is created if None)
         """
         self.npc_threat_map = npc_threat_map
+        self.route_planner = route_planner if route_planner is not None else RoutePlanner()
+        self.route = []  # Remaining Pathfind legs, last one is the destination
         self.patrol_active = False
         self.STATE = "idle"  # idle, patrolling
         self.patrol_start_time = 0
@@ -1821,13 +1837,44 @@ class PatrolSystem:
         # Use NPCThreatMap to check if position is safe
         return self.npc_threat_map.is_position_safe(x, y)
 
+    def _get_patrol_points(self, area):
+        """
+        Get the area's patrol spots that can be walked to (computed once per area).
+
+        Args:
+            area: FarmingArea with circle or waypoints configuration
+
+        Returns:
+            List of reachable (x, y) spots (empty if none could be found)
+        """
+        try:
+            if area.area_type == "waypoints":
+                return self.route_planner.patrol_loop(area.name, area.waypoints)
+            return self.route_planner.patrol_points(area.name, area.center_x, area.center_y, area.radius)
+        except Exception:
+            return []
+
+    def _start_route(self, dest_x, dest_y):
+        """
+        Plan legs to the destination and pathfind to the first one.
+
+        Returns:
+            True if the destination is reachable and pathfinding started
+        """
+        current_x, current_y = self.get_current_position()
+        legs = self.route_planner.route((current_x, current_y), (dest_x, dest_y))
+        if legs is None:
+            return False
+        self.route = legs or [(dest_x, dest_y)]
+        return API.Pathfind(self.route[0][0], self.route[0][1])
+
     def _pick_circle_destination(self, area, max_attempts=3):
         """
-        Pick a random destination within circle area, avoiding NPCs.
+        Pick a random reachable destination within circle area, avoiding NPCs.
 
         Args:
             area: FarmingArea with circle configuration
-            max_attempts: Max tries to find safe destination
+            max_attempts: Max tries to find safe destination (random fallback only)
 
         Returns:
             (dest_x, dest_y) or None if no safe destination found
@@ -1835,6 +1882,14 @@ class PatrolSystem:
         import random
         import math
 
+        # Precomputed spots are all reachable - only NPC safety is left to check
+        points = self._get_patrol_points(area)
+        if points:
+            safe_points = [point for point in points if self._is_position_safe(point[0], point[1])]
+            if safe_points:
+                return random.choice(safe_points)
+            return None
+
         for attempt in range(max_attempts):
             # Pick random angle and distance
             angle = random.random() * 2 * math.pi
@@ -1882,8 +1937,8 @@ class PatrolSystem:
 
             self.destination_x, self.destination_y = destination
 
-            # Start pathfinding
-            if not API.Pathfind(self.destination_x, self.destination_y):
+            # Start pathfinding (first leg of the planned route)
+            if not self._start_route(self.destination_x, self.destination_y):
                 API.SysMsg("Pathfinding failed to destination", 32)
                 return False
 
@@ -1943,6 +1998,13 @@ class PatrolSystem:
 
                 return "arrived"
 
+            # Reached the end of a leg - pathfind the next one
+            if len(self.route) > 1:
+                leg_x, leg_y = self.route[0]
+                if max(abs(current_x - leg_x), abs(current_y - leg_y)) <= 1:
+                    self.route.pop(0)
+                    API.Pathfind(self.route[0][0], self.route[0][1])
+
             # Check if still pathfinding
             if not API.Pathfinding():
                 # Lost pathfinding (player moved manually or interrupted)
@@ -1953,9 +2015,12 @@ class PatrolSystem:
             # Check for stuck (same position for 3+ seconds)
             if time.time() - self.stuck_check_time >= self.stuck_threshold:
                 if current_x == self.last_position_x and current_y == self.last_position_y:
-                    # Stuck detected
+                    # Stuck detected - remember the tile so the next route avoids it
                     API.SysMsg("Patrol stuck detected, canceling", 43)
                     API.CancelPathfinding()
+                    if self.route:
+                        self.route_planner.note_stuck((current_x, current_y), self.route[0])
+                    self.route = []
                     self.STATE = "idle"
                     self.patrol_active = False
                     return "stuck"
@@ -2003,6 +2068,13 @@ class PatrolSystem:
             # Get target waypoint
             target_x, target_y = area.waypoints[self.current_waypoint_index]
 
+            # Skip waypoints the route planner found no walkable way to
+            reachable = self._get_patrol_points(area)
+            if reachable and (target_x, target_y) not in reachable:
+                API.SysMsg("Waypoint unreachable, skipping", 43)
+                self.current_waypoint_index = (self.current_waypoint_index + 1) % len(area.waypoints)
+                return False
+
             # 20% chance: skip to next waypoint OR backtrack to previous
             import random
             if random.random() < 0.20:
@@ -2031,10 +2103,12 @@ class PatrolSystem:
             self.destination_x = dest_x
             self.destination_y = dest_y
 
-            # Start pathfinding
-            if not API.Pathfind(self.destination_x, self.destination_y):
-                API.SysMsg("Pathfinding failed to waypoint", 32)
-                return False
+            # Start pathfinding (the offset spot may be in a wall - fall back to the waypoint)
+            if not self._start_route(self.destination_x, self.destination_y):
+                self.destination_x, self.destination_y = target_x, target_y
+                if not self._start_route(self.destination_x, self.destination_y):
+                    API.SysMsg("Pathfinding failed to waypoint", 32)
+                    return False
 
             # Update state
             self.STATE = "patrolling"
@@ -2064,6 +2138,7 @@ class PatrolSystem:
             API.CancelPathfinding()
         self.STATE = "idle"
         self.patrol_active = False
+        self.route = []
 
 
 # ========== LOOTING SYSTEM CLASS ==========
@@ -2078,6 +2153,7 @@ class LootingSystem:
             weight_threshold: Percentage of max weight before stopping looting (60-95)
         """
         self.item_filter = []  # List of graphic IDs to loot
+        self.item_filter_set = set()  # Same graphics, for per-item lookups
         self.weight_threshold = weight_threshold  # Percentage
 
         # Statistics
@@ -2085,11 +2161,24 @@ class LootingSystem:
         self.items_collected = 0
         self.corpses_looted = 0
         self.looting_failures = 0
+        self.items_moved = 0
+        self.skipped_for_weight = 0
+        self.loot_time_total = 0.0  # Seconds from opening corpses to their last item moved
+        self.corpse_times = deque(maxlen=20)  # Seconds per looted corpse, approach included
 
         # Constants
         self.GOLD_GRAPHIC = 0x0EED
         self.LOOT_RANGE = 2  # Tiles
         self.DANGER_THRESHOLD = 30  # Abort looting if danger spikes above this
+        self.OPEN_TIMEOUT = 1.0  # Seconds to wait for the corpse to open
+        self.MOVE_TIMEOUT_PER_ITEM = 1.0  # Seconds allowed per queued move
+        self.MOVE_START_TIMEOUT = 0.5  # Seconds for the client to pick up a queued batch
+        self.GOLD_WEIGHT_PER_COIN = 0.02  # Stones (items don't expose their weight)
+        self.DEFAULT_STACK_WEIGHT = 1.0  # Stones assumed for any other stack
+
+        # Containers reported open by OnOpenContainer (serial -> time)
+        self.opened_containers = {}
+        self.open_events = self._subscribe_open_events()
 
     def configure_loot_filter(self, graphics_list):
         """
@@ -2108,6 +2197,7 @@ class LootingSystem:
                     self.item_filter.append(int(graphic))
             else:
                 self.item_filter.append(int(graphic))
+        self.item_filter_set = set(self.item_filter)
 
     def configure_weight_threshold(self, threshold):
         """
@@ -2195,51 +2285,148 @@ class LootingSystem:
             API.SysMsg("Pathfind to corpse error: " + str(e), 32)
             return False
 
-    def _collect_gold(self, corpse_serial):
+    def _subscribe_open_events(self):
+        """Track opened containers through API.Events (False if unavailable)"""
+        try:
+            API.Events.OnOpenContainer(self._on_container_opened)
+            return True
+        except:
+            return False
+
+    def _on_container_opened(self, serial):
+        """OnOpenContainer callback"""
+        self.opened_containers[serial] = time.time()
+
+    def _open_container(self, serial):
         """
-        Collect all gold from corpse.
+        Open a container and wait until the client has it.
+
+        Returns as soon as OnOpenContainer reports it (or the item shows
+        Opened without events) instead of sleeping a fixed time.
 
         Args:
-            corpse_serial: Serial of corpse container
+            serial: Container serial
 
         Returns:
-            Amount of gold collected
+            True if opened within OPEN_TIMEOUT, False otherwise
         """
-        try:
-            # Note: This is a simplified version - actual implementation would need
-            # to enumerate container items and drag gold piles
-            # For now, we'll use a pattern that assumes gold auto-loots or track manually
+        self.opened_containers.pop(serial, None)
+        API.UseObject(serial, False)
 
-            # In UO, opening a corpse and clicking gold typically auto-loots it
-            # We'd need container enumeration API which may not be exposed
-            # This is a placeholder for the actual implementation
-
-            return 0  # Placeholder
+        wait_start = time.time()
+        while time.time() - wait_start < self.OPEN_TIMEOUT:
+            API.ProcessCallbacks()
+            if serial in self.opened_containers:
+                return True
+            if not self.open_events:
+                container = API.FindItem(serial)
+                if container is not None and getattr(container, 'Opened', False):
+                    return True
+            API.Pause(0.05)
+        return False
 
-        except Exception as e:
-            API.SysMsg("Collect gold error: " + str(e), 32)
-            return 0
+    def _estimate_weight(self, item):
+        """Stones an item stack adds to the backpack (estimated when not exposed)"""
+        weight = getattr(item, 'Weight', None)
+        if weight is not None:
+            return weight
+        if item.Graphic == self.GOLD_GRAPHIC:
+            return item.Amount * self.GOLD_WEIGHT_PER_COIN
+        return self.DEFAULT_STACK_WEIGHT
+
+    def _get_weight_budget(self):
+        """Stones left before weight_threshold (None = no limit known)"""
+        current_weight = getattr(API.Player, 'Weight', 0)
+        max_weight = getattr(API.Player, 'MaxWeight', 0)
+        if max_weight <= 0:
+            return None
+        return max_weight * self.weight_threshold / 100.0 - current_weight
 
-    def _collect_items(self, corpse_serial):
+    def _plan_loot(self, corpse_serial):
         """
-        Collect filtered items from corpse.
+        Pick the items to take from an open corpse.
+
+        Gold first, then items whose graphic is in the loot filter, each
+        taken only if it still fits the weight budget.
 
         Args:
             corpse_serial: Serial of corpse container
 
         Returns:
-            Number of items collected
+            (items to move, items skipped for weight)
         """
-        try:
-            # Note: This is a simplified version - actual implementation would need
-            # container enumeration API to scan corpse contents
-            # This is a placeholder for the actual implementation
+        gold = []
+        wanted = []
+        filter_set = self.item_filter_set
+        for item in API.ItemsInContainer(corpse_serial) or []:
+            if item.Graphic == self.GOLD_GRAPHIC:
+                gold.append(item)
+            elif item.Graphic in filter_set:
+                wanted.append(item)
+
+        budget = self._get_weight_budget()
+        moves = []
+        skipped = 0
+        for item in gold + wanted:
+            if budget is not None:
+                weight = self._estimate_weight(item)
+                if weight > budget:
+                    skipped += 1
+                    continue
+                budget -= weight
+            moves.append(item)
+        return moves, skipped
+
+    def _move_batch(self, items, corpse_serial):
+        """
+        Queue every move at once and wait for the client's move queue to drain.
 
-            return 0  # Placeholder
+        The client starts processing the queue on a later frame, so until
+        IsProcessingMoveQueue() reports it the corpse itself is checked:
+        a batch that already left (or never started) is not read as 0 moved.
 
-        except Exception as e:
-            API.SysMsg("Collect items error: " + str(e), 32)
-            return 0
+        Args:
+            items: Items to move to the backpack
+            corpse_serial: Corpse they are in (to confirm what left it)
+
+        Returns:
+            (gold moved, other items moved, stacks moved including gold)
+        """
+        for item in items:
+            API.QueueMoveItem(item.Serial, API.Backpack)
+
+        queued = set(item.Serial for item in items)
+        wait_start = time.time()
+        started = API.IsProcessingMoveQueue()
+        while not started:
+            remaining = set(i.Serial for i in API.ItemsInContainer(corpse_serial) or [])
+            if not (queued & remaining) or time.time() - wait_start >= self.MOVE_START_TIMEOUT:
+                break
+            API.ProcessCallbacks()
+            API.Pause(0.05)
+            started = API.IsProcessingMoveQueue()
+
+        if started:
+            wait_start = time.time()
+            timeout = len(items) * self.MOVE_TIMEOUT_PER_ITEM
+            while API.IsProcessingMoveQueue() and time.time() - wait_start < timeout:
+                API.ProcessCallbacks()
+                API.Pause(0.05)
+
+            # One read to confirm which items actually left the corpse
+            remaining = set(i.Serial for i in API.ItemsInContainer(corpse_serial) or [])
+        gold = 0
+        moved = 0
+        stacks = 0
+        for item in items:
+            if item.Serial in remaining:
+                continue
+            stacks += 1
+            if item.Graphic == self.GOLD_GRAPHIC:
+                gold += item.Amount
+            else:
+                moved += 1
+        return gold, moved, stacks
 
     def loot_corpse(self, corpse_serial, danger_check_callback=None):
         """
@@ -2253,6 +2440,8 @@ class LootingSystem:
             True if looting completed successfully, False if aborted/failed
         """
         try:
+            corpse_start = time.time()
+
             # Safety check: danger level before starting
             if danger_check_callback is not None:
                 danger = danger_check_callback()
@@ -2285,12 +2474,9 @@ class LootingSystem:
 
             # Check for nearby enemies (within 8 tiles)
             try:
-                all_mobiles = API.Mobiles.GetMobiles()
-                for mob in all_mobiles:
-                    if mob and not mob.IsDead and mob.Notoriety in [3, 4, 5, 6]:  # Hostile
-                        if mob.Distance <= 8:
-                            API.SysMsg("Enemy nearby, aborting loot", 43)
-                            return False
+                if get_mobile_scan().any_in_range([3, 4, 5, 6], 8):  # Hostile
+                    API.SysMsg("Enemy nearby, aborting loot", 43)
+                    return False
             except Exception:
                 pass  # Continue if enemy check fails
 
@@ -2300,30 +2486,31 @@ class LootingSystem:
                 return False
 
             # Open corpse
-            API.UseObject(corpse_serial, False)
-
-            # Wait for container gump to open (up to 1 second)
-            wait_start = time.time()
-            while time.time() - wait_start < 1.0:
-                API.ProcessCallbacks()
-                API.Pause(0.05)
-                # Note: We'd check for container gump here if API exposed it
-                # For now, assume gump opens after short delay
+            loot_start = time.time()
+            if not self._open_container(corpse_serial):
+                API.SysMsg("Corpse didn't open", 43)
+                self.looting_failures += 1
+                return False
 
-            # Collect gold (always)
-            gold_amount = self._collect_gold(corpse_serial)
-            if gold_amount > 0:
-                self.gold_collected += gold_amount
+            # Gold (always) and filtered items, within the weight budget
+            items, skipped = self._plan_loot(corpse_serial)
+            self.skipped_for_weight += skipped
+            if skipped:
+                API.SysMsg("Weight limit: left " + str(skipped) + " item(s)", 43)
 
-            # Collect filtered items
-            items_count = self._collect_items(corpse_serial)
-            if items_count > 0:
-                self.items_collected += items_count
+            # Move everything in one queued batch
+            gold_amount, items_count, stacks = self._move_batch(items, corpse_serial) if items else (0, 0, 0)
+            self.gold_collected += gold_amount
+            self.items_collected += items_count
+            self.items_moved += stacks
 
             # Close corpse (if needed - may auto-close)
             # API doesn't have explicit close container method
 
             # Success
+            now = time.time()
+            self.loot_time_total += now - loot_start
+            self.corpse_times.append(now - corpse_start)
             self.corpses_looted += 1
 
             return True
@@ -2338,21 +2525,47 @@ class LootingSystem:
         Get looting statistics.
 
         Returns:
-            Dict with gold_collected, items_collected, corpses_looted, looting_failures
+            Dict with gold_collected, items_collected, corpses_looted, looting_failures,
+            items_moved, skipped_for_weight, items_per_second, avg_corpse_time
         """
         return {
             "gold_collected": self.gold_collected,
             "items_collected": self.items_collected,
             "corpses_looted": self.corpses_looted,
-            "looting_failures": self.looting_failures
+            "looting_failures": self.looting_failures,
+            "items_moved": self.items_moved,
+            "skipped_for_weight": self.skipped_for_weight,
+            "items_per_second": self.get_items_per_second(),
+            "avg_corpse_time": self.get_avg_corpse_time()
         }
 
+    def get_items_per_second(self):
+        """Items moved per second spent with a corpse open"""
+        if self.loot_time_total <= 0:
+            return 0.0
+        return self.items_moved / self.loot_time_total
+
+    def get_avg_corpse_time(self):
+        """Average seconds per looted corpse (last 20), approach included"""
+        if not self.corpse_times:
+            return 0.0
+        return sum(self.corpse_times) / len(self.corpse_times)
+
+    def format_loot_rate(self):
+        """Display text, e.g. 'Loot: 6.5 items/s, 2.1s/corpse'"""
+        return "Loot: {:.1f} items/s, {:.1f}s/corpse".format(
+            self.get_items_per_second(), self.get_avg_corpse_time())
+
     def reset_stats(self):
         """Reset all statistics to zero"""
         self.gold_collected = 0
         self.items_collected = 0
         self.corpses_looted = 0
         self.looting_failures = 0
+        self.items_moved = 0
+        self.skipped_for_weight = 0
+        self.loot_time_total = 0.0
+        self.corpse_times.clear()
 
 
 # ========== AREA RECORDING GUMP ==========
@@ -2815,25 +3028,25 @@ class ConfigGump:
 
     def _load_runebook_serial(self):
         """Load saved runebook serial from persistence"""
-        saved = API.GetPersistentVar(KEY_PREFIX + "RunebookSerial", "0", API.PersistentVar.Char)
+        saved = load_setting(KEY_PREFIX + "RunebookSerial", "0")
         return int(saved) if saved.isdigit() else 0
 
     def _save_runebook_serial(self):
         """Save runebook serial to persistence"""
-        API.SavePersistentVar(KEY_PREFIX + "RunebookSerial", str(self.runebook_serial), API.PersistentVar.Char)
+        save_setting(KEY_PREFIX + "RunebookSerial", str(self.runebook_serial))
 
     def _load_int(self, key, default):
         """Load integer from persistence"""
-        saved = API.GetPersistentVar(KEY_PREFIX + key, str(default), API.PersistentVar.Char)
+        saved = load_setting(KEY_PREFIX + key, str(default))
         return int(saved) if saved.isdigit() else default
 
     def _save_int(self, key, value):
         """Save integer to persistence"""
-        API.SavePersistentVar(KEY_PREFIX + key, str(value), API.PersistentVar.Char)
+        save_setting(KEY_PREFIX + key, str(value))
 
     def _load_loot_filter(self):
         """Load loot filter list from persistence"""
-        saved = API.GetPersistentVar(KEY_PREFIX + "LootFilter", "", API.PersistentVar.Char)
+        saved = load_setting(KEY_PREFIX + "LootFilter", "")
         if not saved:
             return [0x0EED]  # Default: Gold only
         # Parse pipe-separated list of graphics (hex or decimal)
@@ -2854,7 +3067,7 @@ class ConfigGump:
         """Save loot filter list to persistence"""
         # Save as pipe-separated hex strings for readability
         items = [hex(g) for g in self.loot_filter]
-        API.SavePersistentVar(KEY_PREFIX + "LootFilter", "|".join(items), API.PersistentVar.Char)
+        save_setting(KEY_PREFIX + "LootFilter", "|".join(items))
         # Update LootingSystem if available
         if self.looting_system:
             self.looting_system.configure_loot_filter(self.loot_filter)
@@ -2864,14 +3077,10 @@ class ConfigGump:
         try:
             self.gump = API.Gumps.CreateGump()
 
-            # Use WindowPositionTracker if available
-            if WindowPositionTracker:
-                self.pos_tracker = WindowPositionTracker(self.gump, KEY_PREFIX + "ConfigXY",
-                                                          default_x=150, default_y=150)
-                x = self.pos_tracker.last_x
-                y = self.pos_tracker.last_y
-            else:
-                x, y = 150, 150
+            self.pos_tracker = WindowPositionTracker(self.gump, KEY_PREFIX + "ConfigXY",
+                                                     default_x=150, default_y=150)
+            x = self.pos_tracker.last_x
+            y = self.pos_tracker.last_y
 
             self.gump.SetRect(x, y, 600, 500)
 
@@ -3729,15 +3938,17 @@ class ConfigGump:
         self._build_gump()
 
     def update(self):
-        """Update window position tracking"""
+        """Update window position tracking and flush changed settings"""
         if self.pos_tracker:
             self.pos_tracker.update()
+        settings_store.update()
 
     def close(self):
         """Close the configuration window"""
-        # Save position
+        # Save position and any buffered settings
         if self.pos_tracker:
             self.pos_tracker.save()
+        settings_store.flush()
 
         # Dispose gump
         if self.gump:
@@ -3801,14 +4012,10 @@ class DungeonFarmerGUI:
         try:
             self.gump = API.Gumps.CreateGump()
 
-            # Use WindowPositionTracker if available
-            if WindowPositionTracker:
-                self.pos_tracker = WindowPositionTracker(self.gump, KEY_PREFIX + "MainXY",
-                                                          default_x=100, default_y=100)
-                x = self.pos_tracker.last_x
-                y = self.pos_tracker.last_y
-            else:
-                x, y = 100, 100
+            self.pos_tracker = WindowPositionTracker(self.gump, KEY_PREFIX + "MainXY",
+                                                     default_x=100, default_y=100)
+            x = self.pos_tracker.last_x
+            y = self.pos_tracker.last_y
 
             self.gump.SetRect(x, y, 350, 400)
 
@@ -3928,29 +4135,28 @@ class DungeonFarmerGUI:
             self.gump.AddControl(emergency_btn)
             API.Gumps.AddControlOnClick(emergency_btn, self._on_emergency_btn)
 
-            # Setup DisplayGroup if available
-            if DisplayGroup:
-                self.display_group = DisplayGroup(update_interval=0.5)
-                self.display_group.add_label("state", self.controls["state_label"],
-                                             lambda: self.state)
-                self.display_group.add_label("location", self.controls["location_label"],
-                                             lambda: "Location: " + str(self.location))
-                self.display_group.add_label("timer", self.controls["timer_label"],
-                                             self._format_session_time)
-                self.display_group.add_label("gold", self.controls["gold_label"],
-                                             self._format_gold)
-                self.display_group.add_label("kills", self.controls["kills_label"],
-                                             lambda: "Kills: " + str(self.stats["kills"]))
-                self.display_group.add_label("deaths", self.controls["deaths_label"],
-                                             self._format_deaths)
-                self.display_group.add_label("bandages", self.controls["bandages_label"],
-                                             self._format_bandages)
-                self.display_group.add_label("vet_kits", self.controls["vet_kits_label"],
-                                             lambda: "Vet Kits: " + str(self.stats["vet_kits"]) + " left")
-                self.display_group.add_label("weight", self.controls["weight_label"],
-                                             self._format_weight)
-                self.display_group.add_label("pet_status", self.controls["pet_status"],
-                                             self._format_pet_status)
+            # Batched label updates
+            self.display_group = DisplayGroup(update_interval=0.5)
+            self.display_group.add_label("state", self.controls["state_label"],
+                                         lambda: self.state)
+            self.display_group.add_label("location", self.controls["location_label"],
+                                         lambda: "Location: " + str(self.location))
+            self.display_group.add_label("timer", self.controls["timer_label"],
+                                         self._format_session_time)
+            self.display_group.add_label("gold", self.controls["gold_label"],
+                                         self._format_gold)
+            self.display_group.add_label("kills", self.controls["kills_label"],
+                                         lambda: "Kills: " + str(self.stats["kills"]))
+            self.display_group.add_label("deaths", self.controls["deaths_label"],
+                                         self._format_deaths)
+            self.display_group.add_label("bandages", self.controls["bandages_label"],
+                                         self._format_bandages)
+            self.display_group.add_label("vet_kits", self.controls["vet_kits_label"],
+                                         lambda: "Vet Kits: " + str(self.stats["vet_kits"]) + " left")
+            self.display_group.add_label("weight", self.controls["weight_label"],
+                                         self._format_weight)
+            self.display_group.add_label("pet_status", self.controls["pet_status"],
+                                         self._format_pet_status)
 
             # Add on_closed callback
             if self.pos_tracker:
@@ -4109,7 +4315,7 @@ class DungeonFarmerGUI:
 
     def _is_pet_dead(self, serial):
         """Check if pet is dead"""
-        mob = API.Mobiles.FindMobile(serial)
+        mob = find_mobile(serial)
         return mob is None or mob.IsDead
 
     def _format_pet_status(self):
@@ -4127,7 +4333,7 @@ class DungeonFarmerGUI:
         # Calculate average HP
         total_hp_pct = 0
         for pet in pets:
-            mob = API.Mobiles.FindMobile(pet["serial"])
+            mob = find_mobile(pet["serial"])
             if mob and not mob.IsDead and mob.HitsMax > 0:
                 total_hp_pct += (mob.Hits / mob.HitsMax * 100)
 
@@ -4237,9 +4443,10 @@ class ErrorRecoverySystem:
         self.recovery_success = {}
         self.recovery_failures = {}
 
-        # Error log file
+        # Error log file (buffered: written in batches, repeats folded, rotated by size)
         self.error_log_path = os.path.join(parent_dir, "logs", "error_log.txt")
         self._ensure_log_directory()
+        self.error_log = BufferedLogWriter(self.error_log_path)
 
     def _ensure_log_directory(self):
         """Create logs directory if it doesn't exist"""
@@ -4251,13 +4458,23 @@ class ErrorRecoverySystem:
             API.SysMsg("Failed to create log directory: " + str(e), 32)
 
     def _log_error(self, error_type, message):
-        """Log error to file with timestamp"""
+        """Queue error for the log file (timestamped; written in batches)"""
+        try:
+            self.error_log.write(error_type, message)
+        except Exception as e:
+            API.SysMsg("Failed to write error log: " + str(e), 32)
+
+    def update_log(self):
+        """Write queued log entries once they are due or the script is stopping"""
         try:
-            timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-            log_entry = "[{}] {}: {}\n".format(timestamp, error_type, message)
+            self.error_log.update()
+        except Exception as e:
+            API.SysMsg("Failed to write error log: " + str(e), 32)
 
-            with open(self.error_log_path, "a") as f:
-                f.write(log_entry)
+    def flush_log(self):
+        """Write all queued log entries now (call on shutdown)"""
+        try:
+            self.error_log.flush()
         except Exception as e:
             API.SysMsg("Failed to write error log: " + str(e), 32)
 
@@ -4275,6 +4492,9 @@ class ErrorRecoverySystem:
         errors = []
         current_time = time.time()
 
+        # Flush the error log once its oldest entry is due (off the error path itself)
+        self.update_log()
+
         # Get current position
         pos_x = getattr(API.Player, 'X', 0)
         pos_y = getattr(API.Player, 'Y', 0)
@@ -4304,7 +4524,7 @@ class ErrorRecoverySystem:
         if self.pet_manager and hasattr(self.pet_manager, 'pets'):
             for pet in self.pet_manager.pets:
                 serial = pet.get("serial", 0)
-                mob = API.Mobiles.FindMobile(serial)
+                mob = find_mobile(serial)
 
                 # Pet disappeared
                 if mob is None:
@@ -4681,7 +4901,7 @@ def on_manual_heal():
 
         if target and target > 0:
             # Validate target is a pet
-            mob = API.Mobiles.FindMobile(target)
+            mob = find_mobile(target)
             if mob and not mob.IsDead and mob.Notoriety == 1:  # Owned pet
                 # TODO: Use HealingSystem when integrated
                 # For now, just show confirmation
@@ -4711,10 +4931,6 @@ def setup_hotkeys():
     """Initialize and register all hotkeys"""
     global hotkey_manager
 
-    if HotkeyManager is None:
-        API.SysMsg("HotkeyManager not available - hotkeys disabled", 32)
-        return False
-
     try:
         # Create hotkey manager instance
         hotkey_manager = HotkeyManager()
@@ -5256,7 +5472,7 @@ def test_combat_manager():
         API.SysMsg("Found " + str(len(enemies)) + " enemies", 68)
 
         for i, enemy_serial in enumerate(enemies[:3]):  # Show first 3
-            enemy = API.Mobiles.FindMobile(enemy_serial)
+            enemy = find_mobile(enemy_serial)
             if enemy:
                 API.SysMsg("  Enemy " + str(i + 1) + ": " + enemy.Name +
                           " (Serial: " + str(enemy_serial) + ", Distance: " + str(enemy.Distance) + ")", 43)
@@ -5559,6 +5775,7 @@ def test_error_recovery():
     """Test function to verify ErrorRecoverySystem works correctly"""
     API.SysMsg("Testing ErrorRecoverySystem...", 68)
 
+    error_recovery = None
     try:
         # Initialize required systems
         pet_manager = PetManager()
@@ -5688,6 +5905,7 @@ def test_error_recovery():
 
         # Test 8: Check error log
         API.SysMsg("Test 8: Checking error log...", 68)
+        error_recovery.flush_log()
         if os.path.exists(error_recovery.error_log_path):
             API.SysMsg("  Error log created at: " + error_recovery.error_log_path, 68)
             with open(error_recovery.error_log_path, "r") as f:
@@ -5704,6 +5922,10 @@ def test_error_recovery():
         API.SysMsg("Test error: " + str(e), 32)
         import traceback
         API.SysMsg(str(traceback.format_exc()), 32)
+    finally:
+        # Entries from the last few seconds are still buffered - write them on stop
+        if error_recovery:
+            error_recovery.flush_log()
 
 def test_hotkey_system():
     """Test function to verify hotkey system integration"""
@@ -5796,3 +6018,7 @@ def test_hotkey_system():
 # test_hotkey_system()
 
 API.SysMsg("Dungeon Farmer loaded (FarmingArea + HealingSystem + PatrolSystem + NPCThreatMap + DangerAssessment + CombatManager + MainGUI + ConfigGump + ErrorRecovery + HotkeySystem v1.12)", 68)
+
+# Append the API trace (the test functions above run their own loops)
+if api_trace:
+    api_trace.stop()
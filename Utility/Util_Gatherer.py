@@ -36,7 +36,7 @@ from LegionUtils import (
     save_window_position, load_window_position,
     get_item_safe, cancel_all_targets,
     format_time_elapsed, ErrorManager,
-    get_item_count, WindowPositionTracker
+    get_item_count, WindowPositionTracker, Scheduler
 )
 
 # ============ CONSTANTS ============
@@ -193,9 +193,6 @@ last_bandage_time = 0  # Track bandage cooldown
 hotkey_pause = "F1"
 hotkey_esc = "F2"
 
-# Display
-last_display_update = 0
-
 # Emergency charge tracking
 used_emergency_charge = False
 
@@ -332,10 +329,10 @@ def handle_captcha(captcha_type):
 def check_resource_depletion():
     """Check journal for resource depletion messages"""
     try:
-        for message in DEPLETION_MESSAGES:
-            if API.InJournal(message, False):
-                API.SysMsg("DETECTED: " + message, HUE_ORANGE)
-                return True
+        message = harvester.find_journal_message(DEPLETION_MESSAGES)
+        if message:
+            API.SysMsg("DETECTED: " + message, HUE_ORANGE)
+            return True
         return False
     except Exception as e:
         return False
@@ -343,10 +340,7 @@ def check_resource_depletion():
 def check_gather_success():
     """Check if gather was successful from journal"""
     try:
-        for message in SUCCESS_MESSAGES:
-            if API.InJournal(message, False):
-                return True
-        return False
+        return harvester.find_journal_message(SUCCESS_MESSAGES) is not None
     except Exception as e:
         return False
 
@@ -2113,6 +2107,38 @@ API.SysMsg("Press " + hotkey_pause + " to pause, " + hotkey_esc + " for emergenc
 
 # ============ MAIN LOOP ============
 
+def session_display_tick():
+    """Refresh the main display and session totals"""
+    update_display()
+
+    # Update session runtime
+    runtime_seconds = stats.get_runtime()
+    runtime_text = format_time_elapsed(runtime_seconds)
+
+    if "session_runtime_label" in controls:
+        controls["session_runtime_label"].SetText("Runtime: " + runtime_text)
+
+    # Update session totals
+    if "session_ore_label" in controls:
+        controls["session_ore_label"].SetText("Total Ore: " + str(session_ore + ore_count))
+    if "session_logs_label" in controls:
+        controls["session_logs_label"].SetText("Total Logs: " + str(session_logs + log_count))
+    if "session_dumps_label" in controls:
+        controls["session_dumps_label"].SetText("Dumps: " + str(session_dumps))
+    if "session_captchas_label" in controls:
+        controls["session_captchas_label"].SetText("Captchas: " + str(session_captchas))
+
+def position_tick():
+    if pos_tracker:
+        pos_tracker.update()
+
+# The gathering state machine below blocks (harvest, recall, combat), so it
+# stays in the foreground; display and position tracking run on their own
+# timers from scheduler.pause() instead of being checked every iteration
+scheduler = Scheduler(API)
+scheduler.every(DISPLAY_UPDATE_INTERVAL, session_display_tick, slack=0.1)
+scheduler.every(2.0, position_tick, delay=2.0, slack=0.5)
+
 try:
     while not API.StopRequested:
         API.ProcessCallbacks()  # CRITICAL: First for responsive hotkeys
@@ -2131,10 +2157,6 @@ try:
         # Update tracking
         update_resource_counts()
 
-        # Update position tracker
-        if pos_tracker:
-            pos_tracker.update()
-
         # Combat check (highest priority) - but not while already in combat or at home
         current_state = state.get_state()
         if current_state not in ["fleeing", "dumping", "pathfinding", "combat", "waiting_to_recall"]:
@@ -2455,30 +2477,7 @@ try:
                     state.set_state("idle")
             # else: Stay in waiting_to_recall state until 2 seconds elapse
 
-        # Update display periodically
-        now = time.time()
-        if now - last_display_update > DISPLAY_UPDATE_INTERVAL:
-            update_display()
-            last_display_update = now
-
-            # Update session runtime
-            runtime_seconds = stats.get_runtime()
-            runtime_text = format_time_elapsed(runtime_seconds)
-
-            if "session_runtime_label" in controls:
-                controls["session_runtime_label"].SetText("Runtime: " + runtime_text)
-
-            # Update session totals
-            if "session_ore_label" in controls:
-                controls["session_ore_label"].SetText("Total Ore: " + str(session_ore + ore_count))
-            if "session_logs_label" in controls:
-                controls["session_logs_label"].SetText("Total Logs: " + str(session_logs + log_count))
-            if "session_dumps_label" in controls:
-                controls["session_dumps_label"].SetText("Dumps: " + str(session_dumps))
-            if "session_captchas_label" in controls:
-                controls["session_captchas_label"].SetText("Captchas: " + str(session_captchas))
-
-        API.Pause(0.1)  # Short pause only
+        scheduler.pause(0.1)  # Short pause only (runs due display/position tasks)
 
 except Exception as e:
     API.SysMsg("CRITICAL ERROR: " + str(e), HUE_RED)
@@ -40,9 +40,9 @@ from LegionUtils import (
     load_bool, save_bool, load_int, save_int,
     # Phase 2: Standalone utilities
     ErrorManager, CooldownTracker, ResourceRateTracker,
-    get_item_count,
+    get_item_count, get_inventory_index,
     # Phase 4: Complex systems
-    HotkeyManager, WindowPositionTracker
+    HotkeyManager, WindowPositionTracker, Scheduler
 )
 
 __version__ = "4.0"  # Refactored with LegionUtils v3.0
@@ -207,6 +207,7 @@ def move_gold_to_satchel():
 
         API.MoveItem(gold_serial, satchel_serial, amount, -1, -1)
         API.Pause(MOVE_PAUSE)
+        get_inventory_index().invalidate()  # Gold changed containers - rescan both
 
         check_item = get_gold_item()
         if check_item and check_item.Serial == gold_serial:
@@ -872,45 +873,25 @@ hotkeys = HotkeyManager()
 bank_hk = hotkeys.add("bank", BANK_HOTKEY_KEY, "Bank", move_satchel_to_bank, None, "B")
 check_hk = hotkeys.add("check", CHECK_HOTKEY_KEY, "Make Check", make_check, None, "C")
 
-# Wrap bind to update button text after capture
-bank_original_bind = bank_hk.bind
-check_original_bind = check_hk.bind
-
-def bank_bind_with_ui_update(key_name):
-    bank_original_bind(key_name)
-    # Update button text manually
-    bankHotkeyBtn.SetText("[" + bank_hk.current_hotkey + "]BANK")
-    bankHotkeyBtn.SetBackgroundHue(68)
-
-def check_bind_with_ui_update(key_name):
-    check_original_bind(key_name)
-    # Update button text manually
-    checkHotkeyBtn.SetText("[" + check_hk.current_hotkey + "]CHECK")
-    checkHotkeyBtn.SetBackgroundHue(68)
-
-bank_hk.bind = bank_bind_with_ui_update
-check_hk.bind = check_bind_with_ui_update
-
-# Button click handlers to start capture
-def start_bank_capture():
-    bank_hk.start_capture()
-    # Manually update button for capture mode
-    bankHotkeyBtn.SetText("[Listening...]")
-    bankHotkeyBtn.SetBackgroundHue(38)
-
-def start_check_capture():
-    check_hk.start_capture()
-    # Manually update button for capture mode
-    checkHotkeyBtn.SetText("[Listening...]")
-    checkHotkeyBtn.SetBackgroundHue(38)
+def refresh_hotkey_buttons():
+    """Show current binding (or capture state) on the two hotkey buttons"""
+    for binding, btn, suffix in [(bank_hk, bankHotkeyBtn, "BANK"), (check_hk, checkHotkeyBtn, "CHECK")]:
+        if binding.capturing:
+            btn.SetText("[Listening...]")
+            btn.SetBackgroundHue(38)
+        else:
+            btn.SetText("[" + (binding.current_hotkey if binding.current_hotkey else "---") + "]" + suffix)
+            btn.SetBackgroundHue(68 if binding.current_hotkey else 90)
+
+bank_hk.on_change = refresh_hotkey_buttons
+check_hk.on_change = refresh_hotkey_buttons
 
 # Set initial button text to show current hotkeys
-bankHotkeyBtn.SetText("[" + (bank_hk.current_hotkey if bank_hk.current_hotkey else "---") + "]BANK")
-checkHotkeyBtn.SetText("[" + (check_hk.current_hotkey if check_hk.current_hotkey else "---") + "]CHECK")
+refresh_hotkey_buttons()
 
 # Wire button clicks to start capture
-API.Gumps.AddControlOnClick(bankHotkeyBtn, start_bank_capture)
-API.Gumps.AddControlOnClick(checkHotkeyBtn, start_check_capture)
+API.Gumps.AddControlOnClick(bankHotkeyBtn, bank_hk.start_capture)
+API.Gumps.AddControlOnClick(checkHotkeyBtn, check_hk.start_capture)
 
 # ============ CONFIG PANEL (hidden by default, shown when [C] clicked) ============
 config_y = 118
@@ -972,48 +953,9 @@ gump.Add(doneBtn)
 
 API.Gumps.AddGump(gump)
 
-# Register combined handlers for all keys
-# Since API.OnHotKey only allows one handler per key, we create a combined handler
-# that checks both bindings (bank and check) for capture or execution
-def make_combined_handler(key_name):
-    """Create handler that checks all bindings for this key"""
-    def handler():
-        # Check if any binding is capturing
-        for binding in [bank_hk, check_hk]:
-            if binding.capturing:
-                if key_name == "ESC":
-                    # Cancel capture
-                    binding.capturing = False
-                    API.SysMsg("Hotkey capture cancelled", 90)
-                    # Update button manually
-                    if binding == bank_hk:
-                        bankHotkeyBtn.SetText("[" + (bank_hk.current_hotkey if bank_hk.current_hotkey else "---") + "]BANK")
-                        bankHotkeyBtn.SetBackgroundHue(68 if bank_hk.current_hotkey else 90)
-                    else:
-                        checkHotkeyBtn.SetText("[" + (check_hk.current_hotkey if check_hk.current_hotkey else "---") + "]CHECK")
-                        checkHotkeyBtn.SetBackgroundHue(68 if check_hk.current_hotkey else 90)
-                    return
-                # Bind to this key
-                binding.bind(key_name)
-                return
-
-        # Not capturing - check if key matches any binding's hotkey and execute
-        if key_name == bank_hk.current_hotkey:
-            move_satchel_to_bank()
-        elif key_name == check_hk.current_hotkey:
-            make_check()
-
-    return handler
-
-# Register combined handler for all possible keys
-for key in ["F1", "F2", "F3", "F4", "F5", "F6", "F7", "F8", "F9", "F10", "F11", "F12",
-            "A", "B", "C", "D", "E", "F", "G", "H", "I", "J", "K", "L", "M",
-            "N", "O", "P", "Q", "R", "S", "T", "U", "V", "W", "X", "Y", "Z",
-            "0", "1", "2", "3", "4", "5", "6", "7", "8", "9",
-            "NUMPAD0", "NUMPAD1", "NUMPAD2", "NUMPAD3", "NUMPAD4",
-            "NUMPAD5", "NUMPAD6", "NUMPAD7", "NUMPAD8", "NUMPAD9",
-            "ESC"]:
-    API.OnHotKey(key, make_combined_handler(key))
+# One handler per key; the manager's dispatch table routes presses to
+# the bound action (or to a pending capture)
+hotkeys.register_all()
 
 update_display()
 
@@ -1028,35 +970,32 @@ if wand_serial > 0 and loot_bag_serial > 0:
 
 # ============ MAIN LOOP ============
 DISPLAY_UPDATE_INTERVAL = 0.5
-next_scan = time.time() + SCAN_INTERVAL
-next_display = time.time() + DISPLAY_UPDATE_INTERVAL
-
-while not API.StopRequested and not script_should_stop:
-    try:
-        API.ProcessCallbacks()
-
-        # Track window position periodically
-        pos_tracker.update()
-
-        # Track income from looting
-        income_tracker.update(count_all_gold())
-
-        if enabled and time.time() >= next_scan:
-            move_gold_to_satchel()
-            next_scan = time.time() + SCAN_INTERVAL
-
-        # Salvage loot bag when heavy (80%+ weight) and cooldown ready
-        if should_salvage():
-            salvage_loot_bag()
-            salvage_cooldown.use()
-
-        if time.time() >= next_display:
-            update_display()
-            next_display = time.time() + DISPLAY_UPDATE_INTERVAL
-
-        API.Pause(0.1)
-
-    except Exception as e:
-        API.SysMsg("Error in main loop: " + str(e), 32)
-        debug_msg("Main loop exception: " + str(e))
-        API.Pause(1)
+SALVAGE_CHECK_INTERVAL = 1.0
+
+def scan_tick():
+    if enabled:
+        move_gold_to_satchel()
+
+def income_tick():
+    # Track income from looting
+    income_tracker.update(count_all_gold())
+
+def salvage_tick():
+    # Salvage loot bag when heavy (80%+ weight) and cooldown ready
+    if should_salvage():
+        salvage_loot_bag()
+        salvage_cooldown.use()
+
+def report_loop_error(task, e):
+    API.SysMsg("Error in main loop: " + str(e), 32)
+    debug_msg("Main loop exception: " + str(e))
+
+# Nothing here needs to run every tick - each job has its own timer and
+# the loop sleeps between them (callbacks/hotkeys still every 0.1s)
+scheduler = Scheduler(API, on_error=report_loop_error)
+scheduler.every(SCAN_INTERVAL, scan_tick, delay=SCAN_INTERVAL, slack=0.5)
+scheduler.every(income_tracker.check_interval, income_tick, slack=0.5)
+scheduler.every(SALVAGE_CHECK_INTERVAL, salvage_tick, slack=0.5)
+scheduler.every(DISPLAY_UPDATE_INTERVAL, update_display, delay=DISPLAY_UPDATE_INTERVAL, slack=0.1)
+scheduler.every(pos_tracker.update_interval, pos_tracker.update, slack=0.5)
+scheduler.run(until=lambda: script_should_stop)
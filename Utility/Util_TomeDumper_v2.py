@@ -17,7 +17,8 @@ import os
 
 # Add parent directory (CoryCustom root) to path for library imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from LegionUtils import *
+from LegionUtils import ErrorManager, GumpCapture, HotkeyManager
+from LegionUtils import cancel_all_targets, request_target, load_window_position, save_window_position
 
 # ============ CONSTANTS ============
 WINDOW_WIDTH = 280
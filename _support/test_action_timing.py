@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Test script for LegionUtils.ActionTimingModel and learned bandage timers
+
+Tests:
+1. Default is used until min_samples, then the p95 of the samples
+2. Finish messages record a sample, fail messages only count
+3. Learned values are clamped; late finishes are still recorded
+4. to_string/from_string round-trip and skip bad entries
+5. Tamer_Suite and Tamer_Healer learn faster bandages from the journal
+6. A finish line only ends the heal it belongs to
+"""
+
+import sys
+import os
+import runpy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "_support", "tools"))
+
+from LegionSim import SimWorld, run_script, default_tamer_world
+
+FINISH = ["You finish applying the bandages"]
+FAIL = ["You were disturbed"]
+
+
+def _load_script(world, path):
+    """Run a script's top level under the simulator and return its globals"""
+    world.deadline = world.clock.now     # main loops exit at once
+    sys.modules.pop("LegionUtils", None)
+    ns = runpy.run_path(os.path.join(ROOT, path), run_name="__main__")
+    world.deadline = None
+    # run_path returns a copy - the functions read the real globals
+    for value in ns.values():
+        if hasattr(value, "__globals__") and value.__module__ == "__main__":
+            return value.__globals__
+    return ns
+
+
+def _timing_world():
+    world = SimWorld()
+    world.install()
+    sys.modules.pop("LegionUtils", None)
+    import LegionUtils
+    return world, LegionUtils
+
+
+def _bandage(world, timing, action, seconds, message=FINISH[0]):
+    """begin() now, add `message` to the journal `seconds` later and poll it"""
+    timing.begin(action)
+    world.clock.now += seconds
+    world.add_journal(message + ".")
+    world.clock.now += 0.3
+    return timing.poll()
+
+
+def test_1_default_then_p95():
+    print("\n[Test 1] Default until min_samples")
+    world, LegionUtils = _timing_world()
+    try:
+        timing = LegionUtils.ActionTimingModel({"pet": 4.5}, FINISH, FAIL, min_samples=5)
+        for i in range(4):
+            assert _bandage(world, timing, "pet", 3.0 + i * 0.1) == "finish"
+            assert timing.expected("pet") == 4.5
+        assert _bandage(world, timing, "pet", 3.4) == "finish"
+        assert abs(timing.expected("pet") - 3.4) < 0.01, timing.expected("pet")
+        stats = timing.get_stats("pet")
+        assert stats["samples"] == 5 and abs(stats["p50"] - 3.2) < 0.01
+        timing.set_default("pet", 3.0)
+        assert stats["default"] == 4.5 and timing.get_stats("pet")["default"] == 3.0
+        assert timing.expected("self") == 0.0
+    finally:
+        world.uninstall()
+    print("✓ p95 replaces the default once 5 samples exist")
+
+
+def test_2_finish_and_fail():
+    print("\n[Test 2] Finish and fail messages")
+    world, LegionUtils = _timing_world()
+    try:
+        timing = LegionUtils.ActionTimingModel({"self": 4.5}, FINISH, FAIL)
+        assert timing.poll() is None
+        timing.begin("self")
+        world.clock.now += 1.0
+        assert timing.poll() is None
+        world.add_journal("Someone says hello")
+        assert timing.poll() is None
+        assert _bandage(world, timing, "self", 2.0, FAIL[0]) == "fail"
+        assert timing.poll() is None
+        assert timing.get_stats("self")["fails"] == 1
+        assert timing.get_stats("self")["samples"] == 0
+        # The sample comes from the journal entry's time (a datetime, as in
+        # the client), not the poll
+        assert _bandage(world, timing, "self", 3.2) == "finish"
+        assert type(world.journal[-1].Time).__name__ == "datetime"
+        assert abs(timing.samples["self"][0] - 3.2) < 0.01
+    finally:
+        world.uninstall()
+    print("✓ Fails are counted, finishes timed from the journal entry")
+
+
+def test_3_clamps_and_late_finish():
+    print("\n[Test 3] Clamps and late finishes")
+    world, LegionUtils = _timing_world()
+    try:
+        timing = LegionUtils.ActionTimingModel({"pet": 4.0}, FINISH, min_samples=1)
+        timing.record("pet", 9.0)
+        assert timing.expected("pet") == 6.0
+        timing.samples.clear()
+        timing.record("pet", 0.1)
+        timing.record("pet", -1.0)
+        assert timing.expected("pet") == 0.5
+        assert len(timing.samples["pet"]) == 1
+        # Caller gave up waiting; the finish arrives before the next begin()
+        timing.samples.clear()
+        timing.begin("pet")
+        world.clock.now += 5.0
+        world.add_journal("You finish applying the bandages.")
+        world.clock.now += 1.0
+        timing.begin("pet")
+        assert len(timing.samples["pet"]) == 1
+        assert abs(timing.samples["pet"][0] - 5.0) < 0.01
+        assert timing.pending[1] == world.clock.now
+    finally:
+        world.uninstall()
+    print("✓ Clamped to [floor, default * 1.5]; late finish recorded")
+
+
+def test_4_persistence():
+    print("\n[Test 4] Persistence")
+    world, LegionUtils = _timing_world()
+    try:
+        timing = LegionUtils.ActionTimingModel({"self": 4.5, "pet": 4.5}, FINISH)
+        for seconds in (3.1, 3.25, 3.4):
+            timing.record("pet", seconds)
+        timing.record("self", 2.5)
+        text = timing.to_string()
+        assert text == "pet=3.10,3.25,3.40|self=2.50", text
+        loaded = LegionUtils.ActionTimingModel({"self": 4.5, "pet": 4.5}, FINISH)
+        loaded.from_string(text + "|junk|pet=abc,3.5|=1.0")
+        assert list(loaded.samples["pet"]) == [3.1, 3.25, 3.4, 3.5]
+        assert list(loaded.samples["self"]) == [2.5]
+        assert LegionUtils.ActionTimingModel({}, FINISH).from_string("").samples == {}
+    finally:
+        world.uninstall()
+    print("✓ Samples survive a save/load")
+
+
+def _pet_world(bandage_time):
+    world = default_tamer_world()
+    world.bandage_time = bandage_time
+    pets = [m.Serial for m in world.mobiles.values() if m.Name in ("Dragon", "Nightmare", "Hiryu")]
+    world.persistent["PetHealer_Pets"] = ",".join(str(s) for s in pets)
+    return world
+
+
+def test_5_scripts_learn():
+    print("\n[Test 5] Tamer_Suite and Tamer_Healer learn bandage time")
+    world = _pet_world(3.0)
+    report = run_script("Tamer/Tamer_Suite.py", world, seconds=120)
+    assert not report.error, report.error
+    settings = world.persistent.get("TamerSuite_Settings", "")
+    assert "pet=3.00,3.00,3.00,3.00,3.00" in settings, settings[-200:]
+
+    world = _pet_world(3.0)
+    report = run_script("Tamer/Tamer_Healer.py", world, seconds=120)
+    assert not report.error, report.error
+    saved = world.persistent.get("PetHealer_HealTiming", "")
+    assert saved.startswith("pet=3.00,3.00,3.00,3.00,3.00"), saved
+    print("✓ Both scripts save 3.0s bandage samples")
+
+
+def test_6_finish_matches_heal():
+    print("\n[Test 6] Finish lines only end their own heal")
+    world, LegionUtils = _timing_world()
+    try:
+        # Lines stamped before the action started are not its finish
+        timing = LegionUtils.ActionTimingModel({"pet": 4.5}, FINISH)
+        timing.begin("pet", world.clock.now + 2.0)
+        world.add_journal("You finish applying the bandages.")
+        world.clock.now += 5.0
+        assert timing.poll() is None and timing.pending
+        world.add_journal("You finish applying the bandages.")
+        assert timing.poll() == "finish" and abs(timing.samples["pet"][0] - 3.0) < 0.01
+        world.uninstall()
+
+        world = _pet_world(3.0)
+        world.install()
+        g = _load_script(world, "Tamer/Tamer_Suite.py")
+        heal_timing = g["heal_timing"]
+        heal_timing.samples.clear()
+        # A bandage timed out, then a Greater Heal started
+        heal_timing.begin("pet")
+        world.clock.now += 5.0
+        g["HEAL_STATE"], g["heal_start_time"], g["heal_duration"] = "healing", world.clock.now, 2.5
+        world.clock.now += 0.5
+        world.add_journal("You finish applying the bandages.")
+        g["check_heal_complete"]()
+        assert g["HEAL_STATE"] == "healing", "Spell not ended by the old bandage"
+        assert not heal_timing.samples.get("pet")
+        world.clock.now += 2.0
+        g["check_heal_complete"]()
+        assert g["HEAL_STATE"] == "idle"
+
+        # The next bandage records the late finish for the old one
+        heal_timing.begin("pet")
+        assert list(heal_timing.samples["pet"]) == [5.5]
+        g["HEAL_STATE"], g["heal_start_time"], g["heal_duration"] = "healing", heal_timing.pending[1], 9.0
+        world.clock.now += 3.0
+        world.add_journal("You finish applying the bandages.")
+        g["check_heal_complete"]()
+        assert g["HEAL_STATE"] == "idle" and list(heal_timing.samples["pet"]) == [5.5, 3.0]
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+    print("✓ Old bandage lines skip spells; each sample belongs to its bandage")
+
+
+def run_all_tests():
+    """Run all test cases"""
+    print("=" * 60)
+    print("ACTION TIMING MODEL - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_1_default_then_p95()
+        test_2_finish_and_fail()
+        test_3_clamps_and_late_finish()
+        test_4_persistence()
+        test_5_scripts_learn()
+        test_6_finish_matches_heal()
+
+        print("\n" + "=" * 60)
+        print("ALL TESTS PASSED ✓")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ UNEXPECTED ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
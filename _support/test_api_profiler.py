@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test script for LegionUtils.APIProfiler
+
+Tests:
+1. install() wraps API functions and counts calls per function
+2. API.Pause ends a tick - calls/tick is averaged over recent ticks
+3. Report rows are sorted by total time and include percentiles
+4. stop() restores the original functions and writes the report file
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "_support", "tools"))
+
+from LegionSim import SimWorld
+
+
+def _profiled_world():
+    world = SimWorld()
+    api = world.install()
+    sys.modules.pop("LegionUtils", None)
+    import LegionUtils
+    return world, api, LegionUtils
+
+
+def test_1_counts_calls():
+    print("\n[Test 1] Calls are counted per function")
+    world, API, LegionUtils = _profiled_world()
+    try:
+        pet = world.add_pet("Dragon", 100)
+        profiler = LegionUtils.APIProfiler(API, name="test").install()
+        for _ in range(5):
+            API.FindMobile(pet.Serial)
+        API.Mobiles.FindMobile(pet.Serial)
+        LegionUtils.get_mobile_safe(pet.Serial)   # LegionUtils calls are profiled too
+        rows = {r["name"]: r for r in profiler.get_rows()}
+        assert rows["FindMobile"]["calls"] == 5
+        assert rows["Mobiles.FindMobile"]["calls"] == 2
+        profiler.uninstall()
+    finally:
+        world.uninstall()
+    print("✓ FindMobile x5, Mobiles.FindMobile x2")
+
+
+def test_2_ticks():
+    print("\n[Test 2] Pause ends a tick")
+    world, API, LegionUtils = _profiled_world()
+    try:
+        profiler = LegionUtils.APIProfiler(API, name="test").install()
+        for tick in range(10):
+            for _ in range(3):
+                API.HasTarget()
+            API.Pause(0.1)
+        assert profiler.ticks == 10
+        assert profiler.calls_per_tick() == 3.0
+        assert "3.0 calls/tick" in profiler.get_live_text()
+        profiler.uninstall()
+    finally:
+        world.uninstall()
+    print("✓ 10 ticks, 3.0 calls/tick")
+
+
+def test_3_report_rows():
+    print("\n[Test 3] Report rows")
+    world, API, LegionUtils = _profiled_world()
+    try:
+        profiler = LegionUtils.APIProfiler(API, name="test").install()
+        for _ in range(50):
+            API.GetPersistentVar("x", "", API.PersistentVar.Char)
+        API.Pause(0.1)
+        rows = profiler.get_rows()
+        totals = [r["total_ms"] for r in rows]
+        assert totals == sorted(totals, reverse=True), "Rows must be sorted by total time"
+        row = [r for r in rows if r["name"] == "GetPersistentVar"][0]
+        assert row["p50_ms"] <= row["p95_ms"] <= row["p99_ms"]
+        assert all(r["name"] != "Pause" for r in rows), "Pause is sleep, not client work"
+        profiler.uninstall()
+    finally:
+        world.uninstall()
+    print("✓ Sorted by total time, percentiles ordered")
+
+
+def test_4_stop_writes_report():
+    print("\n[Test 4] stop() restores API and writes report")
+    report_dir = tempfile.mkdtemp()
+    world, API, LegionUtils = _profiled_world()
+    try:
+        original = API.FindMobile
+        profiler = LegionUtils.APIProfiler(API, name="test", report_dir=report_dir).install()
+        assert API.FindMobile is not original
+        API.FindMobile(1)
+        API.Pause(0.1)
+        path = profiler.stop()
+        assert API.FindMobile == original
+        assert path and os.path.exists(path)
+        with open(path) as f:
+            text = f.read()
+        assert "FindMobile" in text and "p99 ms" in text
+    finally:
+        world.uninstall()
+        shutil.rmtree(report_dir, ignore_errors=True)
+    print("✓ Report written: " + os.path.basename(path))
+
+
+def run_all_tests():
+    """Run all test cases"""
+    print("=" * 60)
+    print("API PROFILER - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_1_counts_calls()
+        test_2_ticks()
+        test_3_report_rows()
+        test_4_stop_writes_report()
+
+        print("\n" + "=" * 60)
+        print("ALL TESTS PASSED ✓")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ UNEXPECTED ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Test script for LegionUtils.TraceRecorder and LegionReplay
+
+Tests:
+1. The trace holds each tick's reads, actions, callbacks and snapshot deltas
+2. A PetFarmer session replays call for call, hotkeys included, offline
+3. Replaying an edited heal rule on an old trace shows where decisions change
+4. DungeonFarmer load replays under cProfile; per-tick latency is reported
+"""
+
+import sys
+import os
+import gzip
+import shutil
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "_support", "tools"))
+
+from LegionSim import SimWorld, run_script, Notoriety, BANDAGE_GRAPHIC
+from LegionReplay import replay_script, compare_actions
+
+HEAL_BOT = '''
+import API
+import time
+
+THRESHOLD = {threshold}
+
+serials = [int(s) for s in API.GetPersistentVar("HealBot_Pets", "", API.PersistentVar.Char).split(",") if s]
+next_heal = 0
+while not API.StopRequested:
+    API.ProcessCallbacks()
+    if time.time() >= next_heal:
+        for serial in serials:
+            pet = API.Mobiles.FindMobile(serial)
+            if pet and pet.Hits * 100 < pet.HitsMax * THRESHOLD:
+                bandage = API.FindType({bandage})
+                if bandage:
+                    API.UseObject(bandage.Serial)
+                    API.Target(pet.Serial)
+                    next_heal = time.time() + 4.5
+                break
+    API.Pause(0.1)
+'''
+
+
+def _record(world, script, seconds, path):
+    """Run a script in the simulator with a TraceRecorder installed first"""
+    holder = {}
+
+    def setup(world):
+        import LegionUtils
+        holder["recorder"] = LegionUtils.TraceRecorder(world.api, name="test", path=path, seed=7).install()
+    report = run_script(script, world, seconds=seconds, setup=setup)
+    holder["recorder"].stop()
+    return report, holder["recorder"]
+
+
+def _trace_calls(path):
+    sys.modules.pop("LegionUtils", None)
+    from LegionUtils.trace import read_trace
+    header, ticks = read_trace(path)
+    sys.modules.pop("LegionUtils", None)
+    return header, ticks, [(i, e[0], e[1]) for i, tick in enumerate(ticks) for e in tick[2] if e[0] != "!"]
+
+
+def _farmer_world():
+    world = SimWorld()
+    world.add_item(BANDAGE_GRAPHIC, 200, name="bandage")
+    px, py = world.player.X, world.player.Y
+    pets = [world.add_pet("Dragon", 400, x=px + 1, y=py), world.add_pet("Hiryu", 300, x=px, y=py + 1)]
+    prefix = "TamerPetFarmer_"
+    world.persistent[prefix + "Pets"] = "|".join(
+        pet.Name + ":" + str(pet.Serial) + ":" + str(i == 0) + ":" for i, pet in enumerate(pets))
+    world.persistent[prefix + "AreaType"] = "circle"
+    world.persistent[prefix + "AreaCenterX"] = str(px)
+    world.persistent[prefix + "AreaCenterY"] = str(py)
+    for i in range(4):
+        world.add_mobile("orc", 60, x=px + 5 + i, y=py + 3 - i, notoriety=Notoriety.Enemy)
+    for i, pet in enumerate(pets):
+        world.every(2.0 + i, lambda pet=pet: world.damage(pet, 15))
+    world.at(5.0, lambda: world.press_key("PAUSE"))
+    world.at(9.0, lambda: world.press_key("PAUSE"))
+    return world, pets
+
+
+def test_1_trace_format():
+    print("\n[Test 1] Trace contents")
+    tmp = tempfile.mkdtemp()
+    world = SimWorld()
+    world.install()
+    try:
+        sys.modules.pop("LegionUtils", None)
+        import LegionUtils
+        api = world.api
+        original_find = api.FindType
+        bandage = world.add_item(BANDAGE_GRAPHIC, 20, name="bandage")
+        path = os.path.join(tmp, "trace.jsonl.gz")
+        recorder = LegionUtils.TraceRecorder(api, name="unit", path=path, flush_ticks=3, seed=42).install()
+        pressed = []
+        api.OnHotKey("F1", lambda: pressed.append(1))
+        assert api.FindType(BANDAGE_GRAPHIC).Serial == bandage.Serial
+        api.SysMsg("not in the trace")
+        api.SavePersistentVar("Key", "Value", api.PersistentVar.Char)
+        api.Pause(0.1)
+        world.press_key("F1")
+        api.ProcessCallbacks()
+        api.Mobiles.GetMobiles()
+        api.Pause(0.1)
+        world.player.X += 1
+        api.Pause(0.1)
+        assert recorder.get_stats()["flushes"] == 1 and os.path.exists(path), "Flushed every 3 ticks"
+        api.Pause(0.1)
+        recorder.stop()
+        assert api.FindType == original_find and pressed == [1]
+
+        header, ticks = LegionUtils.read_trace(path)
+        assert header["seed"] == 42 and header["script"] == "unit"
+        assert header["constants"]["PersistentVar"]["Char"] == api.PersistentVar.Char
+        assert len(ticks) == 5
+        first = ticks[0]
+        assert first[1]["Player"]["X"] == world.player.X - 1 and first[1]["StopRequested"] is False
+        labels = [e[0] for e in first[2]]
+        assert labels == ["OnHotKey", "FindType", "SavePersistentVar"], labels
+        assert first[2][0][1] == ["F1", "@cb:1"]
+        assert first[2][1][2]["Serial"] == bandage.Serial and first[2][1][2]["Amount"] == 20
+        assert ticks[1][1] is None, "Snapshot only when something changed"
+        assert ticks[1][2][0] == ["!", 1, []] and ticks[1][2][1][0] == "ProcessCallbacks"
+        assert ticks[2][1] is None and ticks[3][1] == {"Player": ticks[3][1]["Player"]}
+        assert ticks[1][0] < ticks[2][0] < ticks[3][0]
+
+        # A line cut short by a crash is dropped, earlier ticks still load
+        with gzip.open(path, "at") as f:
+            f.write('[1.0,null,[["FindTy')
+        assert len(LegionUtils.read_trace(path)[1]) == 5
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+        shutil.rmtree(tmp)
+    print("✓ Reads, callbacks and snapshot deltas recorded per tick")
+
+
+def test_2_pet_farmer_replay():
+    print("\n[Test 2] PetFarmer record and replay")
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, "farmer.jsonl.gz")
+        world, _ = _farmer_world()
+        live, recorder = _record(world, "Tamer/Tamer_PetFarmer.py", 600, path)
+        assert not live.error, live.error
+        header, ticks, recorded = _trace_calls(path)
+        assert recorder.get_stats()["callbacks"] == 2
+
+        report = replay_script(path, "Tamer/Tamer_PetFarmer.py")
+        print("  " + report.format().replace("\n", "\n  "))
+        print("  trace: {} KB for {:.0f}s".format(os.path.getsize(path) // 1024, report.recorded_seconds))
+        assert report.error is None and report.stopped_by == "StopRequested"
+        assert report.call_log == recorded, "Same calls, same arguments, same ticks"
+        assert report.misses == 0 and report.callbacks_fired == 2
+        assert report.ticks == len(ticks)
+        assert report.speedup > 100
+    finally:
+        shutil.rmtree(tmp)
+    print("✓ 10 minutes replayed call for call")
+
+
+def _heal_bot(folder, threshold):
+    path = os.path.join(folder, "heal_bot_{}.py".format(threshold))
+    with open(path, "w") as f:
+        f.write(HEAL_BOT.format(threshold=threshold, bandage=BANDAGE_GRAPHIC))
+    return path
+
+
+def test_3_compare_versions():
+    print("\n[Test 3] Heal decisions across versions")
+    tmp = tempfile.mkdtemp()
+    try:
+        world = SimWorld()
+        world.add_item(BANDAGE_GRAPHIC, 200, name="bandage")
+        pets = [world.add_pet("Dragon", 400), world.add_pet("Hiryu", 300)]
+        world.persistent["HealBot_Pets"] = ",".join(str(p.Serial) for p in pets)
+        for i, pet in enumerate(pets):
+            world.every(1.5 + i, lambda pet=pet: world.damage(pet, 9))
+        path = os.path.join(tmp, "heal.jsonl.gz")
+        live, _ = _record(world, _heal_bot(tmp, 70), 300, path)
+        assert not live.error, live.error
+
+        same = replay_script(path, _heal_bot(tmp, 70))
+        assert same.divergence is None and same.misses == 0
+        assert same.comparison["matched"] == len(same.recorded_actions) > 10
+
+        edited = replay_script(path, _heal_bot(tmp, 90))
+        index, old, new = edited.divergence
+        assert index < edited.comparison["recorded"]
+        print("  " + edited.format().split("\n")[-1])
+        assert new[0] < old[0] and new[1] in ("UseObject", "Target"), "Heals sooner at 90%"
+        assert edited.misses > 0, "New decisions ask for reads the old session never made"
+
+        assert compare_actions([], [])["first_divergence"] is None
+        result = compare_actions([(0, "Msg", ["all kill"])], [(3, "Msg", ["all kill"]), (4, "Msg", ["x"])])
+        assert result["matched"] == 1 and result["first_divergence"] == (1, None, (4, "Msg", ["x"]))
+    finally:
+        shutil.rmtree(tmp)
+    print("✓ Same rule: no divergence; edited rule: first changed action reported")
+
+
+def test_4_profile_and_latency():
+    print("\n[Test 4] DungeonFarmer profile")
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, "df.jsonl")
+        world = SimWorld()
+        live, _ = _record(world, "Utility/Util_DungeonFarmer.py", 10, path)
+        assert not live.error, live.error
+        _, ticks, recorded = _trace_calls(path)
+        report = replay_script(path, "Utility/Util_DungeonFarmer.py", profile=True)
+        assert report.error is None and report.call_log == recorded and report.misses == 0
+        assert "cumulative" in report.profile_text and "Util_DungeonFarmer.py" in report.profile_text
+        assert report.latency_ms(100) >= report.latency_ms(95) >= report.latency_ms(50) > 0
+        text = report.format()
+        assert "Latency      : p50" in text and "Actions      :" in text
+        print("  " + text.split("\n")[3])
+    finally:
+        shutil.rmtree(tmp)
+    print("✓ Replayed under cProfile with per-tick latency")
+
+
+def run_all_tests():
+    """Run all test cases"""
+    print("=" * 60)
+    print("API TRACE - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_1_trace_format()
+        test_2_pet_farmer_replay()
+        test_3_compare_versions()
+        test_4_profile_and_latency()
+
+        print("\n" + "=" * 60)
+        print("ALL TESTS PASSED ✓")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ UNEXPECTED ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
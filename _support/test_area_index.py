@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Test script for LegionUtils.AreaIndex and the farmers' AreaManager index blob
+
+Tests:
+1. Grid lookups match a first-match loop over the shapes, with margins
+2. DungeonFarmer AreaManager migrates old saves, then starts from one blob
+3. DungeonFarmer get_current_area/get_nearest_safe_spot match the old scan
+4. PetFarmer get_current_area(proximity) matches the old scan
+"""
+
+import sys
+import os
+import json
+import math
+import random
+import runpy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "_support", "tools"))
+
+from LegionSim import SimWorld
+
+
+def _load_script(world, path):
+    """Run a script's top level under the simulator and return its globals"""
+    world.deadline = world.clock.now     # main loops exit at once
+    sys.modules.pop("LegionUtils", None)
+    ns = runpy.run_path(os.path.join(ROOT, path), run_name="__main__")
+    world.deadline = None
+    # run_path returns a copy - the functions read the real globals
+    for value in ns.values():
+        if hasattr(value, "__globals__") and value.__module__ == "__main__":
+            return value.__globals__
+    return ns
+
+
+def _record_reads(world):
+    """Wrap GetPersistentVar to log the keys read"""
+    reads = []
+    original = world.api.GetPersistentVar
+
+    def get(name, default, scope=None):
+        reads.append(name)
+        return original(name, default)
+    world.api.GetPersistentVar = get
+    return reads
+
+
+def _random_shapes(rng, count, spread=400):
+    shapes = []
+    for i in range(count):
+        if rng.random() < 0.6:
+            shapes.append(("A" + str(i), "circle", rng.randint(0, spread), rng.randint(0, spread),
+                           rng.choice([0, 5, 15, 22.5, 40])))
+        else:
+            x, y = rng.randint(0, spread), rng.randint(0, spread)
+            points = [(x + rng.randint(-60, 60), y + rng.randint(-60, 60)) for _ in range(rng.randint(0, 6))]
+            shapes.append(("A" + str(i), "points", points, rng.choice([0, 15])))
+    return shapes
+
+
+def _brute(shapes, x, y, margin):
+    found = []
+    for shape in shapes:
+        if shape[1] == "circle":
+            hit = math.sqrt((x - shape[2]) ** 2 + (y - shape[3]) ** 2) <= shape[4] + margin
+        else:
+            hit = any(math.sqrt((x - px) ** 2 + (y - py) ** 2) <= shape[3] + margin for px, py in shape[2])
+        if hit:
+            found.append(shape[0])
+    return found
+
+
+def _build(LegionUtils, shapes, pad):
+    index = LegionUtils.AreaIndex(cell_size=32, pad=pad)
+    for shape in shapes:
+        if shape[1] == "circle":
+            index.add_circle(shape[0], shape[2], shape[3], shape[4])
+        else:
+            index.add_points(shape[0], shape[2], shape[3])
+    return index
+
+
+def test_1_index_matches_scan():
+    print("\n[Test 1] AreaIndex vs first-match loop")
+    sys.modules.pop("LegionUtils", None)
+    import LegionUtils
+    rng = random.Random(23)
+    shapes = _random_shapes(rng, 60)
+    index = _build(LegionUtils, shapes, pad=20)
+    checked = 0
+    for step in range(3000):
+        if step == 1500:
+            # Replace one shape (keeps its place), drop another, round-trip the blob
+            shapes[3] = (shapes[3][0], "circle", 200, 200, 30)
+            index.add_circle(shapes[3][0], 200, 200, 30)
+            index.remove(shapes[10][0])
+            del shapes[10]
+            index = LegionUtils.AreaIndex.from_dict(json.loads(json.dumps(index.to_dict())), pad=20)
+        x, y = rng.randint(-80, 480), rng.randint(-80, 480)
+        margin = rng.choice([0, 0, 7, 20, 25])
+        expected = _brute(shapes, x, y, margin)
+        assert index.find(x, y, margin) == (expected[0] if expected else None), (x, y, margin)
+        assert index.find_all(x, y, margin) == expected
+        checked += 1
+    assert index.keys() == [s[0] for s in shapes]
+    stats = index.get_stats()
+    pieces = sum(1 if s[1] == "circle" else len(s[2]) for s in shapes)
+    assert stats["fallbacks"] > 0, "Margins past pad test every shape"
+    assert stats["tests"] / stats["lookups"] < pieces / 4, stats
+    assert LegionUtils.AreaIndex.from_dict({"version": 0, "areas": []}) is None
+    assert LegionUtils.AreaIndex.from_dict({"version": 1, "areas": [["x", "circle"]]}) is None
+    sys.modules.pop("LegionUtils", None)
+    print("✓ {} lookups agree ({:.1f} distance tests per lookup vs {})".format(
+        checked, stats["tests"] / stats["lookups"], pieces))
+
+
+def _df_areas(g, rng, count):
+    areas = []
+    for i in range(count):
+        area_type = "circle" if i % 3 else "waypoints"
+        area = g["FarmingArea"]("Area" + str(i), area_type)
+        cx, cy = 1000 + rng.randint(0, 600), 1000 + rng.randint(0, 600)
+        if area_type == "circle":
+            area.center_x, area.center_y, area.radius = cx, cy, rng.randint(8, 30)
+        else:
+            area.waypoints = [(cx + rng.randint(-40, 40), cy + rng.randint(-40, 40)) for _ in range(4)]
+        area.safe_spots = [g["SafeSpot"](cx + rng.randint(-20, 20), cy + rng.randint(-20, 20))
+                           for _ in range(rng.randint(1, 3))]
+        areas.append(area)
+    return areas
+
+
+def _save_old_format(world, g, areas):
+    """How AreaManager saved areas before the index blob"""
+    prefix = g["KEY_PREFIX"]
+    for area in areas:
+        world.persistent[prefix + "Area_" + area.name] = json.dumps(area.to_dict())
+    world.persistent[prefix + "AreaList"] = "|".join(a.name for a in areas)
+
+
+def test_2_df_startup():
+    print("\n[Test 2] DungeonFarmer AreaManager startup")
+    world = SimWorld()
+    world.install()
+    try:
+        g = _load_script(world, "Utility/Util_DungeonFarmer.py")
+        areas = _df_areas(g, random.Random(2), 40)
+        _save_old_format(world, g, areas)
+        prefix = g["KEY_PREFIX"]
+
+        migrated = g["AreaManager"]()
+        assert migrated.list_areas() == [a.name for a in areas]
+        assert prefix + "AreaIndex" in world.persistent
+
+        reads = _record_reads(world)
+        manager = g["AreaManager"]()
+        assert reads == [prefix + "AreaIndex"], reads
+        assert manager.areas == {} and manager.get_area_count() == 40
+        assert manager.list_areas() == [a.name for a in areas]
+
+        area = manager.get_area("Area7")
+        assert area.to_dict() == areas[7].to_dict() and reads[-1] == prefix + "Area_Area7"
+        assert manager.get_area("Area7") is area and len(reads) == 2, "Parsed once"
+
+        # Edits keep the blob in step
+        moved = g["FarmingArea"]("Area7", "circle")
+        moved.center_x, moved.center_y, moved.radius = 50, 50, 5
+        manager.add_area(moved)
+        assert manager.delete_area("Area8") and not manager.delete_area("Area8")
+        fresh = g["AreaManager"]()
+        assert fresh.list_areas() == [a.name for a in areas if a.name != "Area8"]
+        world.player.X, world.player.Y = 52, 50
+        assert fresh.get_current_area().name == "Area7"
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+    print("✓ Old saves migrated once; startup reads one var and parses no areas")
+
+
+def test_3_df_lookups():
+    print("\n[Test 3] DungeonFarmer lookups")
+    world = SimWorld()
+    world.install()
+    try:
+        g = _load_script(world, "Utility/Util_DungeonFarmer.py")
+        rng = random.Random(3)
+        areas = _df_areas(g, rng, 40)
+        _save_old_format(world, g, areas)
+        g["AreaManager"]()                      # migrates (parses every area once)
+        manager = g["AreaManager"]()
+        hits = 0
+        found = set()
+        for _ in range(1500):
+            x, y = 960 + rng.randint(0, 680), 960 + rng.randint(0, 680)
+            world.player.X, world.player.Y = x, y
+            old = next((a for a in areas if a.is_in_area(x, y)), None)
+            new = manager.get_current_area()
+            assert (new is None) == (old is None) and (old is None or new.name == old.name), (x, y)
+            if new is not None:
+                found.add(new.name)
+            spot = manager.get_nearest_safe_spot()
+            old_spot = old.get_nearest_safe_spot(x, y) if old else None
+            assert (spot is None) == (old_spot is None)
+            if spot is not None:
+                assert (spot.x, spot.y) == (old_spot.x, old_spot.y)
+                hits += 1
+        assert hits > 100
+        assert set(manager.areas) == found, "Only areas the player stood in were parsed"
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+    print("✓ 1500 positions: same area and safe spot ({} inside an area)".format(hits))
+
+
+def _old_pf_current(manager, g, px, py, proximity):
+    """Pre-index PetFarmer get_current_area, kept as the reference"""
+    distance = g["distance"]
+    for name in manager.list_areas():
+        area = manager.get_area(name)
+        if area.area_type == "circle":
+            if distance(px, py, area.center_x, area.center_y) <= area.radius + proximity:
+                return area
+        elif area.area_type == "waypoints":
+            for wx, wy in area.waypoints:
+                if distance(px, py, wx, wy) <= proximity:
+                    return area
+    return None
+
+
+def test_4_pet_farmer():
+    print("\n[Test 4] PetFarmer get_current_area")
+    world = SimWorld()
+    world.install()
+    try:
+        g = _load_script(world, "Tamer/Tamer_PetFarmer.py")
+        prefix = g["KEY_PREFIX"]
+        rng = random.Random(4)
+        names = []
+        for i in range(30):
+            name = "Spot" + str(i)
+            cx, cy = 1000 + rng.randint(0, 500), 1000 + rng.randint(0, 500)
+            if i % 4:
+                area = g["FarmingArea"](name, "circle", cx, cy, rng.randint(5, 25))
+            else:
+                area = g["FarmingArea"](name, "waypoints",
+                                        waypoints=[(cx + rng.randint(-30, 30), cy + rng.randint(-30, 30))
+                                                   for _ in range(3)])
+            world.persistent[prefix + "Areas_" + name] = json.dumps(area.to_dict())
+            names.append(name)
+        world.persistent[prefix + "AreaNames"] = "|".join(names)
+
+        manager = g["AreaManager"](prefix)
+        assert manager.list_areas() == names
+        reads = _record_reads(world)
+        checked = 0
+        for _ in range(1500):
+            px, py = 960 + rng.randint(0, 580), 960 + rng.randint(0, 580)
+            world.player.X, world.player.Y = px, py
+            proximity = rng.choice([0, 5, 20, 30])
+            old = _old_pf_current(manager, g, px, py, proximity)
+            new = manager.get_current_area(proximity)
+            assert (new is None) == (old is None) and (old is None or new.name == old.name), (px, py, proximity)
+            checked += 1
+        assert len(set(reads)) <= len(names), "Each area parsed at most once"
+        new_area = g["FarmingArea"]("Late", "circle", 3000, 3000, 10)
+        manager.add_area(new_area)
+        assert g["AreaManager"](prefix).list_areas() == names + ["Late"]
+        world.player.X, world.player.Y = 3000, 3025
+        assert manager.get_current_area().name == "Late"
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+    print("✓ " + str(checked) + " positions and proximities agree")
+
+
+def run_all_tests():
+    """Run all test cases"""
+    print("=" * 60)
+    print("AREA INDEX - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_1_index_matches_scan()
+        test_2_df_startup()
+        test_3_df_lookups()
+        test_4_pet_farmer()
+
+        print("\n" + "=" * 60)
+        print("ALL TESTS PASSED ✓")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ UNEXPECTED ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
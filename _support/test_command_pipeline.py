@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test script for LegionUtils.CommandPipeline and Tamer_Commands ORDER mode
+
+Tests:
+1. The floor starts at the default, learns the p75 latency and is clamped
+2. say() waits for the floor unless the last cursor was answered
+3. ordered_kill targets every pet's cursor, far sooner than fixed delays
+4. Under lag the floor rises, so cursorless commands are all heard
+"""
+
+import sys
+import os
+import runpy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "_support", "tools"))
+
+from LegionSim import SimWorld, Notoriety
+
+PET_NAMES = ["Ace", "Bolt", "Cinder", "Dusk", "Ember"]
+
+
+def _pipeline_world():
+    world = SimWorld()
+    world.install()
+    sys.modules.pop("LegionUtils", None)
+    import LegionUtils
+    return world, LegionUtils
+
+
+def _load_commands(world):
+    """Run Tamer_Commands' top level under the simulator and return its globals"""
+    world.deadline = world.clock.now     # main loop exits at once
+    sys.modules.pop("LegionUtils", None)
+    ns = runpy.run_path(os.path.join(ROOT, "Tamer", "Tamer_Commands.py"), run_name="__main__")
+    world.deadline = None
+    # run_path returns a copy - the functions read the real globals
+    g = ns["ordered_kill"].__globals__
+    g["ATTACK_MODE"] = "ORDER"
+    g["ATTACK_PETS"] = [{"name": name, "serial": 0, "active": True} for name in PET_NAMES]
+    return g
+
+
+def test_1_adaptive_floor():
+    print("\n[Test 1] Adaptive floor")
+    world, LegionUtils = _pipeline_world()
+    try:
+        pipeline = LegionUtils.CommandPipeline(floor=0.3, min_floor=0.1, max_floor=1.0, max_samples=4)
+        assert pipeline.get_floor() == 0.3
+        for latency in (0.12, 0.2, 0.15, 0.18):
+            pipeline.record(latency)
+        assert abs(pipeline.get_floor() - 0.18) < 1e-9, pipeline.get_floor()
+        for latency in (0.01, 0.02, 0.01, 0.02):
+            pipeline.record(latency)
+        assert pipeline.get_floor() == 0.1, "Clamped to min_floor"
+
+        # No cursor: counted as a max_floor sample, the floor backs off
+        world.command_gap = 10.0       # server ignores the second command
+        pipeline.say("Ace stay")
+        assert not pipeline.wait_for_cursor(timeout=0.2)
+        pipeline.say("Bolt kill")
+        assert not pipeline.wait_for_cursor(timeout=0.2)
+        stats = pipeline.get_stats()
+        assert stats["misses"] == 2 and stats["commands"] == 2
+        assert stats["floor"] == 1.0, stats
+    finally:
+        world.uninstall()
+    print("✓ Default 0.3s, learned p75, clamped, backs off on misses")
+
+
+def test_2_pacing():
+    print("\n[Test 2] Command pacing")
+    world, LegionUtils = _pipeline_world()
+    try:
+        pipeline = LegionUtils.CommandPipeline(floor=0.5)
+        start = world.clock.now
+        pipeline.say("Ace follow me")
+        pipeline.say("Bolt follow me")
+        times = [t for t, _, _ in world.pet_commands]
+        assert abs(times[1] - times[0] - 0.5) < 1e-6, "Cursorless commands wait for the floor"
+
+        world.command_latency = 0.2
+        pipeline.say("Cinder kill")
+        assert pipeline.wait_for_cursor()
+        world.api.Target(12345)
+        assert pipeline.wait_cursor_consumed()
+        sent = world.clock.now
+        pipeline.say("Dusk kill")
+        assert world.pet_commands[-1][0] == sent, "Answered cursor - next command goes at once"
+        assert 0.15 <= pipeline.samples[-1] <= 0.3, pipeline.samples[-1]
+        assert world.clock.now - start < 2.0
+    finally:
+        world.uninstall()
+    print("✓ Floor between cursorless commands, none after an answered cursor")
+
+
+def _ordered_kill(pipelined, latency):
+    """Run ordered_kill against one enemy; returns (seconds taken, the pipeline)"""
+    world = SimWorld()
+    world.install()
+    try:
+        g = _load_commands(world)
+        if not pipelined:
+            g["command_pipeline"] = None
+        world.command_latency = latency
+        enemy = world.add_mobile("Orc", notoriety=Notoriety.Enemy, x=world.player.X + 3)
+        start = world.clock.now
+        g["ordered_kill"]()
+        elapsed = world.clock.now - start
+        targets = [args[0] for _, name, args in world.actions if name == "Target"]
+        assert targets == [enemy.Serial] * len(PET_NAMES), targets
+        return elapsed, g["command_pipeline"]
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+
+
+def test_3_ordered_kill():
+    print("\n[Test 3] ordered_kill, 5 pets, 150ms lag")
+    fixed, _ = _ordered_kill(False, 0.15)
+    piped, pipeline = _ordered_kill(True, 0.15)
+    stats = pipeline.get_stats()
+    print("  fixed delays: {:.2f}s   pipelined: {:.2f}s   (p50 cursor {:.0f}ms)".format(
+        fixed, piped, stats["p50"] * 1000))
+    assert stats["samples"] == len(PET_NAMES) and stats["misses"] == 0
+    assert piped < fixed / 3, "Pipelining should cut the command train"
+    print("✓ Every pet targeted; last command out " + str(round(fixed - piped, 2)) + "s sooner")
+
+
+def test_4_lag_backoff():
+    print("\n[Test 4] Cursorless commands under lag")
+    world = SimWorld()
+    world.install()
+    try:
+        g = _load_commands(world)
+        world.add_mobile("Orc", notoriety=Notoriety.Enemy, x=world.player.X + 3)
+        world.command_latency = 0.6
+        world.command_gap = 0.5        # server ignores commands said closer than this
+        g["ordered_kill"]()
+        world.pet_commands = []
+        g["ordered_command"]("follow me", "Follow")
+        heard = [heard for _, _, heard in world.pet_commands]
+        floor = g["command_pipeline"].get_floor()
+        print("  floor {:.2f}s, heard {}/{}".format(floor, sum(heard), len(heard)))
+        assert floor >= 0.5 and all(heard), heard
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+    print("✓ Floor follows the measured lag")
+
+
+def run_all_tests():
+    """Run all test cases"""
+    print("=" * 60)
+    print("COMMAND PIPELINE - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_1_adaptive_floor()
+        test_2_pacing()
+        test_3_ordered_kill()
+        test_4_lag_backoff()
+
+        print("\n" + "=" * 60)
+        print("ALL TESTS PASSED ✓")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ UNEXPECTED ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
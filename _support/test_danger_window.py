@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Test script for LegionUtils.WindowedSum and DungeonFarmer's incremental DangerAssessment
+
+Tests:
+1. WindowedSum keeps a running total, expires old entries and caps its size
+2. Danger scores, zones and trends match the old polling implementation
+3. Hits taken and healed between two checks still count (OnPlayerHitsChanged)
+4. Unchanged inputs reuse the last score instead of recomputing
+"""
+
+import sys
+import os
+import random
+import runpy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "_support", "tools"))
+
+from LegionSim import SimWorld
+
+
+def _load_script(world, path):
+    """Run a script's top level under the simulator and return its globals"""
+    world.deadline = world.clock.now     # main loops exit at once
+    sys.modules.pop("LegionUtils", None)
+    ns = runpy.run_path(os.path.join(ROOT, path), run_name="__main__")
+    world.deadline = None
+    # run_path returns a copy - the functions read the real globals
+    for value in ns.values():
+        if hasattr(value, "__globals__") and value.__module__ == "__main__":
+            return value.__globals__
+    return ns
+
+
+class OldDanger:
+    """Pre-ring-buffer DangerAssessment.calculate_danger, kept as the reference"""
+
+    def __init__(self, api, tank):
+        self.api = api
+        self.tank = tank
+        self.weights = None
+        self.history = []
+        self.last_player_hp = api.Player.Hits     # baseline taken at start, as the new code does
+        self.recent_damage = []
+
+    def calculate(self, enemy_count, npc_count, now):
+        player = self.api.Player
+        w = self.weights
+        danger = w["player_hp"] * (1.0 - ((player.Hits / player.HitsMax) if player.HitsMax > 0 else 1.0))
+        tank = self.tank
+        if tank is not None:
+            if tank.IsDead:
+                danger += w["tank_pet_hp"] + 50
+            else:
+                danger += w["tank_pet_hp"] * (1.0 - ((tank.Hits / tank.HitsMax) if tank.HitsMax > 0 else 1.0))
+        danger += enemy_count * w["enemy_count"] + npc_count * w["nearby_npcs"]
+        if self.last_player_hp > 0 and player.Hits < self.last_player_hp:
+            self.recent_damage.append((self.last_player_hp - player.Hits, now))
+        self.last_player_hp = player.Hits
+        self.recent_damage = [(d, t) for d, t in self.recent_damage if now - t <= 3.0]
+        total = sum(d for d, _ in self.recent_damage)
+        danger += w["damage_rate"] * min(1.0, total / (player.HitsMax if player.HitsMax > 0 else 100))
+        if tank is not None and not tank.IsDead and tank.Distance > 5:
+            danger += min(15, (tank.Distance - 5) * 3)
+        danger = max(0, min(100, danger))
+        self.history.append(danger)
+        if len(self.history) > 10:
+            self.history.pop(0)
+        return danger
+
+    def trend(self):
+        if len(self.history) < 3:
+            return "stable"
+        recent_avg = sum(self.history[-3:]) / 3
+        previous_avg = sum(self.history[-6:-3]) / 3 if len(self.history) >= 6 else recent_avg
+        diff = recent_avg - previous_avg
+        return "rising" if diff > 5 else "falling" if diff < -5 else "stable"
+
+
+def _danger_world():
+    world = SimWorld()
+    world.install()
+    g = _load_script(world, "Utility/Util_DungeonFarmer.py")
+    tank = world.add_pet("Tank", 100, hits_max=100, x=world.player.X + 1, y=world.player.Y)
+    pet_manager = g["PetManager"]()
+    pet_manager.pets = [{"serial": tank.Serial, "name": "Tank", "max_hp": 100, "is_tank": True}]
+    pet_manager.tank_pet_serial = tank.Serial
+    return world, g, pet_manager, tank
+
+
+def test_1_windowed_sum():
+    print("\n[Test 1] WindowedSum")
+    sys.modules.pop("LegionUtils", None)
+    import LegionUtils
+    window = LegionUtils.WindowedSum(window=3.0, capacity=4)
+    assert window.total(0.0) == 0 and len(window) == 0
+    window.add(10, 0.0)
+    window.add(5, 1.0)
+    window.add(7, 3.0)
+    assert window.total(3.0) == 22, "Exactly window seconds old still counts"
+    assert window.total(3.5) == 12 and len(window) == 2
+    for t in (4.0, 4.1, 4.2):
+        window.add(1, t)
+    assert len(window) == 4 and window.total(4.2) == 10, "Oldest dropped at capacity"
+    assert window.total(100.0) == 0 and len(window) == 0
+    window.add(2.5, 101.0)
+    window.clear()
+    assert window.total(101.0) == 0 and len(window) == 0
+    print("✓ Running total, expiry and capacity")
+
+
+def test_2_matches_old_scores():
+    print("\n[Test 2] Scores vs old implementation")
+    world, g, pet_manager, tank = _danger_world()
+    try:
+        danger = g["DangerAssessment"](pet_manager)
+        old = OldDanger(world.api, tank)
+        rng = random.Random(19)
+        player = world.player
+        for step in range(600):
+            if rng.random() < 0.05:
+                danger.configure_weights(player_hp=rng.randint(0, 50), damage_rate=rng.randint(0, 30))
+            old.weights = dict(danger.weights)
+            if rng.random() < 0.5:
+                world.damage(player, rng.randint(-15, 12) if player.Hits > 15 else -20)
+            if rng.random() < 0.3:
+                tank.Hits = rng.randint(0, 100)
+                tank.IsDead = tank.Hits == 0
+            if rng.random() < 0.1:
+                tank.X = player.X + rng.randint(0, 12)
+            world.clock.now += rng.choice([0.1, 0.25, 0.5, 1.0])
+            world.api.ProcessCallbacks()           # delivers OnPlayerHitsChanged
+            enemies, npcs = rng.randint(0, 3), rng.randint(0, 4)
+            new_score = danger.calculate_danger(enemy_count=enemies, npc_count=npcs)
+            old_score = old.calculate(enemies, npcs, world.clock.now)
+            assert abs(new_score - old_score) < 1e-9, (step, new_score, old_score)
+            assert danger.get_danger_trend() == old.trend()
+            assert danger.get_danger_zone() == danger.get_danger_zone(old_score)
+        assert danger.hits_events and len(danger.danger_history) == 10
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+    print("✓ 600 readings: same score, zone and trend")
+
+
+def test_3_hits_between_checks():
+    print("\n[Test 3] Damage between checks")
+    world, g, pet_manager, tank = _danger_world()
+    try:
+        danger = g["DangerAssessment"](pet_manager)
+        assert danger.calculate_danger() == 0
+        # 30 damage then a 30 HP heal before the next check: polling saw nothing
+        world.damage(world.player, 30)
+        world.api.ProcessCallbacks()
+        world.damage(world.player, -30)
+        world.api.ProcessCallbacks()
+        world.clock.now += 0.5
+        score = danger.calculate_danger()
+        assert abs(score - danger.weights["damage_rate"] * 0.3) < 1e-9, score
+        world.clock.now += 3.0
+        assert danger.calculate_danger() == 0, "Damage leaves the window after 3s"
+        danger.reset_damage_tracking()
+        assert len(danger.recent_damage) == 0
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+    print("✓ Hits are counted when they happen, not when danger is checked")
+
+
+def test_4_unchanged_inputs():
+    print("\n[Test 4] Unchanged inputs")
+    world, g, pet_manager, tank = _danger_world()
+    try:
+        danger = g["DangerAssessment"](pet_manager)
+        tank.Hits = 60
+        for _ in range(50):
+            danger.calculate_danger(enemy_count=2, npc_count=1)
+            world.api.Pause(0.1)
+        assert danger.recalculations == 1, danger.recalculations
+        first = danger.get_current_danger()
+        danger.configure_weights(enemy_count=30)
+        assert danger.calculate_danger(enemy_count=2, npc_count=1) == first + 30
+        tank.Hits = 50
+        danger.calculate_danger(enemy_count=2, npc_count=1)
+        assert danger.recalculations == 3
+        assert list(danger.danger_history)[-3:] == [first, first + 30, first + 32.5]
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+    print("✓ 50 identical ticks, one recomputation")
+
+
+def run_all_tests():
+    """Run all test cases"""
+    print("=" * 60)
+    print("DANGER WINDOW - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_1_windowed_sum()
+        test_2_matches_old_scores()
+        test_3_hits_between_checks()
+        test_4_unchanged_inputs()
+
+        print("\n" + "=" * 60)
+        print("ALL TESTS PASSED ✓")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ UNEXPECTED ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
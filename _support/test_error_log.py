@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Test script for LegionUtils.BufferedLogWriter and DungeonFarmer's error log
+
+Tests:
+1. Entries are batched, repeats folded, and flushed on count/age/stop
+2. The file rotates by size and keeps the configured backups
+3. ErrorRecoverySystem logs an error storm with one write
+4. A 2000-error storm costs a fraction of open/append/close per error
+5. Entries still buffered when the script is stopped reach the file
+"""
+
+import sys
+import os
+import runpy
+import shutil
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "_support", "tools"))
+
+from LegionSim import SimWorld, SimStop
+
+
+def _load_script(world, path):
+    """Run a script's top level under the simulator and return its globals"""
+    world.deadline = world.clock.now     # main loops exit at once
+    sys.modules.pop("LegionUtils", None)
+    ns = runpy.run_path(os.path.join(ROOT, path), run_name="__main__")
+    world.deadline = None
+    # run_path returns a copy - the functions read the real globals
+    for value in ns.values():
+        if hasattr(value, "__globals__") and value.__module__ == "__main__":
+            return value.__globals__
+    return ns
+
+
+def _read_lines(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return f.read().splitlines()
+
+
+def _log_world():
+    world = SimWorld()
+    world.install()
+    sys.modules.pop("LegionUtils", None)
+    import LegionUtils
+    return world, LegionUtils, tempfile.mkdtemp()
+
+
+def test_1_batching_and_folding():
+    print("\n[Test 1] Batching and folding")
+    world, LegionUtils, tmp = _log_world()
+    try:
+        path = os.path.join(tmp, "error_log.txt")
+        log = LegionUtils.BufferedLogWriter(path, flush_interval=5.0, max_entries=3)
+        assert not log.write("MOVEMENT_STUCK", "No movement", now=100.0)
+        for t in (100.5, 101.0, 102.0):
+            assert not log.write("MOVEMENT_STUCK", "No movement", now=t)
+        assert not log.write("PET_LOST", "Rex", now=102.5)
+        assert not os.path.exists(path), "Nothing on disk yet"
+        assert not log.update(now=104.9)
+        assert log.update(now=105.0), "Oldest entry is 5s old"
+        lines = _read_lines(path)
+        assert len(lines) == 2, lines
+        assert lines[0].endswith("MOVEMENT_STUCK: No movement (x4, last " +
+                                 time.strftime("%H:%M:%S", time.localtime(102.0)) + ")"), lines[0]
+        assert lines[0].startswith("[" + time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(100.0)) + "]")
+        assert lines[1].endswith("PET_LOST: Rex")
+
+        # Three distinct entries hit max_entries
+        log.write("A", "1", now=200.0)
+        log.write("B", "2", now=200.1)
+        assert log.write("C", "3", now=200.2)
+        assert len(_read_lines(path)) == 5
+
+        # Stopping flushes whatever is pending
+        log.write("D", "4", now=300.0)
+        assert not log.update(now=300.1)
+        world.stop_requested = True
+        assert log.update(now=300.2) and len(_read_lines(path)) == 6
+        log.write("E", "5")
+        assert log.close() and not log.close()
+        stats = log.get_stats()
+        assert stats["entries"] == 10 and stats["folded"] == 3 and stats["flushes"] == 4, stats
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+        shutil.rmtree(tmp)
+    print("✓ Folded repeats, flushed on age, count, stop and close")
+
+
+def test_2_rotation():
+    print("\n[Test 2] Rotation")
+    world, LegionUtils, tmp = _log_world()
+    try:
+        path = os.path.join(tmp, "error_log.txt")
+        with open(path, "w") as f:
+            f.write("old\n")
+        log = LegionUtils.BufferedLogWriter(path, max_entries=1, max_bytes=200, backups=2)
+        written = []
+        for i in range(40):
+            message = "entry {:02d}".format(i)
+            log.write("TYPE", message, now=1000.0 + i)
+            written.append(message)
+        files = sorted(os.listdir(tmp))
+        assert files == ["error_log.txt", "error_log.txt.1", "error_log.txt.2"], files
+        for name in files:
+            assert os.path.getsize(os.path.join(tmp, name)) <= 200
+        kept = _read_lines(path + ".2") + _read_lines(path + ".1") + _read_lines(path)
+        assert [line.split(": ", 1)[1] for line in kept] == written[-len(kept):], "Oldest rotated out, order kept"
+        assert log.get_stats()["rotations"] > 2
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+        shutil.rmtree(tmp)
+    print("✓ Rotated at 200 bytes, two backups kept")
+
+
+def _recovery(world, g, tmp):
+    recovery = g["ErrorRecoverySystem"](g["PetManager"]())
+    recovery.error_log_path = os.path.join(tmp, "error_log.txt")
+    recovery.error_log = g["BufferedLogWriter"](recovery.error_log_path)
+    return recovery
+
+
+def test_3_recovery_storm():
+    print("\n[Test 3] ErrorRecoverySystem storm")
+    world, _, tmp = _log_world()
+    try:
+        g = _load_script(world, "Utility/Util_DungeonFarmer.py")
+        recovery = _recovery(world, g, tmp)
+        for i in range(40):
+            recovery._log_error(recovery.ERROR_MOVEMENT_STUCK, "No movement for 3.0s")
+            recovery._log_error("ESCALATED_" + recovery.ERROR_MOVEMENT_STUCK, "Max attempts reached")
+            world.api.Pause(0.1)
+        assert not os.path.exists(recovery.error_log_path), "Storm stays in memory"
+        world.api.Pause(1.1)
+        recovery.detect_errors("idle")
+        lines = _read_lines(recovery.error_log_path)
+        assert len(lines) == 2 and "(x40, last" in lines[0] and "(x40, last" in lines[1], lines
+        assert recovery.error_log.get_stats()["flushes"] == 1
+
+        recovery._log_error(recovery.ERROR_PET_DISAPPEARED, "Rex")
+        recovery.flush_log()
+        assert _read_lines(recovery.error_log_path)[-1].endswith("PET_DISAPPEARED: Rex")
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+        shutil.rmtree(tmp)
+    print("✓ 80 errors, one write of two folded lines")
+
+
+def _old_log_error(path, error_type, message):
+    """Pre-buffer _log_error, kept as the reference cost"""
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+    log_entry = "[{}] {}: {}\n".format(timestamp, error_type, message)
+    with open(path, "a") as f:
+        f.write(log_entry)
+
+
+def test_4_storm_cost():
+    print("\n[Test 4] Storm cost")
+    world, LegionUtils, tmp = _log_world()
+    try:
+        storm = [("MOVEMENT_STUCK", "No movement for {}s".format(i % 5)) for i in range(2000)]
+        old_path = os.path.join(tmp, "old.txt")
+        start = time.perf_counter()
+        for error_type, message in storm:
+            _old_log_error(old_path, error_type, message)
+        old_time = time.perf_counter() - start
+
+        log = LegionUtils.BufferedLogWriter(os.path.join(tmp, "new.txt"))
+        start = time.perf_counter()
+        for error_type, message in storm:
+            log.write(error_type, message)
+        log.close()
+        new_time = time.perf_counter() - start
+        print("  2000 errors: open/append/close {:.1f}ms, buffered {:.1f}ms".format(
+            old_time * 1000, new_time * 1000))
+        assert len(_read_lines(os.path.join(tmp, "new.txt"))) == 5
+        assert new_time * 3 < old_time
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+        shutil.rmtree(tmp)
+    print("✓ No per-error file I/O")
+
+
+def test_5_flushed_on_stop():
+    print("\n[Test 5] Flush on stop")
+    world, _, tmp = _log_world()
+    try:
+        g = _load_script(world, "Utility/Util_DungeonFarmer.py")
+        g["parent_dir"] = tmp                   # logs/error_log.txt under tmp
+        world.deadline = world.clock.now + 2     # stopped mid-test
+        try:
+            g["test_error_recovery"]()
+        except SimStop:
+            pass
+        lines = _read_lines(os.path.join(tmp, "logs", "error_log.txt"))
+        assert lines and lines[-1].endswith("STATE_INVALID: Invalid state: invalid_state_xyz"), lines
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+        shutil.rmtree(tmp)
+    print("✓ " + str(len(lines)) + " buffered entries written when the script stopped")
+
+
+def run_all_tests():
+    """Run all test cases"""
+    print("=" * 60)
+    print("ERROR LOG - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_1_batching_and_folding()
+        test_2_rotation()
+        test_3_recovery_storm()
+        test_4_storm_cost()
+        test_5_flushed_on_stop()
+
+        print("\n" + "=" * 60)
+        print("ALL TESTS PASSED ✓")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ UNEXPECTED ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test script for LegionUtils.FrameCache
+
+Tests:
+1. Repeat lookups within a tick are hits, first lookup is a miss
+2. ProcessCallbacks and Pause invalidate the cache
+3. Missing mobiles (None) are cached for the tick too
+4. get_mobile_safe() and player helpers read through the active cache
+5. Tamer_Suite makes fewer FindMobile calls per tick with the cache
+"""
+
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "_support", "tools"))
+
+from LegionSim import SimWorld, run_script, default_tamer_world
+
+
+def _cached_world():
+    world = SimWorld()
+    api = world.install()
+    sys.modules.pop("LegionUtils", None)
+    import LegionUtils
+    return world, api, LegionUtils
+
+
+def test_1_hits_and_misses():
+    print("\n[Test 1] Hits and misses")
+    world, API, LegionUtils = _cached_world()
+    try:
+        pet = world.add_pet("Dragon", 100)
+        cache = LegionUtils.FrameCache(API).install()
+        for _ in range(5):
+            assert cache.find_mobile(pet.Serial) is pet
+        assert world.call_counts["FindMobile"] == 1, "Only the first lookup should reach the API"
+        stats = cache.get_stats()
+        assert stats["hits"] == 4 and stats["misses"] == 1
+        assert abs(stats["hit_rate"] - 0.8) < 1e-9
+        cache.uninstall()
+    finally:
+        world.uninstall()
+    print("✓ 5 lookups, 1 API call, 80% hit rate")
+
+
+def test_2_invalidation():
+    print("\n[Test 2] ProcessCallbacks and Pause invalidate")
+    world, API, LegionUtils = _cached_world()
+    try:
+        pet = world.add_pet("Dragon", 100)
+        cache = LegionUtils.FrameCache(API).install()
+        cache.find_mobile(pet.Serial)
+        API.ProcessCallbacks()
+        cache.find_mobile(pet.Serial)
+        API.Pause(0.1)
+        cache.find_mobile(pet.Serial)
+        assert cache.misses == 3, "Each tick boundary should force a fresh read"
+        assert cache.invalidations == 2
+        cache.uninstall()
+        assert cache.find_mobile(pet.Serial) is pet
+        API.Pause(0.1)
+        assert cache.invalidations == 3, "uninstall() clears once, Pause no longer hooked"
+    finally:
+        world.uninstall()
+    print("✓ Fresh read after every tick boundary")
+
+
+def test_3_missing_mobiles_cached():
+    print("\n[Test 3] None results are cached")
+    world, API, LegionUtils = _cached_world()
+    try:
+        cache = LegionUtils.FrameCache(API).install()
+        assert cache.find_mobile(0xDEAD) is None
+        assert cache.find_mobile(0xDEAD) is None
+        assert world.call_counts["FindMobile"] == 1
+        cache.uninstall()
+    finally:
+        world.uninstall()
+    print("✓ Out-of-range serial looked up once per tick")
+
+
+def test_4_legion_utils_helpers():
+    print("\n[Test 4] LegionUtils helpers use the active cache")
+    world, API, LegionUtils = _cached_world()
+    try:
+        pet = world.add_pet("Dragon", 100)
+        cache = LegionUtils.FrameCache(API).install()
+        LegionUtils.get_mobile_safe(pet.Serial)
+        LegionUtils.get_mobile_safe(pet.Serial)
+        LegionUtils.is_player_dead()
+        LegionUtils.is_player_poisoned()
+        assert cache.hits == 2 and cache.misses == 2
+        cache.uninstall()
+        assert LegionUtils.get_mobile_safe(pet.Serial) is pet, "Helpers fall back to the API"
+        assert cache.hits == 2
+    finally:
+        world.uninstall()
+    print("✓ get_mobile_safe/is_player_* served from cache")
+
+
+def test_5_tamer_suite_fewer_lookups():
+    print("\n[Test 5] Tamer_Suite FindMobile calls per tick")
+    world = default_tamer_world()
+    report = run_script("Tamer/Tamer_Suite.py", world, seconds=120)
+    assert not report.error, report.error
+    per_tick = world.call_counts.get("FindMobile", 0) / float(report.ticks)
+    pets = 3
+    assert per_tick <= pets + 1, "Expected at most one lookup per pet per tick, got " + "{:.2f}".format(per_tick)
+    print("✓ " + "{:.2f}".format(per_tick) + " FindMobile calls/tick (3 pets)")
+
+
+def run_all_tests():
+    """Run all test cases"""
+    print("=" * 60)
+    print("FRAME CACHE - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_1_hits_and_misses()
+        test_2_invalidation()
+        test_3_missing_mobiles_cached()
+        test_4_legion_utils_helpers()
+        test_5_tamer_suite_fewer_lookups()
+
+        print("\n" + "=" * 60)
+        print("ALL TESTS PASSED ✓")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ UNEXPECTED ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
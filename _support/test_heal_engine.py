@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Test script for LegionUtils.decide_heal (shared heal decision engine)
+
+Tests:
+1. Rule semantics - ranges, thresholds, cure/rez switches, ties
+2. Vet kit counting, cooldown bypass and blocked serials
+3. Tamer_Healer replays its pre-engine decisions (seeded digest)
+4. DungeonFarmer HealingSystem replays its pre-engine decisions (seeded digest)
+5. PetFarmer HealingSystem picks, starts and finishes heals
+6. Microbenchmark - decisions/second for 1-5 pets
+"""
+
+import sys
+import os
+import time
+import runpy
+import random
+import hashlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "_support", "tools"))
+
+from LegionSim import SimWorld, BANDAGE_GRAPHIC
+
+VET_KIT = 0x0E50
+
+# Seeded sweeps - digests of "\n".join(outcomes), recorded from each
+# script's own priority code before it moved to the shared engine
+SWEEP_COUNT = 400
+HEALER_SEED = 5
+HEALER_DIGEST = "4049bfa6596eaf29b7161105214b82a1551c2321"
+FARMER_SEED = 9
+FARMER_DIGEST = "97be43ef32f407832eaa89cabbf1b0a585518f40"
+
+
+def _engine():
+    sys.modules.pop("LegionUtils", None)
+    import LegionUtils
+    return LegionUtils
+
+
+def _pet(serial, hp, dist=1, dead=False, poisoned=False, projected=None):
+    """Pet row for decide_heal()"""
+    if dead:
+        return (serial, True, dist, 0, False, 0)
+    return (serial, False, dist, hp, poisoned, hp if projected is None else projected)
+
+
+def test_1_rules():
+    print("\n[Test 1] Rule semantics")
+    lu = _engine()
+    config = lu.HealConfig((("self_missing", 15), ("tank", 50), ("cure", 0), ("rez", 0),
+                            ("lowest", 90)), heal_range=2, rez_range=10, tank=2, rez=True)
+    rows = [_pet(1, 80), _pet(2, 60), _pet(3, 70, projected=40)]
+    player = (9, False, 100, 0, False)
+    assert lu.decide_heal(config, rows, player) == (3, "heal", "lowest"), "Ranks by projected HP"
+    assert lu.decide_heal(config, rows, (9, False, 80, 20, False)) == (9, "heal_self", "self_missing")
+    assert lu.decide_heal(config, rows, (9, True, 0, 100, False))[0] == 3, "Dead player is skipped"
+
+    rows[1] = _pet(2, 45)
+    assert lu.decide_heal(config, rows, player) == (2, "heal", "tank")
+    rows[1] = _pet(2, 45, dist=3)
+    assert lu.decide_heal(config, rows, player)[0] == 3, "Tank out of heal range"
+
+    rows = [_pet(1, 100, dist=2, poisoned=True), _pet(2, 0, dist=8, dead=True), _pet(3, 70)]
+    assert lu.decide_heal(config, rows, player) == (1, "cure", "cure")
+    config.cure = False
+    assert lu.decide_heal(config, rows, player) == (2, "rez", "rez")
+    config.rez = False
+    assert lu.decide_heal(config, rows, player) == (3, "heal", "lowest")
+
+    # Ties keep row order; reach limits everything but "tank"/"priority"
+    config = lu.HealConfig((("lowest", 90),), heal_range=2)
+    assert lu.decide_heal(config, [_pet(1, 70, dist=5), _pet(2, 70), _pet(3, 70)]) == (2, "heal", "lowest")
+    config.reach = lu.NO_RANGE_LIMIT
+    assert lu.decide_heal(config, [_pet(1, 70, dist=5), _pet(2, 70)])[0] == 1
+    assert lu.decide_heal(config, [_pet(1, 95)]) is None
+
+    # Tank outside the pet list, "_other" rules skip the tank
+    config = lu.HealConfig((("tank_cure", 0), ("cure_other", 0), ("tank_heal", 50),
+                            ("lowest_other", 90), ("tank_heal", 100)), heal_range=2, tank=7, rez=True)
+    tank = [_pet(7, 95, poisoned=True)]
+    assert lu.decide_heal(config, [_pet(1, 70)], extra=tank) == (7, "cure", "tank_cure")
+    assert lu.decide_heal(config, [_pet(7, 95), _pet(1, 70)]) == (1, "heal", "lowest_other")
+    assert lu.decide_heal(config, [_pet(7, 95)]) == (7, "heal", "tank_heal")
+    assert lu.decide_heal(config, [_pet(7, 0, dead=True)]) == (7, "rez", "tank_heal")
+    print("✓ Ranges, thresholds and switches apply per rule")
+
+
+def test_2_vetkit_and_blocked():
+    print("\n[Test 2] Vet kit and blocked serials")
+    lu = _engine()
+    config = lu.HealConfig((("vetkit", 0), ("lowest", 90)), heal_range=2, vetkit_hp=90,
+                           vetkit_critical_hp=50, vetkit_min_pets=2)
+    hurt = [_pet(1, 80), _pet(2, 70)]
+    assert lu.decide_heal(config, hurt, vetkit=True) == (0, "vetkit", "vetkit")
+    assert lu.decide_heal(config, hurt, vetkit=False)[1] == "heal", "Cooldown respected"
+    assert lu.decide_heal(config, hurt, vetkit=None)[1] == "heal", "No kit"
+    critical = [_pet(1, 40), _pet(2, 30)]
+    assert lu.decide_heal(config, critical, vetkit=False)[1] == "vetkit", "Emergency bypass"
+    assert lu.decide_heal(config, [_pet(1, 80), _pet(2, 70, dist=3)], vetkit=True)[1] == "heal"
+
+    poisoned = [_pet(1, 95, poisoned=True), _pet(2, 70)]
+    assert lu.decide_heal(config, poisoned, vetkit=True)[1] == "heal"
+    config.vetkit_count_poisoned = True
+    assert lu.decide_heal(config, poisoned, vetkit=True)[1] == "vetkit"
+    with_dead = hurt + [_pet(3, 0, dead=True)]
+    assert lu.decide_heal(config, with_dead, vetkit=True)[1] == "vetkit"
+    config.vetkit_needs_all_alive = True
+    assert lu.decide_heal(config, with_dead, vetkit=True)[1] == "heal"
+
+    config = lu.HealConfig((("self", 50), ("cure", 0), ("lowest", 90)), heal_range=2)
+    rows = [_pet(1, 100, poisoned=True), _pet(2, 40), _pet(3, 60)]
+    player = (9, False, 30, 70, False)
+    assert lu.decide_heal(config, rows, player, blocked={9, 1, 2}) == (3, "heal", "lowest")
+    assert lu.decide_heal(config, rows, player, blocked={9, 1, 2, 3}) is None
+    print("✓ Kit counts, cooldown bypass and cooldown blocks")
+
+
+# ============ SCRIPT HARNESSES ============
+def _load_script(world, path):
+    """Run a script's top level under the simulator and return its globals"""
+    world.deadline = world.clock.now     # main loops exit at once
+    sys.modules.pop("LegionUtils", None)
+    ns = runpy.run_path(os.path.join(ROOT, path), run_name="__main__")
+    world.deadline = None
+    # run_path returns a copy - the functions read the real globals
+    for value in ns.values():
+        if hasattr(value, "__globals__") and value.__module__ == "__main__":
+            return value.__globals__
+    return ns
+
+
+def _reset_mobiles(world, pets):
+    """Replace every mobile but the player with pets [(hp%, distance, flags)]
+
+    flags: d=dead, p=poisoned, m=missing (created, then removed)
+    """
+    for serial in [s for s in world.mobiles if s != world.player.Serial]:
+        del world.mobiles[serial]
+    world.api.ProcessCallbacks()     # drop cached lookups
+    mobs = []
+    for hp, dist, flags in pets:
+        mob = world.add_mobile("pet", 100, x=world.player.X + dist, y=world.player.Y)
+        mob.Hits = hp
+        mob.IsDead = "d" in flags
+        mob.IsPoisoned = "p" in flags
+        mobs.append(mob)
+    return mobs
+
+
+def _random_pets(rnd, dead, missing, hps, dists):
+    pets = []
+    for _ in range(rnd.randint(1, 5)):
+        roll = rnd.random()
+        flags = "d" if roll < dead else ("m" if roll < missing else "")
+        if rnd.random() < 0.15:
+            flags += "p"
+        pets.append((rnd.choice(hps), rnd.choice(dists), flags))
+    return pets
+
+
+def _digest(outcomes):
+    return hashlib.sha1("\n".join(outcomes).encode("utf-8")).hexdigest()
+
+
+def test_3_tamer_healer_replay():
+    print("\n[Test 3] Tamer_Healer decisions")
+    world = SimWorld()
+    world.install()
+    try:
+        g = _load_script(world, "Tamer/Tamer_Healer.py")
+        world.add_item(BANDAGE_GRAPHIC, 100, name="bandage")
+        kit = world.add_item(VET_KIT, 1, name="vet kit")
+
+        def decide(pets, cfg):
+            mobs = _reset_mobiles(world, pets)
+            friend = world.add_mobile("friend", 100, x=world.player.X + 1, y=world.player.Y)
+            friend.Hits, friend.IsPoisoned, friend.IsDead = cfg["friend"]
+            for mob, (_, _, flags) in zip(mobs, pets):
+                if "m" in flags:
+                    del world.mobiles[mob.Serial]
+            tank = cfg["tank"]
+            g["PETS"] = [mob.Serial for mob in mobs]
+            g["TANK_PET"] = friend.Serial if tank == "x" else (mobs[tank].Serial if tank is not None else 0)
+            for key in ("USE_MAGERY", "USE_REZ", "SKIP_OUT_OF_RANGE", "FOLLOW_PET", "CURE_POISON", "HEAL_SELF"):
+                g[key] = cfg[key]
+            g["VET_KIT_ID"] = VET_KIT if cfg["vet"] else 0
+            kit.Container = world.player.Backpack.Serial if cfg["kit"] else 0
+            g["last_vetkit_use"] = world.clock.now - (1 if cfg["cooldown"] else 60)
+            world.player.Hits, world.player.IsPoisoned = cfg["player"]
+            names = {mob.Serial: str(i) for i, mob in enumerate(mobs)}
+            names[friend.Serial] = "x"
+            names[world.player.Serial] = "me"
+            action = g["get_priority_heal_target"]()
+            return (action.action_type + "@" + names.get(action.target, str(action.target)) + "/" +
+                    str(action.is_self) + "/" + str(action.status))
+
+        rnd = random.Random(HEALER_SEED)
+        outcomes = []
+        for _ in range(SWEEP_COUNT):
+            pets = _random_pets(rnd, 0.12, 0.17, [100, 99, 95, 89, 70, 69, 45, 20], [0, 1, 2, 3, 8, 12, 16])
+            cfg = {"tank": rnd.choice([None, None, "x"] + list(range(len(pets)))),
+                   "USE_MAGERY": rnd.random() < 0.3, "USE_REZ": rnd.random() < 0.5,
+                   "SKIP_OUT_OF_RANGE": rnd.random() < 0.6, "FOLLOW_PET": rnd.random() < 0.7,
+                   "CURE_POISON": rnd.random() < 0.8, "HEAL_SELF": rnd.random() < 0.5,
+                   "vet": rnd.random() < 0.6, "kit": rnd.random() < 0.8, "cooldown": rnd.random() < 0.3,
+                   "player": (rnd.choice([100, 95, 80, 40]), rnd.random() < 0.1),
+                   "friend": (rnd.choice([100, 40, 99]), rnd.random() < 0.2, rnd.random() < 0.1)}
+            outcomes.append(decide(pets, cfg))
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+    digest = _digest(outcomes)
+    print("  " + outcomes[0])
+    print("  digest " + digest)
+    assert digest == HEALER_DIGEST, "Tamer_Healer decisions changed"
+    print("✓ " + str(SWEEP_COUNT) + " decisions (and status text) unchanged")
+
+
+def test_4_dungeon_farmer_replay():
+    print("\n[Test 4] DungeonFarmer HealingSystem decisions")
+    world = SimWorld()
+    world.install()
+    try:
+        g = _load_script(world, "Utility/Util_DungeonFarmer.py")
+        world.add_item(BANDAGE_GRAPHIC, 100, name="bandage")
+        kit = world.add_item(VET_KIT, 1, name="vet kit")
+        pet_manager = g["PetManager"]()
+        healer = g["HealingSystem"](pet_manager)
+
+        def decide(pets, cfg):
+            mobs = _reset_mobiles(world, pets)
+            for mob, (_, _, flags) in zip(mobs, pets):
+                if "m" in flags:
+                    del world.mobiles[mob.Serial]
+            tank = mobs[cfg["tank"]].Serial if cfg["tank"] is not None else 0
+            pet_manager.tank_pet_serial = tank
+            pet_manager.pets = [{"serial": mob.Serial, "name": "pet", "max_hp": 100,
+                                 "is_tank": mob.Serial == tank} for mob in mobs]
+            healer.vet_kit_graphic = VET_KIT if cfg["vet"] else 0
+            kit.Container = world.player.Backpack.Serial if cfg["kit"] else 0
+            healer.last_vetkit_use = world.clock.now - (1 if cfg["cooldown"] else 60)
+            world.player.Hits = cfg["player"]
+            healer.bandage_cooldowns = {}
+            for ref in cfg["blocked"]:
+                serial = world.player.Serial if ref == "me" else mobs[ref].Serial
+                healer.bandage_cooldowns[serial] = world.clock.now - 1
+            names = {mob.Serial: str(i) for i, mob in enumerate(mobs)}
+            names[world.player.Serial] = "me"
+            names[0] = "-"
+            action = healer.get_next_heal_action()
+            return "none" if action is None else action[1] + "@" + names[action[0]] + "/" + str(action[2])
+
+        rnd = random.Random(FARMER_SEED)
+        outcomes = []
+        for _ in range(SWEEP_COUNT):
+            pets = _random_pets(rnd, 0.08, 0.12, [100, 95, 89, 70, 69, 45, 39, 20], [0, 1, 2, 3])
+            refs = ["me"] + list(range(len(pets)))
+            cfg = {"tank": rnd.choice([None] + list(range(len(pets)))), "vet": rnd.random() < 0.6,
+                   "kit": rnd.random() < 0.8, "cooldown": rnd.random() < 0.3,
+                   "player": rnd.choice([100, 90, 84, 49]),
+                   "blocked": [ref for ref in refs if rnd.random() < 0.15]}
+            outcomes.append(decide(pets, cfg))
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+    digest = _digest(outcomes)
+    print("  digest " + digest)
+    assert digest == FARMER_DIGEST, "DungeonFarmer decisions changed"
+    print("✓ " + str(SWEEP_COUNT) + " decisions unchanged")
+
+
+def test_5_pet_farmer_heals():
+    print("\n[Test 5] PetFarmer HealingSystem")
+    world = SimWorld()
+    world.install()
+    try:
+        g = _load_script(world, "Tamer/Tamer_PetFarmer.py")
+        bandages = world.add_item(BANDAGE_GRAPHIC, 20, name="bandage")
+        tank, other = _reset_mobiles(world, [(60, 1, ""), (40, 1, "")])
+        pet_manager = g["PetManager"](g["KEY_PREFIX"])
+        pet_manager.pets = [{"serial": tank.Serial, "is_tank": True},
+                            {"serial": other.Serial, "is_tank": False}]
+        healer = g["HealingSystem"](pet_manager)
+
+        assert healer.get_next_heal_action() == (tank.Serial, "bandage_pet", False), "Tank first"
+        tank.Hits = 80
+        assert healer.get_next_heal_action() == (other.Serial, "bandage_pet", False)
+        other.IsPoisoned = True
+        assert healer.get_next_heal_action() == (other.Serial, "cure", False)
+        healer.auto_cure_poison = False
+        world.player.Hits = world.player.HitsMax // 2
+        assert healer.get_next_heal_action() == (world.player.Serial, "bandage_self", True)
+        healer.use_magery_healing = True
+        assert healer.get_next_heal_action()[1] == "spell_self"
+        healer.use_magery_healing = False
+        world.player.Hits = world.player.HitsMax
+
+        action = healer.get_next_heal_action()
+        assert healer.execute_heal(*action) and healer.STATE == "healing"
+        assert bandages.Amount == 19
+        assert not healer.check_heal_complete()
+        world.clock.now += g["VET_DELAY"] + 0.1
+        assert healer.check_heal_complete() and healer.STATE == "idle"
+
+        healer.vetkit_graphic = VET_KIT
+        world.add_item(VET_KIT, 1, name="vet kit")
+        tank.Hits = 80
+        assert healer.get_next_heal_action() == (0, "vetkit", False)
+        assert healer.execute_heal(0, "vetkit", False)
+        assert healer.get_next_heal_action()[1] != "vetkit", "Vet kit cooldown"
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+    print("✓ Picks, starts and completes bandage, cure, self and vet kit heals")
+
+
+def test_6_benchmark():
+    print("\n[Test 6] Decisions per second")
+    lu = _engine()
+    config = lu.HealConfig((("self_missing", 15), ("priority", 90), ("tank", 50), ("cure", 0),
+                            ("rez", 0), ("vetkit", 0), ("lowest", 90)),
+                           heal_range=2, rez_range=10, tank=1, rez=True, vetkit_min_pets=9)
+    player = (9, False, 100, 0, False)
+    for count in range(1, 6):
+        rows = [_pet(serial, 85, projected=85 - serial) for serial in range(1, count + 1)]
+        loops = 20000
+        start = time.perf_counter()
+        for _ in range(loops):
+            lu.decide_heal(config, rows, player, vetkit=True)
+        rate = loops / (time.perf_counter() - start)
+        print("  " + str(count) + " pets: " + str(int(rate)) + " decisions/s")
+    print("✓ Benchmark complete")
+
+
+def run_all_tests():
+    """Run all test cases"""
+    print("=" * 60)
+    print("HEAL ENGINE - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_1_rules()
+        test_2_vetkit_and_blocked()
+        test_3_tamer_healer_replay()
+        test_4_dungeon_farmer_replay()
+        test_5_pet_farmer_heals()
+        test_6_benchmark()
+
+        print("\n" + "=" * 60)
+        print("ALL TESTS PASSED ✓")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ UNEXPECTED ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Test script for Tamer_Suite heal triage (get_next_heal_action)
+
+Tests:
+1. Recorded scenarios return the recorded decision
+2. Seeded random scenarios replay to the recorded outcome digest
+3. Each pet is looked up once per decision
+4. Microbenchmark - decisions/second for 1-5 pets
+"""
+
+import sys
+import os
+import time
+import runpy
+import random
+import hashlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "_support", "tools"))
+
+from LegionSim import SimWorld, BANDAGE_GRAPHIC
+
+VET_KIT = 0x0E50
+
+# (name, pets, config, expected)
+#   pets:     [(hp_percent, distance, flags)] - flags: d=dead, p=poisoned, m=missing
+#   config:   prio/tank take a pet index or "x" (a mobile outside PETS)
+#   expected: "action@target/delay" - target is a pet index, "x", or "-" for none
+# Recorded from the multi-pass implementation before the triage rewrite.
+SCENARIOS = [
+    ("lowest hurt pet", [(95, 1, ""), (70, 1, ""), (45, 1, "")], {}, "heal@2/4.5"),
+    ("ties keep PETS order", [(70, 1, ""), (70, 1, "")], {}, "heal@0/4.5"),
+    ("poison beats low HP", [(20, 1, ""), (100, 1, "p")], {}, "cure@1/4.5"),
+    ("out of range skipped", [(20, 5, ""), (80, 1, "")], {}, "heal@1/4.5"),
+    ("out of range allowed", [(20, 5, ""), (80, 1, "")], {"skip": False}, "heal@0/4.5"),
+    ("poison out of range skipped", [(80, 1, ""), (100, 4, "p")], {}, "heal@0/4.5"),
+    ("rez before heal", [(20, 1, ""), (0, 3, "d")], {"rez": True}, "rez@1/10.0"),
+    ("rez out of spell range", [(20, 1, ""), (0, 12, "d")], {"rez": True}, "heal@0/4.5"),
+    ("dead pets ignored without rez", [(0, 1, "d")], {}, "none"),
+    ("priority pet first", [(20, 1, ""), (50, 1, ""), (85, 1, "")], {"prio": 2}, "heal@2/4.5"),
+    ("priority pet poisoned", [(20, 1, ""), (100, 1, "p")], {"prio": 1}, "cure@1/4.5"),
+    ("priority pet out of range", [(60, 1, ""), (50, 4, "")], {"prio": 1, "skip": False}, "heal@1/4.5"),
+    ("priority outside PETS", [(60, 1, "")], {"prio": "x"}, "heal@x/4.5"),
+    ("tank below tank threshold", [(20, 1, ""), (45, 1, "")], {"tank": 1}, "heal@1/4.5"),
+    ("tank above tank threshold", [(20, 1, ""), (60, 1, "")], {"tank": 1}, "heal@0/4.5"),
+    ("priority before tank", [(45, 1, ""), (85, 1, "")], {"tank": 0, "prio": 1}, "heal@1/4.5"),
+    ("vet kit for two hurt", [(80, 1, ""), (70, 2, "")], {"vet": True, "kit": True}, "vetkit@-/5.0"),
+    ("vet kit on cooldown", [(80, 1, ""), (70, 2, "")], {"vet": True, "kit": True, "cooldown": True}, "heal@1/4.5"),
+    ("vet kit emergency", [(40, 1, ""), (30, 1, "")], {"vet": True, "kit": True, "cooldown": True}, "vetkit@-/5.0"),
+    ("vet kit bandage range only", [(80, 1, ""), (70, 3, "")], {"vet": True, "kit": True, "skip": False}, "heal@1/4.5"),
+    ("vet kit missing", [(80, 1, ""), (70, 2, "")], {"vet": True}, "heal@1/4.5"),
+    ("rez before vet kit", [(80, 1, ""), (70, 1, ""), (0, 2, "d")], {"vet": True, "kit": True, "rez": True}, "rez@2/10.0"),
+    ("magery range and delay", [(70, 8, "")], {"magery": True}, "heal@0/2.5"),
+    ("missing mobile", [(50, 1, "m"), (80, 1, "")], {}, "heal@1/4.5"),
+    ("nothing to do", [(95, 1, ""), (100, 1, "")], {}, "none"),
+]
+
+# Seeded random sweep - count and digest of "\n".join(outcomes)
+RANDOM_SEED = 11
+RANDOM_COUNT = 400
+RANDOM_DIGEST = "d756288d9fbbaa29141277f336de0c855d5b1719"
+
+
+class TriageHarness:
+    """Tamer_Suite loaded once under the simulator, reset per scenario"""
+
+    def __init__(self):
+        self.world = SimWorld()
+        self.api = self.world.install()
+        self.world.deadline = self.world.clock.now     # main loop exits at once
+        sys.modules.pop("LegionUtils", None)
+        ns = runpy.run_path(os.path.join(ROOT, "Tamer", "Tamer_Suite.py"), run_name="__main__")
+        # run_path returns a copy - the functions read the real globals
+        self.g = ns["get_next_heal_action"].__globals__
+        self.g["HEAL_SELF"] = False
+        self.g["trapped_pouch_enabled"] = False
+        self.world.add_item(BANDAGE_GRAPHIC, 100, name="bandage")
+        self.kit = self.world.add_item(VET_KIT, 1, name="vet kit")
+
+    def close(self):
+        self.world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+
+    def setup(self, pets, config):
+        world = self.world
+        for serial in [s for s in world.mobiles if s != world.player.Serial]:
+            del world.mobiles[serial]
+        self.api.ProcessCallbacks()     # drop cached lookups
+        self.kit.Container = world.player.Backpack.Serial if config.get("kit") else 0
+
+        mobs = []
+        for hp, dist, flags in pets:
+            mob = world.add_mobile("pet", 100, x=world.player.X + dist, y=world.player.Y)
+            mob.Hits = hp
+            mob.IsDead = "d" in flags
+            mob.IsPoisoned = "p" in flags
+            mobs.append(mob)
+        outsider = world.add_mobile("friend", 100, x=world.player.X + 1, y=world.player.Y)
+        outsider.Hits = 40
+        for mob, (_, _, flags) in zip(mobs, pets):
+            if "m" in flags:
+                del world.mobiles[mob.Serial]
+
+        def serial_of(ref):
+            if ref == "x":
+                return outsider.Serial
+            return mobs[ref].Serial if isinstance(ref, int) else 0
+
+        g = self.g
+        g["PETS"] = [mob.Serial for mob in mobs]
+        g["priority_heal_pet"] = serial_of(config.get("prio"))
+        g["TANK_PET"] = serial_of(config.get("tank"))
+        g["USE_MAGERY"] = config.get("magery", False)
+        g["USE_REZ"] = config.get("rez", False)
+        g["SKIP_OUT_OF_RANGE"] = config.get("skip", True)
+        g["VET_KIT_GRAPHIC"] = VET_KIT if config.get("vet") else 0
+        g["last_vetkit_use"] = world.clock.now - (1 if config.get("cooldown") else 60)
+
+        self.names = {mob.Serial: str(i) for i, mob in enumerate(mobs)}
+        self.names[outsider.Serial] = "x"
+        self.names[0] = "-"
+
+    def decide(self, pets, config):
+        self.setup(pets, config)
+        action = self.g["get_next_heal_action"]()
+        if action is None:
+            return "none"
+        target, action_type, duration, _ = action
+        return action_type + "@" + self.names.get(target, "?") + "/" + str(duration)
+
+
+def random_scenarios(count=RANDOM_COUNT, seed=RANDOM_SEED):
+    rnd = random.Random(seed)
+    scenarios = []
+    for _ in range(count):
+        pets = []
+        for _ in range(rnd.randint(1, 5)):
+            roll = rnd.random()
+            flags = "d" if roll < 0.12 else ("m" if roll < 0.17 else "")
+            if rnd.random() < 0.15:
+                flags += "p"
+            pets.append((rnd.choice([100, 95, 89, 70, 45, 20]), rnd.choice([0, 1, 2, 3, 8, 12]), flags))
+        refs = [None, None, "x"] + list(range(len(pets)))
+        config = {"prio": rnd.choice(refs), "tank": rnd.choice(refs),
+                  "magery": rnd.random() < 0.3, "rez": rnd.random() < 0.5,
+                  "skip": rnd.random() < 0.7, "vet": rnd.random() < 0.6,
+                  "kit": rnd.random() < 0.8, "cooldown": rnd.random() < 0.3}
+        scenarios.append((pets, config))
+    return scenarios
+
+
+def test_1_recorded_scenarios():
+    print("\n[Test 1] Recorded scenarios")
+    harness = TriageHarness()
+    try:
+        for name, pets, config, expected in SCENARIOS:
+            got = harness.decide(pets, config)
+            print("  " + name.ljust(30) + got)
+            assert got == expected, name + ": expected " + str(expected) + ", got " + got
+    finally:
+        harness.close()
+    print("✓ " + str(len(SCENARIOS)) + " scenarios unchanged")
+
+
+def test_2_random_sweep():
+    print("\n[Test 2] Seeded random sweep")
+    harness = TriageHarness()
+    try:
+        outcomes = [harness.decide(pets, config) for pets, config in random_scenarios()]
+    finally:
+        harness.close()
+    digest = hashlib.sha1("\n".join(outcomes).encode("utf-8")).hexdigest()
+    counts = {}
+    for outcome in outcomes:
+        kind = outcome.split("@")[0]
+        counts[kind] = counts.get(kind, 0) + 1
+    print("  " + ", ".join(k + "=" + str(v) for k, v in sorted(counts.items())))
+    print("  digest " + digest)
+    assert digest == RANDOM_DIGEST, "Random sweep outcomes changed"
+    print("✓ " + str(RANDOM_COUNT) + " scenarios match the recorded digest")
+
+
+BENCH_CONFIG = {"rez": True, "vet": True, "kit": True, "cooldown": True}
+
+
+def test_3_one_lookup_per_pet():
+    print("\n[Test 3] Mobile lookups per decision")
+    harness = TriageHarness()
+    try:
+        harness.g["find_mobile"] = harness.api.FindMobile    # count raw lookups
+        for count in range(1, 6):
+            harness.decide([(85, 1, "")] * count, BENCH_CONFIG)
+            before = harness.world.call_counts["FindMobile"]
+            harness.g["get_next_heal_action"]()
+            lookups = harness.world.call_counts["FindMobile"] - before
+            print("  " + str(count) + " pets: " + str(lookups) + " lookups")
+            assert lookups == count, "Expected one lookup per pet, got " + str(lookups)
+    finally:
+        harness.close()
+    print("✓ One FindMobile per pet")
+
+
+def test_4_benchmark():
+    print("\n[Test 4] Decisions per second")
+    harness = TriageHarness()
+    try:
+        decide = harness.g["get_next_heal_action"]
+        for count in range(1, 6):
+            harness.decide([(85, 1, "")] * count, BENCH_CONFIG)
+            runs = 2000
+            start = time.perf_counter()
+            for _ in range(runs):
+                decide()
+            elapsed = time.perf_counter() - start
+            print("  " + str(count) + " pets: " + str(int(runs / elapsed)) + " decisions/s")
+    finally:
+        harness.close()
+    print("✓ Benchmark complete")
+
+
+def run_all_tests():
+    """Run all test cases"""
+    print("=" * 60)
+    print("HEAL TRIAGE - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_1_recorded_scenarios()
+        test_2_random_sweep()
+        test_3_one_lookup_per_pet()
+        test_4_benchmark()
+
+        print("\n" + "=" * 60)
+        print("ALL TESTS PASSED ✓")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ UNEXPECTED ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
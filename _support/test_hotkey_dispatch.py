@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Test script for LegionUtils.HotkeyDispatcher and HotkeyManager
+
+Tests:
+1. One action lookup per press; bind/unbind/multiple actions
+2. Capture mode routed centrally (next key, ESC cancel, capture replaced)
+3. HotkeyManager registers each key once, however many bindings it has
+4. Rebinding through capture moves the action and persists the key
+5. Tamer_Suite routes command and pet hotkeys through its key table
+"""
+
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "_support", "tools"))
+
+from LegionSim import SimWorld, run_script, default_tamer_world
+
+
+def _hotkey_world():
+    world = SimWorld()
+    api = world.install()
+    sys.modules.pop("LegionUtils", None)
+    import LegionUtils
+    return world, api, LegionUtils
+
+
+def test_1_dispatch_table():
+    print("\n[Test 1] Dispatch table")
+    world, API, LegionUtils = _hotkey_world()
+    try:
+        calls = []
+        dispatcher = LegionUtils.HotkeyDispatcher()
+        dispatcher.bind("TAB", lambda: calls.append("kill"))
+        guard = lambda: calls.append("guard")
+        dispatcher.bind("1", guard)
+        dispatcher.bind("1", guard)     # duplicate ignored
+        dispatcher.bind("1", lambda: calls.append("also"))
+        assert dispatcher.dispatch("TAB") and dispatcher.dispatch("1")
+        assert not dispatcher.dispatch("Z")
+        assert calls == ["kill", "guard", "also"], calls
+        dispatcher.unbind("1", guard)
+        dispatcher.unbind("TAB", calls.append)   # not bound - no-op
+        dispatcher.dispatch("1")
+        assert calls[-1] == "also" and len(dispatcher.get_actions("1")) == 1
+        assert dispatcher.presses == 4 and dispatcher.dispatched == 3
+    finally:
+        world.uninstall()
+    print("✓ Presses routed by key; unbind removes one action")
+
+
+def test_2_capture():
+    print("\n[Test 2] Capture routing")
+    world, API, LegionUtils = _hotkey_world()
+    try:
+        events = []
+        dispatcher = LegionUtils.HotkeyDispatcher()
+        dispatcher.bind("A", lambda: events.append("action A"))
+        dispatcher.start_capture(lambda key: events.append("captured " + key), lambda: events.append("cancel 1"))
+        assert dispatcher.is_capturing()
+        dispatcher.dispatch("A")                        # captured, action not run
+        dispatcher.start_capture(events.append, lambda: events.append("cancel 2"))
+        dispatcher.dispatch("ESC")
+        dispatcher.start_capture(events.append, lambda: events.append("cancel 3"))
+        dispatcher.start_capture(events.append, lambda: events.append("cancel 4"))
+        dispatcher.cancel_capture()
+        dispatcher.dispatch("A")
+        assert events == ["captured A", "cancel 2", "cancel 3", "cancel 4", "action A"], events
+        assert not dispatcher.is_capturing()
+    finally:
+        world.uninstall()
+    print("✓ Capture, ESC, replaced capture and cancel_capture()")
+
+
+def test_3_registration_once_per_key():
+    print("\n[Test 3] One handler per key")
+    world, API, LegionUtils = _hotkey_world()
+    try:
+        calls = []
+        manager = LegionUtils.HotkeyManager()
+        for i in range(8):
+            manager.add("b" + str(i), "Test_HK_" + str(i), "B" + str(i),
+                        lambda i=i: calls.append(i), None, "F" + str(i + 1))
+        assert manager.register_all() == len(LegionUtils.ALL_HOTKEYS)
+        assert manager.register_all() == len(LegionUtils.ALL_HOTKEYS)   # idempotent
+        assert world.call_counts["OnHotKey"] == len(LegionUtils.ALL_HOTKEYS), "Not keys x bindings"
+        for key, handlers in world.hotkeys.items():
+            assert len(handlers) == 1, key
+        world.press_key("F3")
+        world.press_key("Q")
+        API.ProcessCallbacks()
+        assert calls == [2]
+    finally:
+        world.uninstall()
+    print("✓ " + str(len(LegionUtils.ALL_HOTKEYS)) + " handlers for 8 bindings")
+
+
+def test_4_rebind_through_capture():
+    print("\n[Test 4] Rebinding through capture")
+    world, API, LegionUtils = _hotkey_world()
+    try:
+        calls = []
+        changes = []
+        manager = LegionUtils.HotkeyManager()
+        bank = manager.add("bank", "Test_HK_Bank", "Bank", lambda: calls.append("bank"), None, "B")
+        check = manager.add("check", "Test_HK_Check", "Check", lambda: calls.append("check"), None, "C")
+        bank.on_change = lambda: changes.append((bank.current_hotkey, bank.capturing))
+        manager.register_all()
+
+        bank.start_capture()
+        check.start_capture()       # replaces bank's capture
+        assert not bank.capturing and check.capturing
+        world.press_key("X")
+        API.ProcessCallbacks()
+        assert check.current_hotkey == "X" and not check.capturing
+        assert world.persistent["Test_HK_Check"] == "X"
+
+        for key in ("C", "X", "B"):
+            world.press_key(key)
+        API.ProcessCallbacks()
+        assert calls == ["check", "bank"], calls
+        assert changes == [("B", True), ("B", False)], changes
+
+        bank.clear()
+        world.press_key("B")
+        API.ProcessCallbacks()
+        assert calls == ["check", "bank"]
+    finally:
+        world.uninstall()
+    print("✓ Capture moved Check to X; old key no longer fires")
+
+
+def test_5_tamer_suite_key_table():
+    print("\n[Test 5] Tamer_Suite key table")
+    world = default_tamer_world()
+    world.persistent["TamerSuite_PetHK_2"] = "F2"
+    world.at(2.0, lambda: world.press_key("1"))      # default Guard
+    world.at(3.0, lambda: world.press_key("F2"))     # pet 2 hotkey
+    world.at(4.0, lambda: world.press_key("Z"))      # unbound
+    report = run_script("Tamer/Tamer_Suite.py", world, seconds=6)
+    assert not report.error, report.error
+    said = [text for t, text in world.speech]
+    assert "all guard me" in said, said
+    assert any(text.endswith("follow me") and not text.startswith("all") for text in said), said
+    print("✓ Guard and pet hotkeys dispatched: " + ", ".join(said))
+
+
+def run_all_tests():
+    """Run all test cases"""
+    print("=" * 60)
+    print("HOTKEY DISPATCH - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_1_dispatch_table()
+        test_2_capture()
+        test_3_registration_once_per_key()
+        test_4_rebind_through_capture()
+        test_5_tamer_suite_key_table()
+
+        print("\n" + "=" * 60)
+        print("ALL TESTS PASSED ✓")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ UNEXPECTED ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Import-time budget for the LegionUtils package
+
+Each measurement runs in a fresh interpreter with an empty bytecode cache,
+so every module is compiled from source - the same cost a script pays when
+it is restarted (or hot-reloaded mid-fight) in the client.
+
+Tests:
+1. Bare facade import timing (budget enforced with LEGION_IMPORT_BUDGET=1)
+2. A typical script import (Tamer_Suite's names) timing, same opt-in budget
+3. Only the submodules a name needs are loaded
+4. Every submodule name is reachable through the facade and star import
+5. Re-importing the facade starts from fresh submodules (no stale singletons)
+6. Without the module __getattr__ hook, load_all() fills in every name
+
+Wall-clock timings depend on the machine and its load, so tests 1-2 only
+print them by default; test 3 is the real check. Run directly to print the
+timings, or enforce the budgets with:
+    LEGION_IMPORT_BUDGET=1 python _support/test_import_budget.py
+"""
+
+import sys
+import os
+import subprocess
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Cold import budgets (milliseconds, best of RUNS)
+BARE_IMPORT_BUDGET_MS = 10.0
+TYPICAL_IMPORT_BUDGET_MS = 50.0
+RUNS = 3
+ENFORCE_BUDGETS = os.environ.get("LEGION_IMPORT_BUDGET") == "1"
+
+TYPICAL_IMPORT = ("from LegionUtils import APIProfiler, FrameCache, SettingsStore, "
+                  "get_shared_pets, save_shared_pets, set_combat_state, is_in_combat, Scheduler")
+
+
+def cold_import_ms(statement):
+    """Best-of-RUNS time for statement in a fresh interpreter, compiling from source"""
+    code = ("import builtins, sys, time\n"
+            "builtins.API = None\n"
+            "sys.path.insert(0, " + repr(ROOT) + ")\n"
+            "start = time.perf_counter()\n"
+            + statement + "\n"
+            "print((time.perf_counter() - start) * 1000.0)\n")
+    times = []
+    for _ in range(RUNS):
+        env = dict(os.environ)
+        env["PYTHONDONTWRITEBYTECODE"] = "1"
+        env["PYTHONPYCACHEPREFIX"] = tempfile.mkdtemp(prefix="legion_import_")
+        output = subprocess.check_output([sys.executable, "-c", code], env=env, cwd=ROOT)
+        times.append(float(output.decode().strip().splitlines()[-1]))
+    return min(times)
+
+
+def _check_budget(label, ms, budget_ms):
+    """Assert the budget only when opted in - timings are machine dependent"""
+    if ENFORCE_BUDGETS:
+        assert ms <= budget_ms, "%s took %.1fms (budget %.1fms)" % (label, ms, budget_ms)
+
+
+def _fresh_legion_utils():
+    import builtins
+    if not hasattr(builtins, "API"):
+        builtins.API = None
+    sys.modules.pop("LegionUtils", None)
+    import LegionUtils
+    return LegionUtils
+
+
+def test_1_bare_import():
+    print("\n[Test 1] Bare facade import")
+    ms = cold_import_ms("import LegionUtils")
+    _check_budget("Bare import", ms, BARE_IMPORT_BUDGET_MS)
+    print("✓ %.1fms (budget %.1fms)" % (ms, BARE_IMPORT_BUDGET_MS))
+
+
+def test_2_typical_import():
+    print("\n[Test 2] Typical script import")
+    ms = cold_import_ms(TYPICAL_IMPORT)
+    full = cold_import_ms("import LegionUtils; LegionUtils.load_all()")
+    _check_budget("Typical import", ms, TYPICAL_IMPORT_BUDGET_MS)
+    print("✓ %.1fms (budget %.1fms; everything loaded: %.1fms)" % (ms, TYPICAL_IMPORT_BUDGET_MS, full))
+
+
+def test_3_loads_only_what_is_needed():
+    print("\n[Test 3] Submodules loaded on demand")
+    LegionUtils = _fresh_legion_utils()
+    assert LegionUtils.get_loaded_modules() == ["constants"]
+    from LegionUtils import format_gold_compact
+    assert LegionUtils.get_loaded_modules() == ["constants", "formatting"]
+    from LegionUtils import get_item_count
+    loaded = LegionUtils.get_loaded_modules()
+    assert "inventory" in loaded
+    for heavy in ("gui", "hotkeys", "gump", "perf", "journal"):
+        assert heavy not in loaded, heavy + " should not load for get_item_count"
+    print("✓ get_item_count loaded " + ", ".join(loaded))
+
+
+def test_4_facade_is_complete():
+    print("\n[Test 4] Facade exposes every submodule name")
+    LegionUtils = _fresh_legion_utils()
+    import ast
+    package_dir = os.path.join(ROOT, "LegionUtils")
+    for module_name, names in LegionUtils._SUBMODULES.items():
+        with open(os.path.join(package_dir, module_name + ".py")) as f:
+            tree = ast.parse(f.read())
+        defined = set()
+        for node in tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+                defined.add(node.name)
+            elif isinstance(node, ast.Assign):
+                defined.update(t.id for t in node.targets if isinstance(t, ast.Name))
+        public = set(n for n in defined if not n.startswith("_"))
+        assert public == set(names), module_name + " facade list out of date: " + str(public ^ set(names))
+
+    namespace = {}
+    exec("from LegionUtils import *", namespace)
+    missing = [n for n in LegionUtils.__all__ if n not in namespace]
+    assert not missing, missing
+    assert namespace["BANDAGE_GRAPHIC"] == 0x0E21
+    assert sorted(LegionUtils.get_loaded_modules()) == sorted(["constants"] + list(LegionUtils._SUBMODULES))
+    print("✓ " + str(len(LegionUtils.__all__)) + " names via star import")
+
+
+def test_5_reimport_is_fresh():
+    print("\n[Test 5] Re-import resets submodule state")
+    LegionUtils = _fresh_legion_utils()
+    LegionUtils.set_debug(True)
+    first_bus = LegionUtils.get_state_bus()
+    assert LegionUtils.DEBUG_MODE
+    LegionUtils = _fresh_legion_utils()
+    assert not LegionUtils.DEBUG_MODE
+    assert LegionUtils.get_state_bus() is not first_bus
+    print("✓ Singletons and flags start over")
+
+
+def test_6_load_all_without_hook():
+    print("\n[Test 6] load_all() without module __getattr__")
+    LegionUtils = _fresh_legion_utils()
+    # Lazy path: plain values stay live behind the hook
+    LegionUtils.load_all()
+    assert "DEBUG_MODE" not in vars(LegionUtils)
+    LegionUtils.set_debug(True)
+    assert LegionUtils.DEBUG_MODE
+
+    LegionUtils = _fresh_legion_utils()
+    del LegionUtils.__getattr__
+    LegionUtils.load_all()
+    namespace = {}
+    exec("from LegionUtils import *", namespace)
+    missing = [n for n in LegionUtils.__all__ if n not in namespace]
+    assert not missing, missing
+    assert namespace["DEBUG_MODE"] is False
+    exec("from LegionUtils import HealConfig, decide_heal, NO_RANGE_LIMIT", namespace)
+    sys.modules.pop("LegionUtils", None)
+    print("✓ Star import and plain values work after load_all()")
+
+
+def run_all_tests():
+    """Run all test cases"""
+    print("=" * 60)
+    print("LEGIONUTILS IMPORT BUDGET - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_1_bare_import()
+        test_2_typical_import()
+        test_3_loads_only_what_is_needed()
+        test_4_facade_is_complete()
+        test_5_reimport_is_fresh()
+        test_6_load_all_without_hook()
+
+        print("\n" + "=" * 60)
+        print("ALL TESTS PASSED ✓")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ UNEXPECTED ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test script for LegionUtils.InventoryIndex
+
+Tests:
+1. One container walk answers counts for every graphic
+2. Stacks are summed and serials are grouped per graphic
+3. TTL expiry and invalidate() force a rescan
+4. OnItemCreated/OnOpenContainer mark the index stale
+5. get_item_count/has_item/count_items_by_type read from the shared index
+"""
+
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "_support", "tools"))
+
+from LegionSim import SimWorld, BANDAGE_GRAPHIC
+
+HEAL_POTION = 0x0F0C
+CURE_POTION = 0x0F07
+REFRESH_POTION = 0x0F0B
+
+
+def _indexed_world():
+    world = SimWorld()
+    world.add_item(BANDAGE_GRAPHIC, 50, name="bandage")
+    world.add_item(HEAL_POTION, 10, name="heal potion")
+    pouch = world.add_item(0x0E79, 1, name="pouch", is_container=True)
+    world.add_item(HEAL_POTION, 5, container=pouch.Serial, name="heal potion")
+    world.add_item(CURE_POTION, 3, container=pouch.Serial, name="cure potion")
+    api = world.install()
+    sys.modules.pop("LegionUtils", None)
+    import LegionUtils
+    return world, api, LegionUtils
+
+
+def test_1_single_scan():
+    print("\n[Test 1] One scan answers every graphic")
+    world, API, LegionUtils = _indexed_world()
+    try:
+        index = LegionUtils.InventoryIndex(API)
+        counts = index.counts(HEAL_POTION, CURE_POTION, REFRESH_POTION)
+        assert counts == {HEAL_POTION: 15, CURE_POTION: 3, REFRESH_POTION: 0}, counts
+        assert index.count(BANDAGE_GRAPHIC) == 50
+        assert world.call_counts["ItemsInContainer"] == 1
+        assert index.get_stats() == {"scans": 1, "hits": 1}
+    finally:
+        world.uninstall()
+    print("✓ 4 graphics counted from 1 ItemsInContainer call")
+
+
+def test_2_serials_grouped():
+    print("\n[Test 2] Serials grouped per graphic")
+    world, API, LegionUtils = _indexed_world()
+    try:
+        index = LegionUtils.InventoryIndex(API)
+        assert len(index.serials(HEAL_POTION)) == 2, "Backpack + pouch stacks"
+        assert index.count(HEAL_POTION, recursive=False) == 10, "Non-recursive skips the pouch"
+        assert index.serials(REFRESH_POTION) == []
+    finally:
+        world.uninstall()
+    print("✓ Recursive and root-only maps kept separately")
+
+
+def test_3_ttl_and_invalidate():
+    print("\n[Test 3] TTL and invalidate()")
+    world, API, LegionUtils = _indexed_world()
+    try:
+        index = LegionUtils.InventoryIndex(API, ttl=1.0)
+        bandages = API.FindType(BANDAGE_GRAPHIC)
+        index.count(BANDAGE_GRAPHIC)
+        bandages.Amount = 49
+        assert index.count(BANDAGE_GRAPHIC) == 50, "Within TTL the map is reused"
+        API.Pause(1.0)
+        assert index.count(BANDAGE_GRAPHIC) == 49, "TTL expired - rescanned"
+        bandages.Amount = 48
+        index.invalidate()
+        assert index.count(BANDAGE_GRAPHIC) == 48
+        assert index.scans == 3
+    finally:
+        world.uninstall()
+    print("✓ Rescanned after TTL and on invalidate()")
+
+
+def test_4_events_mark_stale():
+    print("\n[Test 4] Item events mark the index stale")
+    world, API, LegionUtils = _indexed_world()
+    try:
+        index = LegionUtils.InventoryIndex(API, ttl=60.0).subscribe()
+        assert index.subscribed
+        assert index.count(REFRESH_POTION) == 0
+        world.add_item(REFRESH_POTION, 4, name="refresh potion")
+        API.ProcessCallbacks()
+        assert index.count(REFRESH_POTION) == 4, "OnItemCreated should force a rescan"
+        index.count(REFRESH_POTION)
+        world.fire_event("OnOpenContainer", world.player.Backpack.Serial)
+        API.ProcessCallbacks()
+        index.count(REFRESH_POTION)
+        assert index.scans == 3
+    finally:
+        world.uninstall()
+    print("✓ OnItemCreated and OnOpenContainer trigger a rescan")
+
+
+def test_5_helpers_use_index():
+    print("\n[Test 5] Counting helpers share the index")
+    world, API, LegionUtils = _indexed_world()
+    try:
+        assert LegionUtils.get_item_count(HEAL_POTION) == 15
+        assert LegionUtils.has_item(CURE_POTION, min_count=3)
+        assert not LegionUtils.has_item(REFRESH_POTION)
+        counts = LegionUtils.count_items_by_type(HEAL_POTION, CURE_POTION, REFRESH_POTION)
+        assert counts[HEAL_POTION] == 15
+        assert world.call_counts["ItemsInContainer"] == 1, "All helpers answered from one scan"
+        assert LegionUtils.get_item_count(HEAL_POTION, container_serial=0) == 0
+    finally:
+        world.uninstall()
+    print("✓ 6 helper calls, 1 container walk")
+
+
+def run_all_tests():
+    """Run all test cases"""
+    print("=" * 60)
+    print("INVENTORY INDEX - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_1_single_scan()
+        test_2_serials_grouped()
+        test_3_ttl_and_invalidate()
+        test_4_events_mark_stale()
+        test_5_helpers_use_index()
+
+        print("\n" + "=" * 60)
+        print("ALL TESTS PASSED ✓")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ UNEXPECTED ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Test script for LegionUtils.JournalWatcher
+
+Tests:
+1. Each journal entry is processed exactly once across polls
+2. All patterns match in one pass (including overlapping/contained patterns)
+3. Callbacks fire per match, consume() clears the flag
+4. reset() skips existing lines, late watch() sees lines since reset
+5. journal_contains/journal_contains_any read through the shared watcher
+6. Harvester.check_journal uses the watcher instead of InJournal
+7. Tamer_Healer journal tracking runs without InJournal calls
+"""
+
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "_support", "tools"))
+
+from LegionSim import SimWorld, run_script, default_tamer_world
+
+
+def _journal_world():
+    world = SimWorld()
+    api = world.install()
+    sys.modules.pop("LegionUtils", None)
+    import LegionUtils
+    return world, api, LegionUtils
+
+
+def test_1_entries_processed_once():
+    print("\n[Test 1] Entries processed once")
+    world, API, LegionUtils = _journal_world()
+    try:
+        watcher = LegionUtils.JournalWatcher(API).watch("ore")
+        world.add_journal("You dig some iron ore")
+        world.add_journal("You dig some iron ore")   # same timestamp, still two entries
+        assert len(watcher.poll()) == 2
+        for _ in range(10):
+            assert watcher.poll() == []
+        API.Pause(0.5)
+        world.add_journal("You dig some gold ore")
+        assert len(watcher.poll()) == 1
+        assert watcher.get_stats()["entries"] == 3
+    finally:
+        world.uninstall()
+    print("✓ 12 polls, 3 entries processed")
+
+
+def test_2_one_pass_multi_pattern():
+    print("\n[Test 2] Multi-pattern matching")
+    world, API, LegionUtils = _journal_world()
+    try:
+        watcher = LegionUtils.JournalWatcher(API)
+        watcher.watch_all(["bandage", "You finish applying the bandages", "apply", "poison"])
+        world.add_journal("You finish applying the bandages.")
+        hits = [pattern for pattern, entry in watcher.poll()]
+        assert sorted(hits) == ["apply", "bandage", "you finish applying the bandages"], hits
+        assert not watcher.seen("poison")
+        assert watcher.seen("BANDAGE"), "Lookups are case-insensitive"
+    finally:
+        world.uninstall()
+    print("✓ Contained and overlapping patterns all matched")
+
+
+def test_3_callbacks_and_consume():
+    print("\n[Test 3] Callbacks and consume()")
+    world, API, LegionUtils = _journal_world()
+    try:
+        deaths = []
+        watcher = LegionUtils.JournalWatcher(API).watch("you are dead", lambda e: deaths.append(e.Text))
+        world.add_journal("You are dead.")
+        watcher.poll()
+        assert deaths == ["You are dead."]
+        assert watcher.consume("You are dead")
+        assert not watcher.seen("You are dead")
+    finally:
+        world.uninstall()
+    print("✓ Callback ran once, flag consumed")
+
+
+def test_4_reset_and_late_watch():
+    print("\n[Test 4] reset() and late watch()")
+    world, API, LegionUtils = _journal_world()
+    try:
+        watcher = LegionUtils.JournalWatcher(API).watch("too far")
+        world.add_journal("That is too far away.")
+        watcher.reset()
+        watcher.poll()
+        assert not watcher.seen("too far"), "reset() skips lines already in the journal"
+        API.Pause(0.2)
+        world.add_journal("You have cured the target of all poisons.")
+        watcher.poll()
+        watcher.watch("cured")
+        assert watcher.seen("cured"), "Lines read since reset count for new patterns"
+    finally:
+        world.uninstall()
+    print("✓ Old lines skipped, late pattern sees lines since reset")
+
+
+def test_5_journal_contains():
+    print("\n[Test 5] journal_contains helpers")
+    world, API, LegionUtils = _journal_world()
+    try:
+        for i in range(20):
+            world.add_journal("line " + str(i))
+        world.add_journal("You feel very ill")
+        assert LegionUtils.journal_contains("VERY ILL")
+        assert not LegionUtils.journal_contains("line 0")
+        assert LegionUtils.journal_contains_any(["nothing", "line 15"]) == "line 15"
+        assert world.call_counts.get("InGameJournal.GetText", 0) == 0
+        assert LegionUtils.get_journal_watcher().get_stats()["entries"] == 21
+    finally:
+        world.uninstall()
+    print("✓ Recent-line checks served from the watcher")
+
+
+def test_6_harvester_check_journal():
+    print("\n[Test 6] Harvester.check_journal")
+    world, API, LegionUtils = _journal_world()
+    try:
+        sys.modules.pop("GatherFramework", None)
+        import GatherFramework
+        tool = world.add_item(0x0E86, 1, name="pickaxe")
+        harvester = GatherFramework.Harvester(tool.Serial)
+        success = ["You dig some", "You put some"]
+        depleted = ["There is no metal here", "You can't mine there"]
+        world.add_journal("There is no metal here to mine.")   # from the previous swing
+        harvester.harvest()
+        assert harvester.check_journal(success, depleted) == "unknown"
+        world.add_journal("You dig some iron ore and put it in your backpack.")
+        assert harvester.check_journal(success, depleted) == "success"
+        assert world.call_counts.get("InJournal", 0) == 0
+    finally:
+        sys.modules.pop("GatherFramework", None)
+        world.uninstall()
+    print("✓ Results scoped to the current swing, no InJournal calls")
+
+
+def test_7_tamer_healer_journal_tracking():
+    print("\n[Test 7] Tamer_Healer journal tracking")
+    world = default_tamer_world()
+    world.persistent["PetHealer_UseJournal"] = "True"
+    pets = [entry.split(":")[1] for entry in world.persistent["SharedPets_List"].split("|")]
+    world.persistent["PetHealer_Pets"] = ",".join(pets)
+    report = run_script("Tamer/Tamer_Healer.py", world, seconds=120)
+    assert not report.error, report.error
+    assert world.call_counts.get("UseObject", 0) > 0, "Healer should have bandaged"
+    assert world.call_counts.get("InJournal", 0) == 0, "Journal checks should go through the watcher"
+    print("✓ " + str(world.call_counts.get("GetJournalEntries", 0)) + " journal reads, 0 InJournal calls")
+
+
+def run_all_tests():
+    """Run all test cases"""
+    print("=" * 60)
+    print("JOURNAL WATCHER - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_1_entries_processed_once()
+        test_2_one_pass_multi_pattern()
+        test_3_callbacks_and_consume()
+        test_4_reset_and_late_watch()
+        test_5_journal_contains()
+        test_6_harvester_check_journal()
+        test_7_tamer_healer_journal_tracking()
+
+        print("\n" + "=" * 60)
+        print("ALL TESTS PASSED ✓")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ UNEXPECTED ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test script for LegionSim (headless world simulator)
+
+Tests:
+1. Virtual clock - API.Pause and time.time advance together, no real sleeping
+2. Scheduled world events fire at the right virtual time
+3. Bandage flow - UseObject + Target heals after the bandage delay
+4. Persistent vars, hotkeys and events are delivered through ProcessCallbacks
+5. uninstall() restores the real time module and API
+6. Tamer_Suite main loop runs headless and stops on StopRequested
+"""
+
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "tools"))
+
+from LegionSim import SimWorld, SimStop, run_script, default_tamer_world, BANDAGE_GRAPHIC
+
+
+def test_1_virtual_clock():
+    print("\n[Test 1] Virtual clock")
+    world = SimWorld()
+    with world as API:
+        start = time.time()
+        wall_start = time.perf_counter()
+        for _ in range(100):
+            API.Pause(1.0)
+        assert abs(time.time() - start - 100.0) < 1e-6, "100 pauses of 1s should be 100 virtual seconds"
+        assert time.perf_counter() - wall_start < 1.0, "Virtual pauses must not sleep"
+        assert world.ticks == 100
+    print("✓ 100s of virtual time in " + str(world.ticks) + " ticks")
+
+
+def test_2_scheduled_events():
+    print("\n[Test 2] Scheduled world events")
+    world = SimWorld()
+    pet = world.add_pet("Dragon", 100)
+    world.every(2.0, lambda: world.damage(pet, 10))
+    world.at(5.0, lambda: world.add_journal("A daemon appears"))
+    with world as API:
+        API.Pause(6.0)
+        assert pet.Hits == 70, "Three hits by t=6s, got " + str(pet.Hits)
+        assert API.InJournal("daemon appears")
+    print("✓ Periodic damage and one-shot journal line fired on time")
+
+
+def test_3_bandage_flow():
+    print("\n[Test 3] Bandage flow")
+    world = SimWorld()
+    bandages = world.add_item(BANDAGE_GRAPHIC, 10, name="bandage")
+    pet = world.add_pet("Dragon", 100)
+    world.damage(pet, 50)
+    with world as API:
+        item = API.FindType(BANDAGE_GRAPHIC)
+        assert item is bandages
+        API.UseObject(item.Serial)
+        assert API.HasTarget(), "Bandage use should bring up a target cursor"
+        API.Target(pet.Serial)
+        assert not API.HasTarget()
+        API.Pause(world.bandage_time + 0.1)
+        assert pet.Hits == 80, "Bandage should heal 30, got " + str(pet.Hits)
+        assert bandages.Amount == 9
+        assert API.InJournal("You finish applying the bandages")
+    print("✓ UseObject + Target healed the pet after " + str(world.bandage_time) + "s")
+
+
+def test_4_callbacks_and_persistence():
+    print("\n[Test 4] Persistent vars, hotkeys, events")
+    world = SimWorld()
+    pressed = []
+    hits_seen = []
+    with world as API:
+        API.SavePersistentVar("Key", "Value", API.PersistentVar.Char)
+        assert API.GetPersistentVar("Key", "", API.PersistentVar.Char) == "Value"
+        API.OnHotKey("TAB", lambda: pressed.append("TAB"))
+        API.Events.OnPlayerHitsChanged(lambda hits: hits_seen.append(hits))
+        world.press_key("TAB")
+        world.damage(world.player, 25)
+        assert not pressed, "Callbacks only run on ProcessCallbacks"
+        API.ProcessCallbacks()
+        assert pressed == ["TAB"]
+        assert hits_seen == [75]
+        assert world.call_counts["SavePersistentVar"] == 1
+    print("✓ Callbacks delivered on ProcessCallbacks, calls counted")
+
+
+def test_5_uninstall_restores_time():
+    print("\n[Test 5] uninstall() restores time")
+    real_time = time.time
+    previous_api = sys.modules.get("API")  # other test files may install a mock API
+    world = SimWorld()
+    api = world.install()
+    assert time.time is not real_time
+    assert sys.modules["API"] is api
+    world.uninstall()
+    assert time.time is real_time
+    assert sys.modules.get("API") is previous_api
+    print("✓ time.time and sys.modules restored")
+
+
+def test_6_deadline_raises_sim_stop():
+    print("\n[Test 6] Scripts that ignore StopRequested are stopped")
+    world = SimWorld()
+    world.deadline = world.clock.now + 1.0
+    raised = False
+    with world as API:
+        try:
+            while True:
+                API.Pause(0.5)
+        except SimStop:
+            raised = True
+    assert raised
+    print("✓ SimStop raised after the grace period")
+
+
+def test_7_tamer_suite_headless():
+    print("\n[Test 7] Tamer_Suite runs headless")
+    world = default_tamer_world()
+    report = run_script("Tamer/Tamer_Suite.py", world, seconds=120)
+    assert not report.error, report.error
+    assert report.stopped_by == "StopRequested"
+    assert report.ticks > 500, "Expected ~10 ticks/s of virtual time, got " + str(report.ticks)
+    assert report.speedup > 10, "Simulation should run much faster than real time"
+    assert world.call_counts.get("UseObject", 0) > 0, "Suite should have bandaged something"
+    print("✓ " + str(report.ticks) + " ticks, " + "{:.1f}".format(report.calls_per_tick)
+          + " API calls/tick, " + "{:.0f}".format(report.speedup) + "x real time")
+
+
+def run_all_tests():
+    """Run all test cases"""
+    print("=" * 60)
+    print("LEGION SIMULATOR - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_1_virtual_clock()
+        test_2_scheduled_events()
+        test_3_bandage_flow()
+        test_4_callbacks_and_persistence()
+        test_5_uninstall_restores_time()
+        test_6_deadline_raises_sim_stop()
+        test_7_tamer_suite_headless()
+
+        print("\n" + "=" * 60)
+        print("ALL TESTS PASSED ✓")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ UNEXPECTED ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Test script for LegionUtils.MobileScan and the shared per-tick world scan
+
+Tests:
+1. Band and spatial hash queries match a brute-force pass over the mobiles
+2. FrameCache hands out one scan per tick and rebuilds it after Pause
+3. DungeonFarmer's pet, NPC, enemy and engage scans agree with the old
+   per-subsystem loops while sharing one GetMobiles call
+"""
+
+import sys
+import os
+import math
+import random
+import runpy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "_support", "tools"))
+
+from LegionSim import SimWorld, Notoriety
+
+NOTORIETIES = [Notoriety.Innocent, Notoriety.Gray, Notoriety.Criminal,
+               Notoriety.Enemy, Notoriety.Murderer]
+
+
+def _scan_world():
+    world = SimWorld()
+    world.install()
+    sys.modules.pop("LegionUtils", None)
+    import LegionUtils
+    return world, LegionUtils
+
+
+def _populate(world, rng, count, spread=25):
+    """Scatter count mobiles within spread tiles of the player; about one in eight dead"""
+    px, py = world.player.X, world.player.Y
+    mobs = []
+    for i in range(count):
+        mob = world.add_mobile("Mob" + str(i), notoriety=rng.choice(NOTORIETIES),
+                               x=px + rng.randint(-spread, spread), y=py + rng.randint(-spread, spread))
+        mob.IsDead = rng.random() < 0.125
+        mobs.append(mob)
+    return mobs
+
+
+def _brute_range(world, notorieties, max_distance):
+    """Reference: every live non-player mobile in range, by (distance, serial)"""
+    found = [m for m in world.mobiles.values()
+             if m is not world.player and not m.IsDead
+             and (notorieties is None or m.Notoriety in notorieties)
+             and (max_distance is None or m.Distance <= max_distance)]
+    found.sort(key=lambda m: (m.Distance, m.Serial))
+    return found
+
+
+def _load_script(world, path):
+    """Run a script's top level under the simulator and return its globals"""
+    world.deadline = world.clock.now     # main loops exit at once
+    sys.modules.pop("LegionUtils", None)
+    ns = runpy.run_path(os.path.join(ROOT, path), run_name="__main__")
+    world.deadline = None
+    # run_path returns a copy - the functions read the real globals
+    for value in ns.values():
+        if hasattr(value, "__globals__") and value.__module__ == "__main__":
+            return value.__globals__
+    return ns
+
+
+def test_1_queries_match_brute_force():
+    print("\n[Test 1] Queries vs brute force")
+    world, LegionUtils = _scan_world()
+    try:
+        rng = random.Random(17)
+        _populate(world, rng, 120)
+        scan = LegionUtils.MobileScan(world.api)
+        assert len(scan) == sum(1 for m in world.mobiles.values()
+                                if m is not world.player and not m.IsDead)
+        checked = 0
+        for _ in range(300):
+            notorieties = rng.choice([None, [5], [5, 6], [3, 4, 5, 6], [1], [2]])
+            max_distance = rng.choice([None, 0, 1, 2, 3, 7, 8, 12, 13, 19, 40])
+            expected = _brute_range(world, notorieties, max_distance)
+            assert scan.in_range(notorieties, max_distance) == expected, (notorieties, max_distance)
+            assert scan.nearest(notorieties, max_distance) == (expected[0] if expected else None)
+            assert scan.any_in_range(notorieties, max_distance) == bool(expected)
+
+            x = world.player.X + rng.randint(-30, 30)
+            y = world.player.Y + rng.randint(-30, 30)
+            radius = rng.choice([0, 1, 3, 4.5, 8, 17])
+            near = set(m.Serial for m in scan.neighbours(x, y, radius))
+            brute = set(m.Serial for m in world.mobiles.values()
+                        if m is not world.player and not m.IsDead
+                        and math.sqrt((m.X - x) ** 2 + (m.Y - y) ** 2) <= radius)
+            assert near == brute, (x, y, radius)
+            checked += 1
+        assert scan.nearest([world.api.Notoriety.Enemy], 40).Notoriety == Notoriety.Enemy
+    finally:
+        world.uninstall()
+    print("✓ " + str(checked) + " random range/nearest/neighbour queries agree")
+
+
+def test_2_one_scan_per_tick():
+    print("\n[Test 2] One scan per tick")
+    world, LegionUtils = _scan_world()
+    try:
+        _populate(world, random.Random(3), 40)
+        frame_cache = LegionUtils.FrameCache(world.api).install()
+        world.call_counts.clear()
+        first = LegionUtils.get_mobile_scan()
+        assert LegionUtils.get_mobile_scan() is first
+        assert frame_cache.get_scan() is first
+        assert world.call_counts.get("Mobiles.GetMobiles") == 1
+
+        # New tick: a mobile walks in range, the next scan sees it
+        orc = world.add_mobile("Orc", notoriety=Notoriety.Enemy, x=world.player.X + 1)
+        assert orc not in first.in_range()
+        world.api.Pause(0.1)
+        second = LegionUtils.get_mobile_scan()
+        assert second is not first and second.nearest([Notoriety.Enemy]) is orc
+        assert world.call_counts.get("Mobiles.GetMobiles") == 2
+        stats = frame_cache.get_stats()
+        assert stats["scans"] == 2 and stats["scan_reuses"] == 2, stats
+        frame_cache.uninstall()
+        assert LegionUtils.get_mobile_scan() is not LegionUtils.get_mobile_scan()
+    finally:
+        world.uninstall()
+    print("✓ Shared within a tick, rebuilt after Pause")
+
+
+# Pre-scan DungeonFarmer loops, kept as the reference behaviour
+def _old_pets(world):
+    # The old loop also listed the (blue) player as a pet; the scan skips the player
+    player = world.player
+    return [m.Serial for m in world.api.Mobiles.GetMobiles()
+            if not m.IsDead and m.Notoriety == 1 and m.Serial != player.Serial]
+
+
+def _old_npcs(world, radius):
+    player = world.player
+    return [(m.X, m.Y) for m in world.api.Mobiles.GetMobiles()
+            if not m.IsDead and m.Notoriety != 1 and m.Serial != player.Serial
+            and m.Distance <= radius]
+
+
+def _old_enemies(world, scan_range, reds, grays):
+    player = world.player
+    enemies = [(m.Serial, m.Distance) for m in world.api.Mobiles.GetMobiles()
+               if not m.IsDead and m.Serial != player.Serial
+               and ((m.Notoriety == 5 and reds) or (m.Notoriety == 6 and grays))
+               and m.Distance <= scan_range]
+    enemies.sort(key=lambda e: e[1])
+    return [serial for serial, _ in enemies]
+
+
+def _old_npcs_near(world, enemy, radius):
+    player = world.player
+    return sum(1 for m in world.api.Mobiles.GetMobiles()
+               if not m.IsDead and m.Serial != player.Serial and m.Notoriety != 1
+               and m.Serial != enemy.Serial
+               and math.sqrt((m.X - enemy.X) ** 2 + (m.Y - enemy.Y) ** 2) <= radius)
+
+
+def test_3_dungeon_farmer_consumers():
+    print("\n[Test 3] DungeonFarmer consumers")
+    world = SimWorld()
+    world.install()
+    try:
+        g = _load_script(world, "Utility/Util_DungeonFarmer.py")
+        rng = random.Random(29)
+        mobs = _populate(world, rng, 80)
+        pet_manager = g["PetManager"]()
+        danger = g["DangerAssessment"](pet_manager)
+        threat_map = g["NPCThreatMap"](scan_radius=12)
+        combat = g["CombatManager"](danger, threat_map, pet_manager)
+        combat.max_nearby_hostiles = 1000
+        combat.max_npcs_near_target = 1000
+        combat.max_danger_to_engage = 1000
+
+        ticks = 0
+        for reds, grays in [(True, True), (True, False), (False, True), (False, False)]:
+            combat.configure_enemy_types(attack_reds=reds, attack_grays=grays)
+            for scan_range in (3, 8, 15):
+                world.api.Pause(0.1)
+                world.call_counts.clear()
+                pet_manager.scan_pets()
+                threat_map.scan_npcs(force_scan=True)
+                enemies = combat.scan_for_enemies(scan_range)
+                live = [m for m in mobs if not m.IsDead]
+                target = rng.choice(live)
+                combat.should_engage_enemy(target.Serial)
+                calls = world.call_counts.get("Mobiles.GetMobiles")
+                assert calls == 1, "One GetMobiles per tick, got " + str(calls)
+
+                assert sorted(p["serial"] for p in pet_manager.pets) == sorted(_old_pets(world))
+                assert sorted(threat_map.npc_positions) == sorted(_old_npcs(world, 12))
+                assert enemies == _old_enemies(world, scan_range, reds, grays)
+                radius = combat.npc_proximity_radius
+                near = [m for m in g["get_mobile_scan"]().neighbours(target.X, target.Y, radius)
+                        if m.Notoriety != 1 and m.Serial != target.Serial]
+                assert len(near) == _old_npcs_near(world, target, radius)
+                ticks += 1
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+    print("✓ " + str(ticks) + " ticks: same results, one GetMobiles each (was 4+)")
+
+
+def run_all_tests():
+    """Run all test cases"""
+    print("=" * 60)
+    print("MOBILE SCAN - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_1_queries_match_brute_force()
+        test_2_one_scan_per_tick()
+        test_3_dungeon_farmer_consumers()
+
+        print("\n" + "=" * 60)
+        print("ALL TESTS PASSED ✓")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ UNEXPECTED ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Test script for LegionUtils.PetDamageTracker and projected-HP heal triage
+
+Tests:
+1. Unknown or steady pets project to their current HP
+2. Steady damage gives the expected DPS and projection
+3. Heals don't mask damage; old damage ages out of the window
+4. Death resets a pet's history; unchanged HP stores no samples
+5. Tamer_Suite heals the pet that will be lowest when the bandage lands
+6. DungeonFarmer HealingSystem ranks hurt pets by projected HP
+"""
+
+import sys
+import os
+import runpy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "_support", "tools"))
+
+from LegionSim import SimWorld, BANDAGE_GRAPHIC
+
+
+def _tracker_world():
+    world = SimWorld()
+    api = world.install()
+    sys.modules.pop("LegionUtils", None)
+    import LegionUtils
+    return world, api, LegionUtils
+
+
+def _load_script(world, path):
+    """Run a script's top level under the simulator and return its globals"""
+    world.deadline = world.clock.now     # main loops exit at once
+    sys.modules.pop("LegionUtils", None)
+    ns = runpy.run_path(os.path.join(ROOT, path), run_name="__main__")
+    # run_path returns a copy - the functions read the real globals
+    for value in ns.values():
+        if hasattr(value, "__globals__") and value.__module__ == "__main__":
+            return value.__globals__
+    return ns
+
+
+def _hit_every(world, mob, amount, interval, seconds, tick=0.1, observe=None):
+    """Advance virtual time, damaging `mob` every `interval` and observing each tick"""
+    elapsed = 0.0
+    next_hit = interval
+    while elapsed < seconds - 1e-9:
+        world.clock.now += tick
+        elapsed += tick
+        if elapsed >= next_hit - 1e-9:
+            mob.Hits -= amount
+            next_hit += interval
+        if observe:
+            observe()
+
+
+def test_1_no_history():
+    print("\n[Test 1] No history")
+    world, API, LegionUtils = _tracker_world()
+    try:
+        pet = world.add_pet("Dragon", 80, hits_max=100)
+        damage = LegionUtils.PetDamageTracker()
+        assert damage.get_dps(pet.Serial) == 0.0
+        assert damage.projected_percent(pet, 4.5) == 80
+        damage.observe(pet)
+        _hit_every(world, pet, 0, 1.0, 3.0, observe=lambda: damage.observe(pet))
+        assert damage.get_dps(pet.Serial) == 0.0
+        assert damage.projected_percent(pet, 4.5) == 80
+        assert damage.projected_percent(None, 4.5) == 0
+    finally:
+        world.uninstall()
+    print("✓ Projection equals current HP without damage")
+
+
+def test_2_steady_damage():
+    print("\n[Test 2] Steady damage")
+    world, API, LegionUtils = _tracker_world()
+    try:
+        pet = world.add_pet("Dragon", 100)
+        damage = LegionUtils.PetDamageTracker(window=4.0)
+        damage.observe(pet)
+        _hit_every(world, pet, 5, 0.5, 6.0, observe=lambda: damage.observe(pet))
+        dps = damage.get_dps(pet.Serial)
+        assert abs(dps - 10.0) < 1.5, "Expected ~10 dps, got " + str(dps)
+        projected = damage.projected_percent(pet, 2.0)
+        assert abs(projected - (pet.Hits - dps * 2.0)) < 0.01
+        assert damage.projected_hits(pet, 100.0) == 0, "Projection clamps at 0"
+        print("  dps " + str(round(dps, 1)) + ", now " + str(pet.Hits) + "%, in 2s " + str(round(projected, 1)) + "%")
+    finally:
+        world.uninstall()
+    print("✓ DPS and projection follow the damage rate")
+
+
+def test_3_heals_and_window():
+    print("\n[Test 3] Heals and window")
+    world, API, LegionUtils = _tracker_world()
+    try:
+        pet = world.add_pet("Dragon", 100)
+        damage = LegionUtils.PetDamageTracker(window=4.0)
+        damage.observe(pet)
+        _hit_every(world, pet, 10, 1.0, 3.0, observe=lambda: damage.observe(pet))
+        before = damage.get_dps(pet.Serial)
+        pet.Hits += 30                          # bandage lands
+        damage.observe(pet)
+        assert damage.get_dps(pet.Serial) == before, "A heal must not cancel out damage"
+        _hit_every(world, pet, 0, 1.0, 4.5, observe=lambda: damage.observe(pet))
+        assert damage.get_dps(pet.Serial) == 0.0, "Damage older than the window ages out"
+        assert damage.get_stats()["samples"] <= 2
+    finally:
+        world.uninstall()
+    print("✓ Only HP drops count and they expire after the window")
+
+
+def test_4_death_and_samples():
+    print("\n[Test 4] Death and sample storage")
+    world, API, LegionUtils = _tracker_world()
+    try:
+        pet = world.add_pet("Dragon", 100)
+        other = world.add_pet("Hiryu", 100)
+        damage = LegionUtils.PetDamageTracker()
+        for _ in range(50):
+            damage.observe(pet)
+            damage.observe(other)
+        assert damage.get_stats() == {"tracked": 2, "samples": 2}, damage.get_stats()
+        _hit_every(world, pet, 20, 0.5, 2.0, observe=lambda: damage.observe(pet))
+        assert damage.get_dps(pet.Serial) > 0
+        pet.IsDead = True
+        damage.observe(pet)
+        assert damage.get_dps(pet.Serial) == 0.0 and damage.get_stats()["tracked"] == 1
+        damage.forget(other.Serial)
+        damage.observe(None)
+        assert damage.get_stats()["tracked"] == 0
+    finally:
+        world.uninstall()
+    print("✓ Dead pets start fresh; idle pets keep one sample")
+
+
+def test_5_tamer_suite_projection():
+    print("\n[Test 5] Tamer_Suite projected triage")
+    world = SimWorld()
+    world.install()
+    try:
+        world.add_item(BANDAGE_GRAPHIC, 100, name="bandage")
+        steady = world.add_pet("Steady", 70, hits_max=100, x=101, y=100)
+        burst = world.add_pet("Burst", 85, hits_max=100, x=100, y=101)
+        g = _load_script(world, "Tamer/Tamer_Suite.py")
+        g["HEAL_SELF"] = False
+        g["PETS"] = [steady.Serial, burst.Serial]
+        assert g["get_next_heal_action"]()[0] == steady.Serial, "Without history the lowest HP wins"
+
+        # Burst pet drops 85 -> 75 over one second (10 dps): still above the
+        # steady pet now, but ~30% when a bandage started now would land
+        burst.Hits = 85
+        _hit_every(world, burst, 5, 0.5, 1.0, observe=g["track_pet_damage"])
+        world.api.ProcessCallbacks()
+        assert burst.Hits > steady.Hits
+        target = g["get_next_heal_action"]()[0]
+        assert target == burst.Serial, "Expected the pet under burst damage"
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+    print("✓ Burst pet at 75% healed before steady pet at 70%")
+
+
+def test_6_dungeon_farmer_projection():
+    print("\n[Test 6] DungeonFarmer projected triage")
+    world = SimWorld()
+    world.install()
+    try:
+        world.add_item(BANDAGE_GRAPHIC, 100, name="bandage")
+        world.add_pet("Tank", 500, x=101, y=100)
+        steady = world.add_pet("Steady", 40, hits_max=100, x=101, y=100)
+        burst = world.add_pet("Burst", 48, hits_max=100, x=100, y=101)
+        g = _load_script(world, "Utility/Util_DungeonFarmer.py")
+        pets = g["PetManager"]()
+        pets.scan_pets()
+        healer = g["HealingSystem"](pets)
+        assert healer.get_next_heal_action()[0] == steady.Serial
+
+        _hit_every(world, burst, 3, 0.5, 1.0, observe=healer.track_damage)
+        world.api.ProcessCallbacks()
+        assert healer.get_next_heal_action()[0] == burst.Serial
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+    print("✓ HealingSystem picks the pet under burst damage")
+
+
+def run_all_tests():
+    """Run all test cases"""
+    print("=" * 60)
+    print("PET DAMAGE TRACKER - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_1_no_history()
+        test_2_steady_damage()
+        test_3_heals_and_window()
+        test_4_death_and_samples()
+        test_5_tamer_suite_projection()
+        test_6_dungeon_farmer_projection()
+
+        print("\n" + "=" * 60)
+        print("ALL TESTS PASSED ✓")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ UNEXPECTED ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
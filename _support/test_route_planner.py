@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Test script for LegionUtils.WalkabilityGrid/RoutePlanner and the scripts' route planning
+
+Tests:
+1. A* paths are shortest, legs are straight walks, tiles are read once
+2. DungeonFarmer PatrolSystem only patrols to reachable spots (no stuck cycles)
+3. PetFarmer FleeSystem walks around a wall to the safe spot
+4. GatherFramework flee_from_enemy finds a way out when "away" is a wall
+"""
+
+import sys
+import os
+import random
+import runpy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "_support", "tools"))
+
+from LegionSim import SimWorld, Notoriety
+
+
+def _load_script(world, path):
+    """Run a script's top level under the simulator and return its globals"""
+    world.deadline = world.clock.now     # main loops exit at once
+    sys.modules.pop("LegionUtils", None)
+    ns = runpy.run_path(os.path.join(ROOT, path), run_name="__main__")
+    world.deadline = None
+    # run_path returns a copy - the functions read the real globals
+    for value in ns.values():
+        if hasattr(value, "__globals__") and value.__module__ == "__main__":
+            return value.__globals__
+    return ns
+
+
+def _wall(world, x1, y1, x2, y2):
+    for x in range(x1, x2 + 1):
+        for y in range(y1, y2 + 1):
+            world.blocked.add((x, y))
+
+
+def _box(world, x1, y1, x2, y2):
+    """Closed ring of wall tiles - the inside can't be reached"""
+    _wall(world, x1, y1, x2, y1)
+    _wall(world, x1, y2, x2, y2)
+    _wall(world, x1, y1, x1, y2)
+    _wall(world, x2, y1, x2, y2)
+
+
+def _pathfind_targets(world):
+    return [(args[0], args[1]) for _, name, args in world.actions if name == "Pathfind"]
+
+
+def test_1_planner():
+    print("\n[Test 1] A* and the walkability cache")
+    world = SimWorld()
+    world.install()
+    try:
+        sys.modules.pop("LegionUtils", None)
+        import LegionUtils
+        rng = random.Random(21)
+        ox, oy = 2000, 2000
+        for _ in range(250):
+            x, y = ox + rng.randint(-20, 20), oy + rng.randint(-20, 20)
+            if (x, y) != (ox, oy):
+                world.blocked.add((x, y))
+        world.call_counts.clear()
+        planner = LegionUtils.RoutePlanner(max_leg=6)
+        grid = planner.grid
+        steps = LegionUtils.flood_steps(grid, (ox, oy), 30)
+        checked = 0
+        for _ in range(150):
+            goal = (ox + rng.randint(-18, 18), oy + rng.randint(-18, 18))
+            path = LegionUtils.find_path(grid, (ox, oy), goal)
+            if goal not in steps:
+                assert path is None, goal
+                continue
+            assert len(path) == steps[goal], (goal, len(path), steps[goal])
+            prev = (ox, oy)
+            for tile in path:
+                assert grid.can_step(prev[0], prev[1], tile[0] - prev[0], tile[1] - prev[1])
+                prev = tile
+            legs = planner.legs((ox, oy), path)
+            assert legs[-1] == goal and set(legs) <= set(path)
+            anchor = (ox, oy)
+            for leg in legs:
+                assert planner._direct(anchor, leg)
+                assert path.index(leg) - (path.index(anchor) if anchor in path else -1) <= 6
+                anchor = leg
+            checked += 1
+        assert checked > 50
+        chunks = len(set((x // 16, y // 16) for x, y in grid._walkable))
+        assert world.call_counts["GetStaticsInArea"] == chunks
+        # Land is only read where no impassable static already decided the tile
+        assert world.call_counts["GetTile"] == sum(1 for p in grid._walkable if p not in world.blocked)
+        reads = dict(world.call_counts)
+        for _ in range(20):
+            planner.route((ox, oy), (ox + rng.randint(-18, 18), oy + rng.randint(-18, 18)))
+        assert world.call_counts["GetTile"] == reads["GetTile"], "Cached tiles aren't read again"
+        assert planner.route((ox, oy), (ox, oy)) == []
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+    print("✓ " + str(checked) + " paths: shortest, straight legs, each tile read once")
+
+
+class OldPlanner:
+    """Stands in for the planner to get the pre-planner behaviour back"""
+
+    def patrol_points(self, *args, **kwargs):
+        return []
+
+    def patrol_loop(self, *args, **kwargs):
+        return []
+
+    def route(self, start, goal):
+        return [goal]
+
+    def escape_route(self, *args, **kwargs):
+        return None
+
+    def note_stuck(self, *args):
+        return None
+
+
+def _run_patrols(world, g, planner, area, count):
+    """Start count circle patrols and drive each to its end; returns outcome counts"""
+    patrol = g["PatrolSystem"](route_planner=planner)
+    outcomes = {}
+    for _ in range(count):
+        if not patrol.patrol_circle(area):
+            outcomes["failed"] = outcomes.get("failed", 0) + 1
+            continue
+        result = "patrolling"
+        for _ in range(200):
+            result = patrol.check_patrol_progress()
+            if result != "patrolling":
+                break
+            world.api.Pause(0.2)
+        outcomes[result] = outcomes.get(result, 0) + 1
+    return patrol, outcomes
+
+
+def test_2_patrol_reachable():
+    print("\n[Test 2] DungeonFarmer PatrolSystem")
+    world = SimWorld()
+    world.install()
+    try:
+        g = _load_script(world, "Utility/Util_DungeonFarmer.py")
+        px, py = world.player.X, world.player.Y
+        _box(world, px + 3, py - 4, px + 10, py + 4)       # sealed room on the east side
+        _wall(world, px - 6, py - 9, px - 6, py + 2)       # wall on the west side
+        area = g["FarmingArea"]("Crypt", "circle")
+        area.center_x, area.center_y, area.radius = px, py, 10
+        inside = lambda x, y: px + 3 < x < px + 10 and py - 4 < y < py + 4
+
+        random.seed(7)
+        start = world.clock.now
+        patrol, outcomes = _run_patrols(world, g, g["RoutePlanner"](), area, 15)
+        new_time = world.clock.now - start
+        points = patrol._get_patrol_points(area)
+        assert points and not any(inside(x, y) or (x, y) in world.blocked for x, y in points)
+        assert outcomes.get("stuck", 0) == 0 and outcomes.get("failed", 0) == 0, outcomes
+        targets = _pathfind_targets(world)
+        assert not any(inside(x, y) or (x, y) in world.blocked for x, y in targets)
+
+        world.player.X, world.player.Y = px, py
+        world.actions.clear()
+        random.seed(7)
+        start = world.clock.now
+        _, old_outcomes = _run_patrols(world, g, OldPlanner(), area, 15)
+        old_time = world.clock.now - start
+        wasted = old_outcomes.get("stuck", 0) + old_outcomes.get("failed", 0)
+        print("  new: {} in {:.0f}s, old: {} in {:.0f}s".format(outcomes, new_time, old_outcomes, old_time))
+        assert wasted > 0, old_outcomes
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+    print("✓ Every patrol target reachable, no stuck cycles")
+
+
+class StubThreatMap:
+    def is_position_safe(self, x, y):
+        return True
+
+    def scan_npcs(self, force_scan=False):
+        pass
+
+
+class StubAreaManager:
+    def __init__(self, area):
+        self.area = area
+
+    def get_current_area(self):
+        return self.area
+
+
+def _run_flee(world, g, old):
+    px, py = world.player.X, world.player.Y
+    spot = g["SafeSpot"](px + 12, py, escape_method="run_outside")
+    area = g["FarmingArea"]("Crypt", center_x=px, center_y=py, radius=15, safe_spots=[spot])
+    flee = g["FleeSystem"](StubAreaManager(area), StubThreatMap(), "Test_")
+    if old:
+        flee.route_planner = OldPlanner()
+    else:
+        flee.prepare_escape_routes(area)
+    start = world.clock.now
+    assert flee.initiate_flee("test", 80)
+    while flee.flee_to_safe_spot(spot):
+        world.api.Pause(0.25)
+    return flee, world.clock.now - start
+
+
+def test_3_flee_to_safe_spot():
+    print("\n[Test 3] PetFarmer FleeSystem")
+    times = {}
+    for old in (False, True):
+        world = SimWorld()
+        world.install()
+        try:
+            g = _load_script(world, "Tamer/Tamer_PetFarmer.py")
+            px, py = world.player.X, world.player.Y
+            _wall(world, px + 6, py - 10, px + 6, py + 4)    # the spot is behind a wall
+            random.seed(3)
+            world.actions.clear()
+            flee, elapsed = _run_flee(world, g, old)
+            times[old] = (elapsed, flee.flee_success, flee.flee_failures)
+            if not old:
+                assert flee.flee_success == 1 and flee.flee_failures == 0
+                targets = _pathfind_targets(world)
+                steps = g["RoutePlanner"]().escape_map("Crypt", (px + 12, py))
+                assert all(t in steps for t in targets), "Every leg is on the escape map"
+                assert flee.route_planner.get_stats()["stuck_marks"] == 0
+        finally:
+            world.uninstall()
+            sys.modules.pop("LegionUtils", None)
+    print("  planned: {:.1f}s, old: {:.1f}s (success/failure {}/{})".format(
+        times[False][0], times[True][0], times[True][1], times[True][2]))
+    assert times[False][0] < times[True][0]
+    print("✓ Around the wall without a stuck timeout")
+
+
+def _run_gather_flee(world, old):
+    sys.modules.pop("LegionUtils", None)
+    sys.modules.pop("GatherFramework", None)
+    import GatherFramework
+    px, py = world.player.X, world.player.Y
+    _wall(world, px + 3, py - 10, px + 3, py + 10)        # "away from the enemy" is a wall
+    enemy = world.add_mobile("Orc", notoriety=Notoriety.Enemy, x=px - 2, y=py)
+    combat = GatherFramework.CombatSystem()
+    if old:
+        combat.route_planner = None
+    random.seed(11)
+    start = world.clock.now
+    combat.flee_from_enemy(enemy, distance=15, timeout=15.0)
+    return world.clock.now - start, enemy.Distance
+
+
+def test_4_gather_flee():
+    print("\n[Test 4] GatherFramework flee_from_enemy")
+    results = {}
+    for old in (False, True):
+        world = SimWorld()
+        world.install()
+        try:
+            results[old] = _run_gather_flee(world, old)
+        finally:
+            world.uninstall()
+            sys.modules.pop("LegionUtils", None)
+            sys.modules.pop("GatherFramework", None)
+    print("  planned: {:.1f}s to distance {}, old: {:.1f}s to distance {}".format(
+        results[False][0], results[False][1], results[True][0], results[True][1]))
+    assert results[False][1] >= 8 and results[False][0] < 8.0
+    assert results[False][0] < results[True][0]
+    print("✓ Fled along the wall instead of into it")
+
+
+def run_all_tests():
+    """Run all test cases"""
+    print("=" * 60)
+    print("ROUTE PLANNER - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_1_planner()
+        test_2_patrol_reachable()
+        test_3_flee_to_safe_spot()
+        test_4_gather_flee()
+
+        print("\n" + "=" * 60)
+        print("ALL TESTS PASSED ✓")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ UNEXPECTED ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
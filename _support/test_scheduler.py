@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Test script for LegionUtils.Scheduler
+
+Tests:
+1. Periodic tasks run on their own intervals; the loop sleeps until the next one
+2. wake()/wake_at() bring a task forward but never postpone it
+3. API.Events wake a task in the same tick the callback is delivered
+4. Errors are reported without killing the task; cancel() and one-shots
+5. Slack lets bookkeeping tasks share wakeups with a fast task
+6. pause() runs due tasks while a blocking foreground loop waits
+7. Debug Console wakes less often under the scheduler
+"""
+
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "_support", "tools"))
+
+from LegionSim import SimWorld, run_script
+
+
+def _scheduler_world():
+    world = SimWorld()
+    api = world.install()
+    sys.modules.pop("LegionUtils", None)
+    import LegionUtils
+    return world, api, LegionUtils
+
+
+def _run_for(scheduler, seconds):
+    import time
+    end = time.time() + seconds
+    scheduler.run(until=lambda: time.time() >= end)
+
+
+def test_1_intervals():
+    print("\n[Test 1] Tasks run on their own intervals")
+    world, API, LegionUtils = _scheduler_world()
+    try:
+        runs = {"fast": 0, "slow": 0}
+        scheduler = LegionUtils.Scheduler(API, max_sleep=1.0)
+        scheduler.every(0.25, lambda: runs.__setitem__("fast", runs["fast"] + 1), "fast")
+        scheduler.every(1.0, lambda: runs.__setitem__("slow", runs["slow"] + 1), "slow")
+        _run_for(scheduler, 10.0)
+        assert 39 <= runs["fast"] <= 41, runs
+        assert 10 <= runs["slow"] <= 11, runs
+        # A 100ms polling loop would have paused 100 times
+        assert world.call_counts["Pause"] <= 45, world.call_counts["Pause"]
+        assert scheduler.get_stats()["max_late"] < 0.001
+    finally:
+        world.uninstall()
+    print("✓ 40 fast / 10 slow runs in " + str(world.call_counts["Pause"]) + " pauses, never late")
+
+
+def test_2_wake():
+    print("\n[Test 2] wake() only brings tasks forward")
+    world, API, LegionUtils = _scheduler_world()
+    try:
+        import time
+        ran_at = []
+        scheduler = LegionUtils.Scheduler(API, max_sleep=1.0)
+        task = scheduler.every(5.0, lambda: ran_at.append(time.time()), "slow", delay=5.0)
+        start = time.time()
+        scheduler.wake(task, 1.5)
+        scheduler.wake(task, 3.0)      # later than planned - ignored
+        _run_for(scheduler, 2.0)
+        assert len(ran_at) == 1 and abs(ran_at[0] - start - 1.5) < 0.001, ran_at
+
+        # Waking itself from its own callback takes effect after it returns
+        def heal():
+            if len(heal_runs) < 3:
+                scheduler.wake(heal_task, 0.3)
+            heal_runs.append(time.time())
+        heal_runs = []
+        heal_task = scheduler.every(10.0, heal, "heal")
+        _run_for(scheduler, 2.0)
+        gaps = [round(b - a, 3) for a, b in zip(heal_runs, heal_runs[1:])]
+        assert gaps[:3] == [0.3, 0.3, 0.3], gaps
+    finally:
+        world.uninstall()
+    print("✓ Woken at +1.5s; self-wake chains 0.3s apart")
+
+
+def test_3_events():
+    print("\n[Test 3] API.Events wake tasks")
+    world, API, LegionUtils = _scheduler_world()
+    try:
+        seen = []
+        heal_runs = []
+        scheduler = LegionUtils.Scheduler(API, max_sleep=0.1)
+        heal_task = scheduler.every(5.0, lambda: heal_runs.append(world.clock.now), "heal", delay=5.0)
+        assert scheduler.wake_on("OnPlayerHitsChanged", heal_task)
+        assert scheduler.on("OnPlayerHitsChanged", seen.append)
+        assert not scheduler.on("OnNoSuchEvent", seen.append)
+        _run_for(scheduler, 1.0)
+        world.fire_event("OnPlayerHitsChanged", 42)
+        fired_at = world.clock.now
+        _run_for(scheduler, 1.0)
+        assert seen == [42]
+        assert len(heal_runs) == 1 and heal_runs[0] - fired_at <= 0.1 + 1e-9, (heal_runs, fired_at)
+        assert world.call_counts["Events.OnPlayerHitsChanged"] == 1, "One subscription per event"
+        assert scheduler.get_stats()["events"] == 1
+    finally:
+        world.uninstall()
+    print("✓ Heal task ran within one tick of the event")
+
+
+def test_4_errors_and_cancel():
+    print("\n[Test 4] Errors, cancel and one-shots")
+    world, API, LegionUtils = _scheduler_world()
+    try:
+        errors = []
+        runs = []
+
+        def broken():
+            runs.append("broken")
+            raise ValueError("boom")
+
+        scheduler = LegionUtils.Scheduler(API, on_error=lambda task, e: errors.append((task.name, str(e))))
+        scheduler.every(0.5, broken)
+        once = scheduler.after(0.2, lambda: runs.append("once"), "once")
+        cancelled = scheduler.every(0.1, lambda: runs.append("cancelled"), "cancelled", delay=0.1)
+        scheduler.cancel(cancelled)
+        _run_for(scheduler, 2.0)
+        assert runs.count("broken") == 4 and runs.count("once") == 1, runs
+        assert "cancelled" not in runs
+        assert errors[0] == ("broken", "boom") and len(errors) == 4
+        assert once.cancelled and once.runs == 1
+        assert list(scheduler.get_stats()["tasks"].keys()) == ["broken"]
+    finally:
+        world.uninstall()
+    print("✓ Failing task kept its schedule; one-shot ran once")
+
+
+def test_5_slack():
+    print("\n[Test 5] Slack coalesces wakeups")
+    world, API, LegionUtils = _scheduler_world()
+    try:
+        scheduler = LegionUtils.Scheduler(API, max_sleep=1.0)
+        scheduler.every(0.1, lambda: None, "heal")
+        scheduler.every(0.3, lambda: None, "display", delay=0.05, slack=0.1)
+        scheduler.every(2.0, lambda: None, "sync", delay=0.07, slack=0.1)
+        _run_for(scheduler, 6.0)
+        stats = scheduler.get_stats()
+        assert world.call_counts["Pause"] <= 62, world.call_counts["Pause"]
+        assert stats["tasks"]["display"] >= 15 and stats["tasks"]["sync"] >= 2, stats["tasks"]
+    finally:
+        world.uninstall()
+    print("✓ " + str(world.call_counts["Pause"]) + " pauses for three tasks (heal grid alone = 60)")
+
+
+def test_6_foreground_pause():
+    print("\n[Test 6] pause() runs background tasks")
+    world, API, LegionUtils = _scheduler_world()
+    try:
+        import time
+        display_runs = []
+        scheduler = LegionUtils.Scheduler(API)
+        scheduler.every(0.5, lambda: display_runs.append(time.time()), "display")
+        start = time.time()
+        for _ in range(20):
+            scheduler.pause(0.1)    # foreground loop, e.g. a gathering state machine
+        assert abs(time.time() - start - 2.0) < 0.001
+        assert len(display_runs) == 4, display_runs
+        assert world.call_counts["Pause"] <= 24, "At most one extra wakeup per task run"
+    finally:
+        world.uninstall()
+    print("✓ Display ran 4 times during 20 foreground pauses")
+
+
+def test_7_debug_console():
+    print("\n[Test 7] Debug Console under the scheduler")
+    world = SimWorld()
+    report = run_script("Utility/Util_DebugConsole.py", world, seconds=60)
+    assert not report.error, report.error
+    assert report.stopped_by == "StopRequested"
+    assert report.ticks < 450, "Expected fewer wakeups than a 100ms loop (600)"
+    print("✓ " + str(report.ticks) + " wakeups in 60s")
+
+
+def run_all_tests():
+    """Run all test cases"""
+    print("=" * 60)
+    print("SCHEDULER - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_1_intervals()
+        test_2_wake()
+        test_3_events()
+        test_4_errors_and_cancel()
+        test_5_slack()
+        test_6_foreground_pause()
+        test_7_debug_console()
+
+        print("\n" + "=" * 60)
+        print("ALL TESTS PASSED ✓")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ UNEXPECTED ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Test script for LegionUtils.SettingsStore
+
+Tests:
+1. set() is memory-only until flush; flush writes one JSON blob
+2. update() flushes on the interval and immediately on StopRequested
+3. Unchanged values are not marked dirty; writes avoided are counted
+4. Legacy per-key persistent vars are migrated into the blob
+5. install() routes save_*/load_* helpers through the store
+6. Tamer_Suite settings survive a restart via the blob
+7. DungeonFarmer config clicks are written at once (the script has no loop)
+"""
+
+import sys
+import os
+import json
+import runpy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "_support", "tools"))
+
+from LegionSim import SimWorld, run_script, default_tamer_world
+
+
+def _store_world():
+    world = SimWorld()
+    api = world.install()
+    sys.modules.pop("LegionUtils", None)
+    import LegionUtils
+    return world, api, LegionUtils
+
+
+def test_1_coalesced_flush():
+    print("\n[Test 1] Writes coalesced into one blob")
+    world, API, LegionUtils = _store_world()
+    try:
+        store = LegionUtils.SettingsStore("Test", API)
+        for i, key in enumerate(["Gold", "Kills", "Deaths", "PetDeaths"]):
+            store.set(key, str(i))
+        assert world.call_counts.get("SavePersistentVar", 0) == 0, "set() must not write"
+        assert store.flush()
+        assert world.call_counts["SavePersistentVar"] == 1
+        blob = json.loads(world.persistent["Test_Settings"])
+        assert blob == {"Gold": "0", "Kills": "1", "Deaths": "2", "PetDeaths": "3"}
+        assert not store.flush(), "Nothing dirty - no second write"
+    finally:
+        world.uninstall()
+    print("✓ 4 keys, 1 SavePersistentVar")
+
+
+def test_2_interval_and_stop():
+    print("\n[Test 2] update() interval and StopRequested")
+    world, API, LegionUtils = _store_world()
+    try:
+        store = LegionUtils.SettingsStore("Test", API, flush_interval=5.0)
+        store.set("A", "1")
+        assert not store.update(), "Interval not reached"
+        API.Pause(5.0)
+        assert store.update()
+        store.set("A", "2")
+        world.stop_requested = True
+        assert store.update(), "StopRequested flushes immediately"
+        assert json.loads(world.persistent["Test_Settings"])["A"] == "2"
+    finally:
+        world.uninstall()
+    print("✓ Flushed after 5s and on stop")
+
+
+def test_3_writes_avoided():
+    print("\n[Test 3] Writes avoided")
+    world, API, LegionUtils = _store_world()
+    try:
+        store = LegionUtils.SettingsStore("Test", API)
+        for kills in range(100):
+            store.set("Kills", str(kills))
+            store.set("Gold", "500")
+        store.flush()
+        stats = store.get_stats()
+        assert stats["sets"] == 200 and stats["writes"] == 1
+        assert stats["writes_avoided"] == 199
+        store.set("Gold", "500")
+        assert not store.is_dirty(), "Same value should not dirty the store"
+    finally:
+        world.uninstall()
+    print("✓ 200 saves, 1 write, 199 avoided")
+
+
+def test_4_legacy_migration():
+    print("\n[Test 4] Legacy keys migrate into the blob")
+    world, API, LegionUtils = _store_world()
+    try:
+        world.persistent["Test_UseMagery"] = "True"
+        store = LegionUtils.SettingsStore("Test", API)
+        assert store.get("Test_UseMagery", "False") == "True"
+        assert store.get("Test_Missing", "default") == "default"
+        store.flush()
+        assert json.loads(world.persistent["Test_Settings"]) == {"Test_UseMagery": "True"}
+        reloaded = LegionUtils.SettingsStore("Test", API)
+        assert reloaded.values == {"Test_UseMagery": "True"}
+    finally:
+        world.uninstall()
+    print("✓ Old per-key value read once and kept in the blob")
+
+
+def test_5_helpers_route_through_store():
+    print("\n[Test 5] save_*/load_* helpers use the installed store")
+    world, API, LegionUtils = _store_world()
+    try:
+        store = LegionUtils.SettingsStore("Test", API).install()
+        LegionUtils.save_bool("Flag", False)
+        LegionUtils.save_int("Count", 7)
+        LegionUtils.save_list("Items", [1, 2, 3])
+        assert world.call_counts.get("SavePersistentVar", 0) == 0
+        assert LegionUtils.load_bool("Flag") is False
+        assert LegionUtils.load_int("Count") == 7
+        assert LegionUtils.load_list("Items") == ["1", "2", "3"]
+        LegionUtils.save_int("Account", 1, scope=API.PersistentVar.Account)
+        assert world.call_counts["SavePersistentVar"] == 1, "Explicit scopes bypass the store"
+        store.close()
+        assert world.call_counts["SavePersistentVar"] == 2
+        LegionUtils.save_int("After", 1)
+        assert world.call_counts["SavePersistentVar"] == 3, "close() stops routing"
+    finally:
+        world.uninstall()
+    print("✓ Helpers buffered until close()")
+
+
+def test_6_tamer_suite_restart():
+    print("\n[Test 6] Tamer_Suite settings persist across runs")
+    world = default_tamer_world()
+    world.persistent["TamerSuite_UseMagery"] = "True"   # saved by an older version
+    report = run_script("Tamer/Tamer_Suite.py", world, seconds=30)
+    assert not report.error, report.error
+    blob = json.loads(world.persistent["TamerSuite_Settings"])
+    assert blob["TamerSuite_UseMagery"] == "True", "Legacy value migrated and flushed on stop"
+    del world.persistent["TamerSuite_UseMagery"]
+    world.stop_requested = False
+    saves = world.call_counts.get("SavePersistentVar", 0)
+    report = run_script("Tamer/Tamer_Suite.py", world, seconds=30)
+    assert not report.error, report.error
+    assert world.call_counts.get("SavePersistentVar", 0) == saves, "Nothing changed - nothing written"
+    assert json.loads(world.persistent["TamerSuite_Settings"])["TamerSuite_UseMagery"] == "True"
+    print("✓ " + str(len(blob)) + " setting(s) in one blob, reloaded on restart")
+
+
+def test_7_dungeon_farmer_writes_at_once():
+    print("\n[Test 7] DungeonFarmer config saves")
+    world = SimWorld()
+    world.install()
+    try:
+        world.deadline = world.clock.now
+        sys.modules.pop("LegionUtils", None)
+        ns = runpy.run_path(os.path.join(ROOT, "Utility", "Util_DungeonFarmer.py"), run_name="__main__")
+        world.deadline = None
+        g = ns["save_setting"].__globals__
+        g["save_setting"]("DungeonFarmer_RunebookSerial", "12345")
+        blob = json.loads(world.persistent["DungeonFarmer_Settings"])
+        assert blob["DungeonFarmer_RunebookSerial"] == "12345", "Written without a flush call"
+        sys.modules.pop("LegionUtils", None)
+        import LegionUtils
+        assert LegionUtils.SettingsStore("DungeonFarmer").get("DungeonFarmer_RunebookSerial", "0") == "12345"
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+    print("✓ Runebook serial in the blob right after the click")
+
+
+def run_all_tests():
+    """Run all test cases"""
+    print("=" * 60)
+    print("SETTINGS STORE - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_1_coalesced_flush()
+        test_2_interval_and_stop()
+        test_3_writes_avoided()
+        test_4_legacy_migration()
+        test_5_helpers_route_through_store()
+        test_6_tamer_suite_restart()
+        test_7_dungeon_farmer_writes_at_once()
+
+        print("\n" + "=" * 60)
+        print("ALL TESTS PASSED ✓")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ UNEXPECTED ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
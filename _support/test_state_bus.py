@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Test script for LegionUtils.StateBus and the shared pet/combat helpers
+
+Tests:
+1. publish() stores (version, value) and versions only increase
+2. get_shared_pets() rebuilds only when the bus version changes
+3. Persistent var fallback (parsed once per distinct string) before anything is published
+4. set_combat_state() writes only when the flag changes
+5. GatherFramework.PetSystem preflight reads the pet list once
+6. Tamer_Suite publishes its pets and CottonSuite-style readers see them
+"""
+
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "_support", "tools"))
+
+from LegionSim import SimWorld, run_script, default_tamer_world
+
+
+def _bus_world():
+    world = SimWorld()
+    api = world.install()
+    sys.modules.pop("LegionUtils", None)
+    import LegionUtils
+    return world, api, LegionUtils
+
+
+def test_1_versions():
+    print("\n[Test 1] Versions increase on publish")
+    world, API, LegionUtils = _bus_world()
+    try:
+        bus = LegionUtils.StateBus(API)
+        assert bus.version("pets") == 0 and bus.read("pets") is None
+        assert bus.publish("pets", ("a",)) == 1
+        assert bus.publish("pets", ("b",)) == 2
+        assert bus.get_entry("pets") == (2, ("b",))
+        assert bus.changed("pets", 1) and not bus.changed("pets", 2)
+        other = LegionUtils.StateBus(API)   # another script sees the same state
+        assert other.read("pets") == ("b",)
+        bus.clear("pets")
+        assert other.version("pets") == 0
+    finally:
+        world.uninstall()
+    print("✓ Version 1 -> 2, visible to a second bus instance")
+
+
+def test_2_pets_rebuilt_on_version_change():
+    print("\n[Test 2] Shared pets rebuilt only on version change")
+    world, API, LegionUtils = _bus_world()
+    try:
+        LegionUtils.save_shared_pets({0x100: {"name": "Dragon", "active": True},
+                                      0x200: {"name": "Hiryu", "active": False}})
+        reads_before = world.call_counts.get("GetPersistentVar", 0)
+        for _ in range(50):
+            pets = LegionUtils.get_shared_pets()
+        assert pets == {0x100: {"name": "Dragon", "active": True},
+                        0x200: {"name": "Hiryu", "active": False}}
+        assert world.call_counts.get("GetPersistentVar", 0) == reads_before, "Bus reads skip persistence"
+        assert world.persistent["SharedPets_List"] == "Dragon:256:1|Hiryu:512:0", "Durable copy still written"
+        LegionUtils.save_shared_pets({0x100: {"name": "Dragon", "active": True}})
+        assert list(LegionUtils.get_shared_pets().keys()) == [0x100]
+        assert LegionUtils.get_shared_pets_version() == 2
+    finally:
+        world.uninstall()
+    print("✓ 50 reads, 0 persistent reads, change picked up")
+
+
+def test_3_persistent_fallback():
+    print("\n[Test 3] Persistent fallback before first publish")
+    world, API, LegionUtils = _bus_world()
+    try:
+        world.persistent["SharedPets_List"] = "Dragon:256:1|bad|Hiryu:x:1"
+        assert LegionUtils.get_shared_pets() == {256: {"name": "Dragon", "active": True}}
+        assert LegionUtils.get_shared_pets_version() == 0
+        world.persistent["SharedCombat_Active"] = "True"
+        assert LegionUtils.is_in_combat()
+    finally:
+        world.uninstall()
+    print("✓ Old string format still read; invalid entries skipped")
+
+
+def test_4_combat_writes_on_change():
+    print("\n[Test 4] Combat flag writes only on change")
+    world, API, LegionUtils = _bus_world()
+    try:
+        for _ in range(20):
+            LegionUtils.set_combat_state(True)
+        assert LegionUtils.is_in_combat()
+        LegionUtils.set_combat_state(False)
+        assert not LegionUtils.is_in_combat()
+        assert world.call_counts["SavePersistentVar"] == 2
+        assert world.persistent["SharedCombat_Active"] == "False"
+    finally:
+        world.uninstall()
+    print("✓ 21 calls, 2 writes")
+
+
+def test_5_pet_system_preflight():
+    print("\n[Test 5] PetSystem.preflight_check")
+    world, API, LegionUtils = _bus_world()
+    try:
+        sys.modules.pop("GatherFramework", None)
+        import GatherFramework
+        dragon = world.add_pet("Dragon", 100)
+        hiryu = world.add_pet("Hiryu", 100)
+        pets = GatherFramework.PetSystem()
+        assert pets.preflight_check() == "ok"
+        world.damage(dragon, 50)
+        assert pets.preflight_check() == "needs_healing"
+        world.damage(hiryu, 100)
+        assert pets.preflight_check() == "dead_pets"
+        assert [m.Serial for m in pets.get_dead_pets()] == [hiryu.Serial]
+        before = world.call_counts["FindMobile"]
+        pets.preflight_check()
+        assert world.call_counts["FindMobile"] - before == 2, "One lookup per pet"
+    finally:
+        sys.modules.pop("GatherFramework", None)
+        world.uninstall()
+    print("✓ ok / needs_healing / dead_pets, one lookup per pet")
+
+
+def test_6_tamer_suite_publishes():
+    print("\n[Test 6] Tamer_Suite seeds the bus")
+    world = default_tamer_world()
+    report = run_script("Tamer/Tamer_Suite.py", world, seconds=30)
+    assert not report.error, report.error
+    entry = world.shared_vars.get("LegionBus_pets")
+    assert entry is not None, "Suite should publish the pet list"
+    assert [name for name, serial, active in entry[1]] == ["Dragon", "Nightmare", "Hiryu"]
+    assert world.call_counts.get("GetPersistentVar", 0) < 60, "Pet sync should not poll persistence"
+    print("✓ Pets published as version " + str(entry[0]))
+
+
+def run_all_tests():
+    """Run all test cases"""
+    print("=" * 60)
+    print("STATE BUS - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_1_versions()
+        test_2_pets_rebuilt_on_version_change()
+        test_3_persistent_fallback()
+        test_4_combat_writes_on_change()
+        test_5_pet_system_preflight()
+        test_6_tamer_suite_publishes()
+
+        print("\n" + "=" * 60)
+        print("ALL TESTS PASSED ✓")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ UNEXPECTED ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
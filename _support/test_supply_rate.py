@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Test script for LegionUtils.ConsumptionRate and PetFarmer's SupplyTracker
+
+Tests:
+1. The rate tracks steady use, ignores restocks and fades when use stops
+2. The ring buffer keeps the newest samples and skips repeated counts
+3. SupplyTracker appends new samples to old-format saves, compacting rarely
+4. Every-tick banking checks are answered without rescanning the backpack
+"""
+
+import sys
+import os
+import runpy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "_support", "tools"))
+
+from LegionSim import SimWorld, BANDAGE_GRAPHIC
+
+
+def _load_script(world, path):
+    """Run a script's top level under the simulator and return its globals"""
+    world.deadline = world.clock.now     # main loops exit at once
+    sys.modules.pop("LegionUtils", None)
+    ns = runpy.run_path(os.path.join(ROOT, path), run_name="__main__")
+    world.deadline = None
+    # run_path returns a copy - the functions read the real globals
+    for value in ns.values():
+        if hasattr(value, "__globals__") and value.__module__ == "__main__":
+            return value.__globals__
+    return ns
+
+
+def test_1_rate_estimate():
+    print("\n[Test 1] ConsumptionRate estimate")
+    sys.modules.pop("LegionUtils", None)
+    import LegionUtils
+    usage = LegionUtils.ConsumptionRate(half_life=1800.0)
+    assert usage.rate(0) == 0 and usage.last_count is None
+
+    # 120 bandages an hour, sampled every 30s
+    count = 500
+    for step in range(121):
+        usage.add(count, step * 30.0)
+        count -= 1
+    assert abs(usage.rate(3600.0) - 120) < 0.5, usage.rate(3600.0)
+
+    # Restock: baseline moves, rate unchanged
+    before = usage.rate(3600.0)
+    assert usage.add(1000, 3630.0)
+    assert abs(usage.rate(3630.0) - before) < 1e-9
+
+    # Use doubles: the estimate follows within a couple of half lives
+    count = 1000
+    for step in range(1, 241):
+        count -= 2
+        usage.add(count, 3630.0 + step * 30.0)
+    now = 3630.0 + 240 * 30.0
+    assert 200 < usage.rate(now) <= 240, usage.rate(now)
+
+    # Use stops: fades toward 0 with no new samples
+    assert usage.rate(now + 1800.0) < usage.rate(now) * 0.6
+    assert usage.rate(now + 6 * 3600.0) < 5
+
+    # Needs a minute of observed use
+    short = LegionUtils.ConsumptionRate()
+    short.add(10, 0.0)
+    short.add(5, 30.0)
+    assert short.rate(30.0) == 0
+    short.add(4, 60.0)
+    assert short.rate(60.0) > 0
+    sys.modules.pop("LegionUtils", None)
+    print("✓ Steady 120/h, restock ignored, 240/h followed, idle fades")
+
+
+def test_2_ring_buffer():
+    print("\n[Test 2] Sample ring buffer")
+    sys.modules.pop("LegionUtils", None)
+    import LegionUtils
+    usage = LegionUtils.ConsumptionRate(capacity=5)
+    assert usage.add(10, 1.0) and not usage.add(10, 2.0), "Repeat count skipped"
+    for i in range(1, 9):
+        usage.add(10 - i, 1.0 + i)
+    assert len(usage) == 5
+    assert usage.samples() == [(5.0, 6), (6.0, 5), (7.0, 4), (8.0, 3), (9.0, 2)]
+    assert usage.last_count == 2 and usage.last_time == 9.0
+    usage.clear()
+    assert len(usage) == 0 and usage.samples() == [] and usage.rate(10.0) == 0
+    sys.modules.pop("LegionUtils", None)
+    print("✓ Newest 5 of 9 samples kept in order")
+
+
+def _use_bandages(world, tracker, stack, minutes, per_minute):
+    """Drop the stack by per_minute each minute, checking every tick"""
+    for _ in range(minutes * 60):
+        world.api.Pause(1.0)
+        if int(world.clock.now) % 60 == 0:
+            stack.Amount -= per_minute
+        tracker.update_counts()
+
+
+def test_3_delta_persistence():
+    print("\n[Test 3] SupplyTracker persistence")
+    world = SimWorld()
+    world.install()
+    try:
+        g = _load_script(world, "Tamer/Tamer_PetFarmer.py")
+        prefix = g["KEY_PREFIX"]
+        key = prefix + "Supply_bandages_History"
+        now = world.clock.now
+        old = [(now - 90000, 900), (now - 600, 320), (now - 300, 310)]
+        world.persistent[key] = "|".join("{}:{}".format(t, c) for t, c in old)
+        stack = world.add_item(BANDAGE_GRAPHIC, 300, name="bandage")
+
+        tracker = g["SupplyTracker"](prefix)
+        usage = tracker.supplies['bandages']['usage']
+        assert usage.samples() == [(old[1][0], 320), (old[2][0], 310)], "Day-old sample dropped"
+
+        saves = []
+        original = world.api.SavePersistentVar
+        world.api.SavePersistentVar = lambda name, value, scope=None: (saves.append((name, value)),
+                                                                       original(name, value))
+        _use_bandages(world, tracker, stack, 20, 2)
+        kits = [value for name, value in saves if name != key]
+        assert len(kits) == 1 and kits[0].endswith(":0"), "Vet kits: first count only"
+        saves = [save for save in saves if save[0] == key]
+        for (_, before), (_, after) in zip(saves, saves[1:]):
+            assert after.startswith(before + "|"), "Each write appends to the last"
+        assert saves[0][1].startswith(world.persistent[key][:20])
+        assert len(saves) <= 21
+
+        # Past twice the ring size the string is rebuilt from the ring buffer
+        tracker.HISTORY_SIZE = 10
+        _use_bandages(world, tracker, stack, 3, 1)
+        assert world.persistent[key].count("|") + 1 <= len(usage)
+        stack.Amount -= 5
+        tracker.track_usage('bandages')
+        tracker.flush()
+        assert world.persistent[key].endswith(":" + str(stack.Amount))
+
+        reloaded = g["SupplyTracker"](prefix)
+        assert reloaded.supplies['bandages']['usage'].last_count == stack.Amount
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+    print("✓ Old saves load, writes only append, compaction keeps the ring")
+
+
+def test_4_cheap_queries():
+    print("\n[Test 4] Banking checks every tick")
+    world = SimWorld()
+    world.install()
+    try:
+        g = _load_script(world, "Tamer/Tamer_PetFarmer.py")
+        stack = world.add_item(BANDAGE_GRAPHIC, 400, name="bandage")
+        tracker = g["SupplyTracker"](g["KEY_PREFIX"])
+        _use_bandages(world, tracker, stack, 30, 8)
+
+        status = tracker.get_supply_status()['bandages']
+        assert status['count'] == stack.Amount and abs(status['rate'] - 480) < 48, status
+        assert abs(status['hours_remaining'] - stack.Amount / status['rate']) < 1e-6
+        assert status['status'] == "critical"
+        assert tracker.should_prioritize_restock()
+        assert tracker.optimize_bank_timing(9000, 10000, 50)
+
+        scans_before = world.call_counts.get("ItemsInContainer", 0)
+        for _ in range(1000):
+            tracker.get_supply_status()
+            tracker.should_prioritize_restock()
+            tracker.optimize_bank_timing(1000, 10000, 50)
+        assert world.call_counts.get("ItemsInContainer", 0) - scans_before <= 1, "Answered from the cached map"
+    finally:
+        world.uninstall()
+        sys.modules.pop("LegionUtils", None)
+    print("✓ 480/h estimated; 1000 rounds of checks, no backpack rescans")
+
+
+def run_all_tests():
+    """Run all test cases"""
+    print("=" * 60)
+    print("SUPPLY TRACKER - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_1_rate_estimate()
+        test_2_ring_buffer()
+        test_3_delta_persistence()
+        test_4_cheap_queries()
+
+        print("\n" + "=" * 60)
+        print("ALL TESTS PASSED ✓")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ UNEXPECTED ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,477 @@
+# ============================================================
+# LegionReplay - Offline Replay of Recorded API Traces
+# by Coryigon for UO Unchained
+# Version: 1.0
+# ============================================================
+#
+# Feeds a trace written by LegionUtils.TraceRecorder back through a
+# stand-in `API` module and reruns the script against it. Every read
+# returns what the client returned at that point of the session, hotkeys,
+# API.Events and button clicks fire where they fired, and time.time()
+# follows the recorded clock - so a 2 hour session replays in seconds.
+#
+# Usage (command line):
+#   python _support/tools/LegionReplay.py logs/trace_Tamer_PetFarmer_<time>.jsonl.gz Tamer/Tamer_PetFarmer.py
+#   python _support/tools/LegionReplay.py <trace> <script> --profile
+#
+# Usage (from a test or benchmark):
+#   from LegionReplay import replay_script
+#
+#   report = replay_script(trace_path, "Tamer/Tamer_PetFarmer.py")
+#   print(report.format())
+#   report.divergence        # None if the same actions were issued
+#
+# What the report gives:
+#   - Decision latency: wall time the script spent per tick (p50/p95/max)
+#   - Actions issued vs recorded (UseObject, Pathfind, Msg, ...) and the
+#     first point where they differ - run an edited script on an old trace
+#     to see where its danger/heal decisions change
+#   - Optional cProfile of the whole run (state handlers included)
+#
+# A call the trace has no answer for at that tick (a newer script asking
+# something different) gets the nearest recorded answer for the same call
+# and arguments, else None, and is counted as a miss.
+#
+# ============================================================
+
+import builtins
+import json
+import os
+import random
+import runpy
+import sys
+import time
+from collections import deque
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from LegionUtils.trace import TraceRecorder, read_trace, encode_value, decode_value
+from LegionUtils.formatting import percentile
+
+# Calls compared between the recorded session and the replay
+ACTIONS = (
+    "UseObject", "UseType", "Pathfind", "PathfindEntity", "CancelPathfinding",
+    "PreTarget", "CancelPreTarget", "Target", "TargetSelf", "CancelTarget",
+    "CastSpell", "BandageSelf", "Msg", "Say", "Attack", "UseSkill",
+    "QueueMoveItem", "MoveItem", "ReplyGump", "CloseGump",
+)
+
+# Calls that also set API.Found to the result's serial
+FOUND_SETTERS = ("FindType",)
+
+# Pauses allowed after the trace ends before the script is stopped by force
+OVERRUN_TICKS = 50
+
+_real_perf_counter = time.perf_counter
+
+
+class ReplayStop(BaseException):
+    """Raised from API.Pause when a script keeps running past the trace"""
+
+
+class _Inert:
+    """Script gump handle in a replay - every attribute and call is a no-op"""
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return self
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def __bool__(self):
+        return True
+
+    def __iter__(self):
+        return iter(())
+
+    def __str__(self):
+        return ""
+
+
+_INERT = _Inert()
+
+
+class _Constants:
+    def __init__(self, members):
+        self.__dict__.update(members)
+
+
+class _ReplayNamespace:
+    """API.Mobiles/API.Gumps/... inside a replay"""
+
+    def __init__(self, api, prefix):
+        self._api = api
+        self._prefix = prefix
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        func = self._api._make_function(self._prefix + name)
+        setattr(self, name, func)
+        return func
+
+
+def _key(label, args, kwargs):
+    return label + json.dumps([args, kwargs or {}], sort_keys=True, separators=(",", ":"))
+
+
+# ============ REPLAY API ============
+class ReplayAPI:
+    """Object installed as the `API` module during a replay
+
+    Answers each call from the current tick of the trace; API.Pause moves
+    to the next tick. Unknown names resolve to replayed functions too.
+    """
+
+    def __init__(self, header, ticks, overrun_ticks=OVERRUN_TICKS):
+        self.header = header
+        self.ticks = ticks
+        self.overrun_ticks = overrun_ticks
+        for name, members in header.get("constants", {}).items():
+            setattr(self, name, _Constants(members))
+        for ns in ("Mobiles", "Gumps", "Events", "InGameJournal"):
+            setattr(self, ns, _ReplayNamespace(self, ns + "."))
+        self.Found = 0
+        self.now = header.get("start", 0.0)
+
+        self.tick_index = -1
+        self.calls = []             # (tick, label, args) for every logged call made
+        self.misses = 0             # Calls answered from another tick (or None)
+        self.callbacks_fired = 0
+        self.callback_misses = 0    # Recorded callbacks the replay never registered
+        self.tick_times = []        # Wall seconds the script spent in each tick
+        self._callbacks = {}        # id -> callable
+        self._next_callback = 0
+        self._first = {}            # call key -> first recorded result
+        self._latest = {}           # call key -> latest result up to this tick
+        self._pending = {}          # call key -> deque of this tick's results
+        self._segments = []         # this tick's callbacks, split at ProcessCallbacks
+        self._segment = 0
+        self._ambient = {}
+        self._decoded = {}
+        self._overrun = 0
+        for tick in ticks:
+            for entry in tick[2]:
+                if entry[0] != "!":
+                    key = _key(entry[0], entry[1], entry[3] if len(entry) > 3 else None)
+                    if key not in self._first:
+                        self._first[key] = entry[2] if len(entry) > 2 else None
+        self._load_tick(0)
+        self._tick_start = _real_perf_counter()
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        func = self._make_function(name)
+        setattr(self, name, func)
+        return func
+
+    # ---------- properties ----------
+    @property
+    def Player(self):
+        return self._ambient_value("Player")
+
+    @property
+    def Backpack(self):
+        return self._ambient_value("Backpack")
+
+    @property
+    def StopRequested(self):
+        return self._overrun > 0 or bool(self._ambient.get("StopRequested"))
+
+    # ---------- core ----------
+    def Pause(self, seconds=0):
+        self.tick_times.append(_real_perf_counter() - self._tick_start)
+        self._fire_segments(len(self._segments))
+        self._load_tick(self.tick_index + 1)
+        self._tick_start = _real_perf_counter()
+
+    def ProcessCallbacks(self):
+        self._call("ProcessCallbacks", False, (), {})
+        if self._segment < len(self._segments) - 1:
+            self._fire_segments(self._segment + 1)
+
+    def finish(self):
+        """Close the last tick when the script returns"""
+        self.tick_times.append(_real_perf_counter() - self._tick_start)
+
+    # ---------- internals ----------
+    def _ambient_value(self, name):
+        if name not in self._decoded:
+            self._decoded[name] = decode_value(self._ambient.get(name))
+        return self._decoded[name]
+
+    def _make_function(self, label):
+        quiet = TraceRecorder.is_quiet(label)
+        api = self
+
+        def replayed(*args, **kwargs):
+            return api._call(label, quiet, args, kwargs)
+        replayed.__name__ = label.split(".")[-1]
+        return replayed
+
+    def _encode_arg(self, value):
+        if callable(value) and not isinstance(value, type):
+            self._next_callback += 1
+            self._callbacks[self._next_callback] = value
+            return TraceRecorder.CALLBACK_PREFIX + str(self._next_callback)
+        return encode_value(value)
+
+    def _call(self, label, quiet, args, kwargs):
+        args = [self._encode_arg(a) for a in args]
+        kwargs = dict((k, self._encode_arg(v)) for k, v in kwargs.items())
+        if quiet:
+            return _INERT
+        self.calls.append((self.tick_index, label, args))
+        key = _key(label, args, kwargs)
+        queue = self._pending.get(key)
+        if queue:
+            result = queue.popleft()
+        else:
+            self.misses += 1
+            result = self._latest.get(key, self._first.get(key))
+        if isinstance(result, str) and result.startswith(TraceRecorder.RAISE_PREFIX):
+            raise Exception(result[len(TraceRecorder.RAISE_PREFIX):])
+        value = decode_value(result)
+        if label in FOUND_SETTERS:
+            self.Found = getattr(value, "Serial", 0) if value else 0
+        return value
+
+    def _load_tick(self, index):
+        self._pending = {}
+        self._segments = []
+        self._segment = 0
+        if index >= len(self.ticks):
+            self._overrun += 1
+            if self._overrun > self.overrun_ticks:
+                raise ReplayStop()
+            return
+        self.tick_index = index
+        start, ambient, entries = self.ticks[index]
+        self.now = start
+        if ambient:
+            self._ambient.update(ambient)
+            self._decoded = {}
+        segments = [[]]
+        for entry in entries:
+            if entry[0] == "!":
+                segments[-1].append(entry)
+                continue
+            key = _key(entry[0], entry[1], entry[3] if len(entry) > 3 else None)
+            result = entry[2] if len(entry) > 2 else None
+            self._pending.setdefault(key, deque()).append(result)
+            self._latest[key] = result
+            if entry[0] == "ProcessCallbacks":
+                segments.append([])
+        self._segments = segments
+
+    def _fire_segments(self, end):
+        """Fire the recorded callbacks of every segment before end"""
+        while self._segment < min(end, len(self._segments)):
+            segment = self._segments[self._segment]
+            self._segment += 1
+            for _, callback_id, args in segment:
+                callback = self._callbacks.get(callback_id)
+                if callback is None:
+                    self.callback_misses += 1
+                    continue
+                self.callbacks_fired += 1
+                callback(*decode_value(args))
+
+
+# ============ REPORT ============
+def recorded_actions(ticks):
+    """Actions in a trace as [(tick, label, args)]"""
+    return [(i, entry[0], entry[1]) for i, tick in enumerate(ticks)
+            for entry in tick[2] if entry[0] in ACTIONS]
+
+
+def compare_actions(recorded, replayed):
+    """Compare two action lists ([(tick, label, args)]) in order
+
+    Returns:
+        dict: matched (length of the common prefix), recorded, replayed,
+            first_divergence (None, or (index, recorded item, replayed item))
+    """
+    matched = 0
+    for old, new in zip(recorded, replayed):
+        if old[1:] != new[1:]:
+            break
+        matched += 1
+    divergence = None
+    if matched < max(len(recorded), len(replayed)):
+        old = recorded[matched] if matched < len(recorded) else None
+        new = replayed[matched] if matched < len(replayed) else None
+        divergence = (matched, old, new)
+    return {"matched": matched, "recorded": len(recorded), "replayed": len(replayed),
+            "first_divergence": divergence}
+
+
+class ReplayReport:
+    """Summary of one replay"""
+
+    def __init__(self, api, wall_seconds, stopped_by, error=None, profile_text=""):
+        ticks = api.ticks
+        self.script = api.header.get("script", "")
+        self.recorded_ticks = len(ticks)
+        self.recorded_seconds = ticks[-1][0] - ticks[0][0] if ticks else 0.0
+        self.ticks = len(api.tick_times)
+        self.wall_seconds = wall_seconds
+        self.calls = len(api.calls)
+        self.call_log = api.calls       # [(tick, label, args)] in order
+        self.misses = api.misses
+        self.callbacks_fired = api.callbacks_fired
+        self.callback_misses = api.callback_misses
+        self.stopped_by = stopped_by
+        self.error = error
+        self.profile_text = profile_text
+        self.tick_times = list(api.tick_times)
+        self.recorded_actions = recorded_actions(ticks)
+        self.actions = [call for call in api.calls if call[1] in ACTIONS]
+        self.comparison = compare_actions(self.recorded_actions, self.actions)
+
+    @property
+    def divergence(self):
+        return self.comparison["first_divergence"]
+
+    @property
+    def speedup(self):
+        if self.wall_seconds <= 0:
+            return 0.0
+        return self.recorded_seconds / self.wall_seconds
+
+    def latency_ms(self, pct):
+        """Decision latency percentile in ms (wall time between Pauses)"""
+        if not self.tick_times:
+            return 0.0
+        return percentile(sorted(self.tick_times), pct) * 1000.0
+
+    def format(self):
+        lines = [
+            "Trace        : " + self.script + ", " + str(self.recorded_ticks) + " ticks, "
+            + "{:.1f}".format(self.recorded_seconds) + "s recorded",
+            "Wall time    : " + "{:.3f}".format(self.wall_seconds) + "s ("
+            + "{:.0f}".format(self.speedup) + "x real time)",
+            "Ticks        : " + str(self.ticks) + " replayed",
+            "Latency      : p50 {:.3f}ms  p95 {:.3f}ms  max {:.3f}ms".format(
+                self.latency_ms(50), self.latency_ms(95), self.latency_ms(100)),
+            "API calls    : " + str(self.calls) + " (" + str(self.misses) + " not in the trace)",
+            "Callbacks    : " + str(self.callbacks_fired) + " fired ("
+            + str(self.callback_misses) + " never registered)",
+            "Actions      : " + str(self.comparison["replayed"]) + " issued, "
+            + str(self.comparison["recorded"]) + " recorded, "
+            + str(self.comparison["matched"]) + " match in order",
+            "Stopped by   : " + self.stopped_by,
+        ]
+        if self.divergence:
+            index, old, new = self.divergence
+            lines.append("First change : action #" + str(index) + " recorded "
+                         + _format_action(old) + ", replay " + _format_action(new))
+        if self.error:
+            lines.append("Error        : " + self.error)
+        if self.profile_text:
+            lines.append("")
+            lines.append(self.profile_text)
+        return "\n".join(lines)
+
+
+def _format_action(action):
+    if action is None:
+        return "(none)"
+    return action[1] + "(" + ", ".join(json.dumps(a) for a in action[2]) + ") at tick " + str(action[0])
+
+
+# ============ DRIVER ============
+def replay_script(trace, path, profile=False, overrun_ticks=OVERRUN_TICKS):
+    """Rerun a script against a recorded trace
+
+    Args:
+        trace: Trace file, or a (header, ticks) tuple from read_trace()
+        path: Script file (relative paths resolve from the repo root)
+        profile: Run under cProfile and put the top functions in the report
+        overrun_ticks: Pauses allowed past the end of the trace
+
+    Returns:
+        ReplayReport
+    """
+    header, ticks = read_trace(trace) if isinstance(trace, str) else trace
+    if not os.path.isabs(path):
+        path = os.path.join(REPO_ROOT, path)
+    api = ReplayAPI(header, ticks, overrun_ticks)
+
+    saved = (sys.modules.get("API"), getattr(builtins, "API", None), hasattr(builtins, "API"),
+             time.time, time.sleep, random.getstate())
+    # A copy imported by an earlier run/test would still talk to its API
+    for name in ("LegionUtils", "GatherFramework"):
+        sys.modules.pop(name, None)
+    sys.modules["API"] = api
+    builtins.API = api
+    time.time = lambda: api.now
+    time.sleep = api.Pause
+    random.seed(header.get("seed"))
+
+    profiler = None
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+    stopped_by = "StopRequested"
+    error = None
+    start = _real_perf_counter()
+    try:
+        if profiler:
+            profiler.enable()
+        runpy.run_path(path, run_name="__main__")
+    except ReplayStop:
+        stopped_by = "end of trace (script ignored StopRequested)"
+    except Exception as e:
+        stopped_by = "exception"
+        error = type(e).__name__ + ": " + str(e)
+    finally:
+        if profiler:
+            profiler.disable()
+        api.finish()
+        wall = _real_perf_counter() - start
+        old_module, old_builtin, had_builtin, real_time, real_sleep, random_state = saved
+        if old_module is None:
+            sys.modules.pop("API", None)
+        else:
+            sys.modules["API"] = old_module
+        if had_builtin:
+            builtins.API = old_builtin
+        elif hasattr(builtins, "API"):
+            del builtins.API
+        time.time = real_time
+        time.sleep = real_sleep
+        random.setstate(random_state)
+        for name in ("LegionUtils", "GatherFramework"):
+            sys.modules.pop(name, None)
+
+    profile_text = ""
+    if profiler:
+        import io
+        import pstats
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(25)
+        profile_text = out.getvalue()
+    return ReplayReport(api, wall, stopped_by, error, profile_text)
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Replay a recorded API trace through a Legion script")
+    parser.add_argument("trace", help="Trace file written by TraceRecorder")
+    parser.add_argument("script", help="Script path, e.g. Tamer/Tamer_PetFarmer.py")
+    parser.add_argument("--profile", action="store_true", help="Add a cProfile summary")
+    args = parser.parse_args(argv)
+
+    report = replay_script(args.trace, args.script, profile=args.profile)
+    print(report.format())
+    return 1 if report.error else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1398 @@
+# ============================================================
+# LegionSim - Headless World Simulator for Legion Scripts
+# by Coryigon for UO Unchained
+# Version: 1.0
+# ============================================================
+#
+# Deterministic, in-process stand-in for the TazUO `API` module.
+# Runs whole scripts (main loops included) against a virtual clock,
+# so a 10 minute farming session finishes in a second or two and
+# every API call can be counted.
+#
+# Usage (command line):
+#   python _support/tools/LegionSim.py Tamer/Tamer_Suite.py --seconds 600
+#
+# Usage (from a test or benchmark):
+#   from LegionSim import SimWorld, run_script
+#
+#   world = SimWorld()
+#   pet = world.add_mobile("Dragon", hits=200, notoriety=1, x=101, y=100)
+#   world.persistent["SharedPets_List"] = "Dragon:" + str(pet.Serial) + ":1"
+#   report = run_script("Tamer/Tamer_Suite.py", world=world, seconds=300)
+#   print(report.format())
+#
+# What is simulated:
+#   - Player, mobiles and items (FindMobile, Mobiles.GetMobiles, FindType,
+#     ItemsInContainer, NearestMobile, GetItemsOnGround, ...)
+#   - Journal (InJournal, GetJournalEntries, ClearJournal, InGameJournal)
+#   - Server gumps (HasGump, ReplyGump, WaitForGump, GetGumpContents)
+#   - Script gumps (every control is a recording no-op)
+#   - Persistent and shared vars, hotkeys, API.Events
+#   - Targeting cursor, bandages, pathfinding (1 tile per step)
+#   - Container opening and the move item queue (optional latency/pacing)
+#   - API.Pause / time.time / time.sleep advance a virtual clock
+#
+# Anything the simulator does not model is a counted no-op, so
+# scripts never crash on an unsupported call.
+#
+# ============================================================
+
+import builtins
+import datetime
+import heapq
+import os
+import runpy
+import sys
+import time
+
+# ============ CONSTANTS ============
+BANDAGE_GRAPHIC = 0x0E21
+CORPSE_GRAPHIC = 0x2006
+BACKPACK_GRAPHIC = 0x0E75
+
+# Seconds the simulated server takes for common actions
+DEFAULT_BANDAGE_TIME = 4.0
+DEFAULT_STEP_TIME = 0.2         # Seconds per tile while pathfinding
+DEFAULT_BANDAGE_HEAL = 30
+
+# Pet commands the simulated server reacts to (targeted ones open a cursor)
+TARGETED_COMMAND_SUFFIXES = (" kill", " attack", " guard")
+PET_COMMAND_SUFFIXES = TARGETED_COMMAND_SUFFIXES + (" follow me", " guard me", " stay", " stop")
+
+# Grace period after the deadline before Pause starts raising SimStop
+STOP_GRACE_SECONDS = 5.0
+
+# Real wall-clock functions, captured before install() patches them
+_real_time = time.time
+_real_sleep = time.sleep
+_real_perf_counter = time.perf_counter
+
+
+class SimStop(BaseException):
+    """Raised by API.Pause once a simulation overruns its deadline.
+
+    Derives from BaseException so `except Exception` blocks in scripts
+    do not swallow it. Bare `except:` blocks still can, which is why
+    every later Pause raises again until the script unwinds.
+    """
+    pass
+
+
+# ============ VIRTUAL CLOCK ============
+class SimClock:
+    """Virtual clock shared by API.Pause, time.time and time.sleep"""
+
+    def __init__(self, start=1700000000.0):
+        self.now = start
+        self.start = start
+
+    def time(self):
+        return self.now
+
+    def elapsed(self):
+        return self.now - self.start
+
+
+# ============ ENUMS ============
+class Notoriety:
+    Unknown = 0
+    Innocent = 1
+    Ally = 2
+    Gray = 3
+    Criminal = 4
+    Enemy = 5
+    Murderer = 6
+    Invulnerable = 7
+
+
+class PersistentVar:
+    Char = 1
+    Account = 2
+    Server = 3
+    Global = 4
+
+
+class ScanType:
+    Hostile = 0
+    Party = 1
+    Followers = 2
+    Objects = 3
+    Mobiles = 4
+
+
+# ============ WORLD OBJECTS ============
+class SimObject:
+    """Base for anything with a serial and a position"""
+
+    def __init__(self, world, serial, graphic=0, x=0, y=0, z=0, name="", hue=0):
+        self._world = world
+        self.Serial = serial
+        self.Graphic = graphic
+        self.X = x
+        self.Y = y
+        self.Z = z
+        self.Name = name
+        self.Hue = hue
+        self.IsDestroyed = False
+        self.Impassible = False
+
+    @property
+    def Distance(self):
+        player = self._world.player
+        if player is None or player is self:
+            return 0
+        return max(abs(self.X - player.X), abs(self.Y - player.Y))
+
+    def HasLineOfSightFrom(self, observer=None):
+        return True
+
+    def SetHue(self, hue):
+        self.Hue = hue
+
+    def Destroy(self):
+        self.IsDestroyed = True
+
+    def ToString(self):
+        return self.Name + " (" + hex(self.Serial) + ")"
+
+    def __repr__(self):
+        return "<" + type(self).__name__ + " " + self.ToString() + ">"
+
+
+class SimItem(SimObject):
+    """Item - Amount stacks, Container is the parent serial (0 = ground)"""
+
+    def __init__(self, world, serial, graphic, amount=1, container=0, name="", hue=0,
+                 x=0, y=0, is_container=False, is_corpse=False, weight=1):
+        SimObject.__init__(self, world, serial, graphic, x, y, 0, name, hue)
+        self.Amount = amount
+        self.Container = container
+        self.IsContainer = is_container or is_corpse
+        self.IsCorpse = is_corpse
+        self.Opened = False
+        self.Weight = weight
+
+    @property
+    def RootContainer(self):
+        serial = self.Container
+        while True:
+            parent = self._world.items.get(serial)
+            if parent is None or parent.Container == 0:
+                return serial
+            serial = parent.Container
+
+    @property
+    def Distance(self):
+        if self.Container:
+            return 0
+        return SimObject.Distance.fget(self)
+
+    def NameAndProps(self, wait=False, timeout=10):
+        return self.Name
+
+
+class SimMobile(SimObject):
+    """Mobile - pets, monsters, other players"""
+
+    def __init__(self, world, serial, name, hits=100, hits_max=None, x=0, y=0,
+                 notoriety=Notoriety.Innocent, graphic=0x00C8):
+        SimObject.__init__(self, world, serial, graphic, x, y, 0, name)
+        self.Hits = hits
+        self.HitsMax = hits_max if hits_max is not None else hits
+        self.Mana = 100
+        self.ManaMax = 100
+        self.Stamina = 100
+        self.StaminaMax = 100
+        self.IsDead = False
+        self.IsPoisoned = False
+        self.Notoriety = notoriety
+        self.InWarMode = False
+        self.IsHuman = False
+        self.IsRenamable = notoriety == Notoriety.Innocent
+        self.Backpack = None
+        self.Mount = None
+
+    @property
+    def Poisoned(self):
+        return self.IsPoisoned
+
+    @property
+    def HitsDiff(self):
+        return self.HitsMax - self.Hits
+
+    def NameAndProps(self, wait=False, timeout=10):
+        return self.Name
+
+
+class SimPlayer(SimMobile):
+    """The player mobile (API.Player)"""
+
+    def __init__(self, world, serial, name="Tester", x=100, y=100):
+        SimMobile.__init__(self, world, serial, name, 100, 100, x, y, Notoriety.Innocent, 0x0190)
+        self.IsHuman = True
+        self.Strength = 100
+        self.Dexterity = 100
+        self.Intelligence = 100
+        self.Weight = 50
+        self.WeightMax = 400
+        self.Gold = 0
+        self.Followers = 0
+        self.FollowersMax = 5
+        self.NotorietyFlag = 0
+        self.IsCasting = False
+        self.IsHidden = False
+        self.Skills = {}
+
+    @property
+    def MaxWeight(self):
+        return self.WeightMax
+
+    @property
+    def Str(self):
+        return self.Strength
+
+    def GetSkill(self, name):
+        return self.Skills.get(name)
+
+
+class SimJournalEntry:
+    """One journal line - Time is a datetime, like the client's PyJournalEntry"""
+
+    def __init__(self, text, name="", hue=0, timestamp=0.0):
+        self.Text = text
+        self.Name = name
+        self.Hue = hue
+        self.Time = datetime.datetime.fromtimestamp(timestamp)
+        self._seconds = timestamp       # virtual clock time (sim bookkeeping)
+        self.TextType = None
+        self.MessageType = None
+        self.Disposed = False
+
+
+# ============ SCRIPT GUMP CONTROLS ============
+def _noop(*args, **kwargs):
+    return None
+
+
+class SimControl:
+    """Recording stand-in for every gump control.
+
+    Stores position, size, text and hue so tests can assert on them.
+    Any method the simulator does not know about is a silent no-op.
+    """
+
+    def __init__(self, kind, text=""):
+        self.kind = kind
+        self.Text = text
+        self.Hue = 0
+        self.BackgroundHue = 0
+        self.IsVisible = True
+        self.IsDisposed = False
+        self.IsChecked = False
+        self.CanMove = True
+        self.x = 0
+        self.y = 0
+        self.width = 0
+        self.height = 0
+        self.children = []
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return _noop
+
+    def Add(self, child):
+        self.children.append(child)
+
+    def GetX(self):
+        return self.x
+
+    def GetY(self):
+        return self.y
+
+    def GetWidth(self):
+        return self.width
+
+    def GetHeight(self):
+        return self.height
+
+    def SetX(self, x):
+        self.x = x
+        return self
+
+    def SetY(self, y):
+        self.y = y
+        return self
+
+    def SetPos(self, x, y):
+        self.x = x
+        self.y = y
+        return self
+
+    def SetWidth(self, width):
+        self.width = width
+        return self
+
+    def SetHeight(self, height):
+        self.height = height
+        return self
+
+    def SetRect(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        return self
+
+    def SetText(self, text):
+        self.Text = text
+
+    def GetText(self):
+        return self.Text
+
+    def SetBackgroundHue(self, hue):
+        self.BackgroundHue = hue
+
+    def SetHue(self, hue):
+        self.Hue = hue
+
+    def Dispose(self):
+        self.IsDisposed = True
+
+
+class SimGumps:
+    """API.Gumps - builds SimControls and stores click/dispose callbacks"""
+
+    def __init__(self, world):
+        self._world = world
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        world = self._world
+
+        def factory(*args, **kwargs):
+            world.count("Gumps." + name)
+            text = args[0] if args and isinstance(args[0], str) else ""
+            return SimControl(name, text)
+        return factory
+
+    def AddGump(self, gump):
+        self._world.count("Gumps.AddGump")
+        self._world.script_gumps.append(gump)
+
+    def AddControlOnClick(self, control, on_click, left_only=True):
+        self._world.count("Gumps.AddControlOnClick")
+        self._world.click_handlers[id(control)] = on_click
+        return control
+
+    def AddControlOnDisposed(self, control, on_dispose):
+        self._world.count("Gumps.AddControlOnDisposed")
+        self._world.dispose_handlers.append(on_dispose)
+        return control
+
+
+class SimEvents:
+    """API.Events - subscriptions are dispatched from ProcessCallbacks"""
+
+    EVENT_NAMES = (
+        "OnPlayerHitsChanged", "OnBuffAdded", "OnBuffRemoved", "OnPlayerDeath",
+        "OnOpenContainer", "OnPlayerMoved", "OnItemCreated",
+    )
+
+    def __init__(self, world):
+        self._world = world
+        self.subscribers = {}
+        for name in self.EVENT_NAMES:
+            self.subscribers[name] = []
+
+    def __getattr__(self, name):
+        if name not in SimEvents.EVENT_NAMES:
+            raise AttributeError(name)
+        subscribers = self.subscribers[name]
+        world = self._world
+
+        def subscribe(callback):
+            world.count("Events." + name)
+            subscribers.append(callback)
+        return subscribe
+
+
+class SimJournalText:
+    """API.InGameJournal - whole-journal text access"""
+
+    def __init__(self, world):
+        self._world = world
+
+    def GetText(self):
+        self._world.count("InGameJournal.GetText")
+        return "\n".join(entry.Text for entry in self._world.journal)
+
+
+class SimMobiles:
+    """API.Mobiles namespace"""
+
+    def __init__(self, world):
+        self._world = world
+
+    def FindMobile(self, serial):
+        self._world.count("Mobiles.FindMobile")
+        return self._world.find_mobile(serial)
+
+    def GetMobiles(self):
+        self._world.count("Mobiles.GetMobiles")
+        return list(self._world.mobiles.values())
+
+
+class PositionChangedArgs:
+    def __init__(self, x, y, z):
+        self.NewLocation = (x, y, z)
+
+
+# ============ SIM REPORT ============
+class SimReport:
+    """Summary of one simulated run"""
+
+    def __init__(self, world, wall_seconds, stopped_by):
+        self.ticks = world.ticks
+        self.virtual_seconds = world.clock.elapsed()
+        self.wall_seconds = wall_seconds
+        self.total_calls = world.total_calls
+        self.call_counts = dict(world.call_counts)
+        self.stopped_by = stopped_by
+        self.error = world.error
+        self.sysmsgs = len(world.sysmsgs)
+
+    @property
+    def ticks_per_second(self):
+        if self.wall_seconds <= 0:
+            return 0.0
+        return self.ticks / self.wall_seconds
+
+    @property
+    def calls_per_tick(self):
+        if self.ticks == 0:
+            return 0.0
+        return self.total_calls / float(self.ticks)
+
+    @property
+    def speedup(self):
+        if self.wall_seconds <= 0:
+            return 0.0
+        return self.virtual_seconds / self.wall_seconds
+
+    def top_calls(self, limit=15):
+        """Most frequent API calls as [(name, count)]"""
+        ranked = sorted(self.call_counts.items(), key=lambda kv: (-kv[1], kv[0]))
+        return ranked[:limit]
+
+    def format(self, limit=15):
+        lines = [
+            "Virtual time : " + "{:.1f}".format(self.virtual_seconds) + "s",
+            "Wall time    : " + "{:.3f}".format(self.wall_seconds) + "s ("
+            + "{:.0f}".format(self.speedup) + "x real time)",
+            "Ticks        : " + str(self.ticks) + " ("
+            + "{:.0f}".format(self.ticks_per_second) + " ticks/s)",
+            "API calls    : " + str(self.total_calls) + " ("
+            + "{:.1f}".format(self.calls_per_tick) + " calls/tick)",
+            "Stopped by   : " + self.stopped_by,
+        ]
+        if self.error:
+            lines.append("Error        : " + self.error)
+        lines.append("Top calls:")
+        for name, count in self.top_calls(limit):
+            per_tick = count / float(self.ticks) if self.ticks else 0.0
+            lines.append("  " + name.ljust(28) + str(count).rjust(8)
+                         + "  {:.2f}/tick".format(per_tick))
+        return "\n".join(lines)
+
+
+# ============ SIM WORLD ============
+class SimWorld:
+    """The simulated game world plus the bookkeeping behind the fake API.
+
+    Build the world (player, pets, monsters, items), then either call
+    install() and drive code by hand, or use run_script().
+
+    Scheduled world events (damage, spawns, journal lines) are plain
+    callables run when the virtual clock passes their due time:
+
+        world.every(2.0, lambda: world.damage(pet, 15))
+        world.at(30.0, lambda: world.add_journal("You feel very ill."))
+    """
+
+    def __init__(self, seed_serial=0x1000, player_name="Tester", x=100, y=100):
+        self.clock = SimClock()
+        self._next_serial = seed_serial
+        self.mobiles = {}
+        self.items = {}
+        self._installed = None
+        self.player = None
+        self.player = SimPlayer(self, self._alloc_serial(), player_name, x, y)
+        self.mobiles[self.player.Serial] = self.player
+        backpack = self.add_item(BACKPACK_GRAPHIC, container=self.player.Serial,
+                                 name="Backpack", is_container=True)
+        self.player.Backpack = backpack
+
+        # Client state
+        self.journal = []
+        self.persistent = {}            # name -> value (all scopes share one dict)
+        self.shared_vars = {}
+        self.hotkeys = {}               # key -> [callbacks]
+        self.server_gumps = {}          # gump id -> contents text
+        self.gump_replies = []          # (gump id, button)
+        self.script_gumps = []
+        self.click_handlers = {}
+        self.dispose_handlers = []
+        self.pending_callbacks = []
+        self.sysmsgs = []
+        self.speech = []
+        self.actions = []               # (time, name, args) for everything the script did
+
+        # Targeting
+        self.target_cursor = False
+        self.pretarget = 0
+        self.pending_bandage = 0
+        self.last_target = 0
+        self.pet_commands = []          # (time, message, heard) for every pet command said
+
+        # Movement
+        self.path_goal = None
+        self.next_step_time = 0.0
+        self.blocked = set()            # (x, y) tiles that cannot be walked
+
+        # Server rules (tweak per scenario)
+        self.bandage_time = DEFAULT_BANDAGE_TIME
+        self.bandage_heal = DEFAULT_BANDAGE_HEAL
+        self.step_time = DEFAULT_STEP_TIME
+        self.command_latency = 0.0      # Round trip before a pet command's target cursor shows
+        self.command_gap = 0.0          # Pet commands said closer together than this are dropped
+        self.container_latency = 0.0    # Round trip before OnOpenContainer for a used container
+        self.move_delay = 0.0           # Seconds per QueueMoveItem entry (0 = moved at once)
+        self.move_start_lag = 0.0       # Seconds before the client picks up a new queue
+        self.move_queue_start = 0.0     # When the current queue is picked up
+        self.move_queue = []            # (serial, destination, amount) not yet moved
+
+        # Scheduler
+        self._timers = []
+        self._timer_seq = 0
+
+        # Stats
+        self.ticks = 0
+        self.total_calls = 0
+        self.call_counts = {}
+        self.stop_requested = False
+        self.deadline = None
+        self.error = ""
+
+        self.api = SimAPI(self)
+        self._installed = None
+
+    # ---------- object factory ----------
+    def _alloc_serial(self):
+        self._next_serial += 1
+        return self._next_serial
+
+    def add_mobile(self, name, hits=100, hits_max=None, x=None, y=None,
+                   notoriety=Notoriety.Innocent, graphic=0x00C8):
+        """Add a mobile near the player and return it"""
+        if x is None:
+            x = self.player.X + 1
+        if y is None:
+            y = self.player.Y
+        mob = SimMobile(self, self._alloc_serial(), name, hits, hits_max, x, y, notoriety, graphic)
+        self.mobiles[mob.Serial] = mob
+        return mob
+
+    def add_pet(self, name, hits=100, hits_max=None, x=None, y=None):
+        """Add an owned pet and register it in the shared pet list"""
+        pet = self.add_mobile(name, hits, hits_max, x, y, Notoriety.Innocent)
+        entry = name + ":" + str(pet.Serial) + ":1"
+        current = self.persistent.get("SharedPets_List", "")
+        self.persistent["SharedPets_List"] = (current + "|" + entry) if current else entry
+        return pet
+
+    def add_item(self, graphic, amount=1, container=None, name="", hue=0,
+                 x=0, y=0, is_container=False, is_corpse=False, weight=1):
+        """Add an item (container=None puts it in the player's backpack)"""
+        if container is None:
+            container = self.player.Backpack.Serial
+        item = SimItem(self, self._alloc_serial(), graphic, amount, container, name, hue,
+                       x, y, is_container, is_corpse, weight)
+        self.items[item.Serial] = item
+        if self._installed is not None:
+            self.fire_event("OnItemCreated", item.Serial)
+        return item
+
+    def add_corpse(self, x, y, contents=()):
+        """Add a corpse on the ground with [(graphic, amount)] inside"""
+        corpse = self.add_item(CORPSE_GRAPHIC, 1, 0, "corpse", x=x, y=y, is_corpse=True)
+        for graphic, amount in contents:
+            self.add_item(graphic, amount, corpse.Serial)
+        return corpse
+
+    def remove(self, serial):
+        self.mobiles.pop(serial, None)
+        self.items.pop(serial, None)
+
+    # ---------- lookups ----------
+    def find_mobile(self, serial):
+        return self.mobiles.get(serial)
+
+    def contents(self, container, recursive=False):
+        result = []
+        for item in self.items.values():
+            if item.Container == container:
+                result.append(item)
+                if recursive and item.IsContainer:
+                    result.extend(self.contents(item.Serial, True))
+        return result
+
+    # ---------- world changes ----------
+    def damage(self, mob, amount):
+        """Apply damage (negative heals). Kills at 0 HP."""
+        if mob.IsDead:
+            return
+        mob.Hits = max(0, min(mob.HitsMax, mob.Hits - amount))
+        if mob is self.player:
+            self.fire_event("OnPlayerHitsChanged", mob.Hits)
+        if mob.Hits == 0:
+            mob.IsDead = True
+            if mob is self.player:
+                self.fire_event("OnPlayerDeath", mob.Serial)
+
+    def add_journal(self, text, name="System", hue=0):
+        self.journal.append(SimJournalEntry(text, name, hue, self.clock.now))
+
+    def open_gump(self, gump_id, contents=""):
+        self.server_gumps[gump_id] = contents
+
+    def move_player(self, x, y):
+        self.player.X = x
+        self.player.Y = y
+        self.fire_event("OnPlayerMoved", PositionChangedArgs(x, y, self.player.Z))
+
+    def fire_event(self, name, arg):
+        """Queue an API.Events callback (delivered on ProcessCallbacks)"""
+        for callback in self.api.Events.subscribers.get(name, ()):
+            self.pending_callbacks.append((callback, (arg,)))
+
+    def press_key(self, key):
+        """Simulate a hotkey press (delivered on ProcessCallbacks)"""
+        for callback in self.hotkeys.get(key, ()):
+            self.pending_callbacks.append((callback, ()))
+
+    def click(self, control):
+        """Simulate clicking a gump control (delivered on ProcessCallbacks)"""
+        callback = self.click_handlers.get(id(control))
+        if callback:
+            self.pending_callbacks.append((callback, ()))
+
+    # ---------- scheduler ----------
+    def at(self, seconds, action):
+        """Run action once, `seconds` of virtual time from now"""
+        self._timer_seq += 1
+        heapq.heappush(self._timers, (self.clock.now + seconds, self._timer_seq, action, 0))
+
+    def every(self, interval, action):
+        """Run action every `interval` seconds of virtual time"""
+        self._timer_seq += 1
+        heapq.heappush(self._timers, (self.clock.now + interval, self._timer_seq, action, interval))
+
+    def advance(self, seconds):
+        """Advance the virtual clock, running timers and movement on the way"""
+        target = self.clock.now + max(0.0, seconds)
+        while True:
+            next_due = self._timers[0][0] if self._timers else None
+            step_due = self.next_step_time if self.path_goal else None
+            candidates = [t for t in (next_due, step_due) if t is not None and t <= target]
+            if not candidates:
+                break
+            due = min(candidates)
+            self.clock.now = max(self.clock.now, due)
+            if step_due is not None and due == step_due:
+                self._step_path()
+            else:
+                _, seq, action, interval = heapq.heappop(self._timers)
+                if interval:
+                    heapq.heappush(self._timers, (due + interval, seq, action, interval))
+                action()
+        self.clock.now = target
+        if self.deadline is not None and self.clock.now >= self.deadline:
+            self.stop_requested = True
+
+    def _step_path(self):
+        goal_x, goal_y, distance = self.path_goal
+        px, py = self.player.X, self.player.Y
+        if max(abs(goal_x - px), abs(goal_y - py)) <= distance:
+            self.path_goal = None
+            return
+        nx = px + (goal_x > px) - (goal_x < px)
+        ny = py + (goal_y > py) - (goal_y < py)
+        if (nx, ny) in self.blocked:
+            self.path_goal = None   # Stuck - real client gives up the same way
+            return
+        self.move_player(nx, ny)
+        self.next_step_time = self.clock.now + self.step_time
+
+    # ---------- server rules ----------
+    def use_object(self, serial):
+        item = self.items.get(serial)
+        if item is None:
+            return
+        if item.Graphic == BANDAGE_GRAPHIC:
+            if self.pretarget:
+                self.apply_bandage(item, self.pretarget)
+            else:
+                self.target_cursor = True
+                self.pending_bandage = item.Serial
+        elif item.IsContainer:
+            def opened():
+                item.Opened = True
+                self.fire_event("OnOpenContainer", item.Serial)
+            if self.container_latency > 0:
+                self.at(self.container_latency, opened)
+            else:
+                opened()
+
+    def move_item(self, serial, destination, amt=0):
+        """Move an item (amt < Amount splits the stack); backpack moves add weight"""
+        item = self.items.get(serial)
+        if item is None:
+            return
+        self.record("MoveItem", serial, destination, amt)
+        backpack = self.player.Backpack.Serial
+        to_backpack = destination == backpack and item.RootContainer != backpack
+        if amt and amt < item.Amount:
+            item.Amount -= amt
+            item = self.add_item(item.Graphic, amt, destination, item.Name, item.Hue, weight=item.Weight)
+        else:
+            item.Container = destination
+        if to_backpack:
+            self.player.Weight += item.Weight
+
+    def queue_move(self, serial, destination, amt=0):
+        """QueueMoveItem: one entry every move_delay seconds, after move_start_lag"""
+        if self.move_delay <= 0 and self.move_start_lag <= 0:
+            self.move_item(serial, destination, amt)
+            return
+        self.move_queue.append((serial, destination, amt))
+        if len(self.move_queue) == 1:
+            self.move_queue_start = self.clock.now + self.move_start_lag
+            self.at(self.move_start_lag + self.move_delay, self._next_queued_move)
+
+    def _next_queued_move(self):
+        if not self.move_queue:
+            return
+        self.move_item(*self.move_queue.pop(0))
+        if self.move_queue:
+            self.at(self.move_delay, self._next_queued_move)
+
+    def apply_bandage(self, bandage, target_serial):
+        self.target_cursor = False
+        self.pretarget = 0
+        self.pending_bandage = 0
+        bandage.Amount -= 1
+        if bandage.Amount <= 0:
+            self.remove(bandage.Serial)
+        patient = self.find_mobile(target_serial)
+        if patient is None:
+            return
+        self.add_journal("You begin applying the bandages.")
+
+        def finish():
+            if patient.IsDead:
+                return
+            if patient.IsPoisoned:
+                patient.IsPoisoned = False
+                self.add_journal("You have cured the target of all poisons.")
+            else:
+                self.damage(patient, -self.bandage_heal)
+                self.add_journal("You finish applying the bandages.")
+        self.at(self.bandage_time, finish)
+
+    def show_target_cursor(self):
+        self.target_cursor = True
+
+    def target(self, serial):
+        self.last_target = serial
+        if not self.target_cursor:
+            return
+        self.target_cursor = False
+        bandage = self.items.get(self.pending_bandage)
+        if bandage is not None:
+            self.apply_bandage(bandage, serial)
+
+    # ---------- bookkeeping ----------
+    def count(self, name):
+        self.total_calls += 1
+        self.call_counts[name] = self.call_counts.get(name, 0) + 1
+
+    def record(self, name, *args):
+        self.actions.append((self.clock.now, name, args))
+
+    def tick(self, seconds):
+        """One API.Pause - this is the simulator's definition of a tick"""
+        self.ticks += 1
+        if self.deadline is not None and self.clock.now >= self.deadline + STOP_GRACE_SECONDS:
+            raise SimStop()
+        self.advance(seconds)
+
+    def process_callbacks(self):
+        pending = self.pending_callbacks
+        self.pending_callbacks = []
+        for callback, args in pending:
+            callback(*args)
+
+    # ---------- install / uninstall ----------
+    def install(self):
+        """Make `import API` return this world's API and virtualise time"""
+        if self._installed is not None:
+            return self.api
+        self._installed = (sys.modules.get("API"), getattr(builtins, "API", None),
+                           hasattr(builtins, "API"), time.time, time.sleep)
+        sys.modules["API"] = self.api
+        builtins.API = self.api
+        time.time = self.clock.time
+        time.sleep = self.api.Pause
+        return self.api
+
+    def uninstall(self):
+        """Restore the real time module and any previous API module"""
+        if self._installed is None:
+            return
+        old_module, old_builtin, had_builtin, real_time, real_sleep = self._installed
+        if old_module is None:
+            sys.modules.pop("API", None)
+        else:
+            sys.modules["API"] = old_module
+        if had_builtin:
+            builtins.API = old_builtin
+        elif hasattr(builtins, "API"):
+            del builtins.API
+        time.time = real_time
+        time.sleep = real_sleep
+        self._installed = None
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.uninstall()
+        return False
+
+    def reset_stats(self):
+        self.ticks = 0
+        self.total_calls = 0
+        self.call_counts = {}
+
+
+# ============ SIM API ============
+class SimAPI:
+    """Object installed as the `API` module.
+
+    Methods mirror API.py. Every call is counted in world.call_counts.
+    Unknown names resolve to counted no-ops.
+    """
+
+    PersistentVar = PersistentVar
+    Notoriety = Notoriety
+    ScanType = ScanType
+
+    def __init__(self, world):
+        self._world = world
+        self.Gumps = SimGumps(world)
+        self.Events = SimEvents(world)
+        self.Mobiles = SimMobiles(world)
+        self.InGameJournal = SimJournalText(world)
+        self.Found = 0
+        self.Bank = 0
+        self.LastTargetSerial = 0
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        world = self._world
+
+        def unsupported(*args, **kwargs):
+            world.count(name)
+            world.record(name, *args)
+            return None
+        return unsupported
+
+    # ---------- properties ----------
+    @property
+    def Player(self):
+        return self._world.player
+
+    @property
+    def Backpack(self):
+        return self._world.player.Backpack.Serial
+
+    @property
+    def StopRequested(self):
+        return self._world.stop_requested
+
+    @property
+    def JournalEntries(self):
+        return list(self._world.journal)
+
+    # ---------- core ----------
+    def Pause(self, seconds):
+        self._world.count("Pause")
+        self._world.tick(seconds)
+
+    def ProcessCallbacks(self):
+        self._world.count("ProcessCallbacks")
+        self._world.process_callbacks()
+
+    def Stop(self):
+        self._world.count("Stop")
+        self._world.stop_requested = True
+
+    def OnHotKey(self, key, callback=None):
+        self._world.count("OnHotKey")
+        self._world.hotkeys.setdefault(key, []).append(callback)
+
+    def UnregisterHotkey(self, key):
+        self._world.count("UnregisterHotkey")
+        self._world.hotkeys.pop(key, None)
+
+    # ---------- messages ----------
+    def SysMsg(self, message, hue=946):
+        self._world.count("SysMsg")
+        self._world.sysmsgs.append((self._world.clock.now, message, hue))
+
+    def Msg(self, message):
+        world = self._world
+        world.count("Msg")
+        world.record("Msg", message)
+        world.speech.append((world.clock.now, message))
+        world.add_journal(message, world.player.Name)
+        lowered = message.lower()
+        if not lowered.endswith(PET_COMMAND_SUFFIXES):
+            return
+        last = next((t for t, _, heard in reversed(world.pet_commands) if heard), None)
+        heard = last is None or world.clock.now - last >= world.command_gap
+        world.pet_commands.append((world.clock.now, message, heard))
+        if heard and lowered.endswith(TARGETED_COMMAND_SUFFIXES):
+            if world.command_latency > 0:
+                world.at(world.command_latency, world.show_target_cursor)
+            else:
+                world.target_cursor = True
+
+    def HeadMsg(self, message, serial=0, hue=1337):
+        self._world.count("HeadMsg")
+
+    # ---------- persistence ----------
+    def SavePersistentVar(self, name, value, scope=PersistentVar.Char):
+        self._world.count("SavePersistentVar")
+        self._world.persistent[name] = value
+
+    def GetPersistentVar(self, name, defaultValue, scope=PersistentVar.Char):
+        self._world.count("GetPersistentVar")
+        return self._world.persistent.get(name, defaultValue)
+
+    def RemovePersistentVar(self, name, scope=PersistentVar.Char):
+        self._world.count("RemovePersistentVar")
+        self._world.persistent.pop(name, None)
+
+    def SetSharedVar(self, name, value):
+        self._world.count("SetSharedVar")
+        self._world.shared_vars[name] = value
+
+    def GetSharedVar(self, name):
+        self._world.count("GetSharedVar")
+        return self._world.shared_vars.get(name)
+
+    def RemoveSharedVar(self, name):
+        self._world.count("RemoveSharedVar")
+        self._world.shared_vars.pop(name, None)
+
+    def ClearSharedVars(self):
+        self._world.count("ClearSharedVars")
+        self._world.shared_vars.clear()
+
+    # ---------- mobiles ----------
+    def FindMobile(self, serial):
+        self._world.count("FindMobile")
+        return self._world.find_mobile(serial)
+
+    def GetAllMobiles(self, graphic=None, distance=None, notoriety=None):
+        self._world.count("GetAllMobiles")
+        result = []
+        for mob in self._world.mobiles.values():
+            if mob is self._world.player:
+                continue
+            if graphic is not None and mob.Graphic != graphic:
+                continue
+            if distance is not None and mob.Distance > distance:
+                continue
+            if notoriety and mob.Notoriety not in notoriety:
+                continue
+            result.append(mob)
+        return result
+
+    def _nearest(self, notoriety, max_distance):
+        player = self._world.player
+        result = [m for m in self._world.mobiles.values()
+                  if m is not player and not m.IsDead
+                  and m.Notoriety in notoriety and m.Distance <= max_distance]
+        result.sort(key=lambda m: (m.Distance, m.Serial))
+        return result
+
+    def NearestMobiles(self, notoriety, maxDistance=10):
+        self._world.count("NearestMobiles")
+        return self._nearest(notoriety, maxDistance)
+
+    def NearestMobile(self, notoriety, maxDistance=10):
+        self._world.count("NearestMobile")
+        found = self._nearest(notoriety, maxDistance)
+        return found[0] if found else None
+
+    # ---------- items ----------
+    def FindItem(self, serial):
+        self._world.count("FindItem")
+        return self._world.items.get(serial)
+
+    def _find_type_all(self, graphic, container, hue, minamount):
+        world = self._world
+        if container == 1337:
+            candidates = world.contents(world.player.Backpack.Serial, True)
+        else:
+            candidates = world.contents(container, True)
+        return [i for i in candidates if i.Graphic == graphic
+                and (hue == 1337 or i.Hue == hue) and i.Amount >= minamount]
+
+    def FindType(self, graphic, container=1337, range=1337, hue=1337, minamount=0):
+        self._world.count("FindType")
+        found = self._find_type_all(graphic, container, hue, minamount)
+        if not found:
+            self.Found = 0
+            return None
+        self.Found = found[0].Serial
+        return found[0]
+
+    def FindTypeAll(self, graphic, container=1337, range=1337, hue=1337, minamount=0):
+        self._world.count("FindTypeAll")
+        return self._find_type_all(graphic, container, hue, minamount)
+
+    def ItemsInContainer(self, container, recursive=False):
+        self._world.count("ItemsInContainer")
+        return self._world.contents(container, recursive)
+
+    def Contents(self, serial):
+        self._world.count("Contents")
+        return len(self._world.contents(serial))
+
+    def GetItemsOnGround(self, distance=18, graphic=1337):
+        self._world.count("GetItemsOnGround")
+        return [i for i in self._world.items.values() if i.Container == 0
+                and i.Distance <= distance and (graphic == 1337 or i.Graphic == graphic)]
+
+    def NearestCorpse(self, distance=3):
+        self._world.count("NearestCorpse")
+        corpses = [i for i in self._world.items.values()
+                   if i.IsCorpse and i.Container == 0 and i.Distance <= distance]
+        corpses.sort(key=lambda i: (i.Distance, i.Serial))
+        return corpses[0] if corpses else None
+
+    def MoveItem(self, serial, destination, amt=0, x=0xFFFF, y=0xFFFF):
+        self._world.count("MoveItem")
+        self._world.move_item(serial, destination, amt)
+
+    def QueueMoveItem(self, serial, destination, amt=0, x=0xFFFF, y=0xFFFF):
+        self._world.count("QueueMoveItem")
+        self._world.queue_move(serial, destination, amt)
+
+    def IsProcessingMoveQueue(self):
+        self._world.count("IsProcessingMoveQueue")
+        world = self._world
+        return bool(world.move_queue) and world.clock.now >= world.move_queue_start
+
+    def ClearMoveQueue(self):
+        self._world.count("ClearMoveQueue")
+        self._world.move_queue = []
+
+    def UseObject(self, serial, skipQueue=True):
+        self._world.count("UseObject")
+        self._world.record("UseObject", serial)
+        self._world.use_object(serial)
+
+    def UseType(self, graphic, hue=1337, container=1337, skipQueue=True):
+        self._world.count("UseType")
+        found = self._find_type_all(graphic, container, hue, 0)
+        if found:
+            self._world.record("UseObject", found[0].Serial)
+            self._world.use_object(found[0].Serial)
+
+    def BandageSelf(self):
+        world = self._world
+        world.count("BandageSelf")
+        found = self._find_type_all(BANDAGE_GRAPHIC, 1337, 1337, 0)
+        if not found:
+            return False
+        world.apply_bandage(found[0], world.player.Serial)
+        return True
+
+    # ---------- targeting ----------
+    def PreTarget(self, serial, targetType="neutral"):
+        self._world.count("PreTarget")
+        self._world.record("PreTarget", serial)
+        self._world.pretarget = serial
+
+    def CancelPreTarget(self):
+        self._world.count("CancelPreTarget")
+        self._world.pretarget = 0
+
+    def HasTarget(self, targetType="any"):
+        self._world.count("HasTarget")
+        return self._world.target_cursor
+
+    def CancelTarget(self):
+        self._world.count("CancelTarget")
+        self._world.target_cursor = False
+
+    def WaitForTarget(self, targetType="any", timeout=5):
+        world = self._world
+        world.count("WaitForTarget")
+        waited = 0.0
+        while not world.target_cursor and waited < timeout:
+            world.advance(0.05)
+            waited += 0.05
+        return world.target_cursor
+
+    def Target(self, *args):
+        self._world.count("Target")
+        self._world.record("Target", *args)
+        if len(args) == 1:
+            self._world.target(args[0])
+        else:
+            self._world.target_cursor = False
+
+    def TargetSelf(self):
+        self._world.count("TargetSelf")
+        self._world.record("Target", self._world.player.Serial)
+        self._world.target(self._world.player.Serial)
+
+    def RequestTarget(self, timeout=5):
+        self._world.count("RequestTarget")
+        return self._world.last_target or None
+
+    def Attack(self, serial):
+        self._world.count("Attack")
+        self._world.record("Attack", serial)
+
+    def CastSpell(self, spellName):
+        self._world.count("CastSpell")
+        self._world.record("CastSpell", spellName)
+        self._world.target_cursor = True
+
+    # ---------- journal ----------
+    def _journal_match(self, entry, msg):
+        return msg.lower() in entry.Text.lower()
+
+    def InJournal(self, msg, clearMatches=False):
+        self._world.count("InJournal")
+        for entry in self._world.journal:
+            if self._journal_match(entry, msg):
+                return True
+        return False
+
+    def InJournalAny(self, msgs, clearMatches=False):
+        self._world.count("InJournalAny")
+        for entry in self._world.journal:
+            for msg in msgs:
+                if self._journal_match(entry, msg):
+                    return True
+        return False
+
+    def GetJournalEntries(self, seconds, matchingText=""):
+        self._world.count("GetJournalEntries")
+        cutoff = self._world.clock.now - seconds
+        return [e for e in self._world.journal if e._seconds >= cutoff
+                and (not matchingText or self._journal_match(e, matchingText))]
+
+    def ClearJournal(self, matchingEntries=""):
+        self._world.count("ClearJournal")
+        if matchingEntries:
+            self._world.journal = [e for e in self._world.journal
+                                   if not self._journal_match(e, matchingEntries)]
+        else:
+            self._world.journal = []
+
+    # ---------- server gumps ----------
+    def HasGump(self, ID=1337):
+        self._world.count("HasGump")
+        if ID == 1337:
+            return next(iter(self._world.server_gumps), 0)
+        return ID if ID in self._world.server_gumps else 0
+
+    def WaitForGump(self, ID=1337, delay=5):
+        world = self._world
+        world.count("WaitForGump")
+        waited = 0.0
+        while waited < delay:
+            if (ID == 1337 and world.server_gumps) or ID in world.server_gumps:
+                return True
+            world.advance(0.05)
+            waited += 0.05
+        return False
+
+    def ReplyGump(self, button, gump=1337, switches=None):
+        self._world.count("ReplyGump")
+        self._world.record("ReplyGump", button, gump)
+        self._world.gump_replies.append((gump, button))
+        if gump == 1337:
+            self._world.server_gumps.clear()
+        else:
+            self._world.server_gumps.pop(gump, None)
+        return True
+
+    def CloseGump(self, ID=1337):
+        self._world.count("CloseGump")
+        self._world.server_gumps.pop(ID, None)
+        return True
+
+    def GetGumpContents(self, ID=1337):
+        self._world.count("GetGumpContents")
+        return self._world.server_gumps.get(ID, "")
+
+    def GumpContains(self, text, ID=1337):
+        self._world.count("GumpContains")
+        return text in self._world.server_gumps.get(ID, "")
+
+    def GetAllGumps(self):
+        self._world.count("GetAllGumps")
+        return list(self._world.server_gumps)
+
+    # ---------- movement ----------
+    def _pathfind(self, x, y, distance, wait, timeout):
+        world = self._world
+        world.record("Pathfind", x, y)
+        if (x, y) in world.blocked:
+            return False
+        world.path_goal = (x, y, distance)
+        world.next_step_time = world.clock.now + world.step_time
+        if wait:
+            waited = 0.0
+            while world.path_goal and waited < timeout:
+                world.advance(world.step_time)
+                waited += world.step_time
+        return True
+
+    def Pathfind(self, x, y, z=1337, distance=1, wait=False, timeout=10):
+        self._world.count("Pathfind")
+        return self._pathfind(x, y, distance, wait, timeout)
+
+    def PathfindEntity(self, entity, distance=1, wait=False, timeout=10):
+        self._world.count("PathfindEntity")
+        target = self._world.find_mobile(entity) or self._world.items.get(entity)
+        if target is None:
+            return False
+        return self._pathfind(target.X, target.Y, distance, wait, timeout)
+
+    def Pathfinding(self):
+        self._world.count("Pathfinding")
+        return self._world.path_goal is not None
+
+    def CancelPathfinding(self):
+        self._world.count("CancelPathfinding")
+        self._world.path_goal = None
+
+    def GetTile(self, x, y):
+        self._world.count("GetTile")
+        tile = SimObject(self._world, 0, 0x0003, x, y, 0, "tile")
+        tile.Impassible = (x, y) in self._world.blocked
+        return tile
+
+    def GetStaticsInArea(self, x1, y1, x2, y2):
+        self._world.count("GetStaticsInArea")
+        statics = []
+        for (bx, by) in self._world.blocked:
+            if x1 <= bx <= x2 and y1 <= by <= y2:
+                static = SimObject(self._world, 0, 0x0001, bx, by, 0, "wall")
+                static.Impassible = True
+                static.IsImpassible = True
+                statics.append(static)
+        return statics
+
+    def GetStaticsAt(self, x, y):
+        self._world.count("GetStaticsAt")
+        return self.GetStaticsInArea(x, y, x, y)
+
+
+# ============ SCRIPT RUNNER ============
+def run_script(path, world=None, seconds=60.0, setup=None):
+    """Run a Legion script headlessly until `seconds` of virtual time pass.
+
+    Args:
+        path: Script file (relative paths resolve from the repo root)
+        world: Pre-built SimWorld (a fresh one is created if None)
+        seconds: Virtual seconds to run before API.StopRequested goes True
+        setup: Optional callable(world) run after install, before the script
+
+    Returns:
+        SimReport: ticks, API call counts, wall time and speedup
+    """
+    if world is None:
+        world = SimWorld()
+    if not os.path.isabs(path):
+        repo_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        path = os.path.join(repo_root, path)
+
+    world.deadline = world.clock.now + seconds
+    stopped_by = "StopRequested"
+    start = _real_perf_counter()
+    # A copy imported by an earlier run/test would still talk to its world
+    for name in ("LegionUtils", "GatherFramework"):
+        sys.modules.pop(name, None)
+    world.install()
+    try:
+        if setup:
+            setup(world)
+        runpy.run_path(path, run_name="__main__")
+    except SimStop:
+        stopped_by = "deadline (script ignored StopRequested)"
+    except Exception as e:
+        stopped_by = "exception"
+        world.error = type(e).__name__ + ": " + str(e)
+    finally:
+        world.uninstall()
+        # Script modules imported under the simulator hold a reference to
+        # its API object - drop them so the next run imports them fresh.
+        for name in ("LegionUtils", "GatherFramework"):
+            sys.modules.pop(name, None)
+    wall = _real_perf_counter() - start
+    return SimReport(world, wall, stopped_by)
+
+
+def default_tamer_world():
+    """Player with bandages, three pets and a few monsters taking turns at them"""
+    world = SimWorld()
+    world.add_item(BANDAGE_GRAPHIC, 200, name="bandage")
+    pets = [world.add_pet("Dragon", 400, x=101, y=100),
+            world.add_pet("Nightmare", 300, x=100, y=101),
+            world.add_pet("Hiryu", 350, x=99, y=100)]
+    for i in range(3):
+        world.add_mobile("daemon", 500, x=104 + i, y=100 + i, notoriety=Notoriety.Enemy)
+    for i, pet in enumerate(pets):
+        world.every(1.5 + i * 0.5, lambda pet=pet: world.damage(pet, 12))
+    return world
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Run a Legion script in the headless simulator")
+    parser.add_argument("script", help="Script path, e.g. Tamer/Tamer_Suite.py")
+    parser.add_argument("--seconds", type=float, default=300.0, help="Virtual seconds to simulate")
+    parser.add_argument("--top", type=int, default=15, help="Number of API calls to list")
+    args = parser.parse_args(argv)
+
+    report = run_script(args.script, default_tamer_world(), args.seconds)
+    print(report.format(args.top))
+    return 1 if report.error else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())